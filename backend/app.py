@@ -12,7 +12,7 @@ from flask import (
     stream_with_context,
     make_response
 )
-from functools import wraps
+from functools import partial, wraps
 import os
 from dotenv import load_dotenv
 
@@ -41,7 +41,7 @@ from http import HTTPStatus  # Best Practice: Use standard HTTP status codes
 from azure.cosmos.exceptions import CosmosHttpResponseError, CosmosResourceNotFoundError
 from werkzeug.exceptions import BadRequest, Unauthorized, NotFound
 
-from gallery.blob_utils import get_gallery_items_by_org
+from gallery.blob_utils import get_gallery_items_by_org, invalidate_gallery_index
 
 # Load .env BEFORE importing modules that might read env at import time
 load_dotenv(override=True)
@@ -88,16 +88,46 @@ from shared.cosmo_db import (
     create_user_logs,
 )
 from shared.conversation_export import export_conversation
+from shared import activity_rollups
+from shared import chat_history
 from shared import clients
+from shared import description_jobs
+from shared import membership_cache
+from shared.orchestrator_stream import (
+    ORCHESTRATOR_CONNECT_TIMEOUT,
+    ORCHESTRATOR_FIRST_BYTE_TIMEOUT,
+    MarkerWatcher,
+    get_orchestrator_session,
+    stream_orchestrator,
+)
+from shared.spreadsheet_preview import (
+    XLSX_MIMETYPE as SPREADSHEET_XLSX_MIMETYPE,
+    get_csv_preview,
+)
+from shared.citation_resolver import (
+    CITATIONS_CONTAINER,
+    get_service_client as get_citation_service_client,
+    mark_blob_index_stale,
+    parse_citation_path,
+    resolve_blob as resolve_citation_blob,
+    resolve_citation,
+)
 from shared.webhook import handle_checkout_session_completed, handle_subscription_updated, handle_subscription_deleted
-from shared.blob_storage import BlobStorageManager, BlobUploadError
+from shared.blob_storage import (
+    BLOB_BATCH_SIZE,
+    BlobStorageManager,
+    BlobUploadError,
+    invalidate_directory_listing,
+)
 from data_summary.config import get_azure_openai_config, get_openai_config
-from data_summary.llm import PandasAIClient, OpenAIClient
+from data_summary.llm import ProfileSummaryClient, OpenAIClient
+from data_summary.summarize import create_excel_file_summary, create_openAI_file_summary
 
 from routes.report_jobs import bp as jobs_bp
 from routes.organizations import bp as organizations
-from routes.file_management import bp as file_management
+from routes.file_management import bp as file_management, start_folder_job
 from routes.user_documents import bp as user_documents
+from routes.conversations import bp as conversations_bp
 from routes.voice_customer import bp as voice_customer
 from routes.categories import bp as categories
 from routes.invitations import bp as invitations
@@ -195,9 +225,9 @@ limiter = Limiter(
 )
 
 
-def setup_pandas_llm_instance() -> PandasAIClient:
+def setup_profile_summary_llm_instance() -> ProfileSummaryClient:
     cfg = get_openai_config(model="gpt-4.1")
-    excel_summarization_llm = PandasAIClient(
+    excel_summarization_llm = ProfileSummaryClient(
         api_key=cfg.api_key,
         model=cfg.model
     )
@@ -227,8 +257,17 @@ auth = Auth(
 def setup_clients():
     print(f"[before_first_request] ", flush=True)
     clients.warm_up()  # idempotent
-    current_app.config["excel_summarization_llm"] = setup_pandas_llm_instance() 
+    current_app.config["excel_summarization_llm"] = setup_profile_summary_llm_instance() 
     current_app.config["openai_summarization_llm"] = setup_openai_llm_instance()
+    # Uploaded source documents are described in the background (see upload-source-document)
+    description_jobs.start_workers({
+        "excel": partial(
+            create_excel_file_summary, llm=current_app.config["excel_summarization_llm"]
+        ),
+        "document": partial(
+            create_openAI_file_summary, client=current_app.config["openai_summarization_llm"]
+        ),
+    })
     current_app.config["blob_storage_manager"] = (
         BlobStorageManager()
     )  # TODO implement the new BlobStorageManager in the upload_sources.py (this is the only way that there is no pytest import issue) The issue was that when running all tests together, there was a complex import resolution problem where the utils module was not being found properly due to module caching issues and conflicts between test fixtures.
@@ -264,6 +303,7 @@ app.register_blueprint(users)
 app.register_blueprint(platform_admin_bp)
 app.register_blueprint(notifications_bp)
 app.register_blueprint(google_edit_bp)
+app.register_blueprint(conversations_bp)
 
 
 def handle_auth_error(func):
@@ -463,6 +503,7 @@ def activate_invitation(invitation_id: str) -> bool:
         if item.get("active") is False:
             item["active"] = True
             container.upsert_item(item)
+            membership_cache.invalidate(item.get("invited_user_id"))
             return True
         return False
     except CosmosResourceNotFoundError:
@@ -529,6 +570,7 @@ def mark_invitation_as_redeemed(inviteId):
         item["redeemed_at"] = int(datetime.now(timezone.utc).timestamp())
 
         container.upsert_item(item)
+        membership_cache.invalidate(item.get("invited_user_id"))
         return render_template(
             "token_status.html",
             title="Invitation Activated!",
@@ -680,7 +722,7 @@ def get_user(*, context: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
 
         # Get function key from Key Vault
         key_secret_name = "orchestrator-host--checkuser"
-        function_key = clients.get_azure_key_vault_secret(key_secret_name)
+        function_key = clients.get_cached_secret(key_secret_name)
         if not function_key:
             raise ValueError(f"Secret {key_secret_name} not found in Key Vault")
 
@@ -833,7 +875,7 @@ def proxy_orc(*, context, **kwargs):
         # keySecretName is the name of the secret in Azure Key Vault which holds the key for the orchestrator function
         # It is set during the infrastructure deployment.
         keySecretName = "orchestrator-host--functionKey"
-        functionKey = clients.get_azure_key_vault_secret(keySecretName)
+        functionKey = clients.get_cached_secret(keySecretName)
         if not functionKey:
             raise ValueError(f"Function key {keySecretName} is empty")
     except Exception as e:
@@ -891,24 +933,34 @@ def proxy_orc(*, context, **kwargs):
 
     headers = {"Content-Type": "text/event-stream", "x-functions-key": functionKey}
 
+    activity_rollups.submit_user_message(
+        client_principal_organization,
+        client_principal_id,
+        int(time.time()),
+        new_conversation=not conversation_id and not hitl_resume,
+    )
+
+    # Images the orchestrator writes are referenced by blob path in the stream.
+    generated_images = MarkerWatcher(b"generated_images/")
+
     def generate():
         try:
-            with requests.post(
-                ORCHESTRATOR_ENDPOINT, stream=True, headers=headers, data=payload
-            ) as r:
-                # Check for error status codes
-                if r.status_code != 200:
-                    raise Exception(
-                        f"Orchestrator returned status code {r.status_code}"
-                    )
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        yield chunk.decode()
+            # Relay the orchestrator's bytes as-is over a pooled connection.
+            for chunk in stream_orchestrator(ORCHESTRATOR_ENDPOINT, payload, headers):
+                yield generated_images.scan(chunk)
         except Exception as e:
             logging.exception(f"[webbackend] exception in /stream_chatgpt: {str(e)}")
             error_message = f"Error contacting orchestrator {str(e)}"
             logging.error(error_message)
-            yield error_message
+            yield error_message.encode()
+        finally:
+            if not conversation_id:
+                # The orchestrator has stored the new conversation by now.
+                chat_history.invalidate_history(client_principal_id)
+            if generated_images.seen and client_principal_organization:
+                invalidate_gallery_index(
+                    f"organization_files/{client_principal_organization}/generated_images"
+                )
 
     return Response(stream_with_context(generate()), content_type="text/event-stream")
 
@@ -937,7 +989,7 @@ def chatgpt(*, context):
         # It is set during the infrastructure deployment.
         keySecretName = "orchestrator-host--functionKey"
 
-        functionKey = clients.get_azure_key_vault_secret(keySecretName)
+        functionKey = clients.get_cached_secret(keySecretName)
     except Exception as e:
         logging.exception(
             "[webbackend] exception in /api/orchestrator-host--functionKey"
@@ -963,8 +1015,12 @@ def chatgpt(*, context):
             }
         )
         headers = {"Content-Type": "application/json", "x-functions-key": functionKey}
-        response = requests.request(
-            "GET", ORCHESTRATOR_ENDPOINT, headers=headers, data=payload
+        response = get_orchestrator_session().request(
+            "GET",
+            ORCHESTRATOR_ENDPOINT,
+            headers=headers,
+            data=payload,
+            timeout=(ORCHESTRATOR_CONNECT_TIMEOUT, ORCHESTRATOR_FIRST_BYTE_TIMEOUT),
         )
         logging.info(f"[webbackend] response: {response.text[:500]}...")
 
@@ -972,6 +1028,8 @@ def chatgpt(*, context):
             logging.error(f"[webbackend] Error from orchestrator: {response.text}")
             return jsonify({"error": "Error contacting orchestrator"}), 500
 
+        if not conversation_id:
+            chat_history.invalidate_history(client_principal_id)
         return response.text
     except Exception as e:
         logging.exception("[webbackend] exception in /chatgpt")
@@ -1025,6 +1083,7 @@ def deleteChatConversation(*, context, chat_id):
     try:
         if chat_id:
             delete_conversation(chat_id, client_principal_id)
+            chat_history.invalidate_history(client_principal_id)
             return jsonify({"message": "Conversation deleted successfully"}), 200
         else:
             return jsonify({"error": "Missing conversation ID"}), 400
@@ -1049,6 +1108,7 @@ def renameChatConversation(*, context, chat_id):
             return jsonify({"error": "Title is required"}), 400
 
         saved_title = rename_conversation(chat_id, client_principal_id, title)
+        chat_history.invalidate_history(client_principal_id)
         return jsonify({"message": "Conversation renamed successfully", "title": saved_title}), 200
     except Exception as e:
         logging.exception("[webbackend] exception in /rename-chat-conversation")
@@ -1312,7 +1372,7 @@ def create_customer_portal_session(*, context):
 def getStripe(*, context):
     try:
         keySecretName = "stripeKey"
-        functionKey = clients.get_azure_key_vault_secret(keySecretName)
+        functionKey = clients.get_cached_secret(keySecretName)
         return jsonify({"functionKey": functionKey})
     except Exception as e:
         logging.exception("[webbackend] exception in /api/stripe")
@@ -1600,139 +1660,16 @@ def download_excel_citation(*, context):
         # Log the received file_path for debugging
         logging.info(f"Processing file_path: {file_path}")
 
-        # Handle different citation formats
-        if file_path.startswith("@https://") and file_path.endswith("/"):
-            # Handle citation format like: @https://construction%20adhesives%20pos%202024%202025%20ytd.xlsx/
-            # Extract the filename from between @https:// and the trailing /
-            encoded_filename = file_path[
-                9:-1
-            ]  # Remove '@https://' prefix and '/' suffix
-            blob_name = unquote(encoded_filename)  # URL decode the filename
-            logging.info(f"Detected citation format, extracted filename: {blob_name}")
-
-        elif file_path.startswith("https://") and (
-            file_path.endswith(".xlsx")
-            or file_path.endswith(".xls")
-            or file_path.endswith(".csv")
-        ):
-            # Handle citation format like: https://Construction%20Adhesives%20POS%202024%202025%20YTD.xlsx
-            # This is just a URL-encoded filename, not a real URL - remove the https:// prefix
-            encoded_filename = file_path[8:]  # Remove 'https://' prefix
-            blob_name = unquote(encoded_filename)
-            logging.info(f"Detected encoded filename format, extracted: {blob_name}")
-
-        elif file_path.startswith("https://") and "blob.core.windows.net" in file_path:
-            # Handle full blob URL - extract the blob name after documents/
-            parsed_url = urlparse(file_path)
-            path_parts = [part for part in parsed_url.path.split("/") if part]
-
-            if "documents" in path_parts:
-                docs_index = path_parts.index("documents")
-                blob_name = (
-                    "/".join(path_parts[docs_index + 1 :])
-                    if docs_index + 1 < len(path_parts)
-                    else ""
-                )
-            else:
-                # If no 'documents' in path, try to extract filename from the path
-                blob_name = "/".join(path_parts) if path_parts else ""
-                logging.warning(f"URL doesn't contain 'documents' in path: {file_path}")
-        else:
-            # Handle simple filename or relative path
-            blob_name = unquote(file_path)
-            if blob_name.startswith("documents/"):
-                blob_name = blob_name[10:]  # Remove 'documents/' prefix
-
-        logging.info(f"Extracted blob_name: {blob_name}")
-
-        # Additional validation
-        if not blob_name or blob_name.strip() == "":
-            return jsonify({"error": "Unable to extract valid filename from path"}), 400
-
-        # Validate file extension for Excel files
-        allowed_extensions = [".xlsx", ".xls", ".csv"]
-        if not any(blob_name.lower().endswith(ext) for ext in allowed_extensions):
-            return (
-                jsonify(
-                    {"error": "Only Excel files (.xlsx, .xls, .csv) are supported"}
-                ),
-                400,
-            )
-
-        # Build a streaming preview URL
-        q = urlencode({"file_path": file_path})
-        preview_url = urljoin(request.url_root, f"preview/spreadsheet?{q}")
-
-        # Derive filename for download button; normalize CSV to .xlsx
-        try:
-            if file_path.startswith("@https://") and file_path.endswith("/"):
-                encoded_filename = file_path[9:-1]
-                name = unquote(encoded_filename)
-            elif (
-                file_path.startswith("https://")
-                and "blob.core.windows.net" in file_path
-            ):
-                parsed_url = urlparse(file_path)
-                parts = [p for p in parsed_url.path.split("/") if p]
-                name = parts[-1] if parts else "file"
-            else:
-                name = unquote(file_path.split("/")[-1])
-        except Exception:
-            name = "file"
-        # Keep original filename extension for downloads (CSV remains .csv)
-        # Try to generate a SAS URL to the original blob for dev fallback (Excel files)
-        sas_url = None
-        try:
-            blob_service_client = BlobServiceClient.from_connection_string(
-                current_app.config["AZURE_STORAGE_CONNECTION_STRING"]
-            )
-            container_name = "documents"
-            _blob_name = blob_name
-            blob_client = blob_service_client.get_blob_client(
-                container=container_name, blob=_blob_name
-            )
-            try:
-                blob_client.get_blob_properties()
-            except Exception:
-                filename_only = _blob_name.split("/")[-1]
-                container_client = blob_service_client.get_container_client(
-                    container_name
-                )
-                found_blob = None
-                for b in container_client.list_blobs():
-                    if b.name.endswith(filename_only):
-                        found_blob = b.name
-                        break
-                if found_blob:
-                    _blob_name = found_blob
-                else:
-                    _blob_name = None
-            if _blob_name:
-                sas_token = generate_blob_sas(
-                    account_name=blob_service_client.account_name,
-                    container_name=container_name,
-                    blob_name=_blob_name,
-                    account_key=blob_service_client.credential.account_key,
-                    permission=BlobSasPermissions(read=True),
-                    expiry=datetime.now(timezone.utc) + timedelta(days=2),
-                )
-                sas_url = f"https://{blob_service_client.account_name}.blob.core.windows.net/{container_name}/{_blob_name}?{sas_token}"
-        except Exception as e:
-            logging.warning(
-                f"[download-excel-citation] SAS fallback generation failed: {e}"
-            )
-
-        return jsonify(
-            {
-                "success": True,
-                "download_url": sas_url
-                or preview_url,  # Download should return the ORIGINAL file (CSV remains CSV)
-                "preview_url": preview_url,  # Preview uses streaming endpoint (converted XLSX for CSV)
-                "sas_url": sas_url,
-                "filename": name,
-                "expires_in_days": 2,
-            }
+        result = resolve_citation(
+            file_path,
+            current_app.config["AZURE_STORAGE_CONNECTION_STRING"],
+            request.url_root,
         )
+        if not result["success"]:
+            return jsonify({"error": result["error"]}), 400
+
+        result.pop("file_path")
+        return jsonify(result)
 
     except Exception as e:
         logging.exception("[webbackend] Exception in /api/download-excel-citation")
@@ -1747,88 +1684,45 @@ def preview_spreadsheet():
             return jsonify({"error": "Missing file_path parameter"}), 400
 
         # Resolve blob name from various citation formats
-        if file_path.startswith("@https://") and file_path.endswith("/"):
-            encoded_filename = file_path[9:-1]
-            blob_name = unquote(encoded_filename)
-        elif file_path.startswith("https://") and file_path.endswith(
-            (".xlsx", ".xls", ".csv")
-        ):
-            blob_name = unquote(file_path[8:])
-        elif file_path.startswith("https://") and "blob.core.windows.net" in file_path:
-            parsed_url = urlparse(file_path)
-            parts = [p for p in parsed_url.path.split("/") if p]
-            if "documents" in parts:
-                idx = parts.index("documents")
-                blob_name = "/".join(parts[idx + 1 :]) if idx + 1 < len(parts) else ""
-            else:
-                blob_name = "/".join(parts) if parts else ""
-        else:
-            blob_name = unquote(file_path)
-            if blob_name.startswith("documents/"):
-                blob_name = blob_name[10:]
+        blob_name = parse_citation_path(file_path)
 
         if not blob_name:
             return jsonify({"error": "Unable to extract valid filename from path"}), 400
 
         # Connect to blob store
-        blob_service_client = BlobServiceClient.from_connection_string(
+        blob_service_client = get_citation_service_client(
             current_app.config["AZURE_STORAGE_CONNECTION_STRING"]
         )
-        container_name = "documents"
-        blob_client = blob_service_client.get_blob_client(
-            container=container_name, blob=blob_name
-        )
+        container_name = CITATIONS_CONTAINER
 
-        # Verify existence; if not, try to locate by filename
-        try:
-            blob_client.get_blob_properties()
-        except Exception:
-            filename_only = blob_name.split("/")[-1]
-            container_client = blob_service_client.get_container_client(container_name)
-            found_blob = None
-            for blob in container_client.list_blobs():
-                if blob.name.endswith(filename_only):
-                    found_blob = blob.name
-                    break
-            if not found_blob:
-                return jsonify({"error": "File not found"}), 404
-            blob_client = blob_service_client.get_blob_client(
-                container=container_name, blob=found_blob
-            )
-            blob_name = found_blob
+        # Verify existence; if not, locate by filename through the name index
+        resolved = resolve_citation_blob(blob_service_client, container_name, blob_name)
+        if not resolved:
+            return jsonify({"error": "File not found"}), 404
+        blob_client, properties = resolved
+        blob_name = blob_client.blob_name
 
         lower = blob_name.lower()
         if lower.endswith(".csv"):
-            csv_bytes = blob_client.download_blob().readall()
-            try:
-                df = pd.read_csv(BytesIO(csv_bytes))
-            except UnicodeDecodeError:
-                df = pd.read_csv(BytesIO(csv_bytes), encoding="latin1")
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                df.to_excel(writer, index=False, sheet_name="Sheet1")
-            output.seek(0)
+            # Converted once per blob version (ETag) and cached
             resp = Response(
-                output.getvalue(),
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                get_csv_preview(blob_client, blob_name, properties.etag),
+                mimetype=SPREADSHEET_XLSX_MIMETYPE,
             )
             base = blob_name.split("/")[-1].rsplit(".", 1)[0]
             resp.headers["Content-Disposition"] = f'inline; filename="{base}.xlsx"'
             resp.headers["Cache-Control"] = "no-store"
             return resp
-        elif lower.endswith(".xlsx"):
-            data = blob_client.download_blob().readall()
-            resp = Response(
-                data,
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        elif lower.endswith((".xlsx", ".xls")):
+            # Stream the original in chunks instead of buffering it
+            mimetype = (
+                SPREADSHEET_XLSX_MIMETYPE
+                if lower.endswith(".xlsx")
+                else "application/vnd.ms-excel"
             )
-            base = blob_name.split("/")[-1]
-            resp.headers["Content-Disposition"] = f'inline; filename="{base}"'
-            resp.headers["Cache-Control"] = "no-store"
-            return resp
-        elif lower.endswith(".xls"):
-            data = blob_client.download_blob().readall()
-            resp = Response(data, mimetype="application/vnd.ms-excel")
+            downloader = blob_client.download_blob()
+            resp = Response(stream_with_context(downloader.chunks()), mimetype=mimetype)
+            resp.headers["Content-Length"] = str(properties.size)
             base = blob_name.split("/")[-1]
             resp.headers["Content-Disposition"] = f'inline; filename="{base}"'
             resp.headers["Cache-Control"] = "no-store"
@@ -2442,7 +2336,8 @@ def list_blobs(*, context):
     - include_metadata(str): include metadata in results
     - page_size(int): number of results per page (default: 10, max: 100)
     - page(int): page number (1-based, default: 1)
-    - continuation_token(str): token for continuing pagination from a specific point
+    - continuation_token(str): opaque cursor from a previous response's
+      pagination.next_continuation_token; takes precedence over page
     - container_name(str): name of the container to list blobs from
 
     Returns:
@@ -2563,25 +2458,6 @@ def get_source_documents(*, context):
     if not organization_id:
         return create_error_response("Organization ID is required", 400)
 
-    # Define file extension mappings for categories
-    CATEGORY_EXTENSIONS = {
-        "documents": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt"],
-        "spreadsheets": [".csv", ".xlsx", ".xls", ".ods"],
-        "presentations": [".ppt", ".pptx", ".odp", ".key"]
-    }
-
-    def should_include_file(file_name, category):
-        """Check if a file should be included based on the category filter"""
-        if category == "all":
-            return True
-        
-        if category not in CATEGORY_EXTENSIONS:
-            return True
-        
-        # Get file extension
-        file_ext = os.path.splitext(file_name.lower())[1]
-        return file_ext in CATEGORY_EXTENSIONS[category]
-
     try:
         blob_storage_manager = BlobStorageManager()
         
@@ -2596,47 +2472,24 @@ def get_source_documents(*, context):
         else:
             current_prefix = base_prefix
         
-        # Get all blobs with the current prefix
-        blobs = blob_storage_manager.list_blobs_in_container_for_upload_files(
-            container_name="documents", prefix=current_prefix, include_metadata="yes"
+        # Direct children only, filtered by category and sorted by creation
+        # date; generated images are excluded.
+        listing = blob_storage_manager.list_directory(
+            container_name="documents",
+            prefix=current_prefix,
+            include_metadata="yes",
+            category=category,
+            order=order,
+            exclude_prefixes=[f"{base_prefix}generated_images/"],
         )
-
-        # Exclude generated_images folder
-        generated_images_prefix = f"{base_prefix}generated_images/"
-        
-        files = []
-        folder_set = set()
-        
-        for blob in blobs:
-            blob_name = blob.get("name", "")
-            
-            # Skip generated images
-            if blob_name.startswith(generated_images_prefix):
-                continue
-            
-            # Get the relative path from current prefix
-            relative_path = blob_name[len(current_prefix):]
-            
-            # Skip empty paths
-            if not relative_path:
-                continue
-            
-            # Check if this is a file in the current directory or a nested item
-            parts = relative_path.split("/")
-            
-            if len(parts) == 1:
-                # This is a file directly in the current folder
-                # Apply category filter
-                if should_include_file(blob_name, category):
-                    files.append(blob)
-            elif len(parts) > 1:
-                # This is a nested item, add the folder name
-                folder_name = parts[0]
-                folder_set.add(folder_name)
+        files = listing["files"]
         
         # Create folder objects
         folders = []
-        for folder_name in sorted(folder_set):
+        for folder_prefix in listing["folders"]:
+            folder_name = folder_prefix[len(current_prefix):].rstrip("/")
+            if not folder_name:
+                continue
             folder_full_path = f"{folder_path}/{folder_name}" if folder_path else folder_name
             folders.append({
                 "name": folder_name,
@@ -2649,14 +2502,6 @@ def get_source_documents(*, context):
                 "url": "",
             })
         
-        # Sort files by creation date based on order parameter
-        if files:
-            # reverse=True means newest first, reverse=False means oldest first
-            sort_reverse = (order == "newest")
-            files.sort(
-                key=lambda x: datetime.fromisoformat(x["created_on"]), reverse=sort_reverse
-            )
-        
         # Combine folders and files (folders first)
         result = {
             "folders": folders,
@@ -2757,11 +2602,12 @@ def rename_folder_endpoint(*, context):
         blob_storage_manager = BlobStorageManager()
         container_client = blob_storage_manager.blob_service_client.get_container_client("documents")
 
-        has_source = False
-        for _ in container_client.list_blobs(name_starts_with=src_prefix, results_per_page=1):
-            has_source = True
-            break
-        if not has_source:
+        # Look at the first batch only: large folders are moved by a
+        # background job, small ones inline.
+        pages = container_client.list_blobs(
+            name_starts_with=src_prefix, results_per_page=BLOB_BATCH_SIZE
+        ).by_page()
+        if not list(next(pages, [])):
             return create_error_response("Folder not found or empty", 404)
 
         exists_in_dest = False
@@ -2771,61 +2617,38 @@ def rename_folder_endpoint(*, context):
         if exists_in_dest:
             return create_error_response("A folder with this name already exists at this level", 409)
 
-        copied = 0
-        failed = 0
-        copy_errors = []
-        to_delete = []
-
-        for blob in container_client.list_blobs(name_starts_with=src_prefix):
-            src_blob_name = blob.name
-            rel_path = src_blob_name[len(src_prefix):]
-            dst_blob_name = dst_prefix + rel_path
-
-            src = container_client.get_blob_client(src_blob_name)
-            dst = container_client.get_blob_client(dst_blob_name)
-
-            try:
-                copy = dst.start_copy_from_url(src.url)
-                max_wait_time = 120
-                wait_time = 0.0
-                interval = 0.5
-                while wait_time < max_wait_time:
-                    props = dst.get_blob_properties()
-                    status = props.copy.status
-                    if status == "success":
-                        break
-                    if status == "failed":
-                        raise RuntimeError("copy failed")
-                    time.sleep(interval)
-                    wait_time += interval
-                if wait_time >= max_wait_time:
-                    raise TimeoutError("copy timed out")
-
-                try:
-                    src_props = src.get_blob_properties()
-                    dst.set_blob_metadata(metadata=(src_props.metadata or {}))
-                except Exception as meta_err:
-                    logger.warning(f"[rename-folder] metadata set failed on {dst_blob_name}: {meta_err}")
-
-                copied += 1
-                to_delete.append(src_blob_name)
-            except Exception as err:
-                failed += 1
-                copy_errors.append({"blob": src_blob_name, "error": str(err)})
-                logger.error(f"[rename-folder] copy failed {src_blob_name} -> {dst_blob_name}: {err}")
-
-        if failed > 0 and copied == 0:
-            return create_error_response("Failed to rename folder (no blobs copied)", 500)
-
-        deleted = 0
-        delete_errors = []
-        for src_blob_name in to_delete:
-            try:
-                container_client.get_blob_client(src_blob_name).delete_blob()
-                deleted += 1
-            except Exception as del_err:
-                delete_errors.append({"blob": src_blob_name, "error": str(del_err)})
-                logger.error(f"[rename-folder] could not delete {src_blob_name}: {del_err}")
+        if pages.continuation_token:
+            job = start_folder_job(
+                organization_id,
+                "rename-folder",
+                {"source_prefix": src_prefix, "destination_prefix": dst_prefix},
+                blob_storage_manager,
+            )
+            logger.info(f"[rename-folder] started job {job['id']} for {src_prefix} -> {dst_prefix}")
+            return create_success_response({
+                "message": "Folder rename started",
+                "job_id": job["id"],
+                "status": job["status"],
+                "source_prefix": src_prefix,
+                "destination_prefix": dst_prefix,
+            }, 202)
+
+        result = blob_storage_manager.move_prefix("documents", src_prefix, dst_prefix)
+
+        invalidate_gallery_index(src_prefix)
+        invalidate_directory_listing(src_prefix)
+        invalidate_directory_listing(dst_prefix)
+        mark_blob_index_stale()
+
+        if result["rolled_back"]:
+            logger.error(f"[rename-folder] copy failed, rolled back {src_prefix}: {result['copy_errors']}")
+            return create_error_response("Failed to rename folder (no blobs moved)", 500)
+
+        copied = result["copied"]
+        failed = len(result["copy_errors"])
+        copy_errors = result["copy_errors"]
+        deleted = result["deleted"]
+        delete_errors = result["delete_errors"]
 
         summary = {
             "message": "Folder renamed",
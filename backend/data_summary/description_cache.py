@@ -0,0 +1,210 @@
+"""
+Content-addressed cache of generated file descriptions.
+
+Re-uploading a file (renamed, or into another folder) should not pay for
+another LLM run. Descriptions are keyed by the SHA-256 of the file content
+plus the prompt, the model and ``CACHE_VERSION``, so editing a prompt or
+switching models naturally misses.
+
+Stores:
+- ``BlobDescriptionStore``: one small JSON blob per key in
+  ``DESCRIPTION_CACHE_CONTAINER``, shared by all instances.
+- ``LocalDescriptionStore``: JSON files under ``DESCRIPTION_CACHE_DIR``;
+  the stand-in when Blob Storage is not configured (local development).
+
+Both sit behind a small in-process LRU. The cache is best effort: store
+errors are logged and treated as misses, never surfaced to the upload.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, Optional
+
+from cachetools import LRUCache
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+
+from shared import clients
+
+logger = logging.getLogger("datasummary.description_cache")
+
+# Bump when the way descriptions are produced changes (e.g. the profile format)
+CACHE_VERSION = "1"
+HASH_CHUNK_BYTES = 1024 * 1024
+MEMORY_ENTRIES = 1024
+
+DESCRIPTION_CACHE_BACKEND = os.getenv("DESCRIPTION_CACHE_BACKEND", "")  # "blob" | "local" | "off"
+DESCRIPTION_CACHE_CONTAINER = os.getenv("DESCRIPTION_CACHE_CONTAINER", "description-cache")
+DESCRIPTION_CACHE_DIR = os.getenv(
+    "DESCRIPTION_CACHE_DIR", os.path.join(tempfile.gettempdir(), "description-cache")
+)
+
+# Only model output is worth keeping; manual summaries and errors are retried next time.
+CACHEABLE_SOURCES = {
+    "primary_llm",
+    "secondary_llm_fallback",
+    "openai_summary",
+}
+
+
+def file_sha256(path: str, chunk_bytes: int = HASH_CHUNK_BYTES) -> str:
+    """SHA-256 of a file, read in chunks so large uploads are never fully in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def description_key(content_sha256: str, prompt: str, model: str) -> str:
+    prompt_sha256 = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    material = f"v{CACHE_VERSION}|{content_sha256}|{prompt_sha256}|{model}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LocalDescriptionStore:
+    """JSON file per key in a local directory."""
+
+    def __init__(self, directory: str = DESCRIPTION_CACHE_DIR):
+        self._directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: Dict) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+
+
+class BlobDescriptionStore:
+    """JSON blob per key in a dedicated container."""
+
+    def __init__(self, container_name: str = DESCRIPTION_CACHE_CONTAINER):
+        self._container_name = container_name
+
+    def _container(self):
+        return clients.get_blob_container_client(self._container_name)
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            data = self._container().get_blob_client(f"{key[:2]}/{key}.json").download_blob().readall()
+        except ResourceNotFoundError:
+            return None
+        return json.loads(data)
+
+    def put(self, key: str, value: Dict) -> None:
+        container = self._container()
+        payload = json.dumps(value).encode("utf-8")
+        blob_name = f"{key[:2]}/{key}.json"
+        try:
+            container.upload_blob(blob_name, payload, overwrite=True)
+        except ResourceNotFoundError:
+            # First write on a fresh storage account
+            try:
+                container.create_container()
+            except ResourceExistsError:
+                pass
+            container.upload_blob(blob_name, payload, overwrite=True)
+
+
+class DescriptionCache:
+    def __init__(self, store, memory_entries: int = MEMORY_ENTRIES):
+        self._store = store
+        self._memory: LRUCache = LRUCache(maxsize=memory_entries)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._memory.get(key)
+        if value is not None:
+            return value
+        try:
+            value = self._store.get(key)
+        except Exception as e:
+            logger.warning("Description cache read failed: %s", e)
+            return None
+        if value is not None:
+            with self._lock:
+                self._memory[key] = value
+        return value
+
+    def put(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._memory[key] = value
+        try:
+            self._store.put(key, value)
+        except Exception as e:
+            logger.warning("Description cache write failed: %s", e)
+
+
+_cache: Optional[DescriptionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_description_cache() -> Optional[DescriptionCache]:
+    """Process-wide cache; None when disabled with DESCRIPTION_CACHE_BACKEND=off."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            backend = DESCRIPTION_CACHE_BACKEND or (
+                "blob" if clients.CONFIG.blob_account_url else "local"
+            )
+            if backend == "off":
+                return None
+            store = BlobDescriptionStore() if backend == "blob" else LocalDescriptionStore()
+            _cache = DescriptionCache(store)
+            logger.info("Description cache using %s store", backend)
+        return _cache
+
+
+def cached_description(
+    path: str,
+    prompt: str,
+    model: str,
+    describe: Callable[[], Dict],
+    cache: Optional[DescriptionCache] = None,
+) -> Dict:
+    """
+    Return the cached description of the file at ``path`` or compute it.
+
+    ``describe()`` runs only on a miss and its result is stored when it came
+    from the model (see ``CACHEABLE_SOURCES``).
+    """
+    cache = cache or get_description_cache()
+    if cache is None:
+        return describe()
+    try:
+        key = description_key(file_sha256(path), prompt, model)
+    except OSError as e:
+        logger.warning("Could not hash %s for the description cache: %s", path, e)
+        return describe()
+
+    hit = cache.get(key)
+    if hit is not None:
+        logger.info("Description cache hit for %s", path)
+        return {"file_description": hit["file_description"], "source": hit["source"]}
+
+    result = describe()
+    if isinstance(result, dict) and result.get("source") in CACHEABLE_SOURCES:
+        cache.put(key, {
+            "file_description": result["file_description"],
+            "source": result["source"],
+            "model": model,
+        })
+    return result
@@ -1,35 +1,33 @@
 from abc import ABC, abstractmethod
-from pandasai_openai import OpenAI as PandasAIOpenAI
 from openai import OpenAI
-import pandasai as pai
 
 
 class LLMClient(ABC):
     @abstractmethod
-    def summarize_dataframe(self, df, prompt: str) -> str: ...
+    def summarize_profile(self, profile: str, prompt: str) -> str: ...
 
 
-class PandasAIClient(LLMClient):
+class ProfileSummaryClient(LLMClient):
     def __init__(
             self, api_key: str, model: str
         ):
-        self._llm = PandasAIOpenAI(
-            api_token=api_key,
-            model=model
-        )
-        pai.config.set(
-            {
-                "llm": self._llm,
-                "save_logs": False,
-                "save_charts": False,
-                "return_code": False,
-                "enable_charts": False,
-                "verbose": False,
-            }
-        )
+        self._client = OpenAI(api_key=api_key)
+        self._model = model
+
+    @property
+    def model(self) -> str:
+        return self._model
 
-    def summarize_dataframe(self, df, prompt: str) -> str:
-        return df.chat(prompt)
+    def summarize_profile(self, profile: str, prompt: str) -> str:
+        response = self._client.chat.completions.create(
+            model=self._model,
+            max_tokens=300,
+            messages=[
+                {"role": "system", "content": prompt},
+                {"role": "user", "content": f"Profile of the file:\n{profile}"},
+            ],
+        )
+        return response.choices[0].message.content
 
 
 class OpenAIClient:
@@ -37,6 +35,10 @@ class OpenAIClient:
         self._llm = OpenAI(api_key=api_key)
         self._model = model
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def summarize_document(self, file_id, prompt: str) -> str:
         response = self._llm.responses.create(
             model=self._model,
@@ -0,0 +1,275 @@
+import codecs
+import csv
+import logging
+import re
+import warnings
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .file_utils import detect_extension
+
+logger = logging.getLogger("datasummary.profiler")
+
+CHUNK_ROWS = 100_000
+SNIFF_BYTES = 64 * 1024
+CSV_ENCODINGS = ["utf-8-sig", "cp1252", "latin-1"]
+CSV_DELIMITERS = ",;\t|"
+TOP_K = 5
+MAX_TRACKED_VALUES = 10_000
+QUANTILE_SAMPLE_ROWS = 20_000
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DATE_SNIFF_ROWS = 200
+DATE_LIKE = re.compile(r"\d{1,4}[-/.]\d{1,2}")
+MAX_PROFILE_COLUMNS = 60
+MAX_VALUE_CHARS = 40
+
+
+def sniff_csv(path: str, sample_bytes: int = SNIFF_BYTES) -> Tuple[str, str]:
+    """
+    Detect encoding and delimiter from one sample of the file.
+
+    Returns (encoding, delimiter). Latin-1 decodes anything, so it is the
+    last resort; the delimiter falls back to the candidate that splits the
+    first lines most consistently.
+    """
+    with open(path, "rb") as f:
+        raw = f.read(sample_bytes)
+
+    encoding, sample = "latin-1", raw.decode("latin-1")
+    for candidate in CSV_ENCODINGS:
+        try:
+            # The sample may cut a multi-byte character in half.
+            sample = codecs.getincrementaldecoder(candidate)().decode(raw, final=False)
+            encoding = candidate
+            break
+        except UnicodeDecodeError:
+            continue
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        lines = [line for line in sample.splitlines()[:20] if line.strip()]
+
+        def consistency(sep: str) -> Tuple[int, int]:
+            counts = [line.count(sep) for line in lines] or [0]
+            return (min(counts), -len(set(counts)))
+
+        delimiter = max(CSV_DELIMITERS, key=consistency)
+    return encoding, delimiter
+
+
+def _promote_header(df: pd.DataFrame) -> pd.DataFrame:
+    """Use the first non-empty row as header when the sheet's first row is blank."""
+    if df.empty or not all(str(c).startswith("Unnamed:") for c in df.columns):
+        return df
+    for position in range(min(2, len(df))):
+        row = df.iloc[position]
+        if row.notna().sum() >= max(1, df.shape[1] // 2):
+            promoted = df.iloc[position + 1:].reset_index(drop=True)
+            promoted.columns = [
+                str(v) if pd.notna(v) else f"Unnamed: {i}" for i, v in enumerate(row)
+            ]
+            return promoted
+    return df
+
+
+def iter_frames(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the file as dataframes: CSV in chunks of ``chunk_rows``, Excel's first sheet whole."""
+    if detect_extension(path) == ".csv":
+        encoding, delimiter = sniff_csv(path)
+        logger.info("CSV dialect: encoding=%s delimiter=%r", encoding, delimiter)
+        yield from pd.read_csv(
+            path,
+            encoding=encoding,
+            sep=delimiter,
+            chunksize=chunk_rows,
+            low_memory=False,
+            on_bad_lines="skip",
+        )
+        return
+    yield _promote_header(pd.read_excel(path, sheet_name=0))
+
+
+class ColumnProfile:
+    """Statistics of one column, accumulated chunk by chunk."""
+
+    def __init__(self, name: str, rng: np.random.Generator):
+        self.name = name
+        self.rows = 0
+        self.nulls = 0
+        self.kind: Optional[str] = None
+        self.values: Counter = Counter()
+        self.high_cardinality = False
+        self.minimum: Any = None
+        self.maximum: Any = None
+        self.total = 0.0
+        self.numeric_count = 0
+        self._rng = rng
+        self._sample_rate = 1.0
+        self._sample: List[np.ndarray] = []
+        self._sample_size = 0
+
+    def _kind_of(self, series: pd.Series) -> str:
+        if pd.api.types.is_bool_dtype(series):
+            return "boolean"
+        if pd.api.types.is_numeric_dtype(series):
+            return "numeric"
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        return "text"
+
+    def _looks_like_dates(self, series: pd.Series) -> bool:
+        head = series.head(DATE_SNIFF_ROWS).astype(str)
+        if head.empty or head.str.contains(DATE_LIKE).mean() < 0.9:
+            return False
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return pd.to_datetime(head, errors="coerce").notna().mean() >= 0.9
+
+    def _to_dates(self, series: pd.Series) -> pd.Series:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return pd.to_datetime(series, errors="coerce")
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        if present.empty:
+            return
+
+        kind = self._kind_of(present)
+        if self.kind is None and kind == "text" and self._looks_like_dates(present):
+            self.kind = "datetime"
+        if self.kind == "datetime" and kind == "text":
+            present = self._to_dates(present).dropna()
+            kind = "datetime"
+            if present.empty:
+                return
+        if self.kind is None:
+            self.kind = kind
+        elif self.kind != kind:
+            # Mixed chunks (e.g. dates, then numbers) are profiled as text,
+            # which has no range: values of different kinds do not compare.
+            self.kind = "text"
+            self.minimum = self.maximum = None
+
+        if kind == self.kind and kind in ("numeric", "datetime"):
+            low, high = present.min(), present.max()
+            self.minimum = low if self.minimum is None else min(self.minimum, low)
+            self.maximum = high if self.maximum is None else max(self.maximum, high)
+        if kind == self.kind == "numeric":
+            numbers = present.to_numpy(dtype="float64", na_value=np.nan)
+            numbers = numbers[np.isfinite(numbers)]
+            self.total += float(numbers.sum())
+            self.numeric_count += len(numbers)
+            self._add_sample(numbers)
+        self._count_values(present)
+
+    def _add_sample(self, numbers: np.ndarray) -> None:
+        """Uniform sample for quantiles: keep each value with the current rate, halve when full."""
+        if self._sample_rate < 1.0:
+            numbers = numbers[self._rng.random(len(numbers)) < self._sample_rate]
+        self._sample.append(numbers)
+        self._sample_size += len(numbers)
+        while self._sample_size > 2 * QUANTILE_SAMPLE_ROWS:
+            merged = np.concatenate(self._sample)
+            merged = merged[self._rng.random(len(merged)) < 0.5]
+            self._sample, self._sample_size = [merged], len(merged)
+            self._sample_rate /= 2
+
+    def _count_values(self, present: pd.Series) -> None:
+        counts = present.astype(str).value_counts()
+        if self.high_cardinality:
+            # Only keep counting values that are already tracked.
+            counts = counts[counts.index.isin(self.values.keys())]
+        self.values.update(counts.to_dict())
+        if len(self.values) > MAX_TRACKED_VALUES:
+            self.high_cardinality = True
+            self.values = Counter(dict(self.values.most_common(MAX_TRACKED_VALUES)))
+
+    def result(self) -> Dict[str, Any]:
+        profile: Dict[str, Any] = {
+            "name": self.name,
+            "kind": self.kind or "empty",
+            "null_rate": self.nulls / self.rows if self.rows else 0.0,
+            "distinct": len(self.values),
+            "distinct_is_lower_bound": self.high_cardinality,
+            "top": self.values.most_common(TOP_K),
+        }
+        if self.kind in ("numeric", "datetime"):
+            profile["min"], profile["max"] = self.minimum, self.maximum
+        if self.kind == "numeric" and self.numeric_count:
+            profile["mean"] = self.total / self.numeric_count
+            sample = np.concatenate(self._sample) if self._sample else np.array([])
+            if len(sample):
+                profile["quantiles"] = dict(zip(QUANTILES, np.quantile(sample, QUANTILES)))
+        return profile
+
+
+def profile_file(path: str, chunk_rows: int = CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Read a CSV/Excel file once and return its profile.
+
+    ``{"rows": int, "columns": [column profile, ...]}``; each column has
+    kind, null rate, distinct count, top values and, for numbers and
+    dates, the range (plus mean and quantiles for numbers).
+    """
+    rng = np.random.default_rng(0)
+    columns: Dict[str, ColumnProfile] = {}
+    rows = 0
+    for frame in iter_frames(path, chunk_rows):
+        frame.columns = [
+            str(c).strip().replace("\n", " ").replace("\r", " ") for c in frame.columns
+        ]
+        frame = frame.loc[:, ~pd.Index(frame.columns).duplicated()]
+        for name in frame.columns:
+            if name not in columns:
+                columns[name] = ColumnProfile(name, rng)
+            columns[name].update(frame[name])
+        rows += len(frame)
+
+    column_profiles = [c.result() for c in columns.values()]
+    # Drop columns that are entirely empty, like the previous manual summary did
+    column_profiles = [c for c in column_profiles if c["kind"] != "empty"]
+    return {"rows": rows, "columns": column_profiles}
+
+
+def _fmt(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d") if value == value.normalize() else str(value)
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= MAX_VALUE_CHARS else text[:MAX_VALUE_CHARS - 1] + "…"
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """Compact plain-text rendering of a profile for the LLM prompt."""
+    columns = profile["columns"]
+    lines = [f"Rows: {profile['rows']}; Columns: {len(columns)}"]
+    for column in columns[:MAX_PROFILE_COLUMNS]:
+        distinct = f"{column['distinct']}{'+' if column['distinct_is_lower_bound'] else ''}"
+        parts = [f"nulls {column['null_rate']:.1%}", f"distinct {distinct}"]
+        if "min" in column:
+            parts.append(f"range {_fmt(column['min'])} .. {_fmt(column['max'])}")
+        if "mean" in column:
+            parts.append(f"mean {_fmt(column['mean'])}")
+        if "quantiles" in column:
+            q = column["quantiles"]
+            parts.append(
+                "p5/p25/p50/p75/p95 " + "/".join(_fmt(float(q[k])) for k in QUANTILES)
+            )
+        if column["kind"] in ("text", "boolean") and column["top"]:
+            total = profile["rows"] or 1
+            parts.append(
+                "top "
+                + ", ".join(f"{_fmt(v)} ({count / total:.0%})" for v, count in column["top"])
+            )
+        lines.append(f"- {column['name']} ({column['kind']}): " + "; ".join(parts))
+    if len(columns) > MAX_PROFILE_COLUMNS:
+        lines.append(f"... and {len(columns) - MAX_PROFILE_COLUMNS} more columns")
+    return "\n".join(lines)
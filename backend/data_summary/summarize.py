@@ -1,9 +1,9 @@
 import logging
 from typing import Optional
-import pandas as pd
 import re
 from .llm import LLMClient, OpenAIClient
-from .file_utils import read_preview, read_full_dataframe, to_pandasai_dataframe, reduce_dataframe_for_fallback
+from .profiler import profile_file, format_profile
+from .description_cache import cached_description
 import unicodedata
 
 logger = logging.getLogger("datasummary.summarize")
@@ -35,24 +35,18 @@ Analyze the data and provide a brief explanation of the file in 2 sentences, foc
 STALL_MSG = "Unfortunately, I was not able to get your answer. Please try again."
 
 
-def _manual_description(df: pd.DataFrame) -> str:
-    df = df.dropna(how="all").dropna(axis=1, how="all")
-    n_rows, n_cols = df.shape
-    cols = [str(c).strip().replace("\n", " ").replace("\r", " ") for c in df.columns]
+def _manual_description(profile: dict) -> str:
+    columns = profile["columns"]
+    n_rows, n_cols = profile["rows"], len(columns)
+    cols = [c["name"] for c in columns]
     patterns = []
-    for col in cols[:5]:
-        s = df[col].dropna()
-        if s.empty:
-            continue
-        dt = str(s.dtype)
-        if "int" in dt or "float" in dt:
-            patterns.append(f"{col} ranges {s.min()}–{s.max()}")
-        elif "datetime" in dt:
-            patterns.append(f"{col} spans {s.min()}–{s.max()}")
-        else:
-            vc = s.value_counts()
-            if not vc.empty:
-                patterns.append(f"{col} often '{vc.index[0]}'")
+    for col in columns[:5]:
+        if col["kind"] == "numeric":
+            patterns.append(f"{col['name']} ranges {col['min']}–{col['max']}")
+        elif col["kind"] == "datetime":
+            patterns.append(f"{col['name']} spans {col['min']}–{col['max']}")
+        elif col["top"]:
+            patterns.append(f"{col['name']} often '{col['top'][0][0]}'")
         if len(patterns) >= 2:
             break
     cols_text = f" Columns: {', '.join(cols)}." if n_cols <= 12 else ""
@@ -90,36 +84,39 @@ def sanitize_metadata_value(value: str) -> str:
 def create_excel_file_summary(
     path: str, llm: LLMClient, prompt: str = DEFAULT_PROMPT, max_retries: int = 3
 ) -> dict:
-    try:
-        preview, _ = read_preview(path)
-        if preview is not None:
-            logger.info("Preview columns: %s", list(preview.columns))
-            logger.info("Preview shape: %s", preview.shape)
+    """
+    Describe a CSV/Excel file from its profile.
+
+    The file is read once (CSV in chunks) into a compact column profile,
+    which is what the LLM sees; the dataframe itself never reaches it.
+    Files already described with the same prompt and model are answered
+    from the description cache.
+    """
+    return cached_description(
+        path, prompt, getattr(llm, "model", type(llm).__name__),
+        lambda: _describe_excel_file(path, llm, prompt, max_retries),
+    )
+
 
-        full_df = read_full_dataframe(path)
-        pai_df = to_pandasai_dataframe(full_df)
+def _describe_excel_file(path: str, llm: LLMClient, prompt: str, max_retries: int) -> dict:
+    try:
+        profile = profile_file(path)
+        profile_text = format_profile(profile)
+        logger.info("Profile: %d rows, %d columns, %d chars",
+                    profile["rows"], len(profile["columns"]), len(profile_text))
 
         last_err: Optional[Exception] = None
         for attempt in range(1, max_retries + 1):
             try:
-                if attempt == 1:
-                    resp = llm.summarize_dataframe(pai_df, prompt)
+                # Retry the prompt on stalls and errors; the last attempt
+                # switches to the shorter fallback prompt.
+                if attempt < max_retries:
+                    resp = llm.summarize_profile(profile_text, prompt)
                     description_source = "primary_llm"
-                if attempt == 2:
-                    pai_df = reduce_dataframe_for_fallback(pai_df)
-                    resp = llm.summarize_dataframe(pai_df, prompt)
-                    description_source = "primary_llm_fallback"
                 else:
-                    resp = llm.summarize_dataframe(pai_df, FALLBACK_PROMPT)
+                    resp = llm.summarize_profile(profile_text, FALLBACK_PROMPT)
                     description_source = "secondary_llm_fallback"
 
-
-                # Handle PandasAI StringResponse
-                if hasattr(resp, "value"):
-                    resp = resp.value
-                elif hasattr(resp, "__str__"):
-                    resp = str(resp)
-
                 text = (resp or "").strip()
                 if not text or text == STALL_MSG:
                     logger.warning("LLM stall/empty on attempt %d", attempt)
@@ -135,7 +132,7 @@ def create_excel_file_summary(
                 last_err = e
 
         logger.warning("Falling back to manual description.")
-        manual_description = _manual_description(full_df)
+        manual_description = _manual_description(profile)
         return {"file_description": sanitize_metadata_value(manual_description), "source": "manual_summary" }
 
     except Exception as e:
@@ -143,7 +140,14 @@ def create_excel_file_summary(
         return f"Error processing file: {e}"
 
 def create_openAI_file_summary(path: str, client: OpenAIClient, max_retries: int = 3) -> dict:
-    """Create a file summary using OpenAI's GPT-4 model."""
+    """Create a file summary using OpenAI; cache hits skip the file upload too."""
+    return cached_description(
+        path, DEFAULT_DOC_SUMMARIZATION_PROMPT, client.model,
+        lambda: _describe_document(path, client),
+    )
+
+
+def _describe_document(path: str, client: OpenAIClient) -> dict:
     try:
         file_id = client.upload_file(path)
         response = client.summarize_document(file_id, DEFAULT_DOC_SUMMARIZATION_PROMPT)
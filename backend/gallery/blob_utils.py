@@ -1,11 +1,16 @@
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
 from email.utils import parsedate_to_datetime
 from shared.blob_storage import BlobStorageManager
+from shared.blob_cursors import cursor_store, decode_cursor, encode_cursor, invalidate_cursors
 from logging import getLogger
 from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions
+from cachetools import TTLCache
 from flask import current_app
 import math
+import os
+import threading
 
 logger = getLogger(__name__)
 
@@ -21,6 +26,13 @@ TEXT_DOCUMENT_CONTENT_TYPES = {
     "application/msword"
 }
 
+GALLERY_INDEX_TTL_SECONDS = int(os.getenv("GALLERY_INDEX_TTL_SECONDS", "120"))
+GALLERY_INDEX_MAX_ORGS = int(os.getenv("GALLERY_INDEX_MAX_ORGS", "256"))
+GALLERY_INDEX_MAX_VIEWS = 32
+SAS_EXPIRY_HOURS = 24
+ORG_FILES_PREFIX = "organization_files"
+
+
 class GalleryRetrievalError(Exception):
     """Custom exception for gallery retrieval errors."""
 
@@ -84,7 +96,20 @@ def _coerce_dt(value: Any) -> datetime:
 
     return _MIN
 
-def _generate_sas_url(blob_name: str, container_name: str = "documents", expiry_hours: int = 24) -> Optional[str]:
+@lru_cache(maxsize=4)
+def _get_signing_credentials(connection_string: str) -> Tuple[str, str]:
+    """Parse the connection string once and return (account_name, account_key)."""
+    blob_service_client = BlobServiceClient.from_connection_string(connection_string)
+    return blob_service_client.account_name, blob_service_client.credential.account_key
+
+
+# Issued read URLs are reused until half their lifetime has passed, so a
+# returned URL is always valid for at least SAS_EXPIRY_HOURS / 2.
+_sas_url_cache: TTLCache = TTLCache(maxsize=10000, ttl=SAS_EXPIRY_HOURS * 3600 / 2)
+_sas_url_lock = threading.Lock()
+
+
+def _generate_sas_url(blob_name: str, container_name: str = "documents", expiry_hours: int = SAS_EXPIRY_HOURS) -> Optional[str]:
     """
     Generate a SAS URL for a blob with read permissions.
     
@@ -96,22 +121,31 @@ def _generate_sas_url(blob_name: str, container_name: str = "documents", expiry_
     Returns:
         SAS URL string or None if generation fails
     """
+    cache_key = (container_name, blob_name, expiry_hours)
+    with _sas_url_lock:
+        cached = _sas_url_cache.get(cache_key)
+    if cached:
+        return cached
+
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(
+        account_name, account_key = _get_signing_credentials(
             current_app.config["AZURE_STORAGE_CONNECTION_STRING"]
         )
-        account_name = blob_service_client.account_name
         
         sas_token = generate_blob_sas(
             account_name=account_name,
             container_name=container_name,
             blob_name=blob_name,
-            account_key=blob_service_client.credential.account_key,
+            account_key=account_key,
             permission=BlobSasPermissions(read=True),
             expiry=datetime.now(timezone.utc) + timedelta(hours=expiry_hours),
         )
         
-        return f"https://{account_name}.blob.core.windows.net/{container_name}/{blob_name}?{sas_token}"
+        url = f"https://{account_name}.blob.core.windows.net/{container_name}/{blob_name}?{sas_token}"
+        if expiry_hours == SAS_EXPIRY_HOURS:
+            with _sas_url_lock:
+                _sas_url_cache[cache_key] = url
+        return url
         
     except Exception as e:
         logger.warning(f"Failed to generate SAS URL for blob {blob_name}: {e}")
@@ -142,6 +176,27 @@ def _matches_file_type(blob: Dict[str, Any], desired: Optional[str]) -> bool:
 
     return True
 
+def _matches_custom_filters(
+    item: Dict[str, Any],
+    filter_criteria: Optional[Dict[str, Any]],
+    query_lower: Optional[str],
+) -> bool:
+    metadata = item.get("metadata", {}) or {}
+    if filter_criteria:
+        for key, value in filter_criteria.items():
+            if key not in metadata or str(metadata[key]).casefold() != str(value).casefold():
+                return False
+    if query_lower:
+        # Search across name, content_type and metadata
+        if query_lower in item.get("name", "").lower():
+            return True
+        if query_lower in item.get("content_type", "").lower():
+            return True
+        metadata_string = " ".join(f"{k}:{v}" for k, v in metadata.items()).lower()
+        return query_lower in metadata_string
+    return True
+
+
 def get_blobs_with_custom_filtering_paginated(
     container_name: str,
     prefix: str = None,
@@ -150,13 +205,18 @@ def get_blobs_with_custom_filtering_paginated(
     requested_limit: int = 10,
     filter_criteria: Optional[Dict[str, Any]] = None,
     query: Optional[str] = None,
-    internal_page_size: int = 30
+    internal_page_size: int = 30,
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Get blobs with custom filtering and pagination.
 
     This function fetches blobs in pages of internal_page_size, applies filtering,
     and builds custom pages that match the requested page size and number.
+    The start of every filtered page (internal listing cursor plus the number
+    of matches to skip in that listing page) is kept in ``cursor_store``, so a
+    page that was walked past before is served without re-listing its
+    predecessors.
 
     Args:
         container_name: Name of the container to list blobs from
@@ -167,103 +227,108 @@ def get_blobs_with_custom_filtering_paginated(
         filter_criteria: Dict of metadata filters (e.g., {"user_id": "some_value"})
         query: Search string to match across name, content_type, and metadata
         internal_page_size: Internal page size for fetching from blob storage (default: 30)
+        cursor: ``next_continuation_token`` from a previous call; overrides requested_page
 
     Returns:
-        Dict containing paginated results with filtering applied
+        Dict containing paginated results with filtering applied. ``total_count``
+        and ``total_pages`` only cover the pages walked so far.
     """
     try:
         blob_storage_manager = BlobStorageManager()
-        all_filtered_items: List[Dict[str, Any]] = []
-        continuation_token = None
-        current_page = 1
+        query_lower = query.lower() if query else None
+        listing_key = (
+            prefix or "",
+            "filtered",
+            container_name,
+            include_metadata,
+            internal_page_size,
+            requested_limit,
+            tuple(sorted((k, str(v).casefold()) for k, v in (filter_criteria or {}).items())),
+            query_lower,
+        )
+
+        decoded = decode_cursor(cursor)
+        if decoded:
+            requested_page, position = decoded
+            current_page = requested_page
+        else:
+            current_page, position = cursor_store.nearest(listing_key, requested_page)
+        continuation_token = position.get("token") if position else None
+        skip = position.get("skip", 0) if position else 0
+
+        page_items: List[Dict[str, Any]] = []
+        page_count = 0
+        next_position = None
         max_pages_to_fetch = 100  # Safety limit to prevent infinite loops
 
-        # Fetch pages until we have enough items for the requested page or hit max pages
-        while len(all_filtered_items) < (requested_page * requested_limit) and current_page <= max_pages_to_fetch:
-            try:
-                paginated_result = blob_storage_manager.list_blobs_in_container_for_upload_files_paginated(
-                    container_name=container_name,
-                    prefix=prefix,
-                    include_metadata=include_metadata,
-                    page_size=internal_page_size,
-                    page=current_page,
-                    continuation_token=continuation_token
-                )
-
-                raw_items = paginated_result.get("blobs", [])
-
-                # Apply metadata filtering
-                if filter_criteria:
-                    filtered_items = []
-                    for item in raw_items:
-                        metadata = item.get("metadata", {})
-                        matches = True
-                        for key, value in filter_criteria.items():
-                            if key not in metadata or str(metadata[key]).casefold() != str(value).casefold():
-                                matches = False
-                                break
-                        if matches:
-                            filtered_items.append(item)
-                    raw_items = filtered_items
-
-                # Apply query filtering (search across name, content_type, metadata)
-                if query:
-                    query_lower = query.lower()
-                    filtered_items = []
-                    for item in raw_items:
-                        # Check name
-                        name_match = query_lower in item.get("name", "").lower()
-                        # Check content_type
-                        content_type_match = query_lower in item.get("content_type", "").lower()
-                        # Check metadata
-                        metadata_match = False
-                        metadata = item.get("metadata", {})
-                        if metadata:
-                            metadata_string = " ".join(f"{k}:{v}" for k, v in metadata.items()).lower()
-                            metadata_match = query_lower in metadata_string
-
-                        if name_match or content_type_match or metadata_match:
-                            filtered_items.append(item)
-
-                    raw_items = filtered_items
-
-                all_filtered_items.extend(raw_items)
-
-                # Check if we have more pages
-                if not paginated_result.get("has_more", False):
-                    break
-
-                continuation_token = paginated_result.get("next_continuation_token")
-                current_page += 1
-
-            except StopIteration:
-                # No more pages available
+        for _ in range(max_pages_to_fetch):
+            paginated_result = blob_storage_manager.list_blobs_in_container_for_upload_files_paginated(
+                container_name=container_name,
+                prefix=prefix,
+                include_metadata=include_metadata,
+                page_size=internal_page_size,
+                continuation_token=continuation_token
+            )
+            matches = [
+                item
+                for item in paginated_result.get("blobs", [])
+                if _matches_custom_filters(item, filter_criteria, query_lower)
+            ]
+
+            for index in range(skip, len(matches)):
+                if page_count == requested_limit:
+                    # This match opens the next filtered page.
+                    position = {"token": continuation_token, "skip": index}
+                    current_page += 1
+                    cursor_store.put(listing_key, current_page, position)
+                    page_count = 0
+                    if current_page > requested_page:
+                        next_position = position
+                        break
+                if current_page == requested_page:
+                    page_items.append(matches[index])
+                page_count += 1
+            skip = 0
+
+            if next_position or not paginated_result.get("has_more", False):
                 break
+            continuation_token = paginated_result.get("next_continuation_token")
 
-        # Calculate pagination for the filtered results
-        total_filtered_items = len(all_filtered_items)
-        total_pages = math.ceil(total_filtered_items / requested_limit) if total_filtered_items > 0 else 0
+            if current_page == requested_page and page_count == requested_limit:
+                # The page is full and ended with this listing page; the next
+                # filtered page (if any) starts at the next listing page.
+                next_position = {"token": continuation_token, "skip": 0}
+                cursor_store.put(listing_key, requested_page + 1, next_position)
+                break
 
-        # Extract the specific page requested
-        start_index = (requested_page - 1) * requested_limit
-        end_index = start_index + requested_limit
-        page_items = all_filtered_items[start_index:end_index]
+        has_more = next_position is not None
+        total_filtered_items = (requested_page - 1) * requested_limit + len(page_items)
+        total_pages = math.ceil(total_filtered_items / requested_limit) if total_filtered_items > 0 else 0
 
         # Generate SAS URLs for the items
-        for item in page_items:
+        app = current_app._get_current_object()
+
+        def sign(item: Dict[str, Any]) -> None:
             blob_name = item.get("name")
-            if blob_name:
+            if not blob_name:
+                return
+            # Pool threads do not inherit the request's app context.
+            with app.app_context():
                 sas_url = _generate_sas_url(blob_name, container_name=container_name)
-                if sas_url:
-                    item["url"] = sas_url
+            if sas_url:
+                item["url"] = sas_url
+
+        blob_storage_manager.map_blobs(sign, page_items)
 
         return {
             "blobs": page_items,
             "current_page": requested_page,
             "page_size": requested_limit,
             "total_count": total_filtered_items,
-            "has_more": requested_page < total_pages,
-            "next_continuation_token": None,  # Custom pagination doesn't use continuation tokens
+            "has_more": has_more,
+            "next_continuation_token": (
+                encode_cursor(requested_page + 1, next_position) if has_more else None
+            ),
             "total_pages": total_pages
         }
 
@@ -272,6 +337,138 @@ def get_blobs_with_custom_filtering_paginated(
         raise GalleryRetrievalError(f"Failed to retrieve blobs with custom filtering: {str(e)}")
 
 
+class _GalleryIndex:
+    """An organization's gallery items, sorted newest first, plus memoized filter views."""
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items
+        self._views: Dict[Tuple, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def view(
+        self,
+        uploader_id: Optional[str],
+        file_type: Optional[str],
+        query: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """Return the items matching the filters, computing each combination once."""
+        key = (
+            str(uploader_id).casefold() if uploader_id else None,
+            file_type,
+            query.lower() if query else None,
+        )
+        with self._lock:
+            cached = self._views.get(key)
+        if cached is not None:
+            return cached
+
+        matched = [item for item in self.items if _matches_gallery_filters(item, *key)]
+        with self._lock:
+            if len(self._views) >= GALLERY_INDEX_MAX_VIEWS:
+                self._views.clear()
+            self._views[key] = matched
+        return matched
+
+
+_gallery_indexes: TTLCache = TTLCache(
+    maxsize=GALLERY_INDEX_MAX_ORGS, ttl=GALLERY_INDEX_TTL_SECONDS
+)
+_gallery_indexes_lock = threading.Lock()
+
+
+def _gallery_prefix(organization_id: str) -> str:
+    return f"{ORG_FILES_PREFIX}/{organization_id}/generated_images"
+
+
+def _matches_gallery_filters(
+    item: Dict[str, Any],
+    uploader_id: Optional[str],
+    file_type: Optional[str],
+    query: Optional[str],
+) -> bool:
+    metadata = item.get("metadata") or {}
+
+    if not _matches_file_type(item, file_type):
+        return False
+
+    # Filter by uploader_id if provided
+    if uploader_id:
+        user_id_in_metadata = metadata.get("user_id", "")
+        if str(user_id_in_metadata).casefold() != uploader_id:
+            return False
+
+    # Filter by query if provided (search across name, content_type, metadata)
+    if query:
+        name_match = query in (item.get("name") or "").lower()
+        content_type_match = query in (item.get("content_type") or "").lower()
+        metadata_match = False
+        if metadata:
+            metadata_string = " ".join(f"{k}:{v}" for k, v in metadata.items()).lower()
+            metadata_match = query in metadata_string
+        if not (name_match or content_type_match or metadata_match):
+            return False
+
+    return True
+
+
+def _build_gallery_index(organization_id: str) -> _GalleryIndex:
+    blob_storage_manager = BlobStorageManager()
+    prefix = _gallery_prefix(organization_id)
+
+    logger.info(f"Building gallery index for organization {organization_id} with prefix {prefix}")
+    items = [
+        {
+            "name": blob.get("name"),
+            "size": blob.get("size"),
+            "content_type": blob.get("content_type"),
+            "created_on": blob.get("last_modified"),
+            "last_modified": blob.get("last_modified"),
+            "metadata": blob.get("metadata") or {},
+            "url": blob.get("url"),
+        }
+        for blob in blob_storage_manager.list_blobs_in_container(
+            container_name="documents",
+            prefix=prefix,
+            include_metadata="yes",
+        )
+    ]
+
+    def sort_key(it: Dict[str, Any]) -> Tuple[datetime, str]:
+        created = _coerce_dt(it.get("created_on"))
+        created = created if created != _MIN else _coerce_dt(it.get("last_modified"))
+        return created, it.get("name") or ""
+
+    items.sort(key=sort_key, reverse=True)
+    return _GalleryIndex(items)
+
+
+def _get_gallery_index(organization_id: str) -> _GalleryIndex:
+    with _gallery_indexes_lock:
+        index = _gallery_indexes.get(organization_id)
+    if index is None:
+        index = _build_gallery_index(organization_id)
+        with _gallery_indexes_lock:
+            _gallery_indexes[organization_id] = index
+    return index
+
+
+def invalidate_gallery_index(path: Optional[str] = None) -> None:
+    """
+    Drop cached gallery indexes affected by a change under ``path``.
+
+    ``path`` is a blob name or folder inside ``organization_files/<org_id>/``;
+    any other path (or None) clears every organization's index. Stored page
+    positions of listings affected by ``path`` are dropped too.
+    """
+    invalidate_cursors(path)
+    parts = (path or "").strip("/").split("/")
+    with _gallery_indexes_lock:
+        if len(parts) >= 2 and parts[0] == ORG_FILES_PREFIX and parts[1]:
+            _gallery_indexes.pop(parts[1], None)
+        else:
+            _gallery_indexes.clear()
+
+
 def get_gallery_items_by_org(
     organization_id: str,
     uploader_id: Optional[str] = None,
@@ -285,11 +482,12 @@ def get_gallery_items_by_org(
     """
     List the organization's blobs and apply filtering/sorting with pagination.
     
-    Simplified approach:
-    1. Fetch ALL blobs from Azure Storage
-    2. Apply filtering (uploader_id, file_type, query) in memory
-    3. Sort all items by date (newest/oldest)
-    4. Paginate the sorted results
+    Approach:
+    1. Read the organization's gallery index (built from one listing, kept
+       for GALLERY_INDEX_TTL_SECONDS and dropped on upload/delete/move)
+    2. Apply filtering (uploader_id, file_type, query), memoized per index
+    3. Items are already sorted newest first; 'oldest' walks them backwards
+    4. Paginate, then sign SAS URLs for the returned page only
     
     - Filter by metadata.user_id == uploader_id (case-insensitive).
     - Filter by requested file_type (images | pptx | text_documents).
@@ -299,75 +497,25 @@ def get_gallery_items_by_org(
     Returns a dictionary with items, total count, and pagination info.
     """
     try:
-        blob_storage_manager = BlobStorageManager()
-        prefix = f"organization_files/{organization_id}/generated_images"
-        
-        # Step 1: Fetch ALL blobs from Azure Storage
-        logger.info(f"Fetching all blobs for organization {organization_id} with prefix {prefix}")
-        all_blobs = blob_storage_manager.list_blobs_in_container(
-            container_name="documents",
-            prefix=prefix,
-            include_metadata="yes",
-            max_results=None  # Get all blobs
-        )
-        
-        # Step 2: Convert to items format and apply filters
-        items: List[Dict[str, Any]] = []
+        index = _get_gallery_index(organization_id)
+        items = index.view(uploader_id, file_type, query)
         
-        for blob in all_blobs:
-            metadata = blob.get("metadata") or {}
-            blob_name = blob.get("name")
-
-            if not _matches_file_type(blob, file_type):
-                continue
-            
-            # Filter by uploader_id if provided
-            if uploader_id:
-                user_id_in_metadata = metadata.get("user_id", "")
-                if str(user_id_in_metadata).casefold() != str(uploader_id).casefold():
-                    continue  # Skip this blob if user_id doesn't match
-            
-            # Filter by query if provided (search across name, content_type, metadata)
-            if query:
-                query_lower = query.lower()
-                name_match = query_lower in blob.get("name", "").lower()
-                content_type_match = query_lower in blob.get("content_type", "").lower()
-                metadata_match = False
-                if metadata:
-                    metadata_string = " ".join(f"{k}:{v}" for k, v in metadata.items()).lower()
-                    metadata_match = query_lower in metadata_string
-                
-                if not (name_match or content_type_match or metadata_match):
-                    continue  # Skip this blob if query doesn't match
-            
-            # Generate SAS URL for the blob
-            sas_url = _generate_sas_url(blob_name, container_name="documents") if blob_name else None
-            
-            items.append({
-                "name": blob_name,
-                "size": blob.get("size"),
-                "content_type": blob.get("content_type"),
-                "created_on": blob.get("last_modified"),
-                "last_modified": blob.get("last_modified"),
-                "metadata": metadata,
-                "url": sas_url or blob.get("url")  # Fallback to original URL if SAS generation fails
-            })
-        
-        # Step 3: Sort ALL items by date BEFORE pagination
-        def sort_key(it: Dict[str, Any]) -> datetime:
-            created = _coerce_dt(it.get("created_on"))
-            return created if created != _MIN else _coerce_dt(it.get("last_modified"))
-        
-        reverse = (order or "newest").lower() == "newest"
-        items.sort(key=lambda i: (sort_key(i), i.get("name", "")), reverse=reverse)
-        
-        # Step 4: Apply pagination to the sorted and filtered results
         total_items = len(items)
         total_pages = math.ceil(total_items / limit) if total_items > 0 else 0
         
         start_index = (page - 1) * limit
         end_index = start_index + limit
-        paginated_items = items[start_index:end_index]
+        if (order or "newest").lower() == "newest":
+            page_slice = items[start_index:end_index]
+        else:
+            page_slice = items[max(0, total_items - end_index):max(0, total_items - start_index)][::-1]
+
+        # Index entries are shared between requests; copy before adding URLs.
+        paginated_items = []
+        for item in page_slice:
+            blob_name = item.get("name")
+            sas_url = _generate_sas_url(blob_name, container_name="documents") if blob_name else None
+            paginated_items.append({**item, "url": sas_url or item.get("url")})
         
         logger.info(f"Retrieved {len(paginated_items)} items on page {page} of {total_pages} (total: {total_items})")
         
@@ -0,0 +1,158 @@
+# backend/routes/conversations.py
+"""
+Conversation history API endpoints.
+
+- GET /api/conversations: one page of the caller's conversations, newest
+  first. Query params: ``limit`` (default 50, max 200) and ``cursor`` (the
+  ``next_cursor`` of the previous page).
+- GET /api/conversations/<id>/messages: the latest ``limit`` messages of a
+  conversation (default 20, max 100); ``before`` (an ``older_cursor``)
+  pages backwards and ``details=true`` includes thoughts/data_points.
+  Responses carry an ETag and honor If-None-Match with 304.
+- GET /api/conversations/<id>/messages/<index>: one message with its
+  thoughts/data_points, for expanding it in the UI.
+
+The caller is identified by the ``X-MS-CLIENT-PRINCIPAL-ID`` header;
+conversations are partitioned by user id.
+"""
+
+from __future__ import annotations
+import logging
+
+from flask import Blueprint, Response, request
+from azure.cosmos.exceptions import CosmosHttpResponseError
+
+from shared.chat_history import (
+    DEFAULT_HISTORY_PAGE_SIZE,
+    DEFAULT_MESSAGE_WINDOW,
+    clamp_window_limit,
+    get_conversation_etag,
+    get_conversation_window,
+    get_history_page,
+    get_message_details,
+    window_etag,
+)
+from routes.decorators.auth_decorator import auth_required
+from utils import create_success_response, create_error_response
+
+bp = Blueprint("conversations", __name__, url_prefix="/api/conversations")
+logger = logging.getLogger(__name__)
+
+
+@bp.route("", methods=["GET"])
+@auth_required
+def list_conversations():
+    """
+    Response:
+    {
+        "data": {
+            "conversations": [{"id", "start_date", "content", "title", "type", "organization_id"}],
+            "next_cursor": "h1...." | null
+        },
+        "status": 200
+    }
+    """
+    client_principal_id = request.headers.get("X-MS-CLIENT-PRINCIPAL-ID")
+    if not client_principal_id:
+        return create_error_response("Missing client principal ID", 400)
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_HISTORY_PAGE_SIZE))
+    except ValueError:
+        return create_error_response("limit must be an integer", 400)
+
+    try:
+        page = get_history_page(client_principal_id, limit, request.args.get("cursor"))
+        return create_success_response(page, 200)
+    except ValueError as ve:
+        return create_error_response(str(ve), 400)
+    except CosmosHttpResponseError as e:
+        logger.error(f"CosmosDB error listing conversations for '{client_principal_id}': {e}")
+        return create_error_response("Failed to retrieve conversations", 500)
+    except Exception as e:
+        logger.exception(f"Unexpected error listing conversations: {e}")
+        return create_error_response("Internal Server Error", 500)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+@bp.route("/<conversation_id>/messages", methods=["GET"])
+@auth_required
+def get_conversation_messages(conversation_id):
+    """
+    Response:
+    {
+        "data": {
+            "id", "start_date", "type", "pending_hitl", "total_messages",
+            "messages": [{"index", "role", "content", "has_details"}],
+            "older_cursor": int | null,
+            "etag"
+        },
+        "status": 200
+    }
+    """
+    client_principal_id = request.headers.get("X-MS-CLIENT-PRINCIPAL-ID")
+    if not client_principal_id:
+        return create_error_response("Missing client principal ID", 400)
+
+    try:
+        # Clamped once so the 304 check and the window share one ETag variant
+        limit = clamp_window_limit(request.args.get("limit", DEFAULT_MESSAGE_WINDOW))
+        before = request.args.get("before")
+        before = int(before) if before not in (None, "") else None
+    except ValueError:
+        return create_error_response("limit and before must be integers", 400)
+    details = request.args.get("details", "false").lower() == "true"
+
+    try:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            # Revalidation only reads the document's _etag.
+            document_etag = get_conversation_etag(conversation_id, client_principal_id)
+            if document_etag:
+                etag = window_etag(document_etag, limit, before, details)
+                if _etag_matches(if_none_match, etag):
+                    return Response(
+                        status=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+                    )
+
+        window = get_conversation_window(
+            conversation_id, client_principal_id, limit=limit, before=before, details=details
+        )
+        if window is None:
+            return create_error_response("Conversation not found", 404)
+
+        response, status = create_success_response(window, 200)
+        response.headers["ETag"] = window["etag"]
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response, status
+    except ValueError as ve:
+        return create_error_response(str(ve), 400)
+    except CosmosHttpResponseError as e:
+        logger.error(f"CosmosDB error reading conversation '{conversation_id}': {e}")
+        return create_error_response("Failed to retrieve conversation", 500)
+    except Exception as e:
+        logger.exception(f"Unexpected error reading conversation messages: {e}")
+        return create_error_response("Internal Server Error", 500)
+
+
+@bp.route("/<conversation_id>/messages/<int:index>", methods=["GET"])
+@auth_required
+def get_conversation_message(conversation_id, index):
+    client_principal_id = request.headers.get("X-MS-CLIENT-PRINCIPAL-ID")
+    if not client_principal_id:
+        return create_error_response("Missing client principal ID", 400)
+
+    try:
+        message = get_message_details(conversation_id, client_principal_id, index)
+        if message is None:
+            return create_error_response("Message not found", 404)
+        return create_success_response(message, 200)
+    except ValueError as ve:
+        return create_error_response(str(ve), 400)
+    except Exception as e:
+        logger.exception(f"Unexpected error reading conversation message: {e}")
+        return create_error_response("Internal Server Error", 500)
@@ -1,15 +1,28 @@
 import os
-import tempfile
 import logging
-import time
 from flask import Blueprint, current_app, request
 from azure.search.documents import SearchClient
 from azure.core.credentials import AzureKeyCredential
 from azure.core.exceptions import HttpResponseError
-from data_summary.summarize import create_excel_file_summary, create_openAI_file_summary
+from data_summary.blob_utils import update_blob_metadata
 from utils import create_success_response, create_error_response
 
 from shared.decorators import require_organization_storage_limits
+from gallery.blob_utils import invalidate_gallery_index
+from shared.blob_storage import (
+    BLOB_BATCH_SIZE,
+    FileSignatureError,
+    invalidate_directory_listing,
+)
+from shared import description_jobs, folder_jobs
+from shared.citation_resolver import (
+    MAX_CITATIONS_PER_BATCH,
+    mark_blob_index_stale,
+    note_blob_added,
+    note_blob_removed,
+    note_blobs_removed,
+    resolve_citations,
+)
 from shared.cosmo_db import update_storage_used
 
 from routes.decorators.auth_decorator import auth_required
@@ -17,6 +30,10 @@ from routes.decorators.auth_decorator import auth_required
 # Allowed file extensions for description generation
 EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS = [".csv", ".xlsx", ".xls"]
 DOC_DESCRIPTION_FILE_EXTENSIONS = [".pdf", ".docx", ".pptx"]
+# Seconds clients should wait after a 429 from a full description queue
+DESCRIPTION_RETRY_AFTER_SECONDS = 30
+# Blob names accepted by one description-status request
+DESCRIPTION_STATUS_MAX_BLOBS = 50
 
 # Allowed MIME types (strict mapping: extension → mimetype)
 ALLOWED_MIME_TYPES = {
@@ -33,44 +50,49 @@ ALLOWED_MIME_TYPES = {
 BLOB_CONTAINER_NAME = "documents"
 ORG_FILES_PREFIX = "organization_files"
 
+# Azure AI Search accepts at most 1000 actions per indexing request.
+SEARCH_DELETE_BATCH_SIZE = 1000
+# Failed blob names kept in delete-folder responses and job documents.
+MAX_REPORTED_FAILURES = 100
+
 bp = Blueprint("file_management", __name__, url_prefix="/api")
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
-def validate_file_signature(file_path, mimetype):
-    """Lightweight signature validation for safety."""
-    with open(file_path, "rb") as f:
-        header = f.read(8)
+def _uploads_container():
+    """Container that uploads are written to (BLOB_CONTAINER_NAME overrides the default)."""
+    return os.getenv("BLOB_CONTAINER_NAME", BLOB_CONTAINER_NAME)
 
-    if mimetype == "application/pdf":
-        return header.startswith(b"%PDF")
 
-    if mimetype in [
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",  # .xlsx
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",  # .docx
-        "application/vnd.openxmlformats-officedocument.presentationml.presentation",  # .pptx
-    ]:
-        return header.startswith(b"PK")  # ZIP archive
+def _get_search_client():
+    """Return a SearchClient for the documents index, or None if search is not configured."""
+    # Get Azure Search configuration from environment variables
+    search_service_name = os.getenv("AZURE_SEARCH_SERVICE_NAME")
+    search_admin_key = os.getenv("AZURE_SEARCH_ADMIN_KEY")
+    search_index_name = os.getenv("AZURE_SEARCH_INDEX_NAME")
 
-    if mimetype in [
-        "application/vnd.ms-excel",      # .xls
-        "application/msword",            # .doc
-        "application/vnd.ms-powerpoint", # .ppt
-    ]:
-        return header.startswith(b"\xD0\xCF\x11\xE0")  # OLE Compound File
+    # If Azure Search is not configured, skip deletion
+    if not all([search_service_name, search_admin_key]):
+        logger.warning("Azure Search Service not fully configured. Skipping search index deletion.")
+        return None
 
-    if mimetype == "text/csv":
-        # Try to decode as UTF-8 text
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                f.read(1024)
-            return True
-        except UnicodeDecodeError:
-            return False
+    # If index name is not provided, log warning and skip
+    if not search_index_name:
+        logger.warning("AZURE_SEARCH_INDEX_NAME not set. Skipping search index deletion.")
+        return None
+
+    # Construct the Azure Search endpoint
+    search_endpoint = f"https://{search_service_name}.search.windows.net"
 
-    return False
+    # Create credential and search client
+    credential = AzureKeyCredential(search_admin_key)
+    return SearchClient(
+        endpoint=search_endpoint,
+        index_name=search_index_name,
+        credential=credential
+    )
 
 
 def delete_from_azure_search(filepath: str) -> dict:
@@ -84,33 +106,11 @@ def delete_from_azure_search(filepath: str) -> dict:
         dict: Result dictionary with 'success' boolean and optional 'error' message
     """
     try:
-        # Get Azure Search configuration from environment variables
-        search_service_name = os.getenv("AZURE_SEARCH_SERVICE_NAME")
-        search_admin_key = os.getenv("AZURE_SEARCH_ADMIN_KEY")
-        search_index_name = os.getenv("AZURE_SEARCH_INDEX_NAME")
-        
-        # If Azure Search is not configured, skip deletion
-        if not all([search_service_name, search_admin_key]):
-            logger.warning("Azure Search Service not fully configured. Skipping search index deletion.")
+        search_client = _get_search_client()
+        if search_client is None:
             return {"success": True, "skipped": True}
         
-        # If index name is not provided, log warning and skip
-        if not search_index_name:
-            logger.warning("AZURE_SEARCH_INDEX_NAME not set. Skipping search index deletion.")
-            return {"success": True, "skipped": True}
-        
-        # Construct the Azure Search endpoint
-        search_endpoint = f"https://{search_service_name}.search.windows.net"
-        
-        # Create credential and search client
-        credential = AzureKeyCredential(search_admin_key)
-        search_client = SearchClient(
-            endpoint=search_endpoint,
-            index_name=search_index_name,
-            credential=credential
-        )
-        
-        logger.info(f"Attempting to delete document from Azure Search index '{search_index_name}' with filepath: {filepath}")
+        logger.info(f"Attempting to delete document from Azure Search index with filepath: {filepath}")
         
         # Delete document by filepath
         # The document must include the key field (filepath in this case)
@@ -141,15 +141,59 @@ def delete_from_azure_search(filepath: str) -> dict:
         return {"success": False, "error": error_msg}
 
 
+def delete_many_from_azure_search(filepaths: list, search_client=None) -> dict:
+    """
+    Delete the search documents of many files, SEARCH_DELETE_BATCH_SIZE per request.
+
+    Args:
+        filepaths: The filepath values to remove from the search index
+        search_client: Optional client to reuse across calls
+
+    Returns:
+        dict: 'success' boolean, 'failed_count' and optional 'skipped'/'error'
+    """
+    if not filepaths:
+        return {"success": True, "failed_count": 0}
+    try:
+        search_client = search_client or _get_search_client()
+        if search_client is None:
+            return {"success": True, "skipped": True, "failed_count": 0}
+
+        failed_count = 0
+        for start in range(0, len(filepaths), SEARCH_DELETE_BATCH_SIZE):
+            batch = filepaths[start:start + SEARCH_DELETE_BATCH_SIZE]
+            results = search_client.delete_documents(
+                documents=[{"filepath": filepath} for filepath in batch]
+            )
+            failed_count += sum(1 for r in results if not r.succeeded)
+
+        if failed_count:
+            logger.error(f"Failed to delete {failed_count} of {len(filepaths)} documents from Azure Search")
+        return {"success": failed_count == 0, "failed_count": failed_count}
+
+    except HttpResponseError as e:
+        error_msg = f"Azure Search HTTP error: {str(e)}"
+        logger.error(error_msg)
+        return {"success": False, "error": error_msg, "failed_count": len(filepaths)}
+    except Exception as e:
+        error_msg = f"Unexpected error deleting from Azure Search: {str(e)}"
+        logger.exception(error_msg)
+        return {"success": False, "error": error_msg, "failed_count": len(filepaths)}
+
 
 
 @bp.route("/upload-source-document", methods=["POST"])
 @auth_required
 @require_organization_storage_limits()
 def upload_source_document(**kwargs):
-    excel_llm = current_app.config["excel_summarization_llm"]
-    openai_llm = current_app.config["openai_summarization_llm"]
-    temp_file_path = None
+    """
+    Upload a source document for an organization.
+
+    Spreadsheets and documents get their AI description in the background:
+    the response carries ``blob_name`` and ``description_status`` and
+    GET /api/source-documents/description-status reports progress. Answers
+    429 (with Retry-After) while too many descriptions are queued.
+    """
     try:
         organization_id = request.form.get("organization_id")
         if not organization_id:
@@ -182,16 +226,18 @@ def upload_source_document(**kwargs):
             logger.error(f"Invalid file type: {file.filename} ({file_mime})")
             return create_error_response("Invalid file type", 422)
 
-        # Save to temp
-        temp_file_path = os.path.join(tempfile.gettempdir(), file.filename)
-        file.save(temp_file_path)
-
-        file_size = os.path.getsize(temp_file_path)
-
-        # Validate file signature
-        if not validate_file_signature(temp_file_path, file_mime):
-            logger.error(f"File signature mismatch for {file.filename} ({file_mime})")
-            return create_error_response("File content does not match declared type", 422)
+        description_kind = None
+        if ext in EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS:
+            description_kind = "excel"
+        elif ext in DOC_DESCRIPTION_FILE_EXTENSIONS:
+            description_kind = "document"
+        if description_kind and not description_jobs.has_capacity():
+            logger.warning(f"Description queue is full, rejecting upload of '{file.filename}'")
+            response, status = create_error_response(
+                "Too many files are being processed, please retry shortly", 429
+            )
+            response.headers["Retry-After"] = str(DESCRIPTION_RETRY_AFTER_SECONDS)
+            return response, status
 
         logger.info(f"Uploading file '{file.filename}' for organization '{organization_id}' to folder '{folder_path}'")
 
@@ -204,35 +250,43 @@ def upload_source_document(**kwargs):
 
         # Metadata
         metadata = {"organization_id": organization_id}
+        if description_kind:
+            metadata["description_status"] = description_jobs.PENDING
 
-        if ext in EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS:
-            logger.info(f"Gen AI description for file '{file.filename}'")
-            description = create_excel_file_summary(temp_file_path, llm=excel_llm)
-            logger.info(f"Generated Description of file {temp_file_path}: {description}")
-            metadata["description"] = description["file_description"]
-            metadata["description_source"] = description["source"]
-
-        elif ext in DOC_DESCRIPTION_FILE_EXTENSIONS:
-            logger.info(f"Gen AI description for file '{file.filename}'")
-            description = create_openAI_file_summary(temp_file_path, client=openai_llm)
-            logger.info(f"Generated Description of file {temp_file_path}: {description}")
-            metadata["description"] = description["file_description"]
-            metadata["description_source"] = description["source"]
-
-        # Upload to blob
+        # Stream to blob; the signature is checked on the first block
         blob_storage_manager = current_app.config["blob_storage_manager"]
-        result = blob_storage_manager.upload_to_blob(
-            file_path=temp_file_path,
-            blob_folder=blob_folder,
-            metadata=metadata,
-            container=os.getenv("BLOB_CONTAINER_NAME", BLOB_CONTAINER_NAME),
-        )
+        container_name = _uploads_container()
+        try:
+            result = blob_storage_manager.upload_stream_to_blob(
+                stream=file.stream,
+                filename=file.filename,
+                blob_folder=blob_folder,
+                metadata=metadata,
+                container=container_name,
+                mimetype=file_mime,
+            )
+        except FileSignatureError:
+            logger.error(f"File signature mismatch for {file.filename} ({file_mime})")
+            return create_error_response("File content does not match declared type", 422)
 
         if result["status"] == "success":
             logger.info(f"Successfully uploaded file '{file.filename}' to '{blob_folder}'")
-            updated_storage = kwargs["upload_limits"]["usedStorage"] + (file_size/(1024**3))
+            invalidate_gallery_index(blob_folder)
+            invalidate_directory_listing(f"{blob_folder}/")
+            note_blob_added(result["blob_path"])
+            updated_storage = kwargs["upload_limits"]["usedStorage"] + (result["size"]/(1024**3))
             update_storage_used(organization_id, updated_storage)
-            return create_success_response({"blob_url": result["blob_url"]}, 200)
+
+            description_status = None
+            if description_kind:
+                description_status = _queue_description(
+                    result["blob_path"], container_name, description_kind
+                )
+            return create_success_response({
+                "blob_url": result["blob_url"],
+                "blob_name": result["blob_path"],
+                "description_status": description_status,
+            }, 200)
         else:
             error_msg = f"Error uploading file: {result.get('error', 'Unknown error')}"
             logger.error(error_msg)
@@ -242,11 +296,58 @@ def upload_source_document(**kwargs):
         logger.exception(f"Unexpected error in upload_source_document: {e}")
         return create_error_response("Internal Server Error", 500)
 
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
 
 
+def _queue_description(blob_name, container_name, kind):
+    """Queue the AI description of an uploaded blob and return its description_status."""
+    try:
+        description_jobs.enqueue(blob_name, container_name, kind)
+        logger.info(f"Queued Gen AI description for '{blob_name}'")
+        return description_jobs.PENDING
+    except Exception as e:
+        # The file is stored either way; it just stays without a description
+        logger.error(f"Could not queue description for '{blob_name}': {e}")
+        try:
+            update_blob_metadata(
+                blob_name, {"description_status": description_jobs.FAILED}, container_name
+            )
+        except Exception:
+            logger.exception(f"Could not mark description of '{blob_name}' as failed")
+        return description_jobs.FAILED
+
+
+@bp.route("/source-documents/description-status", methods=["GET"])
+@auth_required
+def get_description_status():
+    """
+    Description progress of uploaded source documents.
+
+    Query: one or more ``blob_name`` parameters.
+    Returns ``{"statuses": [{"blob_name", "status", "description", "description_source"}]}``
+    where status is pending, ready, failed or null (no description for this
+    file type). 404 if any of the blobs does not exist.
+    """
+    try:
+        blob_names = request.args.getlist("blob_name")
+        if not blob_names:
+            return create_error_response("blob_name is required", 400)
+        if len(blob_names) > DESCRIPTION_STATUS_MAX_BLOBS:
+            return create_error_response(
+                f"At most {DESCRIPTION_STATUS_MAX_BLOBS} blob names per request", 400
+            )
+
+        container_name = _uploads_container()
+        statuses = []
+        for blob_name in blob_names:
+            status = description_jobs.get_status(blob_name, container_name)
+            if status is None:
+                return create_error_response(f"File not found: {blob_name}", 404)
+            statuses.append(status)
+        return create_success_response({"statuses": statuses}, 200)
+    except Exception as e:
+        logger.exception(f"Unexpected error in get_description_status: {e}")
+        return create_error_response("Internal Server Error", 500)
+
 
 @bp.route("/upload-shared-document", methods=["POST"])
 @auth_required
@@ -261,9 +362,6 @@ def upload_shared_document():
     Returns:
         JSON response with upload result
     """
-    llm = current_app.config["llm"]
-    temp_file_path = None
-    
     try:
         file = request.files.get("file")
         if not file:
@@ -283,44 +381,15 @@ def upload_shared_document():
             logger.error(f"Invalid file type: {file.filename} ({file_mime})")
             return create_error_response("Invalid file type", 422)
 
-        # Save to temp
-        temp_file_path = os.path.join(tempfile.gettempdir(), file.filename)
-        file.save(temp_file_path)
-
-        # Validate file signature
-        if not validate_file_signature(temp_file_path, file_mime):
-            logger.error(f"File signature mismatch for {file.filename} ({file_mime})")
-            return create_error_response("File content does not match declared type", 422)
-
         logger.info(f"Uploading shared file '{file.filename}' to shared folder")
 
         # Get blob storage manager
         blob_storage_manager = current_app.config["blob_storage_manager"]
 
-        # Prepare metadata (generate description if applicable)
+        # Prepare metadata; spreadsheets are described in the background
         metadata = {}
-        
         if ext in EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS:
-            logger.info(f"[PandasAI] Generating AI description for shared file '{file.filename}'")
-            try:
-                description = create_description(temp_file_path, llm=llm)
-                logger.info(f"[PandasAI] Generated Description: {description}")
-                metadata["description"] = description["file_description"]
-                metadata["description_source"] = description["source"]
-            except Exception as desc_error:
-                logger.warning(f"[PandasAI] Failed to generate description: {desc_error}")
-                # Continue without description
-
-        if ext in EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS:
-            logger.info(f"[PandasAI] Generating AI description for shared file '{file.filename}'")
-            try:
-                description = create_description(temp_file_path, llm=llm)
-                logger.info(f"Generated Description: {description}")
-                metadata["description"] = description["file_description"]
-                metadata["description_source"] = description["source"]
-            except Exception as desc_error:
-                logger.warning(f"Failed to generate description: {desc_error}")
-                # Continue without description
+            metadata["description_status"] = description_jobs.PENDING
 
         # Upload to shared folder
         blob_folder = f"{ORG_FILES_PREFIX}/shared"
@@ -329,22 +398,35 @@ def upload_shared_document():
         metadata["organization_id"] = "shared"
         metadata["shared_file"] = "true"
         
-        # Upload to blob
-        result = blob_storage_manager.upload_to_blob(
-            file_path=temp_file_path,
-            blob_folder=blob_folder,
-            metadata=metadata,
-            container=os.getenv("BLOB_CONTAINER_NAME", BLOB_CONTAINER_NAME),
-        )
+        # Stream to blob; the signature is checked on the first block
+        container_name = _uploads_container()
+        try:
+            result = blob_storage_manager.upload_stream_to_blob(
+                stream=file.stream,
+                filename=file.filename,
+                blob_folder=blob_folder,
+                metadata=metadata,
+                container=container_name,
+                mimetype=file_mime,
+            )
+        except FileSignatureError:
+            logger.error(f"File signature mismatch for {file.filename} ({file_mime})")
+            return create_error_response("File content does not match declared type", 422)
 
         if result["status"] == "success":
             logger.info(f"Successfully uploaded to shared folder")
-            
+            note_blob_added(result["blob_path"])
+
             response_data = {
                 "message": "File uploaded to shared folder successfully",
                 "filename": file.filename,
-                "blob_url": result["blob_url"]
+                "blob_url": result["blob_url"],
+                "blob_name": result["blob_path"],
             }
+            if ext in EXCEL_DESCRIPTION_VALID_FILE_EXTENSIONS:
+                response_data["description_status"] = _queue_description(
+                    result["blob_path"], container_name, "excel"
+                )
             return create_success_response(response_data, 200)
         else:
             error_msg = result.get('error', 'Unknown error')
@@ -355,10 +437,6 @@ def upload_shared_document():
         logger.exception(f"Unexpected error in upload_shared_document: {e}")
         return create_error_response("Internal Server Error", 500)
 
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
-
 
 @bp.route("/delete-source-document", methods=["DELETE"])
 @auth_required
@@ -389,6 +467,9 @@ def delete_source_document():
 
         # Delete the blob
         blob_client.delete_blob()
+        invalidate_gallery_index(blob_name)
+        invalidate_directory_listing(blob_name)
+        note_blob_removed(blob_name)
         
         # Delete from Azure Search Service
         search_result = delete_from_azure_search(blob_name)
@@ -488,6 +569,7 @@ def create_folder():
             },
             overwrite=False
         )
+        invalidate_directory_listing(folder_full_path)
         
         logger.info(f"Created folder '{folder_name}' at path '{folder_full_path}' for organization {organization_id}")
         
@@ -577,48 +659,24 @@ def move_file():
         if destination_blob_client.exists():
             return create_error_response("A file with this name already exists in the destination folder", 409)
         
-        # Get source blob properties and metadata
-        source_properties = source_blob_client.get_blob_properties()
-        source_metadata = source_properties.metadata or {}
-        
-        # Copy the blob to the new location
-        # Using start_copy_from_url which is async in Azure but we'll wait for it
-        source_url = source_blob_client.url
-        copy_operation = destination_blob_client.start_copy_from_url(source_url)
-        
-        # Wait for the copy to complete (with timeout)
-        max_wait_time = 60  # 60 seconds timeout
-        wait_time = 0
-        sleep_interval = 0.5
-        
-        while wait_time < max_wait_time:
-            dest_properties = destination_blob_client.get_blob_properties()
-            copy_status = dest_properties.copy.status
-            
-            if copy_status == "success":
-                break
-            elif copy_status == "failed":
-                return create_error_response("Failed to copy file", 500)
-            elif copy_status in ["pending", "copying"]:
-                time.sleep(sleep_interval)
-                wait_time += sleep_interval
-            else:
-                return create_error_response(f"Unknown copy status: {copy_status}", 500)
-        
-        if wait_time >= max_wait_time:
-            return create_error_response("Copy operation timed out", 500)
-        
-        # Set metadata on the destination blob (preserving original metadata)
-        try:
-            destination_blob_client.set_blob_metadata(metadata=source_metadata)
-        except Exception as metadata_error:
-            logger.warning(f"Failed to set metadata on destination blob: {metadata_error}")
-        
-        # Delete the source blob
-        try:
-            source_blob_client.delete_blob()
-        except Exception as delete_error:
-            logger.error(f"Failed to delete source blob after copy: {delete_error}")
+        # Server-side copy (metadata included), then delete the source
+        move_result = blob_storage_manager.move_blobs(
+            BLOB_CONTAINER_NAME, [(source_blob_name, destination_blob_name)]
+        )
+        if move_result["rolled_back"]:
+            logger.error(f"Failed to copy {source_blob_name}: {move_result['copy_errors']}")
+            return create_error_response("Failed to copy file", 500)
+        
+        # Source and destination are in the same organization.
+        invalidate_gallery_index(source_blob_name)
+        invalidate_directory_listing(source_blob_name)
+        invalidate_directory_listing(destination_blob_name)
+        note_blob_added(destination_blob_name)
+        if not move_result["delete_errors"]:
+            note_blob_removed(source_blob_name)
+
+        if move_result["delete_errors"]:
+            logger.error(f"Failed to delete source blob after copy: {move_result['delete_errors']}")
             # File was copied but not deleted - return a partial success message
             return create_success_response({
                 "message": "File copied but original could not be deleted",
@@ -699,34 +757,21 @@ def rename_file():
         if dst.exists():
             return create_error_response("A file with this name already exists in this folder", 409)
 
-        source_url = src.url
-        copy = dst.start_copy_from_url(source_url)
-
-        max_wait_time = 60
-        wait_time = 0.0
-        interval = 0.5
-        while wait_time < max_wait_time:
-            props = dst.get_blob_properties()
-            status = props.copy.status
-            if status == "success":
-                break
-            if status == "failed":
-                return create_error_response("Failed to copy file", 500)
-            time.sleep(interval)
-            wait_time += interval
-        if wait_time >= max_wait_time:
-            return create_error_response("Copy operation timed out", 500)
-
-        try:
-            src_props = src.get_blob_properties()
-            dst.set_blob_metadata(metadata=(src_props.metadata or {}))
-        except Exception as meta_err:
-            logger.warning(f"[rename-file] Could not set metadata on {dest_blob_name}: {meta_err}")
-
-        try:
-            src.delete_blob()
-        except Exception as del_err:
-            logger.error(f"[rename-file] Copied but could not delete source {source_blob_name}: {del_err}")
+        move_result = blob_storage_manager.move_blobs(
+            BLOB_CONTAINER_NAME, [(source_blob_name, dest_blob_name)]
+        )
+        if move_result["rolled_back"]:
+            logger.error(f"[rename-file] Copy failed {source_blob_name}: {move_result['copy_errors']}")
+            return create_error_response("Failed to copy file", 500)
+
+        invalidate_gallery_index(source_blob_name)
+        invalidate_directory_listing(source_blob_name)
+        note_blob_added(dest_blob_name)
+        if not move_result["delete_errors"]:
+            note_blob_removed(source_blob_name)
+
+        if move_result["delete_errors"]:
+            logger.error(f"[rename-file] Copied but could not delete source {source_blob_name}: {move_result['delete_errors']}")
             return create_success_response({
                 "message": "File renamed (source not deleted)",
                 "destination_blob_name": dest_blob_name,
@@ -816,32 +861,41 @@ def delete_folder():
         blob_storage_manager = current_app.config["blob_storage_manager"]
         container_client = blob_storage_manager.blob_service_client.get_container_client("documents")
         
-        # List all blobs with this prefix (includes all files and subfolders)
-        blobs_to_delete = list(container_client.list_blobs(name_starts_with=folder_full_path))
+        # Look at the first batch only: small folders are deleted inline,
+        # larger ones by a background job.
+        pages = container_client.list_blobs(
+            name_starts_with=folder_full_path, results_per_page=BLOB_BATCH_SIZE
+        ).by_page()
+        first_page = list(next(pages, []))
         
-        if not blobs_to_delete:
+        if not first_page:
             return create_error_response("Folder not found or is empty", 404)
         
-        # Delete all blobs with this prefix
-        deleted_count = 0
-        failed_deletions = []
-        
-        for blob in blobs_to_delete:
-            try:
-                blob_client = container_client.get_blob_client(blob.name)
-                blob_client.delete_blob()
-                deleted_count += 1
-                logger.info(f"Deleted blob: {blob.name}")
-            except Exception as delete_error:
-                logger.error(f"Failed to delete blob {blob.name}: {delete_error}")
-                failed_deletions.append(blob.name)
-        
-        if failed_deletions:
+        if pages.continuation_token:
+            job = start_folder_job(
+                organization_id,
+                "delete-folder",
+                {"folder_path": folder_path, "prefix": folder_full_path},
+                blob_storage_manager,
+            )
+            logger.info(f"Started delete-folder job {job['id']} for '{folder_full_path}'")
+            return create_success_response({
+                "message": "Folder deletion started",
+                "job_id": job["id"],
+                "status": job["status"],
+                "folder_path": folder_path
+            }, 202)
+        
+        progress = _delete_folder_contents(blob_storage_manager, folder_full_path)
+        deleted_count = progress["deleted_count"]
+        failed_deletions = progress["failed_files"]
+
+        if progress["failed_count"]:
             logger.warning(f"Some files could not be deleted: {failed_deletions}")
             return create_success_response({
-                "message": f"Folder partially deleted. {deleted_count} files deleted, {len(failed_deletions)} failed.",
+                "message": f"Folder partially deleted. {deleted_count} files deleted, {progress['failed_count']} failed.",
                 "deleted_count": deleted_count,
-                "failed_count": len(failed_deletions),
+                "failed_count": progress["failed_count"],
                 "failed_files": failed_deletions
             }, 200)
         
@@ -856,3 +910,215 @@ def delete_folder():
     except Exception as e:
         logger.exception(f"Unexpected error in delete_folder: {e}")
         return create_error_response("Internal Server Error", 500)
+
+
+def _delete_folder_contents(blob_storage_manager, folder_full_path, on_progress=None):
+    """
+    Bulk-delete everything under ``folder_full_path`` and its search documents.
+
+    Returns the progress dict (deleted/failed/search_failed counts and the
+    first MAX_REPORTED_FAILURES failed blob names). ``on_progress`` receives
+    it after every batch.
+    """
+    progress = {
+        "deleted_count": 0,
+        "failed_count": 0,
+        "failed_files": [],
+        "search_failed_count": 0,
+    }
+    search_client = _get_search_client()
+
+    def on_batch(deleted, failed):
+        progress["deleted_count"] += len(deleted)
+        progress["failed_count"] += len(failed)
+        room = MAX_REPORTED_FAILURES - len(progress["failed_files"])
+        progress["failed_files"].extend(f["blob"] for f in failed[:max(room, 0)])
+        note_blobs_removed(deleted)
+        if deleted and search_client is not None:
+            search_result = delete_many_from_azure_search(deleted, search_client=search_client)
+            progress["search_failed_count"] += search_result["failed_count"]
+        if on_progress:
+            on_progress(progress)
+
+    invalidate_gallery_index(folder_full_path)
+    invalidate_directory_listing(folder_full_path)
+    try:
+        blob_storage_manager.delete_prefix(
+            BLOB_CONTAINER_NAME,
+            folder_full_path,
+            on_batch=on_batch,
+        )
+    finally:
+        invalidate_gallery_index(folder_full_path)
+        invalidate_directory_listing(folder_full_path)
+    return progress
+
+
+def _make_delete_folder_runner(blob_storage_manager):
+    def run(job):
+        prefix = job["params"]["prefix"]
+        # Counts restart on resume: the listing only returns what is left.
+        progress = _delete_folder_contents(
+            blob_storage_manager,
+            prefix,
+            on_progress=lambda p: folder_jobs.save_job(job, progress=p),
+        )
+        status = folder_jobs.PARTIAL if progress["failed_count"] else folder_jobs.SUCCEEDED
+        folder_jobs.save_job(job, status=status, progress=progress)
+        logger.info(f"[delete-folder] job {job['id']} finished: {status} {progress}")
+
+    return run
+
+
+def _make_rename_folder_runner(blob_storage_manager):
+    def run(job):
+        params = job["params"]
+        # Copies overwrite and sources are only deleted once every copy
+        # succeeded, so a resumed job simply moves whatever is left. Progress
+        # doubles as the heartbeat that keeps the job from looking stale.
+        result = blob_storage_manager.move_prefix(
+            BLOB_CONTAINER_NAME,
+            params["source_prefix"],
+            params["destination_prefix"],
+            on_progress=lambda p: folder_jobs.save_job(job, progress=p),
+        )
+        for prefix in (params["source_prefix"], params["destination_prefix"]):
+            invalidate_gallery_index(prefix)
+            invalidate_directory_listing(prefix)
+        mark_blob_index_stale()
+        progress = {
+            "copied": result["copied"],
+            "copy_failed": len(result["copy_errors"]),
+            "deleted_source": result["deleted"],
+            "delete_failed": len(result["delete_errors"]),
+            "rolled_back": result["rolled_back"],
+            "errors": (result["copy_errors"] + result["delete_errors"])[:MAX_REPORTED_FAILURES],
+        }
+        if result["rolled_back"]:
+            status = folder_jobs.FAILED
+        elif result["delete_errors"]:
+            status = folder_jobs.PARTIAL
+        else:
+            status = folder_jobs.SUCCEEDED
+        folder_jobs.save_job(job, status=status, progress=progress)
+        logger.info(f"[rename-folder] job {job['id']} finished: {status}")
+
+    return run
+
+
+_JOB_RUNNERS = {
+    "delete-folder": _make_delete_folder_runner,
+    "rename-folder": _make_rename_folder_runner,
+}
+
+
+def start_folder_job(organization_id, kind, params, blob_storage_manager):
+    """Create a folder job of ``kind`` and start it in the background; returns the job document."""
+    job = folder_jobs.create_job(organization_id, kind, params)
+    folder_jobs.submit(job, _JOB_RUNNERS[kind](blob_storage_manager))
+    return job
+
+
+@bp.route("/folder-jobs/<job_id>", methods=["GET"])
+@auth_required
+def get_folder_job(job_id):
+    """
+    Return the status and progress of a background folder job.
+
+    Query params:
+        organization_id: The organization that owns the job
+    """
+    organization_id = request.args.get("organization_id", "").strip()
+    if not organization_id:
+        return create_error_response("Organization ID is required", 400)
+    try:
+        job = folder_jobs.get_job(organization_id, job_id)
+        if not job:
+            return create_error_response("Job not found", 404)
+        return create_success_response({
+            "job_id": job["id"],
+            "kind": job["kind"],
+            "status": job["status"],
+            "progress": job.get("progress", {}),
+            "error": job.get("error"),
+            "attempts": job.get("attempts", 0),
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }, 200)
+    except Exception as e:
+        logger.exception(f"Unexpected error in get_folder_job: {e}")
+        return create_error_response("Internal Server Error", 500)
+
+
+@bp.route("/folder-jobs/<job_id>/resume", methods=["POST"])
+@auth_required
+def resume_folder_job(job_id):
+    """
+    Restart a folder job that failed, partially failed or was interrupted.
+
+    Expected JSON payload:
+    {
+        "organization_id": "org-123"
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    organization_id = (data.get("organization_id") or "").strip()
+    if not organization_id:
+        return create_error_response("Organization ID is required", 400)
+    try:
+        job = folder_jobs.get_job(organization_id, job_id)
+        if not job:
+            return create_error_response("Job not found", 404)
+        if job["kind"] not in _JOB_RUNNERS:
+            return create_error_response(f"Jobs of kind '{job['kind']}' cannot be resumed", 400)
+        if not folder_jobs.is_resumable(job):
+            return create_error_response(f"Job is {job['status']} and cannot be resumed", 409)
+
+        # Conditional on the job's etag: only one resume can take it over.
+        job = folder_jobs.claim_job(job, status=folder_jobs.QUEUED)
+        if job is None:
+            return create_error_response("Job was changed or resumed concurrently", 409)
+        runner = _JOB_RUNNERS[job["kind"]](current_app.config["blob_storage_manager"])
+        folder_jobs.submit(job, runner)
+        return create_success_response({"job_id": job["id"], "status": job["status"]}, 202)
+    except Exception as e:
+        logger.exception(f"Unexpected error in resume_folder_job: {e}")
+        return create_error_response("Internal Server Error", 500)
+
+
+@bp.route("/download-excel-citations", methods=["POST"])
+@auth_required
+def download_excel_citations():
+    """
+    Resolve several spreadsheet citations in one call.
+
+    Expected JSON:
+    {
+        "file_paths": ["organization_files/org-123/sales.xlsx", "@https://report.csv/"]
+    }
+
+    Returns one entry per path, in request order, shaped like the
+    /api/download-excel-citation response; unresolvable paths get
+    success False and an error instead of failing the whole batch.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        file_paths = data.get("file_paths")
+        if not isinstance(file_paths, list) or not file_paths:
+            return create_error_response("file_paths must be a non-empty list", 400)
+        if len(file_paths) > MAX_CITATIONS_PER_BATCH:
+            return create_error_response(
+                f"At most {MAX_CITATIONS_PER_BATCH} citations can be resolved per request", 400
+            )
+        if not all(isinstance(path, str) for path in file_paths):
+            return create_error_response("file_paths must contain strings", 400)
+
+        results = resolve_citations(
+            file_paths,
+            current_app.config["AZURE_STORAGE_CONNECTION_STRING"],
+            request.url_root,
+        )
+        return create_success_response({"results": results}, 200)
+    except Exception as e:
+        logger.exception(f"Unexpected error in download_excel_citations: {e}")
+        return create_error_response("Internal Server Error", 500)
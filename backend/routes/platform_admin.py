@@ -3,7 +3,6 @@ import os
 import json
 from datetime import datetime
 from http import HTTPStatus
-from io import BytesIO
 from pathlib import Path
 
 from flask import Blueprint, request, current_app
@@ -14,12 +13,20 @@ from shared.cosmo_db import (
     update_organization_metadata, 
     get_user_by_email, 
     delete_organization,
-    get_user_activity_data
+    reload_subscription_tiers,
+    get_subscription_tier_catalog_stats,
 )
 
-from shared.blob_storage import BlobStorageManager
+from shared import activity_rollups, clients, membership_cache
+from shared.blob_storage import BlobStorageManager, BlobUploadError, iter_stream
 from shared.decorators import only_platform_admin
-from shared.pulse_excel_to_json import serialize_excel, ExcelParserError
+from shared.pulse_excel_to_json import (
+    JSON_FORMAT,
+    NDJSON_FORMAT,
+    ExcelParserError,
+    encode_records,
+    serialize_excel,
+)
 from routes.decorators.auth_decorator import auth_required
 from routes.organizations import send_admin_notification_email
 from utils import create_success_response, create_error_response
@@ -32,6 +39,15 @@ logger = logging.getLogger(__name__)
 CUSTOMER_PULSE_CONTAINER_NAME = os.getenv("CUSTOMER_PULSE_CONTAINER_NAME", "survey-data")
 CUSTOMER_PULSE_JSON_CONTAINER_NAME = os.getenv("CUSTOMER_PULSE_JSON_CONTAINER_NAME", "survey-json-intermediate")
 CUSTOMER_PULSE_FOLDER = "consumer-pulse"
+# Intermediate output: "json" (one compact array) or "ndjson" (one group per
+# line), optionally stored with Content-Encoding: gzip. Consumers of the
+# intermediate container must support the chosen format before switching.
+CUSTOMER_PULSE_JSON_FORMAT = os.getenv("CUSTOMER_PULSE_JSON_FORMAT", JSON_FORMAT)
+CUSTOMER_PULSE_JSON_GZIP = os.getenv("CUSTOMER_PULSE_JSON_GZIP", "false").lower() == "true"
+PULSE_OUTPUT_CONTENT_TYPES = {
+    JSON_FORMAT: ("application/json", ".json"),
+    NDJSON_FORMAT: ("application/x-ndjson", ".ndjson"),
+}
 
 TIER_MAPPING = {
     'tier_free': 'Free',
@@ -207,6 +223,9 @@ def ingest_global_data():
     Endpoint for platform administrators to upload customer pulse data files.
     The file is uploaded to blob storage in the customer-pulse folder, then
     converted from Excel to JSON and uploaded to the intermediate JSON container.
+    Both uploads are streamed in blocks: the Excel file from the request (with
+    one local copy for the parser) and the JSON as it is encoded, in the
+    CUSTOMER_PULSE_JSON_FORMAT format, gzip-encoded if CUSTOMER_PULSE_JSON_GZIP.
 
     Args:
         file: File uploaded via multipart/form-data with key 'file'
@@ -242,9 +261,8 @@ def ingest_global_data():
         logger.error("No file selected")
         return create_error_response("No file selected", HTTPStatus.BAD_REQUEST)
 
+    staged_excel = None
     try:
-        file_content = file.stream.read()
-
         blob_storage_manager = current_app.config["blob_storage_manager"]
 
         excel_metadata = {}
@@ -254,25 +272,29 @@ def ingest_global_data():
             for item in form_metadata:
                 excel_metadata[item["key"]] = item["value"]
 
-        # 1. Upload original Excel file
-        excel_blob_path = f"{CUSTOMER_PULSE_FOLDER}/{file.filename}"
-        excel_result = blob_storage_manager.upload_fileobj_to_blob(
-            fileobj=BytesIO(file_content),
-            filename=file.filename,
-            blob_folder=CUSTOMER_PULSE_FOLDER,
-            container=CUSTOMER_PULSE_CONTAINER_NAME,
-            metadata=excel_metadata
-        )
+        # 1. Upload original Excel file, keeping a local copy for the parser
+        try:
+            staged_excel = blob_storage_manager.stage_upload(
+                stream=file.stream,
+                filename=file.filename,
+                blob_folder=CUSTOMER_PULSE_FOLDER,
+                container=CUSTOMER_PULSE_CONTAINER_NAME,
+                spill=True,
+            )
+        except BlobUploadError as e:
+            return create_error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
+        excel_result = blob_storage_manager.commit_upload(staged_excel, excel_metadata)
         if excel_result["status"] != "success":
             return create_error_response(
                 excel_result.get("error", "Excel upload failed"),
                 HTTPStatus.INTERNAL_SERVER_ERROR
             )
+        excel_blob_path = excel_result["blob_path"]
 
         # 2. Convert Excel to JSON
         try:
-            json_data = serialize_excel(BytesIO(file_content))
+            json_data = serialize_excel(staged_excel.spill_path)
         except ExcelParserError as e:
             logger.error(f"Excel conversion failed: {str(e)}")
             return create_error_response(
@@ -280,24 +302,29 @@ def ingest_global_data():
                 HTTPStatus.BAD_REQUEST
             )
 
-        # 3. Upload JSON to intermediate container 
-        json_filename = Path(file.filename).with_suffix('.json').name
-        json_bytes = json.dumps(json_data, indent=2, ensure_ascii=False).encode('utf-8')
+        # 3. Stream JSON to intermediate container as it is encoded
+        content_type, suffix = PULSE_OUTPUT_CONTENT_TYPES[CUSTOMER_PULSE_JSON_FORMAT]
+        json_filename = Path(file.filename).with_suffix(suffix).name
 
         json_metadata = {
             "source_file_container": CUSTOMER_PULSE_CONTAINER_NAME,
             "source_file_directory": excel_blob_path,
             "source_file_name": file.filename,
             "processed_at": datetime.now().isoformat(),
+            "output_format": CUSTOMER_PULSE_JSON_FORMAT,
             **excel_metadata
         }
 
-        json_result = blob_storage_manager.upload_fileobj_to_blob(
-            fileobj=BytesIO(json_bytes),
+        json_result = blob_storage_manager.upload_stream_to_blob(
+            stream=iter_stream(encode_records(
+                json_data, CUSTOMER_PULSE_JSON_FORMAT, compress=CUSTOMER_PULSE_JSON_GZIP
+            )),
             filename=json_filename,
             blob_folder=CUSTOMER_PULSE_FOLDER,
             container=CUSTOMER_PULSE_JSON_CONTAINER_NAME,
-            metadata=json_metadata
+            metadata=json_metadata,
+            content_type=content_type,
+            content_encoding="gzip" if CUSTOMER_PULSE_JSON_GZIP else None,
         )
 
         if json_result["status"] != "success":
@@ -313,6 +340,10 @@ def ingest_global_data():
         logger.error(f"Error ingesting global data: {str(e)}")
         return create_error_response(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
 
+    finally:
+        if staged_excel:
+            staged_excel.discard_spill()
+
 @bp.route("/global-data", methods=["GET"])
 @only_platform_admin()
 def get_global_data():
@@ -346,9 +377,11 @@ def get_global_data():
     """
     try:
         blob_storage_manager: BlobStorageManager = current_app.config["blob_storage_manager"]
-        files = blob_storage_manager.list_blobs_in_container(
-            CUSTOMER_PULSE_CONTAINER_NAME,
-            prefix=CUSTOMER_PULSE_FOLDER + "/",
+        files = list(
+            blob_storage_manager.list_blobs_in_container(
+                CUSTOMER_PULSE_CONTAINER_NAME,
+                prefix=CUSTOMER_PULSE_FOLDER + "/",
+            )
         )
         return create_success_response(files, HTTPStatus.OK)
     except Exception as e:
@@ -368,7 +401,8 @@ def get_user_activity_logs():
         end_date (str, optional): End date as Unix timestamp string
     
     Returns:
-        JSON: User activity data with sessions, conversations, and messages per user
+        JSON: User activity data with sessions, conversations, and messages per user,
+        summed from the per-day rollups in shared/activity_rollups.py
         
     Example:
         GET /api/platform-admin/user-activity-logs?organization_id=abc123&start_date=1704067200&end_date=1704153600
@@ -376,12 +410,72 @@ def get_user_activity_logs():
     organization_id = request.args.get("organization_id", None)
     start_date = request.args.get("start_date", None)
     end_date = request.args.get("end_date", None)
-    action = "session-start"
     try:
         start_timestamp = int(start_date) if start_date else None
         end_timestamp = int(end_date) if end_date else None
-        user_logs = get_user_activity_data(organization_id, start_timestamp, end_timestamp, action)
+        user_logs = activity_rollups.get_activity_summary(
+            organization_id, start_timestamp, end_timestamp
+        )
         return create_success_response(user_logs, HTTPStatus.OK)
     except Exception as e:
         logger.exception("Error retrieving user activity logs")
-        return create_error_response("Failed to retrieve user activity logs.", HTTPStatus.INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return create_error_response("Failed to retrieve user activity logs.", HTTPStatus.INTERNAL_SERVER_ERROR)
+
+@bp.route("/cache-stats", methods=["GET"])
+@only_platform_admin()
+def get_cache_stats():
+    """
+    Report hit/miss counters for the in-process caches on this instance.
+
+    Counters are per worker process, so repeated calls may land on different
+    instances and return different numbers.
+
+    Example:
+        GET /api/platform-admin/cache-stats
+
+        Response:
+        {
+            "data": {
+                "membership": {"hits": 120, "misses": 8, "invalidations": 2, "size": 6},
+                "subscription_tiers": {"hits": 300, "misses": 0, "reloads": 1, "refresh_errors": 0, "size": 4},
+                "secrets": {"hits": 950, "misses": 3, "coalesced": 1, "refreshes": 2, "refresh_errors": 0, "stale_served": 0, "size": 3}
+            }
+        }
+    """
+    try:
+        return create_success_response(
+            {
+                "membership": membership_cache.get_stats(),
+                "subscription_tiers": get_subscription_tier_catalog_stats(),
+                "secrets": clients.secret_cache.get_stats(),
+            },
+            HTTPStatus.OK,
+        )
+    except Exception as e:
+        logger.exception("Error retrieving cache stats")
+        return create_error_response("Failed to retrieve cache stats.", HTTPStatus.INTERNAL_SERVER_ERROR)
+
+
+@bp.route("/subscription-tiers/reload", methods=["POST"])
+@only_platform_admin()
+def reload_subscription_tier_catalog():
+    """
+    Force the in-memory subscription tier catalog to re-read Cosmos DB.
+
+    Use after editing tier documents when the change must apply before the next
+    background refresh. Only the instance that serves the request is reloaded;
+    other instances pick the change up on their next refresh.
+
+    Example:
+        POST /api/platform-admin/subscription-tiers/reload
+
+        Response:
+        {
+            "data": {"reloaded": true, "hits": 300, "misses": 0, "reloads": 2, "refresh_errors": 0, "size": 4}
+        }
+    """
+    try:
+        return create_success_response(reload_subscription_tiers(force=True), HTTPStatus.OK)
+    except Exception as e:
+        logger.exception("Error reloading subscription tier catalog")
+        return create_error_response("Failed to reload subscription tiers.", HTTPStatus.INTERNAL_SERVER_ERROR)
@@ -1,6 +1,5 @@
 import os
 from flask import Blueprint, current_app, request
-import tempfile
 import logging
 import re
 import uuid
@@ -8,6 +7,7 @@ import time
 from typing import Any, Optional
 from utils import create_success_response, create_error_response
 from routes.decorators.auth_decorator import auth_required
+from shared.blob_storage import BlobUploadError, FileTooLargeError
 from shared.anthropic_files import AnthropicFilesClient, AnthropicFilesError, AnthropicFilesRequestError
 BLOB_CONTAINER_NAME = "user-documents"
 ALLOWED_FILE_EXTENSIONS = [".pdf", ".csv", ".xls", ".xlsx", ".docx"]
@@ -82,7 +82,7 @@ def _extract_file_id(result: Any) -> Optional[str]:
 @bp.route("/upload-user-document", methods=["POST"])
 @auth_required
 def upload_user_document():
-    temp_file_path = None
+    staged = None
     try:
         if "file" not in request.files:
             logger.error("No file part in the request")
@@ -143,11 +143,29 @@ def upload_user_document():
         timestamp_ms = int(time.time() * 1000)
         timestamped_filename = f"{base_name}_{timestamp_ms}{ext}"
 
-        temp_filename = timestamped_filename
-        temp_file_path = os.path.join(tempfile.gettempdir(), temp_filename)
-        file.save(temp_file_path)
-
         blob_folder = f"{safe_org_id}/{safe_user_id}/{safe_conversation_id}"
+        blob_storage_manager = current_app.config["blob_storage_manager"]
+
+        # Stage the blob straight from the request; files that also go to
+        # Anthropic are spilled to a private temp file for that upload.
+        try:
+            staged = blob_storage_manager.stage_upload(
+                stream=file.stream,
+                filename=timestamped_filename,
+                blob_folder=blob_folder,
+                container=BLOB_CONTAINER_NAME,
+                max_bytes=MAX_FILE_SIZE,
+                spill=ext_lower in ANTHROPIC_FILE_EXTENSIONS,
+            )
+        except FileTooLargeError:
+            logger.error(f"File '{file.filename}' exceeds {MAX_FILE_SIZE} bytes")
+            return create_error_response(
+                f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB", 400
+            )
+        except BlobUploadError as exc:
+            error_msg = f"Error uploading file: {exc}"
+            logger.error(error_msg)
+            return create_error_response(error_msg, 500)
 
         # Create metadata with hierarchical information
         metadata = {
@@ -162,7 +180,7 @@ def upload_user_document():
             mime_type = ANTHROPIC_MIME_TYPES.get(ext_lower, "application/octet-stream")
             try:
                 anthropic_result = _upload_to_anthropic(
-                    file_path=temp_file_path,
+                    file_path=staged.spill_path,
                     filename=timestamped_filename,
                     mime_type=mime_type,
                 )
@@ -179,15 +197,8 @@ def upload_user_document():
                 logger.exception("Unexpected error uploading to Anthropic: %s", exc)
                 return create_error_response("Anthropic upload failed. Please try again.", 502)
 
-        # Initialize blob storage manager and upload file
-        blob_storage_manager = current_app.config["blob_storage_manager"]
-
-        result = blob_storage_manager.upload_to_blob(
-            file_path=temp_file_path,
-            blob_folder=blob_folder,
-            metadata=metadata,
-            container=BLOB_CONTAINER_NAME,
-        )
+        # Commit the staged blocks with the final metadata
+        result = blob_storage_manager.commit_upload(staged, metadata)
 
         if result["status"] == "success":
             logger.info(
@@ -216,8 +227,8 @@ def upload_user_document():
         return create_error_response("Internal Server Error", 500)
 
     finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        if staged:
+            staged.discard_spill()
 
 
 @bp.route("/list-user-documents", methods=["GET"])
@@ -0,0 +1,341 @@
+# backend/shared/activity_rollups.py
+"""
+Per-(organization, user, day) activity counters for the platform admin
+user-activity report.
+
+The report used to scan every session log, every full conversation document
+and every user on each request. Instead, each write that matters bumps a small
+rollup document, and the report sums the rollups in the requested date range:
+
+- ``create_user_logs`` with action ``session-start`` -> ``sessionCount``
+- ``/stream_chatgpt`` questions -> ``messageCount`` (and ``conversationCount``
+  when the question starts a new conversation)
+
+Rollups live in the ``userActivityRollups`` container, partitioned by
+``/organizationId``, one document per org/user/UTC day. Existing data can be
+rolled up with the backfill command (run from ``backend/``)::
+
+    python -m shared.activity_rollups backfill [--organization-id ORG_ID]
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from azure.cosmos.exceptions import CosmosHttpResponseError, CosmosResourceNotFoundError
+
+from shared import clients
+
+log = logging.getLogger(__name__)
+
+ROLLUPS_CONTAINER = "userActivityRollups"
+SESSION_ACTION = "session-start"
+ROLLUP_WRITE_WORKERS = int(os.getenv("ROLLUP_WRITE_WORKERS", "2"))
+
+# Message counts are written off the request path so /stream_chatgpt does not
+# wait on Cosmos before relaying the first byte.
+_write_executor = ThreadPoolExecutor(
+    max_workers=ROLLUP_WRITE_WORKERS, thread_name_prefix="activity-rollup"
+)
+
+
+def _day_bucket(timestamp: int) -> Tuple[str, int]:
+    """Return the UTC day (``YYYY-MM-DD``) of ``timestamp`` and its midnight timestamp."""
+    day = datetime.fromtimestamp(int(timestamp), timezone.utc).date()
+    day_start = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+    return day.isoformat(), day_start
+
+
+def _rollup_id(organization_id: str, user_id: str, day: str) -> str:
+    return f"{organization_id}:{user_id}:{day}"
+
+
+def _new_rollup(organization_id: str, user_id: str, timestamp: int) -> dict:
+    day, day_start = _day_bucket(timestamp)
+    return {
+        "id": _rollup_id(organization_id, user_id, day),
+        "organizationId": organization_id,
+        "userId": user_id,
+        "day": day,
+        "dayStart": day_start,
+        "sessionCount": 0,
+        "conversationCount": 0,
+        "messageCount": 0,
+        "firstLoginTs": None,
+    }
+
+
+def _increment(
+    organization_id: str, user_id: str, timestamp: int, counters: Dict[str, int]
+) -> None:
+    container = clients.get_cosmos_container(ROLLUPS_CONTAINER)
+    doc = _new_rollup(organization_id, user_id, timestamp)
+    operations = [
+        {"op": "incr", "path": f"/{field}", "value": value}
+        for field, value in counters.items()
+    ]
+    try:
+        updated = container.patch_item(
+            item=doc["id"], partition_key=organization_id, patch_operations=operations
+        )
+        if counters.get("sessionCount") and updated.get("firstLoginTs") is None:
+            # The day's document was started by a message; this is its first session.
+            container.patch_item(
+                item=doc["id"],
+                partition_key=organization_id,
+                patch_operations=[
+                    {"op": "set", "path": "/firstLoginTs", "value": int(timestamp)}
+                ],
+            )
+        return
+    except CosmosResourceNotFoundError:
+        pass
+
+    doc.update(counters)
+    if counters.get("sessionCount"):
+        doc["firstLoginTs"] = int(timestamp)
+    try:
+        container.create_item(body=doc)
+    except CosmosHttpResponseError as e:
+        if e.status_code != 409:
+            raise
+        # Another writer created today's document first; apply our delta to it.
+        container.patch_item(
+            item=doc["id"], partition_key=organization_id, patch_operations=operations
+        )
+
+
+def record_session(organization_id: str, user_id: str, timestamp: int) -> None:
+    """Count a session start. Failures are logged and never raised."""
+    if not organization_id or not user_id:
+        return
+    try:
+        _increment(organization_id, user_id, timestamp, {"sessionCount": 1})
+    except Exception as e:
+        log.warning("[activity_rollups] failed to record session: %s", e)
+
+
+def record_user_message(
+    organization_id: str,
+    user_id: str,
+    timestamp: int,
+    new_conversation: bool = False,
+) -> None:
+    """Count a question sent to the orchestrator. Failures are logged and never raised."""
+    if not organization_id or not user_id:
+        return
+    counters = {"messageCount": 1}
+    if new_conversation:
+        counters["conversationCount"] = 1
+    try:
+        _increment(organization_id, user_id, timestamp, counters)
+    except Exception as e:
+        log.warning("[activity_rollups] failed to record message: %s", e)
+
+
+def submit_user_message(
+    organization_id: str,
+    user_id: str,
+    timestamp: int,
+    new_conversation: bool = False,
+) -> Future:
+    """Run ``record_user_message`` on a background thread and return its future."""
+    return _write_executor.submit(
+        record_user_message, organization_id, user_id, timestamp, new_conversation
+    )
+
+
+def _get_user_names(user_ids: List[str]) -> Dict[str, str]:
+    if not user_ids:
+        return {}
+    users = clients.get_cosmos_container("users").query_items(
+        query="SELECT c.id, c.data.name AS name FROM c WHERE ARRAY_CONTAINS(@user_ids, c.id)",
+        parameters=[{"name": "@user_ids", "value": user_ids}],
+        enable_cross_partition_query=True,
+    )
+    return {u["id"]: u.get("name") for u in users}
+
+
+def get_activity_summary(
+    organization_id: Optional[str] = None,
+    start_date: Optional[int] = None,
+    end_date: Optional[int] = None,
+) -> List[dict]:
+    """
+    Sum the rollups into one activity record per user.
+
+    Each record has ``user_id``, ``user_name``, ``organization_id``,
+    ``session_count``, ``conversation_count``, ``message_count`` and
+    ``first_login_date``; only users with at least one session in the range
+    are included. Ranges are applied at UTC
+    day granularity.
+    """
+    conditions = []
+    parameters = []
+    if organization_id:
+        conditions.append("c.organizationId = @organization_id")
+        parameters.append({"name": "@organization_id", "value": organization_id})
+    if start_date and end_date:
+        conditions.append("c.dayStart >= @start AND c.dayStart <= @end")
+        parameters.append({"name": "@start", "value": _day_bucket(start_date)[1]})
+        parameters.append({"name": "@end", "value": int(end_date)})
+    query = (
+        "SELECT c.organizationId, c.userId, c.sessionCount, c.conversationCount, "
+        "c.messageCount, c.firstLoginTs FROM c"
+    )
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    container = clients.get_cosmos_container(ROLLUPS_CONTAINER)
+    if organization_id:
+        rows = container.query_items(
+            query=query, parameters=parameters, partition_key=organization_id
+        )
+    else:
+        rows = container.query_items(
+            query=query, parameters=parameters, enable_cross_partition_query=True
+        )
+
+    agg: Dict[Tuple[str, str], dict] = {}
+    for row in rows:
+        key = (row.get("organizationId"), row.get("userId"))
+        record = agg.get(key)
+        if record is None:
+            record = agg[key] = {
+                "user_id": key[1],
+                "organization_id": key[0],
+                "session_count": 0,
+                "first_login_date": None,
+                "conversation_count": 0,
+                "message_count": 0,
+            }
+        record["session_count"] += row.get("sessionCount") or 0
+        record["conversation_count"] += row.get("conversationCount") or 0
+        record["message_count"] += row.get("messageCount") or 0
+        ts = row.get("firstLoginTs")
+        if ts is not None and (
+            record["first_login_date"] is None or ts < record["first_login_date"]
+        ):
+            record["first_login_date"] = ts
+
+    records = [r for r in agg.values() if r["session_count"] > 0]
+    names = _get_user_names(sorted({r["user_id"] for r in records}))
+    for record in records:
+        record["user_name"] = names.get(record["user_id"]) or "Unknown User"
+    return records
+
+
+# -----------------------------
+# Backfill
+# -----------------------------
+def _conversation_timestamp(start_date: Optional[str]) -> Optional[int]:
+    if not start_date:
+        return None
+    try:
+        parsed = datetime.strptime(start_date, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        return None
+    return int(parsed.replace(tzinfo=timezone.utc).timestamp())
+
+
+def _build_rollups(
+    organization_id: str, session_logs: Iterable[dict], conversations: Iterable[dict]
+) -> Dict[str, dict]:
+    rollups: Dict[str, dict] = {}
+
+    def bucket(user_id: str, timestamp: int) -> dict:
+        doc = _new_rollup(organization_id, user_id, timestamp)
+        return rollups.setdefault(doc["id"], doc)
+
+    for entry in session_logs:
+        user_id, ts = entry.get("userId"), entry.get("timestamp")
+        if not user_id or ts is None:
+            continue
+        doc = bucket(user_id, ts)
+        doc["sessionCount"] += 1
+        if doc["firstLoginTs"] is None or ts < doc["firstLoginTs"]:
+            doc["firstLoginTs"] = ts
+
+    for conv in conversations:
+        user_id = conv.get("user_id")
+        ts = _conversation_timestamp(conv.get("start_date"))
+        if not user_id or ts is None:
+            continue
+        # Per-message timestamps are not stored, so history counts land on
+        # the conversation's start day.
+        doc = bucket(user_id, ts)
+        doc["conversationCount"] += 1
+        doc["messageCount"] += conv.get("user_messages") or 0
+
+    return rollups
+
+
+def backfill_organization(organization_id: str) -> int:
+    """
+    Rebuild every rollup of one organization from userLogs and conversations.
+
+    Existing rollup documents for the same days are overwritten, so run this
+    before traffic starts updating the rollups or during a quiet period.
+
+    Returns:
+        int: Number of rollup documents written.
+    """
+    session_logs = clients.get_cosmos_container("userLogs").query_items(
+        query=(
+            "SELECT c.userId, c.timestamp FROM c "
+            "WHERE c.organizationId = @organization_id AND c.action = @action"
+        ),
+        parameters=[
+            {"name": "@organization_id", "value": organization_id},
+            {"name": "@action", "value": SESSION_ACTION},
+        ],
+        partition_key=organization_id,
+    )
+    conversations = clients.get_cosmos_container("conversations").query_items(
+        query=(
+            "SELECT c.user_id, c.conversation_data.start_date AS start_date, "
+            "ARRAY_LENGTH(ARRAY(SELECT VALUE h FROM h IN c.conversation_data.history "
+            "WHERE h.role = 'user')) AS user_messages "
+            "FROM c WHERE c.conversation_data.interaction.organization_id = @organization_id"
+        ),
+        parameters=[{"name": "@organization_id", "value": organization_id}],
+        enable_cross_partition_query=True,
+    )
+
+    rollups = _build_rollups(organization_id, session_logs, conversations)
+    container = clients.get_cosmos_container(ROLLUPS_CONTAINER)
+    for doc in rollups.values():
+        container.upsert_item(doc)
+    log.info(
+        "[activity_rollups] backfilled %d rollups for organization %s",
+        len(rollups),
+        organization_id,
+    )
+    return len(rollups)
+
+
+def backfill(organization_id: Optional[str] = None) -> int:
+    """Backfill one organization, or every organization when none is given."""
+    if organization_id:
+        return backfill_organization(organization_id)
+    org_ids = clients.get_cosmos_container("organizations").query_items(
+        query="SELECT VALUE c.id FROM c", enable_cross_partition_query=True
+    )
+    return sum(backfill_organization(org_id) for org_id in org_ids)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="User activity rollup maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = subcommands.add_parser(
+        "backfill", help="Rebuild rollups from userLogs and conversations"
+    )
+    backfill_parser.add_argument("--organization-id", default=None)
+    args = parser.parse_args()
+    written = backfill(args.organization_id)
+    print(f"Wrote {written} rollup documents")
@@ -0,0 +1,129 @@
+# backend/shared/blob_cursors.py
+"""
+Cursor store for paginated blob listings.
+
+Azure only hands out continuation tokens page by page, so serving page N
+without a token means re-listing pages 1..N-1. The store remembers where each
+page of a listing starts (its continuation token plus, for filtered
+listings, how many matching items to skip), keyed by the listing parameters.
+A request for page N then resumes from the closest known page at or before N
+and records every page boundary it walks past.
+
+Cursors handed to clients are opaque strings that embed the page number and
+its start position, so they also work on instances whose store has not seen
+the listing.
+
+Stored positions go stale when blobs are added or removed before them, so
+listings expire after ``BLOB_CURSOR_TTL_SECONDS`` and writers drop the
+affected ones with ``invalidate_cursors`` (called by
+``invalidate_directory_listing`` and ``invalidate_gallery_index``).
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from cachetools import TTLCache
+
+BLOB_CURSOR_CACHE_SIZE = int(os.getenv("BLOB_CURSOR_CACHE_SIZE", "2000"))
+# Same bound as the directory listing cache for writes on other instances
+BLOB_CURSOR_TTL_SECONDS = int(os.getenv("DIRECTORY_CACHE_TTL_SECONDS", "60"))
+MAX_PAGES_PER_LISTING = 1000
+
+_CURSOR_PREFIX = "c1."
+
+Position = Dict[str, Any]
+
+
+class BlobCursorStore:
+    """
+    Bounded TTL cache of listing key -> {page number: start position}.
+
+    A position is a small JSON-serializable dict, e.g. ``{"token": "..."}``.
+    Page 1 always starts at the beginning and is never stored. Listing keys
+    are tuples whose first item is the listed prefix, so ``invalidate`` can
+    find them.
+    """
+
+    def __init__(
+        self, maxsize: int = BLOB_CURSOR_CACHE_SIZE, ttl: float = BLOB_CURSOR_TTL_SECONDS
+    ):
+        self._listings: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def nearest(self, key: Hashable, page: int) -> Tuple[int, Optional[Position]]:
+        """Return the closest known ``(page, position)`` at or before ``page``."""
+        with self._lock:
+            pages = self._listings.get(key)
+            if not pages:
+                return 1, None
+            known = [p for p in pages if p <= page]
+            if not known:
+                return 1, None
+            best = max(known)
+            return best, pages[best]
+
+    def put(self, key: Hashable, page: int, position: Position) -> None:
+        """Remember where ``page`` of the listing ``key`` starts."""
+        if page <= 1:
+            return
+        with self._lock:
+            pages = self._listings.get(key)
+            if pages is None:
+                pages = self._listings[key] = {}
+            if page not in pages and len(pages) >= MAX_PAGES_PER_LISTING:
+                return
+            pages[page] = position
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """
+        Drop the listings a write to ``path`` affects: those whose prefix
+        contains it and those under it. Without a path everything is dropped.
+        """
+        with self._lock:
+            if not path:
+                self._listings.clear()
+                return
+            for key in list(self._listings.keys()):
+                prefix = key[0]
+                if path.startswith(prefix) or prefix.startswith(path):
+                    self._listings.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._listings.clear()
+
+
+def encode_cursor(page: int, position: Position) -> str:
+    """Pack a page number and its start position into an opaque cursor string."""
+    raw = json.dumps({"n": page, **position}, separators=(",", ":")).encode()
+    return _CURSOR_PREFIX + base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, Position]]:
+    """
+    Unpack a cursor made by ``encode_cursor``.
+
+    Returns None for empty values and for strings that are not cursors (such
+    as raw Azure continuation tokens from older clients).
+    """
+    if not cursor or not cursor.startswith(_CURSOR_PREFIX):
+        return None
+    body = cursor[len(_CURSOR_PREFIX):]
+    try:
+        data = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+        page = int(data.pop("n"))
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid continuation token")
+    return page, data
+
+
+cursor_store = BlobCursorStore()
+
+
+def invalidate_cursors(path: Optional[str] = None) -> None:
+    """Forget stored page positions of listings affected by a write to ``path``."""
+    cursor_store.invalidate(path)
@@ -1,13 +1,119 @@
+import base64
+import codecs
+import hashlib
+import io
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    BinaryIO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 from azure.storage.blob import BlobServiceClient, ContentSettings
+from cachetools import TTLCache
 
 from _secrets import get_secret
+from shared.blob_cursors import cursor_store, decode_cursor, encode_cursor, invalidate_cursors
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on threads used for per-blob work that cannot be done in the
+# listing call itself (signing, copying, deleting, ...).
+BLOB_WORKER_THREADS = int(os.getenv("BLOB_WORKER_THREADS", "8"))
+
+# Blob batch requests accept at most 256 sub-requests.
+BLOB_BATCH_SIZE = 256
+
+# Streamed uploads are staged as blocks of UPLOAD_BLOCK_BYTES, with at most
+# UPLOAD_MAX_CONCURRENCY blocks in flight, and committed in one call.
+UPLOAD_BLOCK_BYTES = int(os.getenv("BLOB_UPLOAD_BLOCK_BYTES", str(4 * 1024 * 1024)))
+UPLOAD_MAX_CONCURRENCY = int(os.getenv("BLOB_UPLOAD_MAX_CONCURRENCY", "4"))
+
+# Leading bytes expected for each accepted mimetype.
+FILE_SIGNATURES = {
+    "application/pdf": b"%PDF",
+    # ZIP archives: .xlsx, .docx, .pptx
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": b"PK",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": b"PK",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": b"PK",
+    # OLE compound files: .xls, .doc, .ppt
+    "application/vnd.ms-excel": b"\xD0\xCF\x11\xE0",
+    "application/msword": b"\xD0\xCF\x11\xE0",
+    "application/vnd.ms-powerpoint": b"\xD0\xCF\x11\xE0",
+}
+# Bytes of a CSV that must decode as UTF-8.
+CSV_SIGNATURE_BYTES = 1024
+
+# Server-side copies still pending after the copy call are re-checked with
+# backoff from COPY_POLL_INITIAL_SECONDS up to COPY_POLL_MAX_SECONDS.
+COPY_TIMEOUT_SECONDS = int(os.getenv("BLOB_COPY_TIMEOUT_SECONDS", "120"))
+COPY_POLL_INITIAL_SECONDS = 0.1
+COPY_POLL_MAX_SECONDS = 2.0
+# Copy progress is reported every COPY_PROGRESS_INTERVAL finished copies.
+COPY_PROGRESS_INTERVAL = BLOB_BATCH_SIZE
+
+# Direct-children listings used by folder browsers, keyed by
+# (container, prefix, include_metadata). Writes under a prefix invalidate it
+# through invalidate_directory_listing(); the TTL bounds staleness caused by
+# writes on other instances.
+DIRECTORY_CACHE_TTL_SECONDS = int(os.getenv("DIRECTORY_CACHE_TTL_SECONDS", "60"))
+DIRECTORY_CACHE_MAX_ENTRIES = int(os.getenv("DIRECTORY_CACHE_MAX_ENTRIES", "1024"))
+
+# Category name -> file extensions, for list_directory(category=...).
+FILE_CATEGORY_EXTENSIONS = {
+    "documents": {".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt"},
+    "spreadsheets": {".csv", ".xlsx", ".xls", ".ods"},
+    "presentations": {".ppt", ".pptx", ".odp", ".key"},
+}
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_directory_cache: TTLCache = TTLCache(
+    maxsize=DIRECTORY_CACHE_MAX_ENTRIES, ttl=DIRECTORY_CACHE_TTL_SECONDS
+)
+_directory_cache_lock = threading.Lock()
+
+
+def invalidate_directory_listing(path: Optional[str] = None) -> None:
+    """
+    Drop cached directory listings affected by a write to ``path``.
+
+    ``path`` may be a blob name or a folder prefix. Every cached folder that
+    contains it (a new or emptied subfolder changes its ancestors' listings)
+    and every cached folder below it is dropped. Without a path the whole
+    cache is cleared. Stored page positions under ``path`` go with them.
+    """
+    invalidate_cursors(path)
+    with _directory_cache_lock:
+        if not path:
+            _directory_cache.clear()
+            return
+        for key in list(_directory_cache.keys()):
+            cached_prefix = key[1]
+            if path.startswith(cached_prefix) or cached_prefix.startswith(path):
+                _directory_cache.pop(key, None)
+
+
+def _created_on_key(blob_info: Dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(blob_info["created_on"])
+
 
 class BlobStorageError(Exception):
     """Base exception for blob storage operations."""
@@ -41,6 +147,78 @@ class BlobMetadataError(BlobStorageError):
     """Raised when blob metadata access fails."""
 
 
+class FileSignatureError(BlobStorageError):
+    """Raised when uploaded content does not match its declared type."""
+
+
+class FileTooLargeError(BlobStorageError):
+    """Raised when a streamed upload exceeds its size limit."""
+
+
+def matches_file_signature(header: bytes, mimetype: str) -> bool:
+    """Check the first bytes of a file against the magic bytes of ``mimetype``."""
+    if mimetype == "text/csv":
+        try:
+            # A multi-byte character may straddle the cut
+            codecs.getincrementaldecoder("utf-8")().decode(header[:CSV_SIGNATURE_BYTES])
+            return True
+        except UnicodeDecodeError:
+            return False
+    signature = FILE_SIGNATURES.get(mimetype)
+    return signature is not None and header.startswith(signature)
+
+
+def content_type_for(blob_path: str) -> str:
+    if blob_path.endswith(".pdf"):
+        return "application/pdf"
+    if blob_path.endswith(".html"):
+        return "text/html"
+    if blob_path.endswith(".txt"):
+        return "text/plain"
+    return "application/octet-stream"
+
+
+class _ChunkReader(io.RawIOBase):
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            try:
+                self._pending = next(self._chunks)
+            except StopIteration:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def iter_stream(chunks: Iterable[bytes]) -> BinaryIO:
+    """Read-only file object over an iterator of byte chunks, for stage_upload."""
+    return io.BufferedReader(_ChunkReader(chunks))
+
+
+@dataclass
+class StagedUpload:
+    """Blocks staged by BlobStorageManager.stage_upload, not yet visible as a blob."""
+
+    container_name: str
+    blob_path: str
+    block_ids: List[str]
+    size: int
+    sha256: str
+    spill_path: Optional[str] = None
+
+    def discard_spill(self) -> None:
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+
 class BlobStorageManager:
     def __init__(self, default_container_name: Optional[str] = None):
         try:
@@ -101,14 +279,7 @@ class BlobStorageManager:
         file_name = os.path.basename(file_path)
         blob_path = f"{blob_folder}/{file_name}" if blob_folder else file_name
 
-        if blob_path.endswith(".pdf"):
-            content_type = "application/pdf"
-        elif blob_path.endswith(".html"):
-            content_type = "text/html"
-        elif blob_path.endswith(".txt"):
-            content_type = "text/plain"
-        else:
-            content_type = "application/octet-stream"
+        content_type = content_type_for(blob_path)
 
         try:
             container_client, container_name = self._get_container_client(container)
@@ -192,8 +363,170 @@ class BlobStorageManager:
         except Exception as e:
             logger.error(f"Failed to upload file {filename}: {str(e)}")
             return {"status": "failed", "error": str(e)}
-        
-    
+
+    def stage_upload(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        blob_folder: str,
+        container: Optional[str] = None,
+        mimetype: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        spill: bool = False,
+        block_size: int = UPLOAD_BLOCK_BYTES,
+        max_workers: int = UPLOAD_MAX_CONCURRENCY,
+    ) -> StagedUpload:
+        """
+        Stage ``stream`` as uncommitted blocks of a block blob in one pass.
+
+        The first block is checked against the signature of ``mimetype``
+        before anything is sent, the content is hashed and counted as it is
+        read, and blocks are staged concurrently. With ``spill`` the content
+        is also written to a private temp file for consumers that need a
+        seekable file (``StagedUpload.spill_path``; the caller removes it).
+        Nothing is visible until ``commit_upload``; uncommitted blocks are
+        discarded by the service.
+
+        Raises:
+            FileSignatureError: content does not match ``mimetype``.
+            FileTooLargeError: more than ``max_bytes`` were read.
+            BlobUploadError: staging a block failed.
+        """
+        blob_folder = (blob_folder or "").strip("/")
+        filename = os.path.basename(filename)
+        blob_path = f"{blob_folder}/{filename}" if blob_folder else filename
+        container_client, container_name = self._get_container_client(container)
+        blob_client = container_client.get_blob_client(blob_path)
+
+        digest = hashlib.sha256()
+        totals = {"size": 0}
+        spill_file, spill_path = None, None
+        if spill:
+            # Unique name: concurrent uploads of the same file name must not collide
+            fd, spill_path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+            spill_file = os.fdopen(fd, "wb")
+        staged = StagedUpload(container_name, blob_path, [], 0, "", spill_path)
+        # Uncommitted blocks are shared by every writer of the blob, so ids are
+        # unique per upload or concurrent uploads to one path would mix blocks.
+        upload_id = uuid.uuid4().hex
+
+        def blocks() -> Iterator[Tuple[str, bytes]]:
+            index = 0
+            while True:
+                chunk = stream.read(block_size)
+                if index == 0 and mimetype and not matches_file_signature(chunk, mimetype):
+                    raise FileSignatureError(f"Content of {filename} does not match {mimetype}")
+                if not chunk:
+                    return
+                totals["size"] += len(chunk)
+                if max_bytes is not None and totals["size"] > max_bytes:
+                    raise FileTooLargeError(f"{filename} exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                if spill_file:
+                    spill_file.write(chunk)
+                # Block ids must all have the same length
+                block_id = base64.b64encode(f"{upload_id}-{index:08d}".encode()).decode()
+                staged.block_ids.append(block_id)
+                index += 1
+                yield block_id, chunk
+
+        def stage(block: Tuple[str, bytes]) -> None:
+            try:
+                blob_client.stage_block(block_id=block[0], data=block[1])
+            except Exception as e:
+                raise BlobUploadError(f"Failed to stage a block of {blob_path}: {str(e)}")
+
+        try:
+            self._bounded_map(stage, blocks(), max_workers, lambda block, _: None)
+        except Exception:
+            if spill_file:
+                spill_file.close()
+            staged.discard_spill()
+            raise
+        if spill_file:
+            spill_file.close()
+        staged.size = totals["size"]
+        staged.sha256 = digest.hexdigest()
+        return staged
+
+    def commit_upload(
+        self,
+        staged: StagedUpload,
+        metadata: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Commit staged blocks as the blob; returns the same result shape as
+        ``upload_to_blob`` plus ``size`` and ``sha256``. The content type
+        defaults to the one derived from the blob name.
+        """
+        try:
+            blob_sas_token = get_secret("blobSasToken", env_name="BLOB_SAS_TOKEN")
+            if not blob_sas_token:
+                raise ValueError(
+                    "The SAS token for Azure Blob Storage is not set."
+                )
+        except Exception as e:
+            logger.error("Error retrieving the SAS token for Azure Blob Storage.")
+            logger.debug(f"Detailed error: {e}")
+            return {"status": "failed", "error": str(e)}
+
+        try:
+            container_client, container_name = self._get_container_client(staged.container_name)
+            container_client.get_blob_client(staged.blob_path).commit_block_list(
+                staged.block_ids,
+                content_settings=ContentSettings(
+                    content_type=content_type or content_type_for(staged.blob_path),
+                    content_encoding=content_encoding,
+                ),
+                metadata=metadata,
+            )
+        except Exception as e:
+            logger.error(f"Failed to commit upload {staged.blob_path}: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+
+        return {
+            "status": "success",
+            "blob_path": staged.blob_path,
+            "blob_url": (
+                f"{self.blob_service_client.url}{container_name}/{staged.blob_path}"
+                f"?{blob_sas_token}"
+            ),
+            "metadata": metadata,
+            "size": staged.size,
+            "sha256": staged.sha256,
+        }
+
+    def upload_stream_to_blob(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        blob_folder: str,
+        metadata: Optional[Dict[str, str]] = None,
+        container: Optional[str] = None,
+        mimetype: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Stage and commit ``stream`` without a local copy (see ``stage_upload``).
+
+        FileSignatureError and FileTooLargeError propagate so callers can
+        reject the request; storage failures return ``status: failed``.
+        """
+        try:
+            staged = self.stage_upload(
+                stream, filename, blob_folder, container, mimetype=mimetype, max_bytes=max_bytes
+            )
+        except (FileSignatureError, FileTooLargeError):
+            raise
+        except Exception as e:
+            logger.error(f"Failed to upload file {filename}: {str(e)}")
+            return {"status": "failed", "error": str(e)}
+        return self.commit_upload(staged, metadata, content_type, content_encoding)
+
     def delete_blob(
         self,
         blob_name: str,
@@ -221,15 +554,90 @@ class BlobStorageManager:
             logger.error(f"Failed to delete blob {blob_name}: {str(e)}")
             return {"status": "failed", "error": str(e)}
 
+    def _blob_to_info(
+        self, blob, container_name: str, include_metadata: str
+    ) -> Dict[str, Any]:
+        blob_info = {
+            "name": blob.name,
+            "size": blob.size,
+            "created_on": blob.creation_time.isoformat(),
+            "last_modified": blob.last_modified.isoformat(),
+            "content_type": blob.content_settings.content_type,
+            "url": f"{self.blob_service_client.url}{container_name}/{blob.name}",
+        }
+        if include_metadata == "yes":
+            # Returned inline by list_blobs(include=["metadata"]).
+            blob_info["metadata"] = blob.metadata or {}
+        return blob_info
+
+    def _list_blobs(
+        self,
+        container_client,
+        prefix: Optional[str],
+        include_metadata: str,
+        results_per_page: Optional[int] = None,
+    ):
+        list_params = {
+            "name_starts_with": prefix if prefix else None,
+            "results_per_page": results_per_page,
+            "include": ["metadata"] if include_metadata == "yes" else None,
+        }
+        return container_client.list_blobs(
+            **{k: v for k, v in list_params.items() if v is not None}
+        )
+
+    def _get_existing_container_client(self, container_name: str):
+        container_client = self.blob_service_client.get_container_client(
+            container_name
+        )
+        if not container_client.exists():
+            raise ContainerNotFoundError(f"Container not found: {container_name}")
+        return container_client
+
+    def _iter_blob_infos(
+        self,
+        container_client,
+        container_name: str,
+        prefix: Optional[str],
+        include_metadata: str,
+        max_results: Optional[int],
+        strict_prefix: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        effective_prefix = prefix if prefix else ""
+        count = 0
+        try:
+            for blob in self._list_blobs(
+                container_client, prefix, include_metadata, max_results
+            ):
+                if strict_prefix and effective_prefix and not blob.name.startswith(
+                    effective_prefix
+                ):
+                    continue
+                yield self._blob_to_info(blob, container_name, include_metadata)
+                count += 1
+                if max_results is not None and count >= max_results:
+                    break
+        except Exception as e:
+            if "AuthenticationFailed" in str(e):
+                raise BlobAuthenticationError(
+                    f"Error authenticating with blob storage: {str(e)}"
+                )
+            logger.error(f"Error listing blobs in container: {str(e)}")
+            raise
+
     def list_blobs_in_container(
         self,
         container_name: str,
         prefix: str = None,
         include_metadata: str = "no",
         max_results: int = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
         List blobs in a container with filtering and metadata.
+
+        Arguments are validated and the container is checked eagerly; the blobs
+        themselves are yielded lazily, page by page, as the listing is consumed.
+        Wrap the result in ``list()`` when a materialized list is needed.
         """
         if not container_name or not container_name.strip():
             raise ValueError("Container name is required and cannot be empty")
@@ -238,50 +646,7 @@ class BlobStorageManager:
             raise ValueError("max_results must be greater than 0")
 
         try:
-            container_client = self.blob_service_client.get_container_client(
-                container_name
-            )
-
-            if not container_client.exists():
-                raise ContainerNotFoundError(f"Container not found: {container_name}")
-
-            list_params = {
-                "name_starts_with": prefix if prefix else None,
-                "results_per_page": max_results,
-            }
-
-            blob_list = []
-            blobs = container_client.list_blobs(
-                **{k: v for k, v in list_params.items() if v is not None}
-            )
-
-            for blob in blobs:
-                blob_info = {
-                    "name": blob.name,
-                    "size": blob.size,
-                    "created_on": blob.creation_time.isoformat(),
-                    "last_modified": blob.last_modified.isoformat(),
-                    "content_type": blob.content_settings.content_type,
-                    "url": f"{self.blob_service_client.url}{container_name}/{blob.name}",
-                }
-                if include_metadata == "yes":
-                    try:
-                        blob_client = container_client.get_blob_client(blob.name)
-                        properties = blob_client.get_blob_properties()
-                        blob_info["metadata"] = properties.metadata
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to retrieve metadata for {blob.name}: {str(e)}"
-                        )
-                        blob_info["metadata"] = None
-
-                blob_list.append(blob_info)
-
-                if max_results and len(blob_list) >= max_results:
-                    break
-
-            return blob_list
-
+            container_client = self._get_existing_container_client(container_name)
         except Exception as e:
             if "AuthenticationFailed" in str(e):
                 raise BlobAuthenticationError(
@@ -290,15 +655,21 @@ class BlobStorageManager:
             logger.error(f"Error listing blobs in container: {str(e)}")
             raise
 
+        return self._iter_blob_infos(
+            container_client, container_name, prefix, include_metadata, max_results
+        )
+
     def list_blobs_in_container_for_upload_files(
         self,
         container_name: str,
         prefix: str = None,
         include_metadata: str = "no",
         max_results: int = None,
-    ) -> List[Dict[str, Any]]:
+    ) -> Iterator[Dict[str, Any]]:
         """
         List blobs in a container with optional filtering by prefix and metadata.
+
+        Like ``list_blobs_in_container``, results are yielded lazily.
         """
         if not container_name or not container_name.strip():
             raise ValueError("Container name is required and cannot be empty")
@@ -307,54 +678,7 @@ class BlobStorageManager:
             raise ValueError("max_results must be greater than 0")
 
         try:
-            container_client = self.blob_service_client.get_container_client(
-                container_name
-            )
-
-            if not container_client.exists():
-                raise ContainerNotFoundError(f"Container not found: {container_name}")
-
-            list_params = {
-                "name_starts_with": prefix if prefix else None,
-                "results_per_page": max_results,
-            }
-
-            blob_list = []
-            blobs = container_client.list_blobs(
-                **{k: v for k, v in list_params.items() if v is not None}
-            )
-
-            effective_prefix = prefix if prefix else ""
-
-            for blob in blobs:
-                if effective_prefix and not blob.name.startswith(effective_prefix):
-                    continue
-                blob_info = {
-                    "name": blob.name,
-                    "size": blob.size,
-                    "created_on": blob.creation_time.isoformat(),
-                    "last_modified": blob.last_modified.isoformat(),
-                    "content_type": blob.content_settings.content_type,
-                    "url": f"{self.blob_service_client.url}{container_name}/{blob.name}",
-                }
-                if include_metadata == "yes":
-                    try:
-                        blob_client = container_client.get_blob_client(blob.name)
-                        properties = blob_client.get_blob_properties()
-                        blob_info["metadata"] = properties.metadata
-                    except Exception as e:
-                        logger.warning(
-                            f"Failed to retrieve metadata for {blob.name}: {str(e)}"
-                        )
-                        blob_info["metadata"] = None
-
-                blob_list.append(blob_info)
-
-                if max_results is not None and len(blob_list) >= max_results:
-                    break
-
-            return blob_list
-
+            container_client = self._get_existing_container_client(container_name)
         except Exception as e:
             if "AuthenticationFailed" in str(e):
                 raise BlobAuthenticationError(
@@ -363,142 +687,479 @@ class BlobStorageManager:
             logger.error(f"Error listing blobs in container: {str(e)}")
             raise
 
-    def list_blobs_in_container_paginated(
+        return self._iter_blob_infos(
+            container_client,
+            container_name,
+            prefix,
+            include_metadata,
+            max_results,
+            strict_prefix=True,
+        )
+
+    def map_blobs(
         self,
-        container_name: str,
-        prefix: str = None,
-        include_metadata: str = "no",
-        page_size: int = 10,
-        page: int = 1,
-        continuation_token: str = None,
-    ) -> Dict[str, Any]:
+        func: Callable[[T], R],
+        items: Iterable[T],
+        max_workers: int = BLOB_WORKER_THREADS,
+    ) -> List[R]:
         """
-        List blobs in a container with pagination support using continuation tokens.
+        Apply ``func`` to every item on a bounded thread pool, preserving order.
+
+        Use for per-blob work that cannot be folded into a listing call.
         """
-        if not container_name or not container_name.strip():
-            raise ValueError("Container name is required and cannot be empty")
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def _delete_batch(
+        self, container_client, names: List[str]
+    ) -> Tuple[List[str], List[Dict[str, str]]]:
+        """Delete up to BLOB_BATCH_SIZE blobs in one batch request."""
+        try:
+            responses = list(
+                container_client.delete_blobs(*names, raise_on_any_failure=False)
+            )
+        except Exception as e:
+            logger.error(f"Batch delete of {len(names)} blobs failed: {str(e)}")
+            return [], [{"blob": name, "error": str(e)} for name in names]
+
+        deleted, failed = [], []
+        for name, response in zip(names, responses):
+            # 404: already gone, e.g. when a resumed job retries a batch.
+            if response.status_code in (202, 404):
+                deleted.append(name)
+            else:
+                failed.append(
+                    {"blob": name, "error": f"HTTP {response.status_code}: {response.reason}"}
+                )
+        return deleted, failed
+
+    @staticmethod
+    def _bounded_map(
+        func: Callable[[T], R],
+        items: Iterable[T],
+        max_workers: int,
+        on_result: Callable[[T, R], None],
+    ) -> None:
+        """
+        Apply ``func`` to lazily consumed ``items`` with at most ``max_workers``
+        calls in flight. ``on_result(item, result)`` runs in the calling thread
+        as calls complete; exceptions from ``func`` propagate.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
 
-        if page_size <= 0 or page_size > 100:
-            raise ValueError("page_size must be between 1 and 100")
+            def collect(done) -> None:
+                for future in done:
+                    on_result(in_flight.pop(future), future.result())
 
-        if page < 1:
-            raise ValueError("page must be greater than 0")
+            for item in items:
+                if len(in_flight) >= max_workers:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+                in_flight[executor.submit(func, item)] = item
+            collect(wait(in_flight).done)
 
-        try:
-            container_client = self.blob_service_client.get_container_client(
-                container_name
-            )
+    def _delete_names(
+        self,
+        container_client,
+        names: Iterable[str],
+        max_workers: int = BLOB_WORKER_THREADS,
+        on_batch: Optional[Callable[[List[str], List[Dict[str, str]]], None]] = None,
+    ) -> Tuple[int, List[Dict[str, str]]]:
+        """Batch-delete ``names``; returns the deleted count and the failures."""
+        names = list(names)
+        batches = [
+            names[i:i + BLOB_BATCH_SIZE] for i in range(0, len(names), BLOB_BATCH_SIZE)
+        ]
+        totals = {"deleted": 0, "failed": []}
+
+        def record(batch, result) -> None:
+            deleted, failed = result
+            totals["deleted"] += len(deleted)
+            totals["failed"].extend(failed)
+            if on_batch:
+                on_batch(deleted, failed)
+
+        self._bounded_map(
+            lambda batch: self._delete_batch(container_client, batch),
+            batches,
+            max_workers,
+            record,
+        )
+        return totals["deleted"], totals["failed"]
+
+    def delete_prefix(
+        self,
+        container_name: str,
+        prefix: str,
+        max_workers: int = BLOB_WORKER_THREADS,
+        on_batch: Optional[Callable[[List[str], List[Dict[str, str]]], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Delete every blob under ``prefix`` with batch requests.
 
-            if not container_client.exists():
-                raise ContainerNotFoundError(f"Container not found: {container_name}")
+        The listing is streamed one page of BLOB_BATCH_SIZE names at a time and
+        each page is deleted as one batch request, with at most ``max_workers``
+        batches in flight. ``on_batch(deleted_names, failures)`` is called from
+        the calling thread as each batch completes.
 
-            list_params = {
-                "name_starts_with": prefix if prefix else None,
-                "results_per_page": page_size,
-            }
+        Deleted blobs drop out of the listing, so calling this again for the
+        same prefix resumes where an interrupted run stopped (and retries
+        blobs that failed).
 
-            blobs = container_client.list_blobs(
-                **{k: v for k, v in list_params.items() if v is not None}
-            )
+        Returns ``{"deleted_count": int, "failed_count": int}``.
+        """
+        if not prefix:
+            raise ValueError("prefix is required for bulk deletion")
+
+        container_client = self._get_existing_container_client(container_name)
+        totals = {"deleted_count": 0, "failed_count": 0}
+
+        def record(names, result) -> None:
+            deleted, failed = result
+            totals["deleted_count"] += len(deleted)
+            totals["failed_count"] += len(failed)
+            if on_batch:
+                on_batch(deleted, failed)
+
+        pages = container_client.list_blobs(
+            name_starts_with=prefix, results_per_page=BLOB_BATCH_SIZE
+        ).by_page()
+        self._bounded_map(
+            lambda names: self._delete_batch(container_client, names),
+            (names for names in ([blob.name for blob in page] for page in pages) if names),
+            max_workers,
+            record,
+        )
+        return totals
+
+    def _start_copy(self, container_client, pair: Tuple[str, str]):
+        """
+        Start a server-side copy of ``pair = (source, destination)``.
 
-            pages = blobs.by_page(continuation_token=continuation_token)
-
-            if not continuation_token and page > 1:
-                for _ in range(page - 1):
-                    try:
-                        next(pages)
-                    except StopIteration:
-                        return {
-                            "blobs": [],
-                            "current_page": page,
-                            "page_size": page_size,
-                            "total_count": 0,
-                            "has_more": False,
-                            "next_continuation_token": None,
-                            "total_pages": 0,
-                        }
+        Copy Blob carries the source metadata over when none is given, so no
+        separate metadata call is needed. Returns the destination client and
+        the copy status reported by the service.
+        """
+        source_name, destination_name = pair
+        source = container_client.get_blob_client(source_name)
+        destination = container_client.get_blob_client(destination_name)
+        copy = destination.start_copy_from_url(source.url)
+        return destination, copy.get("copy_status")
+
+    def _await_copies(
+        self,
+        pending: Dict[Tuple[str, str], Any],
+        timeout: float,
+        on_round: Optional[Callable[[List[Tuple[str, str]], List[Dict[str, str]]], None]] = None,
+    ) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]:
+        """
+        Track still-pending copies until they finish or ``timeout`` expires.
 
+        Copies inside one account normally complete within the copy call;
+        the rest are re-checked together with exponential backoff rather
+        than one fixed-interval loop per blob. ``on_round(done, failed)``
+        runs after every round of checks.
+        """
+        done, failed = [], []
+        deadline = time.monotonic() + timeout
+        delay = COPY_POLL_INITIAL_SECONDS
+        while pending and time.monotonic() < deadline:
+            # The service has no completion callback; polling is the only signal
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, COPY_POLL_MAX_SECONDS)
+            for pair, destination in list(pending.items()):
+                try:
+                    status = destination.get_blob_properties().copy.status
+                except Exception as e:
+                    status, error = "failed", str(e)
+                else:
+                    error = f"copy {status}"
+                if status == "success":
+                    done.append(pair)
+                    del pending[pair]
+                elif status != "pending":
+                    failed.append({"blob": pair[0], "error": error})
+                    del pending[pair]
+            if on_round:
+                on_round(done, failed)
+        for pair, destination in pending.items():
             try:
-                current_page = next(pages)
-                blob_list = []
-
-                for blob in current_page:
-                    blob_info = {
-                        "name": blob.name,
-                        "size": blob.size,
-                        "created_on": blob.creation_time.isoformat(),
-                        "last_modified": blob.last_modified.isoformat(),
-                        "content_type": blob.content_settings.content_type,
-                        "url": f"{self.blob_service_client.url}{container_name}/{blob.name}",
-                    }
-
-                    if include_metadata == "yes":
-                        try:
-                            blob_client = container_client.get_blob_client(blob.name)
-                            properties = blob_client.get_blob_properties()
-                            blob_info["metadata"] = properties.metadata
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to retrieve metadata for {blob.name}: {str(e)}"
-                            )
-                            blob_info["metadata"] = None
-
-                    blob_list.append(blob_info)
-
-                next_continuation_token = (
-                    pages.continuation_token if hasattr(pages, "continuation_token") else None
-                )
+                destination.abort_copy(destination.get_blob_properties().copy.id)
+            except Exception as e:
+                logger.warning(f"Could not abort copy to {pair[1]}: {str(e)}")
+            failed.append({"blob": pair[0], "error": "copy timed out"})
+        return done, failed
 
-                has_more = next_continuation_token is not None
-                estimated_total = (page - 1) * page_size + len(blob_list)
-                estimated_total_pages = (
-                    max(1, (estimated_total + page_size - 1) // page_size)
-                    if estimated_total > 0
-                    else 0
-                )
+    def copy_blobs(
+        self,
+        container_name: str,
+        pairs: Iterable[Tuple[str, str]],
+        max_workers: int = BLOB_WORKER_THREADS,
+        timeout: float = COPY_TIMEOUT_SECONDS,
+        on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Copy ``(source, destination)`` blob pairs server-side, at most
+        ``max_workers`` copy requests at a time. ``pairs`` is consumed lazily.
 
-                return {
-                    "blobs": blob_list,
-                    "current_page": page,
-                    "page_size": page_size,
-                    "total_count": estimated_total,
-                    "has_more": has_more,
-                    "next_continuation_token": next_continuation_token,
-                    "total_pages": estimated_total_pages,
-                }
+        ``on_progress`` receives ``{"copied", "copy_failed", "copy_pending"}``
+        every COPY_PROGRESS_INTERVAL finished copies and after every round of
+        pending-copy checks, so long copies can heartbeat.
 
-            except StopIteration:
-                return {
-                    "blobs": [],
-                    "current_page": page,
-                    "page_size": page_size,
-                    "total_count": 0,
-                    "has_more": False,
-                    "next_continuation_token": None,
-                    "total_pages": 0,
-                }
+        Returns ``{"copied": [pairs], "errors": [{"blob", "error"}]}``.
+        """
+        container_client = self._get_existing_container_client(container_name)
+        copied: List[Tuple[str, str]] = []
+        errors: List[Dict[str, str]] = []
+        pending: Dict[Tuple[str, str], Any] = {}
+
+        def report(done=(), failed=()) -> None:
+            if on_progress:
+                on_progress({
+                    "copied": len(copied) + len(done),
+                    "copy_failed": len(errors) + len(failed),
+                    "copy_pending": len(pending),
+                })
+
+        def start(pair):
+            try:
+                return self._start_copy(container_client, pair)
+            except Exception as e:
+                return None, str(e)
+
+        def record(pair, result) -> None:
+            destination, status = result
+            if status == "success":
+                copied.append(pair)
+            elif status == "pending":
+                pending[pair] = destination
+            else:
+                logger.error(f"Copy {pair[0]} -> {pair[1]} failed: {status}")
+                errors.append({"blob": pair[0], "error": str(status)})
+            if (len(copied) + len(errors) + len(pending)) % COPY_PROGRESS_INTERVAL == 0:
+                report()
+
+        self._bounded_map(start, pairs, max_workers, record)
+        report()
+        done, failed = self._await_copies(pending, timeout, on_round=report)
+        return {"copied": copied + done, "errors": errors + failed}
+
+    def move_blobs(
+        self,
+        container_name: str,
+        pairs: Iterable[Tuple[str, str]],
+        rollback: bool = True,
+        max_workers: int = BLOB_WORKER_THREADS,
+        timeout: float = COPY_TIMEOUT_SECONDS,
+        on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Move blobs: copy every pair, then batch-delete the copied sources.
 
-        except Exception as e:
-            if "AuthenticationFailed" in str(e):
-                raise BlobAuthenticationError(
-                    f"Error authenticating with blob storage: {str(e)}"
-                )
-            logger.error(
-                f"Error listing blobs in container with pagination: {str(e)}"
+        With ``rollback`` a failed copy undoes the whole move: the copies
+        already made are deleted and no source is touched. A copy whose
+        source is already gone (another mover finished first) is the only
+        copy left and is kept. Without rollback the pairs that copied are
+        moved and the rest are reported.
+
+        ``on_progress`` receives the copy counts (see ``copy_blobs``) plus
+        ``deleted_source`` and ``delete_failed`` after every delete batch.
+
+        Returns ``{"copied", "copy_errors", "deleted", "delete_errors",
+        "rolled_back"}`` (counts for copied/deleted, lists for errors).
+        """
+        copy_result = self.copy_blobs(
+            container_name, pairs, max_workers, timeout, on_progress=on_progress
+        )
+        copied, copy_errors = copy_result["copied"], copy_result["errors"]
+        container_client = self._get_existing_container_client(container_name)
+
+        if copy_errors and rollback:
+            def source_exists(pair: Tuple[str, str]) -> bool:
+                try:
+                    return container_client.get_blob_client(pair[0]).exists()
+                except Exception as e:
+                    # Unknown: keep the copy rather than risk losing the file
+                    logger.warning(f"Could not check {pair[0]} before rollback: {str(e)}")
+                    return False
+
+            present = self.map_blobs(source_exists, copied, max_workers)
+            _, undo_errors = self._delete_names(
+                container_client,
+                (dst for (_, dst), exists in zip(copied, present) if exists),
+                max_workers,
             )
-            raise
+            for failure in undo_errors:
+                logger.error(f"Rollback could not delete copy {failure['blob']}: {failure['error']}")
+            return {
+                "copied": 0,
+                "copy_errors": copy_errors,
+                "deleted": 0,
+                "delete_errors": [],
+                "rolled_back": True,
+            }
 
-    def list_blobs_in_container_for_upload_files_paginated(
+        deletes = {"deleted_source": 0, "delete_failed": 0}
+
+        def on_batch(deleted, failed) -> None:
+            deletes["deleted_source"] += len(deleted)
+            deletes["delete_failed"] += len(failed)
+            if on_progress:
+                on_progress({
+                    "copied": len(copied),
+                    "copy_failed": len(copy_errors),
+                    "copy_pending": 0,
+                    **deletes,
+                })
+
+        deleted, delete_errors = self._delete_names(
+            container_client, (src for src, _ in copied), max_workers, on_batch=on_batch
+        )
+        return {
+            "copied": len(copied),
+            "copy_errors": copy_errors,
+            "deleted": deleted,
+            "delete_errors": delete_errors,
+            "rolled_back": False,
+        }
+
+    def move_prefix(
         self,
         container_name: str,
-        prefix: str = None,
+        source_prefix: str,
+        destination_prefix: str,
+        rollback: bool = True,
+        max_workers: int = BLOB_WORKER_THREADS,
+        on_progress: Optional[Callable[[Dict[str, int]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Move every blob under ``source_prefix`` to ``destination_prefix``; see move_blobs."""
+        if not source_prefix or not destination_prefix:
+            raise ValueError("source and destination prefixes are required")
+        container_client = self._get_existing_container_client(container_name)
+        pairs = (
+            (blob.name, destination_prefix + blob.name[len(source_prefix):])
+            for blob in container_client.list_blobs(
+                name_starts_with=source_prefix, results_per_page=BLOB_BATCH_SIZE
+            )
+        )
+        return self.move_blobs(
+            container_name, pairs, rollback, max_workers, on_progress=on_progress
+        )
+
+    def _walk_directory(
+        self, container_name: str, prefix: str, include_metadata: str
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """List the direct children of ``prefix``: subfolder prefixes and files."""
+        container_client = self._get_existing_container_client(container_name)
+        walk_params = {
+            "name_starts_with": prefix or None,
+            "include": ["metadata"] if include_metadata == "yes" else None,
+        }
+        folders: List[str] = []
+        files: List[Dict[str, Any]] = []
+        for item in container_client.walk_blobs(
+            delimiter="/", **{k: v for k, v in walk_params.items() if v is not None}
+        ):
+            # walk_blobs yields a BlobPrefix (name ending in the delimiter)
+            # for each subfolder instead of recursing into it.
+            if item.name.endswith("/"):
+                folders.append(item.name)
+            elif item.name != prefix:
+                files.append(self._blob_to_info(item, container_name, include_metadata))
+        folders.sort()
+        files.sort(key=_created_on_key, reverse=True)
+        return folders, files
+
+    def list_directory(
+        self,
+        container_name: str,
+        prefix: str = "",
         include_metadata: str = "no",
-        page_size: int = 10,
-        page: int = 1,
-        continuation_token: str = None,
+        category: str = "all",
+        order: str = "newest",
+        exclude_prefixes: Sequence[str] = (),
     ) -> Dict[str, Any]:
         """
-        List blobs in a container for upload files with pagination support.
+        List one folder level under ``prefix`` without recursing into subfolders.
+
+        Returns ``{"folders": [...], "files": [...]}`` where folders are full
+        prefixes (ending in "/") sorted by name and files are blob info dicts
+        sorted by creation date, newest first when ``order`` is "newest" and
+        oldest first otherwise. ``category``
+        keeps only files whose extension is in ``FILE_CATEGORY_EXTENSIONS``;
+        unknown categories and "all" keep everything. Items under any of
+        ``exclude_prefixes`` are left out.
+
+        Listings are cached per prefix; writers must call
+        ``invalidate_directory_listing`` with the path they changed.
+        """
+        if not container_name or not container_name.strip():
+            raise ValueError("Container name is required and cannot be empty")
+
+        prefix = prefix or ""
+        key = (container_name, prefix, include_metadata)
+        with _directory_cache_lock:
+            cached = _directory_cache.get(key)
+        if cached is None:
+            try:
+                cached = self._walk_directory(container_name, prefix, include_metadata)
+            except Exception as e:
+                if "AuthenticationFailed" in str(e):
+                    raise BlobAuthenticationError(
+                        f"Error authenticating with blob storage: {str(e)}"
+                    )
+                logger.error(f"Error listing directory {prefix}: {str(e)}")
+                raise
+            with _directory_cache_lock:
+                _directory_cache[key] = cached
+        folders, files = cached
+
+        excluded = tuple(exclude_prefixes)
+        extensions = FILE_CATEGORY_EXTENSIONS.get(category)
+        if excluded:
+            folders = [f for f in folders if not f.startswith(excluded)]
+        selected = [
+            dict(f)
+            for f in files
+            if not (excluded and f["name"].startswith(excluded))
+            and (extensions is None or os.path.splitext(f["name"].lower())[1] in extensions)
+        ]
+        if order != "newest":
+            selected.reverse()
+        return {"folders": list(folders), "files": selected}
+
+    @staticmethod
+    def _empty_page(page: int, page_size: int) -> Dict[str, Any]:
+        return {
+            "blobs": [],
+            "current_page": page,
+            "page_size": page_size,
+            "total_count": 0,
+            "has_more": False,
+            "next_continuation_token": None,
+            "total_pages": 0,
+        }
+
+    def _list_blobs_page(
+        self,
+        container_name: str,
+        prefix: Optional[str],
+        include_metadata: str,
+        page_size: int,
+        page: int,
+        continuation_token: Optional[str],
+        strict_prefix: bool,
+    ) -> Dict[str, Any]:
+        """
+        Fetch one page of a listing, resuming from the closest known page.
+
+        ``continuation_token`` may be a cursor returned by a previous call (it
+        wins over ``page``), a raw Azure continuation token, or None. Page
+        start tokens are recorded in ``cursor_store`` so later requests for any
+        page already walked past cost a single listing call.
         """
         if not container_name or not container_name.strip():
             raise ValueError("Container name is required and cannot be empty")
@@ -509,103 +1170,74 @@ class BlobStorageManager:
         if page < 1:
             raise ValueError("page must be greater than 0")
 
-        try:
-            container_client = self.blob_service_client.get_container_client(
-                container_name
-            )
-
-            if not container_client.exists():
-                raise ContainerNotFoundError(f"Container not found: {container_name}")
+        listing_key = (prefix or "", container_name, include_metadata, page_size)
+        start_page = page
+        cursor = decode_cursor(continuation_token)
+        if cursor:
+            page, position = cursor
+            start_page, token = page, position.get("token")
+        elif continuation_token:
+            token = continuation_token
+        else:
+            start_page, position = cursor_store.nearest(listing_key, page)
+            token = position.get("token") if position else None
 
-            list_params = {
-                "name_starts_with": prefix if prefix else None,
-                "results_per_page": page_size,
-            }
+        try:
+            container_client = self._get_existing_container_client(container_name)
 
-            blobs = container_client.list_blobs(
-                **{k: v for k, v in list_params.items() if v is not None}
+            blobs = self._list_blobs(
+                container_client, prefix, include_metadata, page_size
             )
-
-            pages = blobs.by_page(continuation_token=continuation_token)
+            pages = blobs.by_page(continuation_token=token)
             effective_prefix = prefix if prefix else ""
 
-            if not continuation_token and page > 1:
-                for _ in range(page - 1):
-                    try:
-                        next(pages)
-                    except StopIteration:
-                        return {
-                            "blobs": [],
-                            "current_page": page,
-                            "page_size": page_size,
-                            "total_count": 0,
-                            "has_more": False,
-                            "next_continuation_token": None,
-                            "total_pages": 0,
-                        }
+            for skipped_page in range(start_page, page):
+                try:
+                    next(pages)
+                except StopIteration:
+                    return self._empty_page(page, page_size)
+                token = getattr(pages, "continuation_token", None)
+                if not token:
+                    return self._empty_page(page, page_size)
+                cursor_store.put(listing_key, skipped_page + 1, {"token": token})
 
             try:
                 current_page = next(pages)
-                blob_list = []
-
-                for blob in current_page:
-                    if effective_prefix and not blob.name.startswith(effective_prefix):
-                        continue
-
-                    blob_info = {
-                        "name": blob.name,
-                        "size": blob.size,
-                        "created_on": blob.creation_time.isoformat(),
-                        "last_modified": blob.last_modified.isoformat(),
-                        "content_type": blob.content_settings.content_type,
-                        "url": f"{self.blob_service_client.url}{container_name}/{blob.name}",
-                    }
-
-                    if include_metadata == "yes":
-                        try:
-                            blob_client = container_client.get_blob_client(blob.name)
-                            properties = blob_client.get_blob_properties()
-                            blob_info["metadata"] = properties.metadata
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to retrieve metadata for {blob.name}: {str(e)}"
-                            )
-                            blob_info["metadata"] = None
-
-                    blob_list.append(blob_info)
-
-                next_continuation_token = (
-                    pages.continuation_token if hasattr(pages, "continuation_token") else None
-                )
+            except StopIteration:
+                return self._empty_page(page, page_size)
 
-                has_more = next_continuation_token is not None
-                estimated_total = (page - 1) * page_size + len(blob_list)
-                estimated_total_pages = (
-                    max(1, (estimated_total + page_size - 1) // page_size)
-                    if estimated_total > 0
-                    else 0
+            blob_list = []
+            for blob in current_page:
+                if strict_prefix and effective_prefix and not blob.name.startswith(
+                    effective_prefix
+                ):
+                    continue
+                blob_list.append(
+                    self._blob_to_info(blob, container_name, include_metadata)
                 )
 
-                return {
-                    "blobs": blob_list,
-                    "current_page": page,
-                    "page_size": page_size,
-                    "total_count": estimated_total,
-                    "has_more": has_more,
-                    "next_continuation_token": next_continuation_token,
-                    "total_pages": estimated_total_pages,
-                }
+            next_token = getattr(pages, "continuation_token", None)
+            next_cursor = None
+            if next_token:
+                cursor_store.put(listing_key, page + 1, {"token": next_token})
+                next_cursor = encode_cursor(page + 1, {"token": next_token})
+
+            estimated_total = (page - 1) * page_size + len(blob_list)
+            estimated_total_pages = (
+                max(1, (estimated_total + page_size - 1) // page_size)
+                if estimated_total > 0
+                else 0
+            )
 
-            except StopIteration:
-                return {
-                    "blobs": [],
-                    "current_page": page,
-                    "page_size": page_size,
-                    "total_count": 0,
-                    "has_more": False,
-                    "next_continuation_token": None,
-                    "total_pages": 0,
-                }
+            return {
+                "blobs": blob_list,
+                "current_page": page,
+                "page_size": page_size,
+                "total_count": estimated_total,
+                "has_more": next_cursor is not None,
+                "next_continuation_token": next_cursor,
+                "total_pages": estimated_total_pages,
+            }
 
         except Exception as e:
             if "AuthenticationFailed" in str(e):
@@ -616,3 +1248,51 @@ class BlobStorageManager:
                 f"Error listing blobs in container with pagination: {str(e)}"
             )
             raise
+
+    def list_blobs_in_container_paginated(
+        self,
+        container_name: str,
+        prefix: str = None,
+        include_metadata: str = "no",
+        page_size: int = 10,
+        page: int = 1,
+        continuation_token: str = None,
+    ) -> Dict[str, Any]:
+        """
+        List blobs in a container with pagination support using continuation tokens.
+
+        ``next_continuation_token`` in the result is an opaque cursor; pass it
+        back as ``continuation_token`` to fetch the next page. Requests by page
+        number jump straight to the page when its start has been seen before.
+        """
+        return self._list_blobs_page(
+            container_name,
+            prefix,
+            include_metadata,
+            page_size,
+            page,
+            continuation_token,
+            strict_prefix=False,
+        )
+
+    def list_blobs_in_container_for_upload_files_paginated(
+        self,
+        container_name: str,
+        prefix: str = None,
+        include_metadata: str = "no",
+        page_size: int = 10,
+        page: int = 1,
+        continuation_token: str = None,
+    ) -> Dict[str, Any]:
+        """
+        List blobs in a container for upload files with pagination support.
+        """
+        return self._list_blobs_page(
+            container_name,
+            prefix,
+            include_metadata,
+            page_size,
+            page,
+            continuation_token,
+            strict_prefix=True,
+        )
@@ -0,0 +1,358 @@
+# backend/shared/chat_history.py
+"""
+Paginated chat history for the conversation sidebar.
+
+Conversations are read newest first (``ORDER BY start_date DESC, id DESC``)
+with keyset cursors, so a page stays stable while new conversations are
+created above it. Legacy conversations without a ``start_date`` follow the
+dated ones, ordered by id.
+
+The two-property ORDER BY needs the composite index in
+``HISTORY_COMPOSITE_INDEX`` on the ``conversations`` container; until it is
+deployed, queries fall back to ordering by ``start_date`` alone.
+
+The first page per user is cached for ``HISTORY_FIRST_PAGE_TTL_SECONDS``;
+``invalidate_history`` drops it when a conversation is created, renamed or
+deleted on this instance (the TTL bounds staleness across instances).
+
+Single conversations are read in windows (``get_conversation_window``):
+the latest messages first, older ones by cursor, with ``thoughts`` and
+``data_points`` left out until a message is expanded. Only the window is
+sliced out of the document by the query, and the document ``_etag`` is
+exposed so clients can revalidate without downloading it again.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from azure.cosmos.exceptions import CosmosHttpResponseError
+from cachetools import TTLCache
+
+from shared import clients
+
+log = logging.getLogger(__name__)
+
+CONVERSATIONS_CONTAINER = "conversations"
+DEFAULT_HISTORY_PAGE_SIZE = 50
+MAX_HISTORY_PAGE_SIZE = 200
+HISTORY_FIRST_PAGE_TTL_SECONDS = int(os.getenv("HISTORY_FIRST_PAGE_TTL_SECONDS", "30"))
+HISTORY_FIRST_PAGE_CACHE_SIZE = int(os.getenv("HISTORY_FIRST_PAGE_CACHE_SIZE", "5000"))
+DEFAULT_MESSAGE_WINDOW = 20
+MAX_MESSAGE_WINDOW = 100
+MESSAGE_DETAIL_FIELDS = ("thoughts", "data_points")
+
+# indexingPolicy.compositeIndexes entry for the conversations container
+HISTORY_COMPOSITE_INDEX = [
+    {"path": "/conversation_data/start_date", "order": "descending"},
+    {"path": "/id", "order": "descending"},
+]
+
+_CURSOR_PREFIX = "h1."
+_SELECT = """
+    SELECT TOP @limit c.id, c.conversation_data.start_date,
+           c.conversation_data.history[0].content AS first_message,
+           c.conversation_data.type,
+           c.conversation_data.interaction.organization_id,
+           c.conversation_data.title
+    FROM c
+    WHERE c.conversation_data.interaction.user_id = @user_id
+"""
+
+_first_pages: TTLCache = TTLCache(
+    maxsize=HISTORY_FIRST_PAGE_CACHE_SIZE, ttl=HISTORY_FIRST_PAGE_TTL_SECONDS
+)
+_first_pages_lock = threading.Lock()
+_composite_index_missing = False
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return _CURSOR_PREFIX + base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a history cursor; raises ValueError for anything malformed."""
+    if not cursor.startswith(_CURSOR_PREFIX):
+        raise ValueError("Invalid cursor")
+    body = cursor[len(_CURSOR_PREFIX):]
+    try:
+        position = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or not isinstance(position.get("i"), str):
+        raise ValueError("Invalid cursor")
+    if position.get("d") is not None and not isinstance(position["d"], str):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def format_conversation(con: Dict[str, Any], default_date: str) -> Dict[str, Any]:
+    return {
+        "id": con["id"],
+        "start_date": con.get("start_date", default_date),
+        "content": con.get("first_message", "No content"),
+        "title": con.get("title", ""),
+        "type": con.get("type", "default"),
+        "organization_id": con.get("organization_id", ""),
+    }
+
+
+def _query(container, query: str, parameters: List[Dict[str, Any]], user_id: str):
+    return list(
+        container.query_items(query=query, parameters=parameters, partition_key=user_id)
+    )
+
+
+def _dated_rows(container, user_id: str, limit: int, after: Optional[Dict[str, Any]]):
+    global _composite_index_missing
+    query = _SELECT + " AND IS_DEFINED(c.conversation_data.start_date)"
+    parameters = [
+        {"name": "@user_id", "value": user_id},
+        {"name": "@limit", "value": limit},
+    ]
+    if after:
+        query += (
+            " AND (c.conversation_data.start_date < @start_date"
+            " OR (c.conversation_data.start_date = @start_date AND c.id < @id))"
+        )
+        parameters += [
+            {"name": "@start_date", "value": after["d"]},
+            {"name": "@id", "value": after["i"]},
+        ]
+    if not _composite_index_missing:
+        try:
+            return _query(
+                container,
+                query + " ORDER BY c.conversation_data.start_date DESC, c.id DESC",
+                parameters,
+                user_id,
+            )
+        except CosmosHttpResponseError as e:
+            if e.status_code != 400:
+                raise
+            # "The order by query does not have a corresponding composite index"
+            log.warning(f"[chat-history] composite index missing, ordering by start_date only: {e}")
+            _composite_index_missing = True
+    return _query(
+        container, query + " ORDER BY c.conversation_data.start_date DESC", parameters, user_id
+    )
+
+
+def _undated_rows(container, user_id: str, limit: int, after_id: Optional[str]):
+    query = _SELECT + " AND NOT IS_DEFINED(c.conversation_data.start_date)"
+    parameters = [
+        {"name": "@user_id", "value": user_id},
+        {"name": "@limit", "value": limit},
+    ]
+    if after_id:
+        query += " AND c.id < @id"
+        parameters.append({"name": "@id", "value": after_id})
+    return _query(container, query + " ORDER BY c.id DESC", parameters, user_id)
+
+
+def _fetch_page(user_id: str, limit: int, position: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    container = clients.get_cosmos_container(CONVERSATIONS_CONTAINER)
+    # One extra row tells whether another page exists.
+    rows: List[Dict[str, Any]] = []
+    if position is None or position.get("d") is not None:
+        rows = _dated_rows(container, user_id, limit + 1, position)
+    if len(rows) <= limit:
+        after_id = position["i"] if position and position.get("d") is None else None
+        rows += _undated_rows(container, user_id, limit + 1 - len(rows), after_id)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor({"d": last.get("start_date"), "i": last["id"]})
+
+    default_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        "conversations": [format_conversation(row, default_date) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+
+def get_history_page(
+    user_id: str, limit: int = DEFAULT_HISTORY_PAGE_SIZE, cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Return one page of a user's conversations, newest first.
+
+    ``cursor`` is the ``next_cursor`` of the previous page (None for the
+    first page, which is served from cache when possible). Returns
+    ``{"conversations": [...], "next_cursor": str | None}``.
+    """
+    if not user_id:
+        raise ValueError("user_id is required")
+    limit = max(1, min(int(limit), MAX_HISTORY_PAGE_SIZE))
+    if cursor:
+        return _fetch_page(user_id, limit, decode_cursor(cursor))
+
+    with _first_pages_lock:
+        page = _first_pages.get(user_id, {}).get(limit)
+    if page is not None:
+        return page
+    page = _fetch_page(user_id, limit, None)
+    with _first_pages_lock:
+        pages = _first_pages.get(user_id) or {}
+        pages[limit] = page
+        _first_pages[user_id] = pages
+    return page
+
+
+def invalidate_history(user_id: Optional[str]) -> None:
+    """Drop the cached first page(s) of ``user_id``."""
+    if not user_id:
+        return
+    with _first_pages_lock:
+        _first_pages.pop(user_id, None)
+
+
+_CONVERSATION_FILTER = """
+    FROM c
+    WHERE c.id = @conversation_id
+      AND c.conversation_data.interaction.user_id = @user_id
+"""
+_HISTORY = "c.conversation_data.history"
+
+
+def _conversation_parameters(conversation_id: str, user_id: str) -> List[Dict[str, Any]]:
+    if not conversation_id:
+        raise ValueError("conversation_id is required")
+    if not user_id:
+        raise ValueError("user_id is required")
+    return [
+        {"name": "@conversation_id", "value": conversation_id},
+        {"name": "@user_id", "value": user_id},
+    ]
+
+
+def clamp_window_limit(limit: int) -> int:
+    """Window size actually served for a requested ``limit``: 1..MAX_MESSAGE_WINDOW."""
+    return max(1, min(int(limit), MAX_MESSAGE_WINDOW))
+
+
+def window_etag(document_etag: str, limit: int, before: Optional[int], details: bool) -> str:
+    """Strong ETag of one window representation of a conversation document version."""
+    variant = hashlib.sha1(f"{limit}:{before}:{int(details)}".encode()).hexdigest()[:8]
+    return f'"{document_etag.strip(chr(34))}.{variant}"'
+
+
+def get_conversation_etag(conversation_id: str, user_id: str) -> Optional[str]:
+    """Return the document ``_etag`` of a conversation without reading its history."""
+    container = clients.get_cosmos_container(CONVERSATIONS_CONTAINER)
+    rows = _query(
+        container,
+        "SELECT VALUE c._etag " + _CONVERSATION_FILTER,
+        _conversation_parameters(conversation_id, user_id),
+        user_id,
+    )
+    return rows[0] if rows else None
+
+
+def _format_message(message: Dict[str, Any], index: int, details: bool) -> Dict[str, Any]:
+    formatted = {"index": index, "role": message["role"], "content": message["content"]}
+    if details:
+        for field in MESSAGE_DETAIL_FIELDS:
+            formatted[field] = message.get(field, "")
+    else:
+        formatted["has_details"] = any(message.get(field) for field in MESSAGE_DETAIL_FIELDS)
+    return formatted
+
+
+def get_conversation_window(
+    conversation_id: str,
+    user_id: str,
+    limit: int = DEFAULT_MESSAGE_WINDOW,
+    before: Optional[int] = None,
+    details: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Return up to ``limit`` messages of a conversation, ending at the latest one.
+
+    ``before`` (the ``older_cursor`` of a previous window) selects the
+    messages preceding that index instead. ``thoughts`` and ``data_points``
+    are only included when ``details`` is true; otherwise each message
+    carries ``has_details``. Returns None when the conversation does not
+    exist or belongs to someone else.
+    """
+    limit = clamp_window_limit(limit)
+    parameters = _conversation_parameters(conversation_id, user_id)
+    parameters.append({"name": "@limit", "value": limit})
+    if before is None:
+        # Last @limit messages; ARRAY_SLICE needs an explicit start.
+        window = (
+            f"ARRAY_SLICE({_HISTORY}, (ARRAY_LENGTH({_HISTORY}) > @limit"
+            f" ? ARRAY_LENGTH({_HISTORY}) - @limit : 0), @limit)"
+        )
+    else:
+        if before < 0:
+            raise ValueError("Invalid cursor")
+        window = f"ARRAY_SLICE({_HISTORY}, @start, @count)"
+        parameters += [
+            {"name": "@start", "value": max(before - limit, 0)},
+            {"name": "@count", "value": min(limit, before)},
+        ]
+
+    container = clients.get_cosmos_container(CONVERSATIONS_CONTAINER)
+    rows = _query(
+        container,
+        f"""
+        SELECT c._etag, c.conversation_data.start_date, c.conversation_data.type,
+               c.pending_hitl, ARRAY_LENGTH({_HISTORY}) AS total,
+               {window} AS messages
+        """ + _CONVERSATION_FILTER,
+        parameters,
+        user_id,
+    )
+    if not rows:
+        return None
+
+    row = rows[0]
+    messages = row.get("messages") or []
+    total = row.get("total") or 0
+    end = total if before is None else min(before, total)
+    start = max(end - len(messages), 0)
+    return {
+        "id": conversation_id,
+        "start_date": row.get("start_date"),
+        "type": row.get("type", "default"),
+        "pending_hitl": row.get("pending_hitl"),
+        "total_messages": total,
+        "messages": [
+            _format_message(message, start + offset, details)
+            for offset, message in enumerate(messages)
+        ],
+        "older_cursor": start if start > 0 else None,
+        "etag": window_etag(row["_etag"], limit, before, details),
+    }
+
+
+def get_message_details(
+    conversation_id: str, user_id: str, index: int
+) -> Optional[Dict[str, Any]]:
+    """Return one message with ``thoughts`` and ``data_points``, or None."""
+    if index < 0:
+        return None
+    parameters = _conversation_parameters(conversation_id, user_id)
+    parameters.append({"name": "@index", "value": index})
+    container = clients.get_cosmos_container(CONVERSATIONS_CONTAINER)
+    rows = _query(
+        container,
+        f"SELECT VALUE ARRAY_SLICE({_HISTORY}, @index, 1) " + _CONVERSATION_FILTER,
+        parameters,
+        user_id,
+    )
+    if not rows or not rows[0]:
+        return None
+    return _format_message(rows[0][0], index, details=True)
@@ -0,0 +1,377 @@
+# backend/shared/citation_resolver.py
+"""
+Resolve spreadsheet citations from chat answers to blobs and download URLs.
+
+Used by ``/preview/spreadsheet``, ``/api/download-excel-citation`` and the
+batch ``/api/download-excel-citations`` endpoint.
+
+- ``parse_citation_path`` turns the citation formats the orchestrator emits
+  into a blob name (memoized; the same citations come back constantly).
+- ``BlobNameIndex`` maps file names to blob names so a citation that only
+  carries a file name resolves without listing the container per request.
+  It is kept current by the write paths (``note_blob_added`` /
+  ``note_blob_removed``) and refreshed from a full listing in the
+  background once older than ``BLOB_NAME_INDEX_TTL_SECONDS``.
+- ``resolve_blob`` remembers which blob a citation resolved to, so repeated
+  resolutions cost a single properties (HEAD) request.
+- ``sign_blob_url`` reuses a read SAS per blob until shortly before it expires.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote, urlencode, urljoin, urlparse
+
+from azure.storage.blob import BlobSasPermissions, BlobServiceClient, generate_blob_sas
+from cachetools import TTLCache
+
+log = logging.getLogger(__name__)
+
+CITATIONS_CONTAINER = "documents"
+SPREADSHEET_EXTENSIONS = (".xlsx", ".xls", ".csv")
+BLOB_NAME_INDEX_TTL_SECONDS = int(os.getenv("BLOB_NAME_INDEX_TTL_SECONDS", "600"))
+CITATION_SAS_EXPIRY_DAYS = 2
+CITATION_SAS_REFRESH_MARGIN_SECONDS = int(
+    os.getenv("CITATION_SAS_REFRESH_MARGIN_SECONDS", "3600")
+)
+CITATION_RESOLVE_WORKERS = int(os.getenv("CITATION_RESOLVE_WORKERS", "8"))
+MAX_CITATIONS_PER_BATCH = 50
+RESOLVED_NAMES_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=4)
+def get_service_client(connection_string: str) -> BlobServiceClient:
+    """Return a shared BlobServiceClient for ``connection_string``."""
+    return BlobServiceClient.from_connection_string(connection_string)
+
+
+@lru_cache(maxsize=4096)
+def parse_citation_path(file_path: str) -> str:
+    """
+    Extract the blob name from a citation path; returns "" when none can be found.
+
+    Handles ``@https://<encoded name>/``, ``https://<encoded name>.xlsx``,
+    full blob URLs and plain (optionally ``documents/``-prefixed) paths.
+    """
+    if file_path.startswith("@https://") and file_path.endswith("/"):
+        # e.g. @https://construction%20adhesives%20pos%202024%202025%20ytd.xlsx/
+        return unquote(file_path[9:-1])
+    if file_path.startswith("https://") and file_path.endswith(SPREADSHEET_EXTENSIONS) and (
+        "blob.core.windows.net" not in file_path
+    ):
+        # An URL-encoded file name with an https:// prefix, not a real URL
+        return unquote(file_path[8:])
+    if file_path.startswith("https://") and "blob.core.windows.net" in file_path:
+        parts = [p for p in urlparse(file_path).path.split("/") if p]
+        if CITATIONS_CONTAINER in parts:
+            idx = parts.index(CITATIONS_CONTAINER)
+            return "/".join(parts[idx + 1:]) if idx + 1 < len(parts) else ""
+        log.warning(f"URL doesn't contain '{CITATIONS_CONTAINER}' in path: {file_path}")
+        return "/".join(parts)
+    blob_name = unquote(file_path)
+    if blob_name.startswith(f"{CITATIONS_CONTAINER}/"):
+        blob_name = blob_name[len(CITATIONS_CONTAINER) + 1:]
+    return blob_name
+
+
+@lru_cache(maxsize=4096)
+def citation_filename(file_path: str) -> str:
+    """File name to offer for download (the original extension is kept)."""
+    try:
+        if file_path.startswith("@https://") and file_path.endswith("/"):
+            return unquote(file_path[9:-1])
+        if file_path.startswith("https://") and "blob.core.windows.net" in file_path:
+            parts = [p for p in urlparse(file_path).path.split("/") if p]
+            return parts[-1] if parts else "file"
+        return unquote(file_path.split("/")[-1])
+    except Exception:
+        return "file"
+
+
+class BlobNameIndex:
+    """
+    File name -> blob names for one container.
+
+    The first lookup builds the index from a names-only listing. Writes keep
+    it current through ``add``/``discard``; once older than ``ttl`` it is
+    rebuilt page by page on a background thread while lookups keep using
+    the current map.
+    """
+
+    def __init__(self, container_client, ttl: int = BLOB_NAME_INDEX_TTL_SECONDS):
+        self._container_client = container_client
+        self._ttl = ttl
+        self._names: Dict[str, List[str]] = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # Writes seen while a rebuild's listing is running, replayed on swap.
+        self._pending: Optional[List[Tuple[str, str]]] = None
+
+    def _rebuild(self) -> None:
+        with self._lock:
+            self._pending = []
+        names: Dict[str, List[str]] = {}
+        count = 0
+        for page in self._container_client.list_blobs().by_page():
+            for blob in page:
+                names.setdefault(blob.name.rsplit("/", 1)[-1], []).append(blob.name)
+                count += 1
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._names = names
+            for op, name in pending:
+                self._apply(op, name)
+            self._built_at = time.monotonic()
+        log.info(f"[blob-name-index] indexed {count} blobs")
+
+    def _refresh_in_background(self) -> None:
+        if not self._build_lock.acquire(blocking=False):
+            return
+
+        def run() -> None:
+            try:
+                self._rebuild()
+            except Exception as e:
+                log.warning(f"[blob-name-index] background rebuild failed: {e}")
+            finally:
+                self._build_lock.release()
+
+        threading.Thread(target=run, name="blob-name-index", daemon=True).start()
+
+    def lookup(self, filename: str) -> Optional[str]:
+        """Return the first blob (by name) whose file name is ``filename``."""
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self._rebuild()
+        elif time.monotonic() - self._built_at >= self._ttl:
+            self._refresh_in_background()
+        with self._lock:
+            matches = self._names.get(filename)
+            return min(matches) if matches else None
+
+    def _apply(self, op: str, name: str) -> None:
+        matches = self._names.setdefault(name.rsplit("/", 1)[-1], [])
+        if op == "add" and name not in matches:
+            matches.append(name)
+        elif op == "discard" and name in matches:
+            matches.remove(name)
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            self._apply("add", name)
+            if self._pending is not None:
+                self._pending.append(("add", name))
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            self._apply("discard", name)
+            if self._pending is not None:
+                self._pending.append(("discard", name))
+
+    def mark_stale(self) -> None:
+        """Refresh on the next lookup (for bulk changes not reported name by name)."""
+        with self._lock:
+            if self._built_at is not None:
+                self._built_at = float("-inf")
+
+
+_indexes: Dict[str, BlobNameIndex] = {}
+_indexes_lock = threading.Lock()
+_resolved_names: TTLCache = TTLCache(maxsize=4096, ttl=RESOLVED_NAMES_TTL_SECONDS)
+_resolved_lock = threading.Lock()
+_sas_urls: TTLCache = TTLCache(
+    maxsize=4096, ttl=CITATION_SAS_EXPIRY_DAYS * 86400 - CITATION_SAS_REFRESH_MARGIN_SECONDS
+)
+_sas_lock = threading.Lock()
+
+
+def get_blob_name_index(container_client, container_name: str) -> BlobNameIndex:
+    with _indexes_lock:
+        index = _indexes.get(container_name)
+        if index is None:
+            index = _indexes[container_name] = BlobNameIndex(container_client)
+        return index
+
+
+def note_blob_added(blob_name: str, container_name: str = CITATIONS_CONTAINER) -> None:
+    """Record a new blob in the name index (no-op until the index exists)."""
+    index = _indexes.get(container_name)
+    if index is not None:
+        index.add(blob_name)
+
+
+def note_blobs_removed(
+    blob_names: Iterable[str], container_name: str = CITATIONS_CONTAINER
+) -> None:
+    """Remove deleted blobs from the name index and forget resolutions to them."""
+    removed = set(blob_names)
+    index = _indexes.get(container_name)
+    if index is not None:
+        for name in removed:
+            index.discard(name)
+    with _resolved_lock:
+        for key, resolved in list(_resolved_names.items()):
+            if key[0] == container_name and resolved in removed:
+                _resolved_names.pop(key, None)
+
+
+def note_blob_removed(blob_name: str, container_name: str = CITATIONS_CONTAINER) -> None:
+    note_blobs_removed((blob_name,), container_name)
+
+
+def mark_blob_index_stale(container_name: str = CITATIONS_CONTAINER) -> None:
+    index = _indexes.get(container_name)
+    if index is not None:
+        index.mark_stale()
+
+
+def resolve_blob(
+    service_client: BlobServiceClient, container_name: str, blob_name: str
+) -> Optional[Tuple[Any, Any]]:
+    """
+    Find the blob a citation refers to and fetch its properties.
+
+    Tries ``blob_name`` as given, then the blob name index by file name.
+    Returns ``(blob_client, properties)`` or None when nothing matches.
+    """
+    cache_key = (container_name, blob_name)
+    with _resolved_lock:
+        candidate = _resolved_names.get(cache_key, blob_name)
+
+    blob_client = service_client.get_blob_client(container=container_name, blob=candidate)
+    try:
+        return blob_client, blob_client.get_blob_properties()
+    except Exception:
+        pass
+
+    container_client = service_client.get_container_client(container_name)
+    index = get_blob_name_index(container_client, container_name)
+    found = index.lookup(blob_name.split("/")[-1])
+    if not found or found == candidate:
+        return None
+    blob_client = service_client.get_blob_client(container=container_name, blob=found)
+    try:
+        properties = blob_client.get_blob_properties()
+    except Exception:
+        # Deleted by a writer that did not report it
+        index.discard(found)
+        return None
+    with _resolved_lock:
+        _resolved_names[cache_key] = found
+    return blob_client, properties
+
+
+def sign_blob_url(
+    service_client: BlobServiceClient, container_name: str, blob_name: str
+) -> Tuple[str, datetime]:
+    """
+    Return a read-only SAS URL for a blob and its expiry.
+
+    URLs are valid for CITATION_SAS_EXPIRY_DAYS and reused until
+    CITATION_SAS_REFRESH_MARGIN_SECONDS before they expire.
+    """
+    key = (service_client.account_name, container_name, blob_name)
+    with _sas_lock:
+        cached = _sas_urls.get(key)
+    if cached:
+        return cached
+
+    expiry = datetime.now(timezone.utc) + timedelta(days=CITATION_SAS_EXPIRY_DAYS)
+    sas_token = generate_blob_sas(
+        account_name=service_client.account_name,
+        container_name=container_name,
+        blob_name=blob_name,
+        account_key=service_client.credential.account_key,
+        permission=BlobSasPermissions(read=True),
+        expiry=expiry,
+    )
+    signed = (
+        f"https://{service_client.account_name}.blob.core.windows.net/"
+        f"{container_name}/{blob_name}?{sas_token}",
+        expiry,
+    )
+    with _sas_lock:
+        _sas_urls[key] = signed
+    return signed
+
+
+def resolve_citation(
+    file_path: str, connection_string: str, url_root: str
+) -> Dict[str, Any]:
+    """
+    Build the download/preview payload for one spreadsheet citation.
+
+    Returns ``{"success": False, "error": ...}`` for paths that cannot be
+    parsed or are not spreadsheets. When the blob cannot be found or signed,
+    ``sas_url`` is None and ``download_url`` falls back to the preview URL.
+    """
+    if not file_path:
+        return {"success": False, "file_path": file_path, "error": "Missing file_path parameter"}
+
+    blob_name = parse_citation_path(file_path)
+    if not blob_name or not blob_name.strip():
+        return {
+            "success": False,
+            "file_path": file_path,
+            "error": "Unable to extract valid filename from path",
+        }
+    if not blob_name.lower().endswith(SPREADSHEET_EXTENSIONS):
+        return {
+            "success": False,
+            "file_path": file_path,
+            "error": "Only Excel files (.xlsx, .xls, .csv) are supported",
+        }
+
+    # Preview uses the streaming endpoint (converted XLSX for CSV)
+    preview_url = urljoin(url_root, f"preview/spreadsheet?{urlencode({'file_path': file_path})}")
+
+    sas_url, expires_at = None, None
+    try:
+        service_client = get_service_client(connection_string)
+        resolved = resolve_blob(service_client, CITATIONS_CONTAINER, blob_name)
+        if resolved:
+            sas_url, expires_at = sign_blob_url(
+                service_client, CITATIONS_CONTAINER, resolved[0].blob_name
+            )
+    except Exception as e:
+        log.warning(f"[download-excel-citation] SAS fallback generation failed: {e}")
+
+    return {
+        "success": True,
+        "file_path": file_path,
+        # Download returns the ORIGINAL file (CSV remains CSV)
+        "download_url": sas_url or preview_url,
+        "preview_url": preview_url,
+        "sas_url": sas_url,
+        "filename": citation_filename(file_path),
+        "expires_in_days": CITATION_SAS_EXPIRY_DAYS,
+        "expires_at": expires_at.isoformat() if expires_at else None,
+    }
+
+
+def resolve_citations(
+    file_paths: List[str], connection_string: str, url_root: str
+) -> List[Dict[str, Any]]:
+    """Resolve many citations concurrently; results keep the input order."""
+    unique = list(dict.fromkeys(file_paths))
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(CITATION_RESOLVE_WORKERS, len(unique)))
+    ) as executor:
+        results = dict(
+            zip(
+                unique,
+                executor.map(
+                    lambda path: resolve_citation(path, connection_string, url_root),
+                    unique,
+                ),
+            )
+        )
+    return [results[path] for path in file_paths]
@@ -5,8 +5,10 @@ import atexit
 import base64
 import json
 import logging
+import threading
+import time
 from functools import lru_cache
-from typing import Optional
+from typing import Callable, Dict, Optional
 from azure.storage.blob import BlobServiceClient
 from azure.identity import DefaultAzureCredential
 from azure.cosmos import CosmosClient
@@ -25,6 +27,12 @@ log = logging.getLogger(__name__)
 
 QUEUE_DEBUG = os.getenv("QUEUE_DEBUG", "0") == "1"
 
+SECRET_CACHE_TTL_SECONDS = int(os.getenv("SECRET_CACHE_TTL_SECONDS", "900"))
+SECRET_CACHE_REFRESH_AHEAD_SECONDS = int(
+    os.getenv("SECRET_CACHE_REFRESH_AHEAD_SECONDS", "120")
+)
+SECRET_CACHE_MAX_STALE_SECONDS = int(os.getenv("SECRET_CACHE_MAX_STALE_SECONDS", "3600"))
+
 
 def _host(url: str) -> str:
     try:
@@ -110,6 +118,166 @@ def get_azure_key_vault_secret(secret_name: str) -> str:
     return secret.value
 
 
+class _SecretFlight:
+    """One in-progress Key Vault read that concurrent callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class SecretCache:
+    """
+    Thread-safe, process-wide cache in front of Key Vault.
+
+    - Values are fresh for ``ttl`` seconds.
+    - A read within ``refresh_ahead`` seconds of expiry returns the cached
+      value and refreshes it on a background thread.
+    - Concurrent misses for the same secret share a single Key Vault call.
+    - If Key Vault fails, an expired value is served for up to ``max_stale``
+      seconds past expiry instead of failing the request.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], str],
+        ttl: int = SECRET_CACHE_TTL_SECONDS,
+        refresh_ahead: int = SECRET_CACHE_REFRESH_AHEAD_SECONDS,
+        max_stale: int = SECRET_CACHE_MAX_STALE_SECONDS,
+    ):
+        self._fetch = fetch
+        self._ttl = ttl
+        self._refresh_ahead = refresh_ahead
+        self._max_stale = max_stale
+        self._entries: Dict[str, tuple] = {}  # name -> (value, expires_at, ttl)
+        self._flights: Dict[str, _SecretFlight] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "stale_served": 0,
+        }
+
+    def get(self, secret_name: str, ttl: Optional[int] = None) -> str:
+        """
+        Return the secret value, reading Key Vault only when needed.
+
+        Raises:
+            Exception: the Key Vault error, when there is no usable cached value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            if entry is not None and now < entry[1]:
+                self._stats["hits"] += 1
+                # Short-lived entries refresh in their last half instead.
+                if entry[1] - now <= min(self._refresh_ahead, entry[2] / 2):
+                    self._start_flight(secret_name, ttl, background=True)
+                return entry[0]
+            flight = self._flights.get(secret_name)
+            if flight is None:
+                self._stats["misses"] += 1
+                flight = self._start_flight(secret_name, ttl, background=False)
+                leader = True
+            else:
+                self._stats["coalesced"] += 1
+                leader = False
+
+        if leader:
+            self._run_flight(secret_name, ttl, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is None:
+            return flight.value
+
+        with self._lock:
+            entry = self._entries.get(secret_name)
+            if entry is not None and time.monotonic() < entry[1] + self._max_stale:
+                self._stats["stale_served"] += 1
+                log.warning("[kv] serving stale secret after refresh failure")
+                return entry[0]
+        raise flight.error
+
+    def invalidate(self, secret_name: Optional[str] = None) -> None:
+        """Drop one secret (or all of them) so the next read hits Key Vault."""
+        with self._lock:
+            if secret_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(secret_name, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return hit/miss/refresh counters and the number of cached secrets."""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries)}
+
+    def reset(self) -> None:
+        """Clear entries and counters. Intended for tests."""
+        with self._lock:
+            self._entries.clear()
+            for key in self._stats:
+                self._stats[key] = 0
+
+    def _start_flight(
+        self, secret_name: str, ttl: Optional[int], background: bool
+    ) -> Optional[_SecretFlight]:
+        # Caller holds self._lock.
+        if secret_name in self._flights:
+            return self._flights[secret_name]
+        flight = _SecretFlight()
+        self._flights[secret_name] = flight
+        if background:
+            self._stats["refreshes"] += 1
+            threading.Thread(
+                target=self._run_flight,
+                args=(secret_name, ttl, flight),
+                name="secret-refresh",
+                daemon=True,
+            ).start()
+        return flight
+
+    def _run_flight(
+        self, secret_name: str, ttl: Optional[int], flight: _SecretFlight
+    ) -> None:
+        try:
+            value = self._fetch(secret_name)
+            with self._lock:
+                entry_ttl = self._ttl if ttl is None else ttl
+                self._entries[secret_name] = (
+                    value,
+                    time.monotonic() + entry_ttl,
+                    entry_ttl,
+                )
+            flight.value = value
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+            log.warning("[kv] secret refresh failed: %s", e)
+        finally:
+            with self._lock:
+                self._flights.pop(secret_name, None)
+            flight.done.set()
+
+
+# Looks up get_azure_key_vault_secret at call time so it can be patched.
+secret_cache = SecretCache(lambda name: get_azure_key_vault_secret(name))
+
+
+def get_cached_secret(secret_name: str, ttl: Optional[int] = None) -> str:
+    """
+    Return a Key Vault secret through the process-wide ``secret_cache``.
+
+    Use this on request paths instead of ``get_azure_key_vault_secret``.
+    """
+    return secret_cache.get(secret_name, ttl=ttl)
+
+
 @lru_cache(maxsize=1)
 def get_blob_service_client() -> Optional[BlobServiceClient]:
     """
@@ -139,6 +307,25 @@ def get_blob_container_client(container_name: str):
     return bsc.get_container_client(container_name)
 
 
+# -----------------------------
+# Azure Queue Storage
+# -----------------------------
+@lru_cache(maxsize=16)
+def get_queue_client(queue_name: str) -> QueueClient:
+    """
+    Get a cached QueueClient by name.
+    Raises:
+        RuntimeError: if Queue Storage is not configured.
+    """
+    if not CONFIG.queue_account_url:
+        raise RuntimeError("Azure Queue Storage not configured (no account URL).")
+    return QueueClient(
+        account_url=CONFIG.queue_account_url,
+        queue_name=queue_name,
+        credential=get_default_azure_credential(),
+    )
+
+
 # -----------------------------
 # Warm-up & graceful shutdown
 # -----------------------------
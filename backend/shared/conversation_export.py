@@ -1,7 +1,11 @@
 import base64
+import hashlib
 import json
 import logging
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import markdown
@@ -11,12 +15,27 @@ from azure.storage.blob import (
     ContentSettings,
     generate_blob_sas,
 )
+from cachetools import LRUCache, TTLCache
 
 from _secrets import get_secret
 from shared.blob_storage import BlobStorageManager
 from shared.clients import get_blob_service_client
 from utils import get_conversation
 
+EXPORT_IMAGE_FETCH_WORKERS = int(os.getenv("EXPORT_IMAGE_FETCH_WORKERS", "8"))
+EXPORT_IMAGE_CACHE_BYTES = int(
+    os.getenv("EXPORT_IMAGE_CACHE_BYTES", str(128 * 1024 * 1024))
+)
+EXPORT_IMAGE_PATH_TTL_SECONDS = int(os.getenv("EXPORT_IMAGE_PATH_TTL_SECONDS", "3600"))
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "toc", "nl2br", "sane_lists"]
+IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^\)]+)\)")
+
+_image_executor = ThreadPoolExecutor(
+    max_workers=EXPORT_IMAGE_FETCH_WORKERS, thread_name_prefix="export-image"
+)
+_markdown_local = threading.local()
+
 
 def extract_image_urls_from_markdown(text):
     """
@@ -26,8 +45,7 @@ def extract_image_urls_from_markdown(text):
     if not text:
         return []
 
-    pattern = r"!\[([^\]]*)\]\(([^\)]+)\)"
-    return re.findall(pattern, text)
+    return IMAGE_PATTERN.findall(text)
 
 
 def fetch_image_from_blob(image_path):
@@ -75,70 +93,127 @@ def image_to_base64(image_data, image_path):
         return None
 
 
-def embed_images_in_markdown(text):
+class ImageCache:
     """
-    Replace markdown image paths with base64 data URIs.
+    Content-addressed cache of embedded image data URIs.
+
+    Blob paths map to the SHA-256 of their bytes for ``path_ttl`` seconds
+    (generated charts are written once), and each distinct image is
+    encoded once and kept in a byte-bounded LRU. A chart repeated across
+    messages or exports is downloaded and encoded a single time.
     """
-    if not text:
-        return text
 
-    image_matches = extract_image_urls_from_markdown(text)
-    if not image_matches:
-        return text
+    def __init__(self, max_bytes=EXPORT_IMAGE_CACHE_BYTES, path_ttl=EXPORT_IMAGE_PATH_TTL_SECONDS):
+        self._digests = TTLCache(maxsize=16384, ttl=path_ttl)
+        self._data_uris = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+
+    def get(self, image_path):
+        with self._lock:
+            digest = self._digests.get(image_path)
+            return self._data_uris.get(digest) if digest else None
+
+    def put(self, image_path, image_data):
+        """Store the image fetched from ``image_path`` and return its data URI."""
+        digest = hashlib.sha256(image_data).hexdigest()
+        with self._lock:
+            data_uri = self._data_uris.get(digest)
+        if data_uri is None:
+            data_uri = image_to_base64(image_data, image_path)
+            if not data_uri:
+                return None
+        with self._lock:
+            self._digests[image_path] = digest
+            if len(data_uri) <= self._data_uris.maxsize:
+                self._data_uris[digest] = data_uri
+        return data_uri
+
+
+image_cache = ImageCache()
+
+
+def load_image_data_uri(image_path):
+    """Return the data URI for a blob image, from the cache or Blob Storage."""
+    data_uri = image_cache.get(image_path)
+    if data_uri:
+        return data_uri
+
+    image_data = fetch_image_from_blob(image_path)
+    if not image_data:
+        logging.warning("Failed to fetch image from blob: %s", image_path)
+        return None
+    return image_cache.put(image_path, image_data)
 
-    modified_text = text
 
-    for alt_text, image_url in image_matches:
-        logging.info("Processing image: %s", image_url)
+def prefetch_images(text):
+    """
+    Start loading every blob image referenced by ``text``.
 
+    Returns {image path: future data URI}; fetches share a pool of
+    EXPORT_IMAGE_FETCH_WORKERS threads.
+    """
+    futures = {}
+    for _, image_url in extract_image_urls_from_markdown(text):
+        if image_url in futures:
+            continue
         if image_url.startswith("http://") or image_url.startswith("https://"):
             logging.warning("Skipping external URL: %s", image_url)
             continue
+        futures[image_url] = _image_executor.submit(load_image_data_uri, image_url)
+    return futures
 
-        image_data = fetch_image_from_blob(image_url)
-        if not image_data:
-            logging.warning("Failed to fetch image from blob: %s", image_url)
-            continue
 
-        data_uri = image_to_base64(image_data, image_url)
+def embed_images_in_markdown(text, images=None):
+    """
+    Replace markdown image paths with base64 data URIs.
+
+    ``images`` is the result of ``prefetch_images(text)`` when the caller
+    started the downloads early; otherwise they are fetched here.
+    """
+    if not text:
+        return text
+
+    if images is None:
+        images = prefetch_images(text)
+    if not images:
+        return text
+
+    def replace(match):
+        alt_text, image_url = match.groups()
+        future = images.get(image_url)
+        data_uri = future.result() if future else None
         if not data_uri:
-            logging.warning("Failed to convert image to base64: %s", image_url)
-            continue
+            return match.group(0)
+        return f"![{alt_text}]({data_uri})"
+
+    return IMAGE_PATTERN.sub(replace, text)
 
-        old_pattern = f"![{alt_text}]({image_url})"
-        new_pattern = f"![{alt_text}]({data_uri})"
-        modified_text = modified_text.replace(old_pattern, new_pattern)
-        logging.info("Successfully embedded image: %s", image_url)
 
-    return modified_text
+def _get_markdown():
+    """Per-thread Markdown instance; building one loads every extension."""
+    md = getattr(_markdown_local, "md", None)
+    if md is None:
+        md = _markdown_local.md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    return md
 
 
-def parse_markdown_to_html(text):
+def parse_markdown_to_html(text, images=None):
     """
     Convert markdown content to HTML.
     """
     if not text:
         return ""
 
-    text = embed_images_in_markdown(text)
+    text = embed_images_in_markdown(text, images)
 
-    md = markdown.Markdown(
-        extensions=[
-            "fenced_code",
-            "tables",
-            "toc",
-            "nl2br",
-            "sane_lists",
-        ]
-    )
-    return md.convert(text)
+    md = _get_markdown()
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
 
 
-def format_conversation_as_html(conversation_data):
-    """
-    Convert conversation data to exportable HTML.
-    """
-    html_template = """
+HTML_TEMPLATE = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
@@ -490,30 +565,52 @@ def format_conversation_as_html(conversation_data):
     </html>
     """
 
-    messages_html = ""
+_HTML_HEAD, _HTML_TAIL = HTML_TEMPLATE.split("{messages_html}")
+
+
+def iter_conversation_html(conversation_data):
+    """
+    Yield the exportable HTML in pieces: header, one chunk per message, footer.
+
+    Images of the next message download while the current one renders, so
+    only about two messages' worth of images are held at a time.
+    """
     messages = conversation_data.get("messages", [])
-    for message in messages:
+    yield _HTML_HEAD.format(
+        export_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        start_date=conversation_data.get("start_date", "Unknown"),
+        conversation_id=conversation_data.get("id", "Unknown"),
+        message_count=len(messages),
+    )
+
+    pending = prefetch_images(messages[0].get("content")) if messages else {}
+    for index, message in enumerate(messages):
+        images = pending
+        if index + 1 < len(messages):
+            pending = prefetch_images(messages[index + 1].get("content"))
+
         role = message.get("role", "unknown")
         content = message.get("content", "")
-        formatted_content = parse_markdown_to_html(content)
+        formatted_content = parse_markdown_to_html(content, images)
 
         css_class = "user-message" if role == "user" else "freddaid-message"
         role_display = "User" if role == "user" else "PRO-ACTIVE"
 
-        messages_html += f"""
+        yield f"""
         <div class="message {css_class}">
             <div class="role">{role_display}</div>
             <div class="content">{formatted_content}</div>
         </div>
         """
 
-    return html_template.format(
-        export_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        start_date=conversation_data.get("start_date", "Unknown"),
-        conversation_id=conversation_data.get("id", "Unknown"),
-        message_count=len(messages),
-        messages_html=messages_html,
-    )
+    yield _HTML_TAIL
+
+
+def format_conversation_as_html(conversation_data):
+    """
+    Convert conversation data to exportable HTML.
+    """
+    return "".join(iter_conversation_html(conversation_data))
 
 
 def format_conversation_as_json(conversation_data):
@@ -542,6 +639,9 @@ def format_conversation_as_json(conversation_data):
 def upload_to_blob_storage(content, filename, user_id, content_type="text/html"):
     """
     Upload content to Azure Blob Storage and return a shareable URL.
+
+    ``content`` may be str/bytes or an iterable of bytes chunks; iterables
+    are staged as blocks while they are produced and committed at the end.
     """
     try:
         blob_storage_manager = BlobStorageManager(
@@ -607,7 +707,10 @@ def export_conversation(conversation_id, user_id, export_format="html"):
         filename = f"{conversation_id}/Freddaid_{timestamp}.{export_format}"
 
         if export_format.lower() == "html":
-            content = format_conversation_as_html(conversation_data)
+            content = (
+                chunk.encode("utf-8")
+                for chunk in iter_conversation_html(conversation_data)
+            )
             content_type = "text/html"
         elif export_format.lower() == "json":
             content = format_conversation_as_json(conversation_data)
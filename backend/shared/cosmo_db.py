@@ -12,6 +12,9 @@ import time
 from datetime import datetime, timezone, timedelta
 from werkzeug.exceptions import NotFound
 from shared import clients
+from shared import activity_rollups
+from shared import membership_cache
+from shared.tier_catalog import SubscriptionTierCatalog
 
 
 def get_cosmos_container(container_name: str):
@@ -455,6 +458,7 @@ def update_invitation_role(invited_user_id, organization_id, new_role):
     invitation = items[0]
     invitation["role"] = new_role
     container.replace_item(item=invitation["id"], body=invitation)
+    membership_cache.invalidate(invited_user_id)
     logging.info(f"Invitation {invitation['id']} updated with new role: {new_role}")
     return invitation
 
@@ -600,6 +604,38 @@ def get_organization_subscription(organizationId):
         raise
 
 
+ORGANIZATION_BATCH_SIZE = int(os.getenv("ORGANIZATION_BATCH_SIZE", "100"))
+
+
+def _read_organizations_by_ids(organizations_container, org_ids):
+    """
+    Fetch the summary fields of many organizations with one query per batch.
+
+    Replaces one read_item round trip per organization with a parameterized
+    ARRAY_CONTAINS query over at most ORGANIZATION_BATCH_SIZE ids. Ids that do
+    not exist are simply absent from the result.
+    """
+    org_ids = sorted(org_ids)
+    organizations = []
+    for i in range(0, len(org_ids), ORGANIZATION_BATCH_SIZE):
+        batch = org_ids[i : i + ORGANIZATION_BATCH_SIZE]
+        try:
+            organizations.extend(
+                organizations_container.query_items(
+                    query=(
+                        "SELECT c.id, c.name, c.owner, c.sessionId, "
+                        "c.subscriptionExpirationDate, c.subscriptionId, c.subscriptionStatus "
+                        "FROM c WHERE ARRAY_CONTAINS(@org_ids, c.id)"
+                    ),
+                    parameters=[{"name": "@org_ids", "value": batch}],
+                    enable_cross_partition_query=True,
+                )
+            )
+        except Exception as e:
+            logging.error(f"Error retrieving organizations {batch}: {e}")
+    return organizations
+
+
 def get_user_organizations(user_id):
     """
     Retrieves simplified organization information for a specific user ID.
@@ -655,30 +691,24 @@ def get_user_organizations(user_id):
         returned_org_ids = set()
         organizations = []
 
-        for org_id in invited_org_ids:
+        for org in _read_organizations_by_ids(organizations_container, invited_org_ids):
+            org_id = org.get("id", "")
             if org_id in returned_org_ids:
                 continue
-            try:
-                org = organizations_container.read_item(
-                    item=org_id, partition_key=org_id
-                )
-                simplified_org = {
-                    "id": org.get("id", ""),
-                    "name": org.get("name", ""),
-                    "owner": org.get("owner", ""),
-                    "sessionId": org.get("sessionId", ""),
-                    "subscriptionExpirationDate": org.get(
-                        "subscriptionExpirationDate", ""
-                    ),
-                    "subscriptionId": org.get("subscriptionId", ""),
-                    "subscriptionStatus": org.get("subscriptionStatus", []),
-                }
-                organizations.append(simplified_org)
-                returned_org_ids.add(org_id)
-            except CosmosResourceNotFoundError:
-                logging.warning(f"Organization with ID '{org_id}' not found.")
-            except Exception as e:
-                logging.error(f"Error retrieving organization with ID '{org_id}': {e}")
+            simplified_org = {
+                "id": org.get("id", ""),
+                "name": org.get("name", ""),
+                "owner": org.get("owner", ""),
+                "sessionId": org.get("sessionId", ""),
+                "subscriptionExpirationDate": org.get("subscriptionExpirationDate", ""),
+                "subscriptionId": org.get("subscriptionId", ""),
+                "subscriptionStatus": org.get("subscriptionStatus", []),
+            }
+            organizations.append(simplified_org)
+            returned_org_ids.add(org_id)
+
+        for org_id in invited_org_ids - returned_org_ids:
+            logging.warning(f"Organization with ID '{org_id}' not found.")
 
         for org in owned_organizations:
             org_id = org.get("id", "")
@@ -818,6 +848,7 @@ def create_invitation(invited_user_email, organization_id, role, nickname):
             "token_expiry": token_expiry,
         }
         result = container.create_item(body=invitation)
+        membership_cache.invalidate(user_id)
     except Exception as e:
         logging.info(f"create_invitation: something went wrong. {str(e)}")
         raise e
@@ -892,6 +923,7 @@ def create_organization(user_id, organization_name, storage_capacity):
                 f"Organization with name '{organization_name}' not created in Cosmos DB."
             )
             raise RuntimeError(f"Organization not created")
+        membership_cache.invalidate(user_id)
     except Exception as e:
         logging.error(f"Error inserting data into Cosmos DB: {e}")
         raise e
@@ -1460,6 +1492,11 @@ def delete_brand_by_id(brand_id, organization_id):
 def get_subscription_tier_by_id(tier_id):
     """
     Retrieves a subscription tier by its ID from the subscriptionTiers container.
+
+    Lookups are served from the in-memory tier catalog; Cosmos is only read when
+    the tier is not in the catalog yet (e.g. it was created after the last refresh).
+    The returned document is shared between requests and must not be mutated.
+
     Parameters:
         tier_id (str): The ID of the subscription tier.
     Returns:
@@ -1468,11 +1505,19 @@ def get_subscription_tier_by_id(tier_id):
         NotFound: If the subscription tier is not found.
         Exception: For any other unexpected error.
     """
+    try:
+        tier = _tier_catalog.get(tier_id)
+        if tier is not None:
+            return tier
+    except Exception as e:
+        logging.warning(f"Subscription tier catalog unavailable, reading from Cosmos DB: {e}")
+
     container = get_cosmos_container("subscriptionsTiers")
 
     try:
         tier = container.read_item(item=tier_id, partition_key=tier_id)
         logging.info(f"Subscription tier successfully retrieved: {tier_id}")
+        _tier_catalog.put(tier)
         return tier
 
     except CosmosResourceNotFoundError:
@@ -1587,6 +1632,46 @@ def get_subscription_tiers():
         return []
 
 
+def _get_subscription_tiers_version():
+    """
+    Returns the (id, _etag) pairs of all tier documents.
+
+    The projection is a few bytes per tier, so the catalog can poll it cheaply and
+    only re-read full documents when a tier was added, edited or removed.
+    """
+    container = get_cosmos_container("subscriptionsTiers")
+    items = container.query_items(
+        query="SELECT c.id, c._etag FROM c WHERE c.type = 'tier'",
+        enable_cross_partition_query=True,
+    )
+    return frozenset((item["id"], item["_etag"]) for item in items)
+
+
+_tier_catalog = SubscriptionTierCatalog(
+    loader=get_subscription_tiers,
+    version_probe=_get_subscription_tiers_version,
+    refresh_interval=int(os.getenv("TIER_CATALOG_REFRESH_SECONDS", "300")),
+)
+
+
+def reload_subscription_tiers(force=True):
+    """
+    Reloads the in-memory subscription tier catalog on this process.
+
+    Parameters:
+        force (bool): Reload even if the tier versions did not change.
+    Returns:
+        dict: Catalog counters after the reload, plus whether contents changed.
+    """
+    reloaded = _tier_catalog.reload(force=force)
+    return {"reloaded": reloaded, **_tier_catalog.get_stats()}
+
+
+def get_subscription_tier_catalog_stats():
+    """Returns hit/miss/reload counters of the subscription tier catalog."""
+    return _tier_catalog.get_stats()
+
+
 def create_new_subscription_logs(
     userId, organizationId, userName, organizationName, action
 ):
@@ -1743,6 +1828,8 @@ def update_organization_metadata(org_id, name, owner_id=None):
         org["name"] = name
 
         if owner_id and org.get("owner") != owner_id:
+            membership_cache.invalidate(org.get("owner"))
+            membership_cache.invalidate(owner_id)
             org["owner"] = owner_id
 
             try:
@@ -1788,6 +1875,8 @@ def delete_organization(organization_id):
     org_container = get_cosmos_container("organizations")
     try:
         org_container.delete_item(item=organization_id, partition_key=organization_id)
+        # Every member of the organization may be affected; drop all entries.
+        membership_cache.invalidate_all()
         logging.info(f"Organization {organization_id} deleted successfully.")
     except CosmosResourceNotFoundError:
         logging.warning(f"Organization {organization_id} to delete not found.")
@@ -1831,6 +1920,9 @@ def create_user_logs(user_id, organization_id, action, metadata=None):
 
         logs_container.create_item(body=log)
 
+        if action == activity_rollups.SESSION_ACTION:
+            activity_rollups.record_session(organization_id, user_id, log["timestamp"])
+
     except CosmosResourceNotFoundError:
         logging.warning(
             f"userLogs container not found while creating log for user {user_id}."
@@ -1840,54 +1932,6 @@ def create_user_logs(user_id, organization_id, action, metadata=None):
         raise
 
 
-def get_user_logs_by_organization_timestamp(
-    organization_id: str, start_timestamp: int, end_timestamp: int, action: str
-):
-    logs_container = get_cosmos_container("userLogs")
-    try:
-        query = """
-            SELECT * FROM c 
-            WHERE c.organizationId = @orgId 
-            AND c.timestamp >= @start_timestamp 
-            AND c.timestamp <= @end_timestamp
-            AND c.action = @action
-        """
-        parameters = [
-            {"name": "@orgId", "value": organization_id},
-            {"name": "@start_timestamp", "value": int(start_timestamp)},
-            {"name": "@end_timestamp", "value": int(end_timestamp)},
-            {"name": "@action", "value": action},
-        ]
-        result = logs_container.query_items(
-            query=query, parameters=parameters, partition_key=organization_id
-        )
-        return list(result)
-    except Exception as e:
-        logging.error(f"Error getting user logs by organization: {e}")
-        raise
-
-
-def get_user_logs_by_organization(organization_id: str, action: str):
-    logs_container = get_cosmos_container("userLogs")
-    try:
-        query = """
-            SELECT * FROM c 
-            WHERE c.organizationId = @orgId 
-            AND c.action = @action
-        """
-        parameters = [
-            {"name": "@orgId", "value": organization_id},
-            {"name": "@action", "value": action},
-        ]
-        result = logs_container.query_items(
-            query=query, parameters=parameters, partition_key=organization_id
-        )
-        return list(result)
-    except Exception as e:
-        logging.error(f"Error getting user logs by organization: {e}")
-        raise
-
-
 def get_all_user_logs_by_timestamp(
     start_timestamp: int, end_timestamp: int, action: str
 ):
@@ -1922,46 +1966,6 @@ def get_all_user_logs(action):
         raise
 
 
-def get_all_conversations_by_organization(
-    organization_id, start_timestamp: int = None, end_timestamp: int = None
-):
-    conversations_container = get_cosmos_container("conversations")
-    try:
-        if start_timestamp and end_timestamp:
-            from datetime import datetime
-
-            start_date_str = datetime.utcfromtimestamp(start_timestamp).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-            end_date_str = datetime.utcfromtimestamp(end_timestamp).strftime(
-                "%Y-%m-%d %H:%M:%S"
-            )
-            query = """
-                SELECT * FROM c 
-                WHERE c.conversation_data.interaction.organization_id = @organization_id
-                AND c.conversation_data.start_date >= @start_date
-                AND c.conversation_data.start_date <= @end_date
-            """
-            parameters = [
-                {"name": "@organization_id", "value": organization_id},
-                {"name": "@start_date", "value": start_date_str},
-                {"name": "@end_date", "value": end_date_str},
-            ]
-        else:
-            query = """
-                SELECT * FROM c 
-                WHERE c.conversation_data.interaction.organization_id = @organization_id
-            """
-            parameters = [{"name": "@organization_id", "value": organization_id}]
-        conversations = conversations_container.query_items(
-            query=query, parameters=parameters, enable_cross_partition_query=True
-        )
-        return list(conversations)
-    except Exception as e:
-        logging.error(f"Error getting history conversations by organization: {e}")
-        raise
-
-
 def get_all_conversations():
     conversations_container = get_cosmos_container("conversations")
     try:
@@ -1978,115 +1982,6 @@ def get_all_conversations():
         raise
 
 
-def get_all_users():
-    users_container = get_cosmos_container("users")
-    try:
-        result = users_container.query_items(
-            query="SELECT * FROM c", enable_cross_partition_query=True
-        )
-        return list(result)
-    except Exception as e:
-        logging.error(f"Error getting all users: {e}")
-        raise
-
-
-def get_user_activity_data(
-    organization_id: str = None,
-    start_date: int = None,
-    end_date: int = None,
-    action: str = "session-start",
-):
-    """
-    Aggregates user activity data (sessions, conversations, messages) per user.
-
-    Args:
-        organization_id (str, optional): Filter by organization. Defaults to None.
-        start_date (int, optional): Unix timestamp for start date range. Defaults to None.
-        end_date (int, optional): Unix timestamp for end date range. Defaults to None.
-        action (str, optional): User action type to filter logs. Defaults to "session-start".
-
-    Returns:
-        list[dict]: List of user activity records with the following fields:
-            - user_id (str): User unique identifier
-            - user_name (str): User's display name from users container
-            - organization_id (str): Organization ID
-            - session_count (int): Number of user sessions (logs)
-            - conversation_count (int): Number of conversations
-            - message_count (int): Total user messages sent
-            - first_login_date (int): Unix timestamp of first session
-
-    Notes:
-        - Returns one record per user with no duplicates
-        - Filters conversations by start_date if provided (uses conversation_data.start_date)
-        - Fetches user names from users container for accuracy
-        - O(n) complexity with single pass aggregation
-    """
-    # 1) Fetch logs and conversations (filtered by date range if provided)
-    if start_date and end_date:
-        user_logs = get_user_logs_by_organization_timestamp(
-            organization_id, start_date, end_date, action
-        )
-        conversations = get_all_conversations_by_organization(
-            organization_id, start_date, end_date
-        )
-    else:
-        user_logs = get_user_logs_by_organization(organization_id, action)
-        conversations = get_all_conversations_by_organization(organization_id)
-
-    users: list[dict] = get_all_users()
-    # 2) Pre-aggregate conversation stats in a single loop
-    conv_stats: dict[str, dict] = {}
-    for conv in conversations:
-        uid = conv.get("user_id")
-        if not uid:
-            continue
-
-        if uid not in conv_stats:
-            conv_stats[uid] = {
-                "user_name": conv.get("conversation_data", {})
-                .get("interaction", {})
-                .get("user_name", "Unknown User"),
-                "conversation_count": 0,
-                "message_count": 0,
-            }
-
-        conv_stats[uid]["conversation_count"] += 1
-        history = conv.get("conversation_data", {}).get("history", [])
-        conv_stats[uid]["message_count"] += sum(
-            1 for h in history if h.get("role") == "user"
-        )
-
-    # 3) Aggregate logs per user (sessions + first_login_date)
-    agg: dict[str, dict] = {}
-    for log in user_logs:
-        uid = log.get("userId")
-        if not uid:
-            continue
-
-        ts = log.get("timestamp")
-        if uid not in agg:
-            user_conv = conv_stats.get(uid, {})
-            user = next((u for u in users if u.get("id") == uid), None)
-            user_name = user["data"]["name"]
-            agg[uid] = {
-                "user_id": uid,
-                "user_name": user_name,
-                "organization_id": log.get("organizationId"),
-                "session_count": 0,
-                "first_login_date": ts,
-                "conversation_count": user_conv.get("conversation_count", 0),
-                "message_count": user_conv.get("message_count", 0),
-            }
-
-        agg[uid]["session_count"] += 1
-        if ts is not None and (
-            agg[uid]["first_login_date"] is None or ts < agg[uid]["first_login_date"]
-        ):
-            agg[uid]["first_login_date"] = ts
-
-    return list(agg.values())
-
-
 # Notifications
 def get_all_notifications():
     """
@@ -1,8 +1,9 @@
 import os
 import logging
-from flask import current_app, request, jsonify
+from flask import current_app, request, jsonify, g
 from functools import wraps
-from shared.clients import get_azure_key_vault_secret
+from shared.clients import get_cached_secret
+from shared import membership_cache
 from utils import (
     get_organization_id_from_request,
     get_organization_id_and_user_id_from_request,
@@ -26,12 +27,31 @@ ORG_FILES_PREFIX = "organization_files"
 BLOB_CONTAINER_NAME = "documents"
 
 
+def _get_user_org_ids(client_principal_id):
+    """
+    Resolve the organization IDs a principal belongs to at most once per request.
+
+    The first lookup in a request goes through the process-wide membership cache,
+    which only falls back to get_user_organizations() on a miss; stacked limit
+    decorators on the same request then reuse the result stored on flask.g.
+    """
+    scoped = g.get("_user_org_ids")
+    if scoped is not None and scoped[0] == client_principal_id:
+        return scoped[1]
+
+    org_ids = membership_cache.get_organization_ids(
+        client_principal_id, get_user_organizations
+    )
+    g._user_org_ids = (client_principal_id, org_ids)
+    return org_ids
+
+
 def validate_token():
     """
     Decorator for Flask routes that requires a valid token in the Authorization header.
     """
 
-    secret = get_azure_key_vault_secret("webbackend-token")
+    secret = get_cached_secret("webbackend-token")
 
     def decorator(f):
         @wraps(f)
@@ -94,8 +114,7 @@ def check_organization_limits():
                     return create_error_response("Unauthorized", 401)
 
                 # Verify user belongs to this organization
-                user_orgs = get_user_organizations(client_principal_id)
-                user_org_ids = [org["id"] for org in user_orgs]
+                user_org_ids = _get_user_org_ids(client_principal_id)
 
                 if organization_id not in user_org_ids:
                     logging.warning(
@@ -164,8 +183,7 @@ def require_conversation_limits():
                     return create_error_response("Unauthorized", 401)
 
                 # Verify user belongs to this organization
-                user_orgs = get_user_organizations(client_principal_id)
-                user_org_ids = [org["id"] for org in user_orgs]
+                user_org_ids = _get_user_org_ids(client_principal_id)
 
                 if organization_id not in user_org_ids:
                     logging.warning(
@@ -228,8 +246,7 @@ def require_user_conversation_limits():
                     return create_error_response("Unauthorized", 401)
 
                 # Verify user belongs to this organization
-                user_orgs = get_user_organizations(client_principal_id)
-                user_org_ids = [org["id"] for org in user_orgs]
+                user_org_ids = _get_user_org_ids(client_principal_id)
 
                 if organization_id not in user_org_ids:
                     logging.warning(
@@ -324,8 +341,7 @@ def check_organization_upload_limits():
                     return create_error_response("Unauthorized", 401)
 
                 # Verify user belongs to this organization
-                user_orgs = get_user_organizations(client_principal_id)
-                user_org_ids = [org["id"] for org in user_orgs]
+                user_org_ids = _get_user_org_ids(client_principal_id)
 
                 if organization_id not in user_org_ids:
                     logging.warning(
@@ -410,8 +426,7 @@ def require_organization_storage_limits():
                     return create_error_response("Unauthorized", 401)
 
                 # Verify user belongs to this organization
-                user_orgs = get_user_organizations(client_principal_id)
-                user_org_ids = [org["id"] for org in user_orgs]
+                user_org_ids = _get_user_org_ids(client_principal_id)
 
                 if organization_id not in user_org_ids:
                     logging.warning(
@@ -0,0 +1,294 @@
+# backend/shared/description_jobs.py
+"""
+Background generation of AI file descriptions for uploaded source documents.
+
+The upload endpoint stores the blob with ``description_status=pending`` and
+enqueues ``{"blob_name", "kind"}``; a pool of worker threads downloads the
+blob, runs the summarizer for its kind and merges ``description``,
+``description_source`` and ``description_status`` into the blob metadata.
+The status endpoint reads that metadata, so any instance can report it.
+
+Queues:
+- ``InMemoryQueue``: bounded, process-local; used when Queue Storage is not
+  configured (local development, tests).
+- ``AzureStorageQueue``: the ``file-descriptions`` Azure Storage queue, like
+  ``report-jobs``. Messages stay invisible for
+  ``DESCRIPTION_VISIBILITY_TIMEOUT_SECONDS`` while being processed and are
+  redelivered if a worker dies; after ``DESCRIPTION_MAX_ATTEMPTS`` the
+  description is marked failed.
+
+Backpressure: once ``DESCRIPTION_MAX_PENDING`` descriptions are waiting,
+``has_capacity()`` is False and ``enqueue`` raises ``DescriptionQueueFull``;
+the upload endpoint answers 429 so bulk uploads slow down instead of
+piling up work.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+
+from shared import clients
+from shared.blob_storage import invalidate_directory_listing
+from data_summary.blob_utils import download_blob_to_temp, update_blob_metadata
+
+log = logging.getLogger(__name__)
+
+DESCRIPTION_QUEUE_NAME = os.getenv("DESCRIPTION_QUEUE_NAME", "file-descriptions")
+DESCRIPTION_QUEUE_BACKEND = os.getenv("DESCRIPTION_QUEUE_BACKEND", "")  # "memory" | "azure"
+DESCRIPTION_WORKERS = int(os.getenv("DESCRIPTION_WORKERS", "2"))
+DESCRIPTION_MAX_PENDING = int(os.getenv("DESCRIPTION_MAX_PENDING", "100"))
+DESCRIPTION_MAX_ATTEMPTS = int(os.getenv("DESCRIPTION_MAX_ATTEMPTS", "3"))
+DESCRIPTION_VISIBILITY_TIMEOUT_SECONDS = int(
+    os.getenv("DESCRIPTION_VISIBILITY_TIMEOUT_SECONDS", "600")
+)
+DESCRIPTION_POLL_SECONDS = float(os.getenv("DESCRIPTION_POLL_SECONDS", "5"))
+BACKLOG_CHECK_SECONDS = 5
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class DescriptionQueueFull(Exception):
+    """Too many descriptions are waiting; retry the upload later."""
+
+
+@dataclass
+class ReceivedMessage:
+    body: Dict[str, Any]
+    dequeue_count: int
+    handle: Any = None
+
+
+class InMemoryQueue:
+    """Bounded process-local queue with the same interface as AzureStorageQueue."""
+
+    def __init__(self, max_pending: int = DESCRIPTION_MAX_PENDING):
+        # Unbounded underneath so retries are never dropped; put() enforces the bound.
+        self._queue: "queue.Queue[ReceivedMessage]" = queue.Queue()
+        self._max_pending = max_pending
+
+    def has_capacity(self) -> bool:
+        return self._queue.qsize() < self._max_pending
+
+    def put(self, body: Dict[str, Any]) -> None:
+        if not self.has_capacity():
+            raise DescriptionQueueFull()
+        self._queue.put_nowait(ReceivedMessage(body, 1))
+
+    def receive(self, timeout: float) -> Optional[ReceivedMessage]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ack(self, message: ReceivedMessage) -> None:
+        pass
+
+    def retry(self, message: ReceivedMessage) -> None:
+        self._queue.put_nowait(ReceivedMessage(message.body, message.dequeue_count + 1))
+
+
+class AzureStorageQueue:
+    """Azure Storage queue of JSON messages."""
+
+    def __init__(self, queue_client, max_pending: int = DESCRIPTION_MAX_PENDING):
+        self._client = queue_client
+        self._max_pending = max_pending
+        self._backlog = 0
+        self._backlog_checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def has_capacity(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._backlog_checked_at >= BACKLOG_CHECK_SECONDS:
+                properties = self._client.get_queue_properties()
+                self._backlog = properties.approximate_message_count or 0
+                self._backlog_checked_at = now
+            return self._backlog < self._max_pending
+
+    def put(self, body: Dict[str, Any]) -> None:
+        if not self.has_capacity():
+            raise DescriptionQueueFull()
+        self._client.send_message(json.dumps(body))
+        with self._lock:
+            self._backlog += 1
+
+    def receive(self, timeout: float) -> Optional[ReceivedMessage]:
+        messages = self._client.receive_messages(
+            max_messages=1, visibility_timeout=DESCRIPTION_VISIBILITY_TIMEOUT_SECONDS
+        )
+        message = next(iter(messages), None)
+        if message is None:
+            # Queue Storage has no blocking receive
+            time.sleep(timeout)
+            return None
+        return ReceivedMessage(json.loads(message.content), message.dequeue_count, message)
+
+    def ack(self, message: ReceivedMessage) -> None:
+        self._client.delete_message(message.handle)
+
+    def retry(self, message: ReceivedMessage) -> None:
+        # Becomes visible again after a short delay instead of the full timeout
+        self._client.update_message(message.handle, visibility_timeout=30)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+_summarizers: Dict[str, Callable[[str], Any]] = {}
+_workers: list = []
+
+
+def get_queue():
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            backend = DESCRIPTION_QUEUE_BACKEND or (
+                "azure" if clients.CONFIG.queue_account_url else "memory"
+            )
+            if backend == "azure":
+                queue_client = clients.get_queue_client(DESCRIPTION_QUEUE_NAME)
+                try:
+                    queue_client.create_queue()
+                except Exception:
+                    pass  # already exists
+                _queue = AzureStorageQueue(queue_client)
+            else:
+                _queue = InMemoryQueue()
+            log.info(f"[descriptions] using {backend} queue")
+        return _queue
+
+
+def has_capacity() -> bool:
+    try:
+        return get_queue().has_capacity()
+    except Exception as e:
+        # Do not block uploads on a failed backlog probe
+        log.warning(f"[descriptions] could not check queue backlog: {e}")
+        return True
+
+
+def enqueue(blob_name: str, container_name: str, kind: str) -> None:
+    """Queue a description for ``blob_name``; raises DescriptionQueueFull under backpressure."""
+    get_queue().put({"blob_name": blob_name, "container": container_name, "kind": kind})
+
+
+def start_workers(summarizers: Dict[str, Callable[[str], Any]]) -> None:
+    """
+    Start the worker pool once per process.
+
+    ``summarizers`` maps a message kind to ``summarize(path) -> {"file_description",
+    "source"}``; the latest mapping is used by all workers.
+    """
+    _summarizers.update(summarizers)
+    with _queue_lock:
+        if _workers:
+            return
+        for n in range(DESCRIPTION_WORKERS):
+            worker = threading.Thread(
+                target=_work_loop, name=f"description-worker-{n}", daemon=True
+            )
+            worker.start()
+            _workers.append(worker)
+
+
+def _mark(blob_name: str, container_name: str, **metadata: str) -> None:
+    update_blob_metadata(blob_name, metadata, container_name)
+    invalidate_directory_listing(blob_name)
+
+
+def process(body: Dict[str, Any]) -> bool:
+    """
+    Describe one blob and store the result in its metadata.
+
+    Returns False when the attempt should be retried.
+    """
+    blob_name, container_name = body["blob_name"], body["container"]
+    summarize = _summarizers[body["kind"]]
+    try:
+        temp_path, _ = download_blob_to_temp(blob_name, container_name)
+    except ResourceNotFoundError:
+        log.info(f"[descriptions] {blob_name} was removed before it was described")
+        return True
+
+    try:
+        description = summarize(temp_path)
+    finally:
+        os.remove(temp_path)
+    if not isinstance(description, dict) or description.get("source") == "error":
+        log.warning(f"[descriptions] no description for {blob_name}: {description}")
+        return False
+
+    try:
+        _mark(
+            blob_name,
+            container_name,
+            description=description["file_description"],
+            description_source=description["source"],
+            description_status=READY,
+        )
+    except ResourceNotFoundError:
+        log.info(f"[descriptions] {blob_name} was removed while it was described")
+    return True
+
+
+def _work_loop() -> None:
+    while True:
+        try:
+            message = get_queue().receive(timeout=DESCRIPTION_POLL_SECONDS)
+        except Exception as e:
+            log.warning(f"[descriptions] receive failed: {e}")
+            time.sleep(DESCRIPTION_POLL_SECONDS)
+            continue
+        if message is None:
+            continue
+
+        body = message.body
+        try:
+            done = process(body)
+        except Exception as e:
+            log.exception(f"[descriptions] failed to describe {body.get('blob_name')}: {e}")
+            done = False
+
+        try:
+            if done:
+                get_queue().ack(message)
+            elif message.dequeue_count >= DESCRIPTION_MAX_ATTEMPTS:
+                log.error(f"[descriptions] giving up on {body.get('blob_name')}")
+                try:
+                    _mark(body["blob_name"], body["container"], description_status=FAILED)
+                except Exception as e:
+                    log.warning(f"[descriptions] could not mark {body.get('blob_name')} failed: {e}")
+                get_queue().ack(message)
+            else:
+                get_queue().retry(message)
+        except Exception as e:
+            log.warning(f"[descriptions] could not settle message: {e}")
+
+
+def get_status(blob_name: str, container_name: str) -> Optional[Dict[str, Any]]:
+    """Description status of a blob from its metadata, or None if it does not exist."""
+    blob_client = clients.get_blob_container_client(container_name).get_blob_client(blob_name)
+    try:
+        metadata = blob_client.get_blob_properties().metadata or {}
+    except ResourceNotFoundError:
+        return None
+    status = metadata.get("description_status")
+    if status is None:
+        # Uploaded before descriptions went async, or a type that gets none
+        status = READY if metadata.get("description") else None
+    return {
+        "blob_name": blob_name,
+        "status": status,
+        "description": metadata.get("description"),
+        "description_source": metadata.get("description_source"),
+    }
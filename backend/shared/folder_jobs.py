@@ -0,0 +1,140 @@
+# backend/shared/folder_jobs.py
+"""
+Background jobs for long-running folder operations (bulk delete, ...).
+
+Job documents live in the ``folderJobs`` Cosmos container, partitioned by
+``/organization_id``, so any instance can report progress. Jobs run on a small
+in-process pool; a job whose runner died (instance restart) stops getting
+``updated_at`` heartbeats and can be resumed once it is older than
+``FOLDER_JOB_STALE_SECONDS``. Runners must therefore be idempotent.
+
+Statuses: QUEUED -> RUNNING -> SUCCEEDED | PARTIAL | FAILED.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from azure.core import MatchConditions
+from azure.cosmos.exceptions import (
+    CosmosAccessConditionFailedError,
+    CosmosResourceNotFoundError,
+)
+
+from shared import clients
+
+log = logging.getLogger(__name__)
+
+FOLDER_JOBS_CONTAINER = "folderJobs"
+FOLDER_JOB_WORKERS = int(os.getenv("FOLDER_JOB_WORKERS", "2"))
+FOLDER_JOB_STALE_SECONDS = int(os.getenv("FOLDER_JOB_STALE_SECONDS", "300"))
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+PARTIAL = "PARTIAL"
+FAILED = "FAILED"
+
+_executor = ThreadPoolExecutor(
+    max_workers=FOLDER_JOB_WORKERS, thread_name_prefix="folder-job"
+)
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _container():
+    return clients.get_cosmos_container(FOLDER_JOBS_CONTAINER)
+
+
+def create_job(organization_id: str, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Persist a QUEUED job document and return it."""
+    job_id = str(uuid.uuid4())
+    now = _utc_now_iso()
+    job = {
+        "id": job_id,
+        "job_id": job_id,
+        "organization_id": organization_id,
+        "kind": kind,
+        "params": params,
+        "status": QUEUED,
+        "progress": {},
+        "attempts": 0,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    return _container().create_item(job)
+
+
+def get_job(organization_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return _container().read_item(item=job_id, partition_key=organization_id)
+    except CosmosResourceNotFoundError:
+        return None
+
+
+def save_job(job: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+    """Apply ``fields`` to ``job``, bump ``updated_at`` and write it back."""
+    job.update(fields)
+    job["updated_at"] = _utc_now_iso()
+    _container().upsert_item(job)
+    return job
+
+
+def claim_job(job: Dict[str, Any], **fields: Any) -> Optional[Dict[str, Any]]:
+    """
+    Like ``save_job``, but only if nobody wrote the job since it was read.
+
+    Returns the stored job, or None when another caller changed it first
+    (e.g. a concurrent resume, or a runner that is still heartbeating).
+    """
+    body = {**job, **fields, "updated_at": _utc_now_iso()}
+    try:
+        return _container().replace_item(
+            item=job["id"],
+            body=body,
+            etag=job["_etag"],
+            match_condition=MatchConditions.IfNotModified,
+        )
+    except CosmosAccessConditionFailedError:
+        return None
+
+
+def is_resumable(job: Dict[str, Any]) -> bool:
+    """True when a job did not finish cleanly and nothing is still running it."""
+    if job["status"] in (PARTIAL, FAILED):
+        return True
+    if job["status"] in (QUEUED, RUNNING):
+        updated_at = datetime.fromisoformat(job["updated_at"])
+        return datetime.now(timezone.utc) - updated_at > timedelta(
+            seconds=FOLDER_JOB_STALE_SECONDS
+        )
+    return False
+
+
+def submit(job: Dict[str, Any], runner: Callable[[Dict[str, Any]], None]) -> None:
+    """
+    Run ``runner(job)`` on the job pool.
+
+    The job is marked RUNNING before the runner starts and FAILED if it
+    raises; the runner sets the final status otherwise.
+    """
+
+    def run() -> None:
+        try:
+            save_job(job, status=RUNNING, attempts=job.get("attempts", 0) + 1, error=None)
+            runner(job)
+        except Exception as e:
+            log.exception(f"[folder-jobs] job {job['id']} failed: {e}")
+            try:
+                save_job(job, status=FAILED, error=str(e))
+            except Exception:
+                log.exception(f"[folder-jobs] could not record failure of job {job['id']}")
+
+    _executor.submit(run)
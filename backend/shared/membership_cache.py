@@ -0,0 +1,112 @@
+# backend/shared/membership_cache.py
+"""
+Process-wide TTL cache of organization membership, keyed by client principal ID.
+
+The limit decorators in shared/decorators.py only need to know which
+organizations a principal belongs to, yet resolving that through
+``get_user_organizations`` costs several Cosmos round trips. Entries are
+short-lived and are dropped explicitly whenever invitations or organization
+ownership change, so a revoked membership is never served for longer than
+``MEMBERSHIP_CACHE_TTL_SECONDS`` even on instances that missed the
+invalidation.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from cachetools import TTLCache
+
+log = logging.getLogger(__name__)
+
+MEMBERSHIP_CACHE_TTL_SECONDS = int(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "30"))
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv("MEMBERSHIP_CACHE_MAX_ENTRIES", "10000"))
+
+_cache: TTLCache = TTLCache(
+    maxsize=MEMBERSHIP_CACHE_MAX_ENTRIES, ttl=MEMBERSHIP_CACHE_TTL_SECONDS
+)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+# Loads in flight per principal: [generation, loads]. invalidate() bumps the
+# generation and invalidate_all() bumps _epoch, so a load that started before
+# an invalidation does not store what it read.
+_loading: Dict[str, list] = {}
+_epoch = 0
+
+
+def get_organization_ids(
+    principal_id: str, loader: Callable[[str], Iterable[dict]]
+) -> FrozenSet[str]:
+    """
+    Return the IDs of the organizations ``principal_id`` belongs to.
+
+    Args:
+        principal_id: The client principal ID of the user.
+        loader: Called on a miss; must return the user's organizations
+            (the shape returned by ``get_user_organizations``).
+
+    Returns:
+        frozenset: Organization IDs the user is a member or owner of.
+    """
+    with _lock:
+        org_ids = _cache.get(principal_id)
+        if org_ids is not None:
+            _stats["hits"] += 1
+            return org_ids
+        _stats["misses"] += 1
+        loading = _loading.setdefault(principal_id, [0, 0])
+        loading[1] += 1
+        started = (loading[0], _epoch)
+
+    # Load outside the lock so a slow Cosmos call does not serialize other users.
+    try:
+        org_ids = frozenset(org["id"] for org in loader(principal_id) if org.get("id"))
+    finally:
+        with _lock:
+            loading[1] -= 1
+            if not loading[1]:
+                _loading.pop(principal_id, None)
+
+    with _lock:
+        if started == (loading[0], _epoch):
+            _cache[principal_id] = org_ids
+    return org_ids
+
+
+def invalidate(principal_id: Optional[str]) -> None:
+    """Drop the cached membership for a single principal, if present."""
+    if not principal_id:
+        return
+    with _lock:
+        _cache.pop(principal_id, None)
+        if principal_id in _loading:
+            _loading[principal_id][0] += 1
+        _stats["invalidations"] += 1
+    log.debug("[membership_cache] invalidated principal %s", principal_id)
+
+
+def invalidate_all() -> None:
+    """Drop every cached membership (e.g. when an organization is deleted)."""
+    global _epoch
+    with _lock:
+        _cache.clear()
+        _epoch += 1
+        _stats["invalidations"] += 1
+    log.debug("[membership_cache] cleared")
+
+
+def get_stats() -> Dict[str, int]:
+    """Return hit/miss/invalidation counters and the current entry count."""
+    with _lock:
+        return {**_stats, "size": len(_cache)}
+
+
+def reset() -> None:
+    """Clear entries and counters. Intended for tests."""
+    with _lock:
+        _cache.clear()
+        _loading.clear()
+        for key in _stats:
+            _stats[key] = 0
@@ -0,0 +1,139 @@
+# backend/shared/orchestrator_stream.py
+"""
+Pooled HTTP client and streaming proxy for the orchestrator function.
+
+Every chat question used to open a brand-new TCP/TLS connection to
+``ORCHESTRATOR_ENDPOINT`` with no timeouts. This module keeps one pooled
+keep-alive ``requests.Session`` per process and relays the orchestrator's
+SSE body as raw bytes, so nothing is decoded or re-encoded on the way out.
+
+Timeouts (seconds, from the environment):
+    ORCHESTRATOR_CONNECT_TIMEOUT     TCP/TLS connect (default 5)
+    ORCHESTRATOR_FIRST_BYTE_TIMEOUT  wait for headers and the first chunk (default 120)
+    ORCHESTRATOR_IDLE_TIMEOUT        max gap between later chunks (default 60)
+
+The proxy only does blocking socket I/O and holds no thread-local state, so
+it is cooperative when the app runs under gevent workers (monkey-patched
+sockets), letting one worker carry many concurrent chat streams.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from typing import Iterator, Mapping, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger(__name__)
+
+ORCHESTRATOR_POOL_MAXSIZE = int(os.getenv("ORCHESTRATOR_POOL_MAXSIZE", "100"))
+ORCHESTRATOR_CONNECT_TIMEOUT = float(os.getenv("ORCHESTRATOR_CONNECT_TIMEOUT", "5"))
+ORCHESTRATOR_FIRST_BYTE_TIMEOUT = float(
+    os.getenv("ORCHESTRATOR_FIRST_BYTE_TIMEOUT", "120")
+)
+ORCHESTRATOR_IDLE_TIMEOUT = float(os.getenv("ORCHESTRATOR_IDLE_TIMEOUT", "60"))
+ORCHESTRATOR_STREAM_CHUNK_SIZE = int(os.getenv("ORCHESTRATOR_STREAM_CHUNK_SIZE", "8192"))
+
+
+class OrchestratorStreamError(Exception):
+    """Raised when the orchestrator rejects or drops a streaming request."""
+
+
+class MarkerWatcher:
+    """
+    Notice a byte marker in a relayed stream, even when it spans two chunks.
+
+    Used to spot side effects of a chat turn (e.g. generated image blob
+    paths) without decoding the SSE body.
+    """
+
+    def __init__(self, marker: bytes):
+        self.marker = marker
+        self.seen = False
+        self._tail = b""
+
+    def scan(self, chunk: bytes) -> bytes:
+        """Record whether ``chunk`` completes the marker and return it unchanged."""
+        if not self.seen:
+            window = self._tail + chunk
+            self.seen = self.marker in window
+            self._tail = window[-(len(self.marker) - 1):] if len(self.marker) > 1 else b""
+        return chunk
+
+
+@lru_cache(maxsize=1)
+def get_orchestrator_session() -> requests.Session:
+    """
+    Return a cached keep-alive session for orchestrator calls.
+
+    Connections are pooled per host up to ORCHESTRATOR_POOL_MAXSIZE; extra
+    concurrent requests open short-lived connections instead of blocking.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=ORCHESTRATOR_POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # Ask for an uncompressed body so it can be relayed byte-for-byte.
+    session.headers["Accept-Encoding"] = "identity"
+    return session
+
+
+def _set_read_timeout(response: requests.Response, seconds: float) -> None:
+    """Best-effort change of the socket read timeout on an open response."""
+    try:
+        sock = response.raw.connection.sock
+        if sock is not None:
+            sock.settimeout(seconds)
+    except Exception as e:
+        log.debug("[orchestrator] could not set idle timeout: %s", e)
+
+
+def stream_orchestrator(
+    url: str,
+    payload: Union[str, bytes],
+    headers: Mapping[str, str],
+    *,
+    connect_timeout: Optional[float] = None,
+    first_byte_timeout: Optional[float] = None,
+    idle_timeout: Optional[float] = None,
+) -> Iterator[bytes]:
+    """
+    POST ``payload`` to the orchestrator and yield the response body as bytes.
+
+    The connection goes back to the pool when the generator is exhausted or
+    closed (e.g. the browser disconnects mid-stream).
+
+    Raises:
+        OrchestratorStreamError: the orchestrator returned a non-200 status.
+        requests.RequestException / urllib3.exceptions.HTTPError: connect,
+            first-byte or idle timeout, or a dropped connection.
+    """
+    connect_timeout = connect_timeout or ORCHESTRATOR_CONNECT_TIMEOUT
+    first_byte_timeout = first_byte_timeout or ORCHESTRATOR_FIRST_BYTE_TIMEOUT
+    idle_timeout = idle_timeout or ORCHESTRATOR_IDLE_TIMEOUT
+
+    with get_orchestrator_session().post(
+        url,
+        data=payload,
+        headers=headers,
+        stream=True,
+        timeout=(connect_timeout, first_byte_timeout),
+    ) as r:
+        if r.status_code != 200:
+            raise OrchestratorStreamError(
+                f"Orchestrator returned status code {r.status_code}"
+            )
+        first = True
+        for chunk in r.raw.stream(ORCHESTRATOR_STREAM_CHUNK_SIZE, decode_content=False):
+            if not chunk:
+                continue
+            if first:
+                _set_read_timeout(r, idle_timeout)
+                first = False
+            yield chunk
@@ -13,14 +13,20 @@ total_hours_waster_here: 8
 from __future__ import annotations
 
 import json
+import multiprocessing
+import os
 import re
-from collections import defaultdict
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from io import BytesIO
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Sequence
 
+import numpy as np
 import openpyxl
 from openpyxl.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
@@ -29,6 +35,7 @@ from openpyxl.worksheet.worksheet import Worksheet
 __all__ = [
     "serialize_excel",
     "serialize_to_file",
+    "encode_records",
     "ExcelParserError",
 ]
 
@@ -53,6 +60,19 @@ CATEGORY_COL = 0
 N_COL = 1
 PERCENT_COL = 2
 
+# Sheets are parsed in a process pool when PULSE_SHEET_WORKERS is above 1,
+# there is more than one sheet to parse and the workbook is at least
+# PARALLEL_MIN_BYTES: every worker opens the workbook again, which smaller
+# books do not pay back. The pool is opt-in until
+# tests/bench_pulse_excel_to_json.py shows a speedup on the deployment SKU.
+SHEET_WORKERS = int(os.getenv("PULSE_SHEET_WORKERS", "1"))
+PARALLEL_MIN_BYTES = int(os.getenv("PULSE_PARALLEL_MIN_BYTES", str(2 * 1024 * 1024)))
+
+# encode_records output formats
+JSON_FORMAT = "json"
+NDJSON_FORMAT = "ndjson"
+ENCODE_CHUNK_BYTES = 256 * 1024
+
 HEADER_ROW_1 = 0
 HEADER_ROW_2 = 1
 ROW_TO_DELETE = 2
@@ -105,6 +125,68 @@ class DataRecord:
         return result
 
 
+class ColumnarRecords:
+    """
+    The records of one sheet as parallel arrays, one entry per breakdown
+    value: label codes for (section, parent_category, category, column,
+    segment) plus the value. Picklable, so sheets can be parsed in worker
+    processes and merged afterwards.
+    """
+
+    FIELDS = ("section", "parent", "category", "column", "segment")
+
+    def __init__(self) -> None:
+        self.labels: list[str] = []
+        self._codes: dict[str, int] = {}
+        # (section, parent_category) codes in order of first appearance,
+        # including records without values: they still fix the output order.
+        self.keys: list[tuple[int, int]] = []
+        self._seen_keys: set[tuple[int, int]] = set()
+        self.codes: dict[str, array] = {name: array("i") for name in self.FIELDS}
+        self.values = array("d")
+
+    def _code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def targets(self, column_mapper: ColumnMapper) -> dict[int, tuple[int, int]]:
+        """Sheet column index -> (column, segment) codes."""
+        return {
+            col_idx: (self._code(group.key), self._code(sub_column))
+            for group in column_mapper.column_groups
+            for col_idx, sub_column in group.sub_columns.items()
+        }
+
+    def add(
+        self,
+        section: str,
+        parent_category: str,
+        category: str,
+        values: dict[int, float],
+        targets: dict[int, tuple[int, int]],
+    ) -> None:
+        key = (self._code(section), self._code(parent_category))
+        if key not in self._seen_keys:
+            self._seen_keys.add(key)
+            self.keys.append(key)
+        category_code = self._code(category)
+        codes = self.codes
+
+        for col_idx, value in values.items():
+            target = targets.get(col_idx)
+            if target is None:
+                continue
+            codes["section"].append(key[0])
+            codes["parent"].append(key[1])
+            codes["category"].append(category_code)
+            codes["column"].append(target[0])
+            codes["segment"].append(target[1])
+            self.values.append(value)
+
+
 def _to_snake_case(name: str) -> str:
     result = re.sub(r"[^a-zA-Z0-9]+", "_", name.lower()).strip("_")
     return f"by_{result}"
@@ -285,11 +367,27 @@ class RecordBuilder:
 
 
 class ExcelParser:
-    def __init__(self, file_source: str | Path | BytesIO) -> None:
+    """
+    Workbook reader.
+
+    With ``read_only`` the workbook is opened in openpyxl's streaming mode:
+    rows are read lazily from the archive instead of building every cell up
+    front, so memory stays flat for large databooks. Close the parser (or
+    use it as a context manager) to release the file.
+    """
+
+    def __init__(self, file_source: str | Path | BytesIO, read_only: bool = False) -> None:
         self._file_source = file_source
+        self._read_only = read_only
         self._workbook: Workbook | None = None
         self._load_file()
 
+    def __enter__(self) -> "ExcelParser":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
     @property
     def sheet_names(self) -> list[str]:
         if self._workbook is None:
@@ -298,10 +396,7 @@ class ExcelParser:
 
     def _load_file(self) -> None:
         if isinstance(self._file_source, BytesIO):
-            try:
-                self._workbook = openpyxl.load_workbook(self._file_source, data_only=True)
-            except Exception as e:
-                raise ExcelParserError(f"Unable to parse Excel file: {e}") from e
+            self._workbook = self._open_workbook(self._file_source)
             return
 
         file_path = Path(self._file_source)
@@ -310,97 +405,141 @@ class ExcelParser:
                 f"Unsupported file format: {file_path.suffix}. "
                 f"Expected one of: {', '.join(VALID_EXTENSIONS)}"
             )
+        self._workbook = self._open_workbook(file_path)
 
+    def _open_workbook(self, source: Path | BytesIO) -> Workbook:
         try:
-            self._workbook = openpyxl.load_workbook(file_path, data_only=True)
+            return openpyxl.load_workbook(source, read_only=self._read_only, data_only=True)
         except Exception as e:
             raise ExcelParserError(f"Unable to parse Excel file: {e}") from e
 
-    def get_sheet_data(self, sheet_name: str) -> list[list[Any]]:
+    def iter_sheet_rows(self, sheet_name: str) -> Iterator[tuple[Any, ...]]:
         if self._workbook is None:
-            return []
+            return
         sheet: Worksheet = self._workbook[sheet_name]
-        return [[cell.value for cell in row] for row in sheet.iter_rows()]
+        yield from sheet.iter_rows(values_only=True)
+
+    def get_sheet_data(self, sheet_name: str) -> list[list[Any]]:
+        return [list(row) for row in self.iter_sheet_rows(sheet_name)]
+
+    def close(self) -> None:
+        if self._workbook is not None:
+            self._workbook.close()
 
 
 class SheetProcessor:
-    def __init__(self, sheet_data: list[list[Any]]) -> None:
+    """
+    Turns the rows of one sheet into records.
+
+    Rows are consumed one at a time with a single row of lookahead (the
+    hierarchy rules look at the neighbouring rows), so a lazy row iterator
+    is never materialized.
+    """
+
+    def __init__(self, sheet_data: Iterable[Sequence[Any]]) -> None:
         self._raw_data = sheet_data
-        self._cleaned_data: list[list[Any]] | None = None
         self._column_mapper: ColumnMapper | None = None
         self._row_parser: RowParser | None = None
         self._record_builder: RecordBuilder | None = None
 
     def process(self) -> list[dict[str, Any]]:
-        if len(self._raw_data) < MINIMUM_HEADER_ROWS:
-            return []
-
-        self._cleaned_data = self._prepare_data()
-        self._initialize_components()
-        return self._extract_records()
-
-    def _prepare_data(self) -> list[list[Any]]:
-        data = [row[:] for row in self._raw_data]
-        del data[ROW_TO_DELETE]
-        data = self._clean_orphan_values(data)
-
-        if data[HEADER_ROW_1] and _cell_is_empty(data[HEADER_ROW_1][CATEGORY_COL]):
-            data[HEADER_ROW_1][CATEGORY_COL] = "Category"
+        return list(self.iter_records())
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        for record in self.iter_data_records():
+            yield record.to_dict()
+
+    def to_columns(self) -> ColumnarRecords:
+        """The sheet's values as columnar records, without building a dict per row."""
+        columns = ColumnarRecords()
+        targets: dict[int, tuple[int, int]] | None = None
+        for parsed_row, section, parent in self._iter_data_rows():
+            if targets is None:
+                targets = columns.targets(self._column_mapper)
+            columns.add(section, parent, parsed_row.category or "", parsed_row.values, targets)
+        return columns
+
+    def iter_data_records(self) -> Iterator[DataRecord]:
+        for parsed_row, section, parent in self._iter_data_rows():
+            yield self._record_builder.build(parsed_row, section, parent)
+
+    def _iter_data_rows(self) -> Iterator[tuple[ParsedRow, str, str]]:
+        """Data rows with the section and parent category they fall under."""
+        rows = self._prepare_data()
+        header = list(islice(rows, MINIMUM_HEADER_ROWS))
+        if len(header) < MINIMUM_HEADER_ROWS:
+            return
 
-        return data
+        if header[HEADER_ROW_1] and _cell_is_empty(header[HEADER_ROW_1][CATEGORY_COL]):
+            header[HEADER_ROW_1][CATEGORY_COL] = "Category"
 
-    def _clean_orphan_values(self, data: list[list[Any]]) -> list[list[Any]]:
-        for row in data:
-            non_empty = [
-                (i, cell)
-                for i, cell in enumerate(row)
-                if not _cell_is_empty(cell)
-            ]
-            if len(non_empty) == 1 and non_empty[0][0] != CATEGORY_COL:
-                row[non_empty[0][0]] = None
-        return data
+        self._initialize_components(header[HEADER_ROW_1], header[HEADER_ROW_2])
+        yield from self._extract_records(rows)
 
-    def _initialize_components(self) -> None:
-        row1 = self._cleaned_data[HEADER_ROW_1]
-        row2 = self._cleaned_data[HEADER_ROW_2]
+    def _prepare_data(self) -> Iterator[list[Any]]:
+        for index, row in enumerate(self._raw_data):
+            if index == ROW_TO_DELETE:
+                continue
+            yield self._clean_orphan_values(list(row))
+
+    def _clean_orphan_values(self, row: list[Any]) -> list[Any]:
+        non_empty = [
+            (i, cell)
+            for i, cell in enumerate(row)
+            if not _cell_is_empty(cell)
+        ]
+        if len(non_empty) == 1 and non_empty[0][0] != CATEGORY_COL:
+            row[non_empty[0][0]] = None
+        return row
+
+    def _initialize_components(self, row1: list[Any], row2: list[Any]) -> None:
         self._column_mapper = ColumnMapper(row1, row2)
         self._row_parser = RowParser()
         self._record_builder = RecordBuilder(self._column_mapper)
 
-    def _extract_records(self) -> list[dict[str, Any]]:
-        data_rows = self._cleaned_data[DATA_START_ROW:]
-        parsed_rows = [self._row_parser.parse(row) for row in data_rows]
-
+    def _extract_records(
+        self, data_rows: Iterable[list[Any]]
+    ) -> Iterator[tuple[ParsedRow, str, str]]:
         current_section = ""
         current_parent = ""
-        records: list[dict[str, Any]] = []
 
-        for i, parsed_row in enumerate(parsed_rows):
+        for parsed_row, context in self._with_context(data_rows):
             if parsed_row.row_type == RowType.EMPTY:
                 continue
 
-            context = self._get_row_context(i, parsed_rows, data_rows)
-
             if parsed_row.row_type in (RowType.SECTION_HEADER, RowType.PARENT_CATEGORY):
                 current_section, current_parent = self._update_hierarchy(
                     parsed_row, context, current_section, current_parent
                 )
             elif parsed_row.row_type == RowType.DATA_ROW:
-                record = self._record_builder.build(parsed_row, current_section, current_parent)
-                records.append(record.to_dict())
+                yield parsed_row, current_section, current_parent
+
+    def _with_context(
+        self, data_rows: Iterable[list[Any]]
+    ) -> Iterator[tuple[ParsedRow, RowContext]]:
+        previous: ParsedRow | None = None
+        current: tuple[list[Any], ParsedRow] | None = None
 
-        return records
+        for row in data_rows:
+            parsed_row = self._row_parser.parse(row)
+            if current is not None:
+                yield current[1], self._get_row_context(previous, current, parsed_row)
+                previous = current[1]
+            current = (row, parsed_row)
+
+        if current is not None:
+            yield current[1], self._get_row_context(previous, current, None)
 
     def _get_row_context(
         self,
-        index: int,
-        parsed_rows: list[ParsedRow],
-        data_rows: list[list[Any]],
+        previous: ParsedRow | None,
+        current: tuple[list[Any], ParsedRow],
+        following: ParsedRow | None,
     ) -> RowContext:
-        prev_empty = index == 0 or parsed_rows[index - 1].row_type == RowType.EMPTY
-        next_empty = index == len(parsed_rows) - 1 or parsed_rows[index + 1].row_type == RowType.EMPTY
+        prev_empty = previous is None or previous.row_type == RowType.EMPTY
+        next_empty = following is None or following.row_type == RowType.EMPTY
 
-        current_row = data_rows[index]
+        current_row = current[0]
         body_cells = current_row[CATEGORY_COL + 1:]
         body_empty = all(_cell_is_empty(cell) for cell in body_cells) if body_cells else True
 
@@ -424,29 +563,132 @@ class SheetProcessor:
         return current_section, current_parent
 
 
-def _serialize_to_rows(file_source: str | Path | BytesIO) -> list[dict[str, Any]]:
-    parser = ExcelParser(file_source)
-    sheets_to_process = [s for s in parser.sheet_names if s in TARGET_SHEET_NAMES]
+def _sheets_columns(
+    file_source: str | bytes, sheet_names: list[str], read_only: bool
+) -> list[ColumnarRecords]:
+    """
+    Parse some sheets; runs in a worker process, so it opens its own
+    workbook. Opening costs about as much as parsing several sheets, hence
+    one call per worker rather than per sheet.
+    """
+    source = BytesIO(file_source) if isinstance(file_source, bytes) else file_source
+    with ExcelParser(source, read_only=read_only) as parser:
+        return [
+            SheetProcessor(parser.iter_sheet_rows(sheet_name)).to_columns()
+            for sheet_name in sheet_names
+        ]
 
-    if not sheets_to_process:
-        raise NoValidSheetsError(
-            f"No valid sheets found. Expected one of {sorted(TARGET_SHEET_NAMES)}, "
-            f"but found: {parser.sheet_names}"
-        )
 
-    all_records: list[dict[str, Any]] = []
+def _pool_context() -> multiprocessing.context.BaseContext:
+    # Forking a threaded web worker is unsafe; forkserver where available.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
 
-    for sheet_name in sheets_to_process:
-        sheet_data = parser.get_sheet_data(sheet_name)
-        processor = SheetProcessor(sheet_data)
-        all_records.extend(processor.process())
+def _source_size(file_source: str | Path | BytesIO) -> int:
+    if isinstance(file_source, BytesIO):
+        return file_source.getbuffer().nbytes
+    return Path(file_source).stat().st_size
 
-    return all_records
 
+def _serialize_to_columns(
+    file_source: str | Path | BytesIO, read_only: bool = True, workers: int | None = None
+) -> list[ColumnarRecords]:
+    workers = SHEET_WORKERS if workers is None else workers
 
-def serialize_excel(file_source: str | Path | BytesIO) -> list[dict[str, Any]]:
-    row_records = _serialize_to_rows(file_source)
-    return _group_by_column(row_records)
+    with ExcelParser(file_source, read_only=read_only) as parser:
+        sheets_to_process = [s for s in parser.sheet_names if s in TARGET_SHEET_NAMES]
+
+        if not sheets_to_process:
+            raise NoValidSheetsError(
+                f"No valid sheets found. Expected one of {sorted(TARGET_SHEET_NAMES)}, "
+                f"but found: {parser.sheet_names}"
+            )
+
+        if (
+            workers <= 1
+            or len(sheets_to_process) <= 1
+            or _source_size(file_source) < PARALLEL_MIN_BYTES
+        ):
+            return [
+                SheetProcessor(parser.iter_sheet_rows(sheet_name)).to_columns()
+                for sheet_name in sheets_to_process
+            ]
+
+    source = file_source.getvalue() if isinstance(file_source, BytesIO) else str(file_source)
+    workers = min(workers, len(sheets_to_process))
+    # Contiguous slices keep the sheet order when the results are joined
+    size = -(-len(sheets_to_process) // workers)
+    slices = [sheets_to_process[i:i + size] for i in range(0, len(sheets_to_process), size)]
+    with ProcessPoolExecutor(max_workers=len(slices), mp_context=_pool_context()) as pool:
+        results = pool.map(
+            _sheets_columns, [source] * len(slices), slices, [read_only] * len(slices)
+        )
+        return [columns for chunk in results for columns in chunk]
+
+
+def serialize_excel(
+    file_source: str | Path | BytesIO, read_only: bool = True, workers: int | None = None
+) -> list[dict[str, Any]]:
+    """
+    Serialize the Pulse sheets of a databook into grouped records.
+
+    By default rows are streamed from a read-only workbook into columnar
+    arrays, so no sheet is held in memory; ``read_only=False`` loads the
+    full workbook instead. Large books with several target sheets are
+    parsed on up to ``workers`` processes (``PULSE_SHEET_WORKERS``).
+    """
+    sheets = _serialize_to_columns(file_source, read_only=read_only, workers=workers)
+    return _group_columns(sheets)
+
+
+def encode_records(
+    records: Iterable[dict[str, Any]],
+    output_format: str = JSON_FORMAT,
+    compress: bool = False,
+    chunk_bytes: int = ENCODE_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Encode records incrementally as compact UTF-8 JSON.
+
+    ``json`` produces one array, ``ndjson`` one record per line. With
+    ``compress`` the output is a gzip stream. Yields chunks of roughly
+    ``chunk_bytes``, so the whole document is never held in memory.
+    """
+    if output_format not in (JSON_FORMAT, NDJSON_FORMAT):
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31: gzip container
+
+    def pieces() -> Iterator[str]:
+        if output_format == NDJSON_FORMAT:
+            for record in records:
+                yield encoder.encode(record)
+                yield "\n"
+            return
+        yield "["
+        for index, record in enumerate(records):
+            if index:
+                yield ","
+            yield encoder.encode(record)
+        yield "]"
+
+    buffer: list[bytes] = []
+    size = 0
+    for piece in pieces():
+        data = piece.encode("utf-8")
+        if compressor:
+            data = compressor.compress(data)
+        buffer.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if compressor:
+        buffer.append(compressor.flush())
+    if buffer:
+        yield b"".join(buffer)
 
 
 def serialize_to_file(input_path: str | Path, output_path: str | Path) -> None:
@@ -455,41 +697,100 @@ def serialize_to_file(input_path: str | Path, output_path: str | Path) -> None:
         json.dump(records, f, indent=2, ensure_ascii=False)
 
 
-def _group_by_column(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    if not records:
+def _round2(values: np.ndarray) -> np.ndarray:
+    """``round(value, 2)`` for an array, exact like the builtin."""
+    rounded = np.round(values, 2)
+    # np.round scales by 100 first, which can tip values sitting on a
+    # half-cent; those few are rounded by Python.
+    with np.errstate(invalid="ignore"):  # inf/nan never match
+        scaled = values * 100
+        near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        rounded[near_half] = [round(v, 2) for v in values[near_half].tolist()]
+    return rounded
+
+
+def _group_columns(sheets: list[ColumnarRecords]) -> list[dict[str, Any]]:
+    """
+    Group values by (section, parent_category) and column.
+
+    Groups keep the order in which their first record appeared, columns
+    are sorted, segments and categories keep their first appearance, and
+    a repeated category keeps its last value.
+    """
+    labels: dict[str, int] = {}
+    key_rank: dict[tuple[int, int], int] = {}
+    parts: dict[str, list[np.ndarray]] = {name: [] for name in ColumnarRecords.FIELDS}
+    values_parts: list[np.ndarray] = []
+
+    for sheet in sheets:
+        remap = np.array(
+            [labels.setdefault(label, len(labels)) for label in sheet.labels], dtype=np.int64
+        )
+        for section, parent in sheet.keys:
+            key_rank.setdefault((int(remap[section]), int(remap[parent])), len(key_rank))
+        for name in ColumnarRecords.FIELDS:
+            parts[name].append(remap[np.asarray(sheet.codes[name], dtype=np.int64)])
+        values_parts.append(np.asarray(sheet.values, dtype=np.float64))
+
+    values = np.concatenate(values_parts) if values_parts else np.empty(0)
+    if not len(values):
         return []
-
-    by_section_parent: dict[tuple[str, str], list[dict[str, Any]]] = defaultdict(list)
-    by_columns: set[str] = set()
-
-    for record in records:
-        key = (record.get("section", ""), record.get("parent_category", ""))
-        by_section_parent[key].append(record)
-        by_columns.update(k for k in record if k.startswith("by_"))
+    names = list(labels)  # dicts keep insertion order, so names[code] is the label
+    codes = {name: np.concatenate(arrays) for name, arrays in parts.items()}
+    n_labels = len(names)
+
+    # Group rank: order of the group's first record
+    pairs, pair_index = np.unique(
+        codes["section"] * n_labels + codes["parent"], return_inverse=True
+    )
+    group = np.array(
+        [key_rank[(int(p) // n_labels, int(p) % n_labels)] for p in pairs], dtype=np.int64
+    )[pair_index]
+
+    # Column rank: sorted by name
+    column_codes, column_index = np.unique(codes["column"], return_inverse=True)
+    by_name = np.argsort(np.array([names[c] for c in column_codes], dtype=object), kind="stable")
+    column_rank = np.empty(len(column_codes), dtype=np.int64)
+    column_rank[by_name] = np.arange(len(column_codes))
+    column = column_rank[column_index]
+
+    # First appearance of each segment within its (group, column), and of
+    # each category within its (group, column, segment)
+    segment_key = (group * len(column_codes) + column) * n_labels + codes["segment"]
+    _, segment_first, segment_index = np.unique(
+        segment_key, return_index=True, return_inverse=True
+    )
+    cell_key = segment_key * n_labels + codes["category"]
+    _, cell_first, cell_index = np.unique(cell_key, return_index=True, return_inverse=True)
+    # Last write wins: first occurrence in the reversed entries
+    _, cell_last_reversed = np.unique(cell_key[::-1], return_index=True)
+    cell_last = len(cell_key) - 1 - cell_last_reversed
+
+    order = np.lexsort((
+        cell_first,
+        segment_first[segment_index[cell_first]],
+        column[cell_first],
+        group[cell_first],
+    ))
+    rows = cell_last[order]
+    rounded = _round2(values[rows]).tolist()
 
     result: list[dict[str, Any]] = []
-
-    for (section, parent_category), group_records in by_section_parent.items():
-        for column in sorted(by_columns):
-            data: dict[str, dict[str, float]] = defaultdict(dict)
-
-            for record in group_records:
-                category = record.get("category", "Unknown")
-                column_data = record.get(column, {})
-
-                if not isinstance(column_data, dict):
-                    continue
-
-                for segment, value in column_data.items():
-                    data[segment][category] = round(value, 2) if isinstance(value, float) else value
-
-            if data:
-                result.append({
-                    "section": section,
-                    "parent_category": parent_category,
-                    "column": column,
-                    "data": dict(data),
-                })
+    current: tuple[int, int] | None = None
+    data: dict[str, dict[str, float]] = {}
+    for row, value in zip(rows.tolist(), rounded):
+        group_column = (int(group[row]), int(column[row]))
+        if group_column != current:
+            current = group_column
+            data = {}
+            result.append({
+                "section": names[codes["section"][row]],
+                "parent_category": names[codes["parent"][row]],
+                "column": names[codes["column"][row]],
+                "data": data,
+            })
+        data.setdefault(names[codes["segment"][row]], {})[names[codes["category"][row]]] = value
 
     return result
 
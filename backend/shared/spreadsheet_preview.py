@@ -0,0 +1,123 @@
+# backend/shared/spreadsheet_preview.py
+"""
+Converted-preview caching for spreadsheet citations.
+
+``get_csv_preview`` converts CSV to XLSX once per blob version, keyed by
+ETag, in a byte-bounded memory LRU backed by a directory on local disk.
+Blob resolution lives in ``shared.citation_resolver``.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from io import BytesIO
+from typing import Optional, Tuple
+
+import pandas as pd
+from cachetools import LRUCache
+
+log = logging.getLogger(__name__)
+
+PREVIEW_MEMORY_CACHE_BYTES = int(os.getenv("PREVIEW_MEMORY_CACHE_BYTES", str(64 * 1024 * 1024)))
+PREVIEW_DISK_CACHE_BYTES = int(os.getenv("PREVIEW_DISK_CACHE_BYTES", str(512 * 1024 * 1024)))
+PREVIEW_CACHE_DIR = os.getenv(
+    "PREVIEW_CACHE_DIR", os.path.join(tempfile.gettempdir(), "spreadsheet-previews")
+)
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def csv_to_xlsx(data: bytes) -> bytes:
+    """Convert CSV bytes (UTF-8, falling back to Latin-1) to an XLSX workbook."""
+    try:
+        df = pd.read_csv(BytesIO(data))
+    except UnicodeDecodeError:
+        df = pd.read_csv(BytesIO(data), encoding="latin1")
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Sheet1")
+    return output.getvalue()
+
+
+class PreviewCache:
+    """Converted previews keyed by (blob name, ETag): memory LRU over a disk directory."""
+
+    def __init__(
+        self,
+        directory: str = PREVIEW_CACHE_DIR,
+        memory_bytes: int = PREVIEW_MEMORY_CACHE_BYTES,
+        disk_bytes: int = PREVIEW_DISK_CACHE_BYTES,
+    ):
+        self._directory = directory
+        self._disk_bytes = disk_bytes
+        self._memory: LRUCache = LRUCache(maxsize=memory_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+
+    def _path(self, key: Tuple[str, str]) -> str:
+        digest = hashlib.sha256("\0".join(key).encode()).hexdigest()
+        return os.path.join(self._directory, f"{digest}.xlsx")
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+        if data is not None:
+            return data
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: Tuple[str, str], data: bytes) -> None:
+        self._remember(key, data)
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            log.warning(f"[preview-cache] could not write disk cache: {e}")
+
+    def _remember(self, key: Tuple[str, str], data: bytes) -> None:
+        if len(data) > self._memory.maxsize:
+            return
+        with self._lock:
+            self._memory[key] = data
+
+    def _prune_disk(self) -> None:
+        """Delete least recently written previews beyond the disk budget."""
+        entries = []
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(".xlsx"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+preview_cache = PreviewCache()
+
+
+def get_csv_preview(blob_client, blob_name: str, etag: str) -> bytes:
+    """Return the XLSX preview of a CSV blob version, converting it only on a cache miss."""
+    key = (blob_name, etag)
+    data = preview_cache.get(key)
+    if data is None:
+        data = csv_to_xlsx(blob_client.download_blob().readall())
+        preview_cache.put(key, data)
+    return data
@@ -0,0 +1,128 @@
+# backend/shared/tier_catalog.py
+"""
+In-memory catalog of subscription tier documents.
+
+Tier documents are read on almost every gated request but change only when
+pricing is edited. The catalog loads all of them once, serves lookups from a
+dict, and a daemon thread re-checks the container's ``(id, _etag)`` pairs on
+an interval so edits are picked up without a restart.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+TierVersion = FrozenSet[Tuple[str, str]]
+
+
+class SubscriptionTierCatalog:
+    """
+    Process-wide, read-mostly view of the ``subscriptionsTiers`` container.
+
+    Args:
+        loader: Returns every tier document (e.g. ``get_subscription_tiers``).
+        version_probe: Returns the current ``(id, _etag)`` pairs of the tier
+            documents; a different result means the catalog is stale.
+        refresh_interval: Seconds between background version checks.
+            ``0`` disables the background thread.
+
+    Returned tier documents are shared between requests and must be treated
+    as read-only.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Iterable[dict]],
+        version_probe: Callable[[], TierVersion],
+        refresh_interval: int = 300,
+    ):
+        self._loader = loader
+        self._version_probe = version_probe
+        self._refresh_interval = refresh_interval
+        self._tiers: Dict[str, dict] = {}
+        self._version: Optional[TierVersion] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "refresh_errors": 0}
+
+    def get(self, tier_id: str) -> Optional[dict]:
+        """Return the tier document for ``tier_id`` or None if it is not cached."""
+        if not self._loaded:
+            self._load_once()
+        tier = self._tiers.get(tier_id)
+        if tier is None:
+            self._stats["misses"] += 1
+        else:
+            self._stats["hits"] += 1
+        return tier
+
+    def put(self, tier: dict) -> None:
+        """Add a tier that was read directly from Cosmos after a catalog miss."""
+        tier_id = tier.get("id")
+        if not tier_id:
+            return
+        with self._lock:
+            tiers = dict(self._tiers)
+            tiers[tier_id] = tier
+            self._tiers = tiers
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the tiers if their version changed (or unconditionally when forced).
+
+        Returns:
+            bool: True if the catalog contents were replaced.
+        """
+        version = self._version_probe()
+        if not force and self._loaded and version == self._version:
+            return False
+
+        tiers = {tier["id"]: tier for tier in self._loader() if tier.get("id")}
+        if not tiers and self._tiers:
+            # get_subscription_tiers() returns [] on Cosmos errors; keep serving
+            # the last good snapshot instead of wiping it.
+            log.warning("[tier_catalog] reload returned no tiers; keeping previous snapshot")
+            return False
+
+        with self._lock:
+            self._tiers = tiers
+            self._version = version
+            self._loaded = True
+            self._stats["reloads"] += 1
+        log.info("[tier_catalog] loaded %d subscription tiers", len(tiers))
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return hit/miss/reload counters and the number of cached tiers."""
+        return {**self._stats, "size": len(self._tiers)}
+
+    def _load_once(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._start_refresher()
+        # Probe and load outside the lock; reload() takes it only for the swap.
+        self.reload(force=True)
+
+    def _start_refresher(self) -> None:
+        # Started lazily so each pre-forked worker gets its own thread.
+        if self._refresh_interval <= 0 or self._refresher is not None:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="tier-catalog-refresh", daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(self._refresh_interval)
+            try:
+                self.reload()
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                log.warning("[tier_catalog] background refresh failed: %s", e)
@@ -0,0 +1,115 @@
+"""
+Benchmark for utils.get_users.
+
+Builds an organization whose invitations cover every state get_users
+handles, serves it from fake containers that sleep for a simulated Cosmos
+round trip, and times:
+- serial: the previous user read, serial batches of 10 ids with two scans
+  of the invitation list per user;
+- batched: the current get_users, USERS_BATCH_SIZE ids per query on up to
+  USERS_READ_CONCURRENCY threads with invitations indexed per user.
+
+    cd backend && python -m tests.bench_get_users [--invitations 1000] [--round-trip-ms 2]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("AZURE_DB_ID", "bench_db_id")
+os.environ.setdefault("AZURE_DB_NAME", "bench_db_name")
+
+import utils
+
+
+class SleepingContainer:
+    def __init__(self, answer, round_trip):
+        self.answer = answer
+        self.round_trip = round_trip
+        self.queries = 0
+
+    def query_items(self, query, parameters=None, **kwargs):
+        self.queries += 1
+        time.sleep(self.round_trip)
+        params = {p["name"]: p["value"] for p in parameters or []}
+        return iter(self.answer(query, params))
+
+
+def build_containers(invitation_count: int, round_trip: float) -> dict:
+    invitations = []
+    users = {"owner": {"id": "owner", "data": {"name": "Owner", "email": "owner@x.com"}}}
+    for i in range(invitation_count):
+        kind = i % 4
+        uid = f"user{i}"
+        if kind == 0:  # active member
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": True})
+        elif kind == 1:  # inactive, not redeemed -> guest row
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": False,
+                                "invited_user_email": f"{uid}@x.com", "nickname": uid})
+        elif kind == 2:  # inactive, redeemed -> hidden
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": False,
+                                "redeemed_at": "2024-01-01"})
+        else:  # invitation without a user yet
+            invitations.append({"id": f"inv{i}", "role": "user", "active": False,
+                                "invited_user_email": f"new{i}@x.com"})
+            continue
+        users[uid] = {"id": uid, "data": {"name": uid, "email": f"{uid}@x.com"}}
+
+    return {
+        "invitations": SleepingContainer(lambda q, p: invitations, round_trip),
+        "organizations": SleepingContainer(lambda q, p: ["owner"], round_trip),
+        "users": SleepingContainer(
+            lambda q, p: [users[u] for u in p["@user_ids"] if u in users], round_trip
+        ),
+    }
+
+
+def serial(containers: dict) -> list:
+    """The previous user read: serial batches of 10, two invitation scans per user."""
+    invitations = list(containers["invitations"].query_items("SELECT * FROM c"))
+    user_ids = ["owner"] + [i["invited_user_id"] for i in invitations if i.get("invited_user_id")]
+    rows = []
+    for i in range(0, len(user_ids), 10):
+        batch = containers["users"].query_items(
+            "SELECT * FROM c WHERE c.id IN (...)",
+            parameters=[{"name": "@user_ids", "value": user_ids[i:i + 10]}],
+        )
+        for user in batch:
+            uid = user["id"]
+            pending = next((item for item in invitations if item.get("invited_user_id") == uid
+                            and item.get("active") == False and not item.get("redeemed_at")), None)
+            redeemed = next((item for item in invitations if item.get("invited_user_id") == uid
+                             and item.get("active") == False and item.get("redeemed_at")), None)
+            if pending or not redeemed:
+                rows.append(user)
+    return rows
+
+
+def timed(func, containers: dict, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        containers["users"].queries = 0
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best, containers["users"].queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--invitations", type=int, default=1000)
+    parser.add_argument("--round-trip-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    containers = build_containers(args.invitations, args.round_trip_ms / 1000)
+    utils.get_cosmos_container = containers.__getitem__
+    print(f"{args.invitations} invitations, {args.round_trip_ms:g} ms per round trip")
+
+    before, before_queries = timed(lambda: serial(containers), containers, args.repeat)
+    after, after_queries = timed(lambda: utils.get_users("org1"), containers, args.repeat)
+    print(f"{'serial':<8} {before * 1000:8.1f} ms {before_queries:>4} user queries")
+    print(f"{'batched':<8} {after * 1000:8.1f} ms {after_queries:>4} user queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark for shared/pulse_excel_to_json.serialize_excel.
+
+Builds a synthetic databook with 50 Pulse-shaped sheets and times:
+- rows: the previous path, row dicts regrouped with dict-of-dict pivots;
+- columnar: columnar records grouped with NumPy, sheets parsed serially;
+- columnar+pool: the same with sheets parsed in a process pool.
+
+Run it on the deployment SKU before raising PULSE_SHEET_WORKERS above 1.
+
+Every target sheet name is accepted for the run, since real databooks
+only carry "Full Run %" and "%".
+
+    cd backend && python -m tests.bench_pulse_excel_to_json [--sheets 50] [--workers 4]
+"""
+import argparse
+import os
+import random
+import time
+from collections import defaultdict
+from io import BytesIO
+
+import openpyxl
+
+from shared import pulse_excel_to_json
+from shared.pulse_excel_to_json import ExcelParser, SheetProcessor, serialize_excel
+
+SEGMENTS = ["Male", "Female", "18-34", "35-54", "55+", "North", "South", "East", "West"]
+
+
+def build_databook(sheets: int, sections: int, categories: int, seed: int = 0) -> bytes:
+    rnd = random.Random(seed)
+    workbook = openpyxl.Workbook(write_only=True)
+    for n in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet {n}")
+        sheet.append([None, "Total", None, "Gender", None, "Age", None, None, "Region"])
+        sheet.append([None, "N", "%"] + SEGMENTS)
+        sheet.append(["Base", 1000, None] + [500] * len(SEGMENTS))
+        for s in range(sections):
+            sheet.append([])
+            sheet.append([f"QUESTION {s}"])
+            sheet.append([f"Statement {s}"])
+            sheet.append([])
+            for c in range(categories):
+                sheet.append(
+                    [f"Answer {c}", rnd.randint(0, 1000), rnd.random()]
+                    + [rnd.random() for _ in SEGMENTS]
+                )
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def serialize_rows(data: bytes) -> list:
+    """The previous path: row dicts, then a dict-of-dict pivot."""
+    with ExcelParser(BytesIO(data), read_only=True) as parser:
+        names = [s for s in parser.sheet_names if s in pulse_excel_to_json.TARGET_SHEET_NAMES]
+        records = [
+            record
+            for name in names
+            for record in SheetProcessor(parser.iter_sheet_rows(name)).iter_records()
+        ]
+
+    by_section_parent = defaultdict(list)
+    by_columns = set()
+    for record in records:
+        by_section_parent[(record["section"], record["parent_category"])].append(record)
+        by_columns.update(k for k in record if k.startswith("by_"))
+
+    result = []
+    for (section, parent_category), group_records in by_section_parent.items():
+        for column in sorted(by_columns):
+            data = defaultdict(dict)
+            for record in group_records:
+                for segment, value in record.get(column, {}).items():
+                    data[segment][record["category"]] = round(value, 2)
+            if data:
+                result.append({
+                    "section": section,
+                    "parent_category": parent_category,
+                    "column": column,
+                    "data": dict(data),
+                })
+    return result
+
+
+def timed(label: str, func, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<16} {best:8.3f} s")
+    return result, best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sheets", type=int, default=50)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--categories", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = build_databook(args.sheets, args.sections, args.categories)
+    pulse_excel_to_json.TARGET_SHEET_NAMES = frozenset(f"Sheet {n}" for n in range(args.sheets))
+    pulse_excel_to_json.PARALLEL_MIN_BYTES = 0
+    print(f"{args.sheets} sheets, {len(data) / 1e6:.1f} MB, {args.workers} workers")
+
+    rows, rows_time = timed("rows", lambda: serialize_rows(data), args.repeat)
+    columnar, columnar_time = timed(
+        "columnar", lambda: serialize_excel(BytesIO(data), workers=1), args.repeat
+    )
+    pooled, pooled_time = timed(
+        "columnar+pool", lambda: serialize_excel(BytesIO(data), workers=args.workers), args.repeat
+    )
+    assert rows == columnar == pooled, "outputs differ"
+    print(f"speedup: columnar x{rows_time / columnar_time:.2f}, "
+          f"columnar+pool x{rows_time / pooled_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark for shared/cosmo_db.get_user_organizations.
+
+Runs against fake containers that sleep for a simulated Cosmos round trip
+and times, for users invited to 1/10/30/50 organizations:
+- per-org: the previous path, one read_item per invited organization;
+- batched: the current path, ids read with a batched ARRAY_CONTAINS query.
+
+    cd backend && python -m tests.bench_user_organizations [--round-trip-ms 2]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("AZURE_DB_ID", "bench_db_id")
+os.environ.setdefault("AZURE_DB_NAME", "bench_db_name")
+
+import shared.cosmo_db as cosmo_db
+
+
+class FakePagedResult(list):
+    def by_page(self):
+        return iter([list(self)])
+
+
+class SleepingContainer:
+    """Answers the queries get_user_organizations issues, one sleep per round trip."""
+
+    def __init__(self, docs, round_trip):
+        self.docs = docs
+        self.round_trip = round_trip
+        self.round_trips = 0
+
+    def _trip(self):
+        self.round_trips += 1
+        time.sleep(self.round_trip)
+
+    def read_item(self, item, partition_key):
+        self._trip()
+        return self.docs[item]
+
+    def query_items(self, query, parameters=None, **kwargs):
+        self._trip()
+        params = {p["name"]: p["value"] for p in parameters or []}
+        if "@org_ids" in params:
+            return FakePagedResult(self.docs[i] for i in params["@org_ids"] if i in self.docs)
+        if "invited_user_id" in query:
+            return FakePagedResult(
+                {"organization_id": d["organization_id"]}
+                for d in self.docs.values()
+                if d["invited_user_id"] == params["@user_id"]
+            )
+        return FakePagedResult(d for d in self.docs.values() if d.get("owner") == params["@user_id"])
+
+
+def build_containers(org_count: int, round_trip: float) -> dict:
+    orgs = {
+        f"org{i}": {"id": f"org{i}", "name": f"Org {i}", "owner": "someone-else"}
+        for i in range(org_count)
+    }
+    invitations = {
+        f"inv{i}": {"id": f"inv{i}", "organization_id": f"org{i}", "invited_user_id": "consultant"}
+        for i in range(org_count)
+    }
+    return {
+        "organizations": SleepingContainer(orgs, round_trip),
+        "invitations": SleepingContainer(invitations, round_trip),
+    }
+
+
+def per_org(containers: dict) -> list:
+    """The previous path: invitations, owned orgs, then one read per invited org."""
+    invited = containers["invitations"].query_items(
+        "SELECT c.organization_id FROM c WHERE c.invited_user_id = @user_id",
+        parameters=[{"name": "@user_id", "value": "consultant"}],
+    )
+    organizations = list(containers["organizations"].query_items(
+        "SELECT * FROM c WHERE c.owner = @user_id",
+        parameters=[{"name": "@user_id", "value": "consultant"}],
+    ))
+    for inv in invited:
+        org_id = inv["organization_id"]
+        organizations.append(containers["organizations"].read_item(org_id, partition_key=org_id))
+    return organizations
+
+
+def timed(func, containers: dict, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        for container in containers.values():
+            container.round_trips = 0
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best, sum(c.round_trips for c in containers.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--orgs", type=int, nargs="+", default=[1, 10, 30, 50])
+    parser.add_argument("--round-trip-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.round_trip_ms:g} ms per round trip")
+    print(f"{'orgs':>5} {'per-org':>10} {'trips':>6} {'batched':>10} {'trips':>6}")
+    for org_count in args.orgs:
+        containers = build_containers(org_count, args.round_trip_ms / 1000)
+        cosmo_db.get_cosmos_container = containers.__getitem__
+        before, before_trips = timed(lambda: per_org(containers), containers, args.repeat)
+        after, after_trips = timed(
+            lambda: cosmo_db.get_user_organizations("consultant"), containers, args.repeat
+        )
+        print(f"{org_count:>5} {before * 1000:>7.1f} ms {before_trips:>6} "
+              f"{after * 1000:>7.1f} ms {after_trips:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ import pytest
 # Set environment variables BEFORE any modules are imported
 os.environ["AZURE_DB_ID"] = "test_db_id"
 os.environ["AZURE_DB_NAME"] = "test_db_name"
+# Tests must not share generated descriptions through a persistent cache
+os.environ["DESCRIPTION_CACHE_BACKEND"] = "off"
 
 # Mock the auth_required decorator at MODULE LEVEL before any test files import route modules
 # This ensures the decorator is mocked BEFORE any blueprints are loaded
@@ -68,6 +70,16 @@ def fake_cosmos_db(monkeypatch, cosmo_db_module):
     return fake
 
 
+@pytest.fixture(autouse=True)
+def reset_membership_cache():
+    """Membership lookups are cached process-wide; keep tests isolated."""
+    from shared import membership_cache
+
+    membership_cache.reset()
+    yield
+    membership_cache.reset()
+
+
 @pytest.fixture(autouse=True)
 def mock_kv(monkeypatch):
     import shared.clients as clients
@@ -82,6 +94,7 @@ def mock_kv(monkeypatch):
     monkeypatch.setattr(
         clients, "get_azure_key_vault_secret", fake_get_secret, raising=True
     )
+    clients.secret_cache.reset()
 
     # Ensure app.py re-import uses the monkeypatched function
     if "app" in sys.modules:
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+import pytest
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+
+from shared import activity_rollups
+
+DAY1 = int(datetime(2025, 3, 1, 9, tzinfo=timezone.utc).timestamp())
+DAY2 = int(datetime(2025, 3, 2, 9, tzinfo=timezone.utc).timestamp())
+
+
+class FakeRollupContainer:
+    def __init__(self):
+        self.items = {}
+
+    def patch_item(self, item, partition_key, patch_operations):
+        if item not in self.items:
+            raise CosmosResourceNotFoundError(message="not found")
+        doc = self.items[item]
+        for op in patch_operations:
+            field = op["path"].lstrip("/")
+            if op["op"] == "incr":
+                doc[field] = doc.get(field, 0) + op["value"]
+            else:
+                doc[field] = op["value"]
+        return doc
+
+    def create_item(self, body):
+        self.items[body["id"]] = dict(body)
+        return body
+
+    def upsert_item(self, body):
+        self.items[body["id"]] = dict(body)
+        return body
+
+    def query_items(self, query, parameters=None, **kwargs):
+        params = {p["name"]: p["value"] for p in parameters or []}
+        rows = list(self.items.values())
+        if "@organization_id" in params:
+            rows = [r for r in rows if r["organizationId"] == params["@organization_id"]]
+        if "@start" in params:
+            rows = [r for r in rows if params["@start"] <= r["dayStart"] <= params["@end"]]
+        return rows
+
+
+class FakeUsersContainer:
+    def query_items(self, query, parameters=None, **kwargs):
+        return [{"id": uid, "name": uid.title()} for uid in parameters[0]["value"]]
+
+
+@pytest.fixture
+def rollups(monkeypatch):
+    container = FakeRollupContainer()
+    containers = {
+        activity_rollups.ROLLUPS_CONTAINER: container,
+        "users": FakeUsersContainer(),
+    }
+    monkeypatch.setattr(activity_rollups.clients, "get_cosmos_container", containers.__getitem__)
+    return container
+
+
+def test_counters_accumulate_per_user_and_day(rollups):
+    activity_rollups.record_session("org1", "alice", DAY1)
+    activity_rollups.record_session("org1", "alice", DAY1 + 60)
+    activity_rollups.record_user_message("org1", "alice", DAY1, new_conversation=True)
+    activity_rollups.record_user_message("org1", "alice", DAY1)
+    activity_rollups.record_session("org1", "alice", DAY2)
+
+    assert len(rollups.items) == 2
+    summary = activity_rollups.get_activity_summary("org1")
+
+    assert summary == [
+        {
+            "user_id": "alice",
+            "organization_id": "org1",
+            "session_count": 3,
+            "first_login_date": DAY1,
+            "conversation_count": 1,
+            "message_count": 2,
+            "user_name": "Alice",
+        }
+    ]
+
+
+def test_date_range_uses_day_buckets(rollups):
+    activity_rollups.record_session("org1", "alice", DAY1)
+    activity_rollups.record_session("org1", "alice", DAY2)
+
+    summary = activity_rollups.get_activity_summary("org1", DAY2, DAY2 + 3600)
+
+    assert summary[0]["session_count"] == 1
+    assert summary[0]["first_login_date"] == DAY2
+
+
+def test_users_without_sessions_are_omitted(rollups):
+    activity_rollups.record_user_message("org1", "bob", DAY1, new_conversation=True)
+
+    assert activity_rollups.get_activity_summary("org1") == []
+
+
+def test_first_session_after_message_sets_first_login(rollups):
+    activity_rollups.record_user_message("org1", "alice", DAY1)
+    activity_rollups.record_session("org1", "alice", DAY1 + 120)
+
+    assert activity_rollups.get_activity_summary("org1")[0]["first_login_date"] == DAY1 + 120
+
+
+def test_build_rollups_from_existing_data():
+    logs = [{"userId": "alice", "timestamp": DAY1}, {"userId": "alice", "timestamp": DAY1 - 60}]
+    conversations = [{"user_id": "alice", "start_date": "2025-03-01 10:00:00", "user_messages": 4}]
+
+    rollups = activity_rollups._build_rollups("org1", logs, conversations)
+
+    (doc,) = rollups.values()
+    assert doc["sessionCount"] == 2
+    assert doc["firstLoginTs"] == DAY1 - 60
+    assert doc["conversationCount"] == 1
+    assert doc["messageCount"] == 4
+
+
+def test_submitted_message_is_recorded_in_the_background(rollups):
+    activity_rollups.submit_user_message("org1", "alice", DAY1, new_conversation=True).result(timeout=5)
+    activity_rollups.record_session("org1", "alice", DAY1)
+
+    [summary] = activity_rollups.get_activity_summary("org1")
+    assert (summary["conversation_count"], summary["message_count"]) == (1, 1)
@@ -0,0 +1,242 @@
+import threading
+import types
+from datetime import datetime, timedelta, timezone
+
+from shared import folder_jobs
+from shared.blob_storage import BLOB_BATCH_SIZE, BlobStorageManager
+
+
+class FakePages:
+    def __init__(self, names, page_size):
+        self.names = names
+        self.page_size = page_size
+        self.offset = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.offset >= len(self.names):
+            raise StopIteration
+        chunk = self.names[self.offset:self.offset + self.page_size]
+        self.offset += self.page_size
+        return iter([types.SimpleNamespace(name=n) for n in chunk])
+
+
+class FakeBlobClient:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+        self.url = f"https://acct/documents/{name}"
+
+    def start_copy_from_url(self, source_url):
+        source = source_url.rsplit("/documents/", 1)[1]
+        if source in self.container.copy_failing:
+            raise RuntimeError("copy rejected")
+        self.container.names.add(self.name)
+        self.container.metadata[self.name] = self.container.metadata.get(source)
+        if source in self.container.slow:
+            self.container.polls[self.name] = 2
+            return {"copy_status": "pending", "copy_id": "c"}
+        return {"copy_status": "success", "copy_id": "c"}
+
+    def exists(self):
+        return self.name in self.container.names
+
+    def get_blob_properties(self):
+        remaining = self.container.polls.get(self.name, 0)
+        self.container.polls[self.name] = remaining - 1
+        status = "pending" if remaining > 0 else "success"
+        return types.SimpleNamespace(copy=types.SimpleNamespace(status=status, id="c"))
+
+
+class FakeContainerClient:
+    def __init__(self, names, failing=(), copy_failing=(), slow=()):
+        self.names = set(names)
+        self.failing = set(failing)
+        self.copy_failing = set(copy_failing)
+        self.slow = set(slow)
+        self.polls = {}
+        self.metadata = {n: {"k": n} for n in names}
+        self.batch_sizes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return True
+
+    def list_blobs(self, name_starts_with=None, results_per_page=None):
+        names = sorted(n for n in self.names if n.startswith(name_starts_with))
+        blobs = [types.SimpleNamespace(name=n) for n in names]
+        return _Listing(blobs, lambda: FakePages(names, results_per_page))
+
+    def get_blob_client(self, name):
+        return FakeBlobClient(self, name)
+
+    def delete_blobs(self, *names, raise_on_any_failure=True):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.batch_sizes.append(len(names))
+        responses = []
+        for name in names:
+            if name in self.failing:
+                responses.append(types.SimpleNamespace(status_code=500, reason="boom"))
+            else:
+                with self._lock:
+                    self.names.discard(name)
+                responses.append(types.SimpleNamespace(status_code=202, reason="Accepted"))
+        with self._lock:
+            self.in_flight -= 1
+        return iter(responses)
+
+
+class _Listing(list):
+    """Iterable like ItemPaged, with by_page()."""
+
+    def __init__(self, blobs, by_page):
+        super().__init__(blobs)
+        self.by_page = by_page
+
+
+def _manager(container):
+    manager = BlobStorageManager.__new__(BlobStorageManager)
+    manager.blob_service_client = types.SimpleNamespace(get_container_client=lambda name: container)
+    return manager
+
+
+def test_delete_prefix_uses_bounded_batches():
+    names = [f"org/big/{n:05d}.pdf" for n in range(1000)] + ["org/keep.pdf"]
+    container = FakeContainerClient(names)
+    batches = []
+
+    totals = _manager(container).delete_prefix(
+        "documents", "org/big/", max_workers=3, on_batch=lambda d, f: batches.append(len(d))
+    )
+
+    assert totals == {"deleted_count": 1000, "failed_count": 0}
+    assert container.names == {"org/keep.pdf"}
+    assert max(container.batch_sizes) == BLOB_BATCH_SIZE
+    assert len(container.batch_sizes) == 4
+    assert container.max_in_flight <= 3
+    assert sum(batches) == 1000
+
+
+def test_failures_are_reported_and_a_rerun_resumes():
+    names = [f"org/f/{n}.pdf" for n in range(10)]
+    container = FakeContainerClient(names, failing={"org/f/3.pdf"})
+    failures = []
+
+    totals = _manager(container).delete_prefix(
+        "documents", "org/f/", on_batch=lambda d, f: failures.extend(f)
+    )
+
+    assert totals == {"deleted_count": 9, "failed_count": 1}
+    assert failures[0]["blob"] == "org/f/3.pdf"
+
+    container.failing.clear()
+    rerun = _manager(container).delete_prefix("documents", "org/f/")
+    assert rerun == {"deleted_count": 1, "failed_count": 0}
+    assert container.names == set()
+
+
+def test_interrupted_jobs_become_resumable_once_stale():
+    fresh = datetime.now(timezone.utc).isoformat()
+    stale = (
+        datetime.now(timezone.utc) - timedelta(seconds=folder_jobs.FOLDER_JOB_STALE_SECONDS + 1)
+    ).isoformat()
+
+    assert not folder_jobs.is_resumable({"status": folder_jobs.RUNNING, "updated_at": fresh})
+    assert folder_jobs.is_resumable({"status": folder_jobs.RUNNING, "updated_at": stale})
+    assert folder_jobs.is_resumable({"status": folder_jobs.PARTIAL, "updated_at": fresh})
+    assert not folder_jobs.is_resumable({"status": folder_jobs.SUCCEEDED, "updated_at": stale})
+
+
+def test_move_prefix_copies_with_metadata_and_deletes_sources(monkeypatch):
+    monkeypatch.setattr("shared.blob_storage.COPY_POLL_INITIAL_SECONDS", 0.001)
+    names = [f"org/old/{n}.pdf" for n in range(300)]
+    container = FakeContainerClient(names, slow={"org/old/7.pdf"})
+
+    result = _manager(container).move_prefix("documents", "org/old/", "org/new/")
+
+    assert result["copied"] == 300 and result["deleted"] == 300
+    assert not result["copy_errors"] and not result["rolled_back"]
+    assert container.names == {f"org/new/{n}.pdf" for n in range(300)}
+    assert container.metadata["org/new/7.pdf"] == {"k": "org/old/7.pdf"}
+
+
+def test_failed_copy_rolls_back_the_move():
+    names = [f"org/old/{n}.pdf" for n in range(5)]
+    container = FakeContainerClient(names, copy_failing={"org/old/2.pdf"})
+
+    result = _manager(container).move_prefix("documents", "org/old/", "org/new/")
+
+    assert result["rolled_back"] is True
+    assert result["copy_errors"][0]["blob"] == "org/old/2.pdf"
+    assert container.names == set(names)
+
+
+def test_move_without_rollback_moves_what_copied():
+    names = [f"org/old/{n}.pdf" for n in range(5)]
+    container = FakeContainerClient(names, copy_failing={"org/old/2.pdf"})
+
+    result = _manager(container).move_blobs(
+        "documents", [(n, n.replace("old", "new")) for n in names], rollback=False
+    )
+
+    assert result["copied"] == 4 and result["deleted"] == 4
+    assert container.names == {"org/old/2.pdf"} | {f"org/new/{n}.pdf" for n in (0, 1, 3, 4)}
+
+
+def test_move_reports_progress_for_heartbeats():
+    names = [f"org/old/{n}.pdf" for n in range(600)]
+    container = FakeContainerClient(names)
+    reports = []
+
+    _manager(container).move_prefix("documents", "org/old/", "org/new/", on_progress=reports.append)
+
+    assert [r["copied"] for r in reports[:2]] == [BLOB_BATCH_SIZE, 2 * BLOB_BATCH_SIZE]
+    assert reports[-1] == {
+        "copied": 600, "copy_failed": 0, "copy_pending": 0, "deleted_source": 600, "delete_failed": 0,
+    }
+
+
+def test_rollback_keeps_copies_whose_source_is_gone():
+    names = [f"org/old/{n}.pdf" for n in range(5)]
+    container = FakeContainerClient(names, copy_failing={"org/old/2.pdf"})
+    # Another mover already finished org/old/0.pdf and deleted its source
+    pairs = iter([(n, n.replace("old", "new")) for n in names])
+
+    def pairs_after_concurrent_move():
+        for source, destination in pairs:
+            yield source, destination
+            if source == "org/old/0.pdf":
+                container.names.discard(source)
+
+    result = _manager(container).move_blobs("documents", pairs_after_concurrent_move())
+
+    assert result["rolled_back"] is True
+    assert "org/new/0.pdf" in container.names
+    assert not {f"org/new/{n}.pdf" for n in (1, 3, 4)} & container.names
+
+
+def test_only_one_caller_can_claim_a_job(monkeypatch):
+    from azure.cosmos.exceptions import CosmosAccessConditionFailedError
+
+    class EtagContainer:
+        def __init__(self):
+            self.etag = "1"
+
+        def replace_item(self, item, body, etag, match_condition):
+            if etag != self.etag:
+                raise CosmosAccessConditionFailedError()
+            self.etag = str(int(self.etag) + 1)
+            return {**body, "_etag": self.etag}
+
+    container = EtagContainer()
+    monkeypatch.setattr(folder_jobs, "_container", lambda: container)
+    job = {"id": "j1", "status": folder_jobs.FAILED, "_etag": "1"}
+
+    assert folder_jobs.claim_job(dict(job), status=folder_jobs.QUEUED)["status"] == folder_jobs.QUEUED
+    assert folder_jobs.claim_job(dict(job), status=folder_jobs.QUEUED) is None
@@ -0,0 +1,213 @@
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from shared import blob_cursors
+from shared.blob_storage import BlobStorageManager
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _blob(name):
+    return types.SimpleNamespace(
+        name=name,
+        size=1,
+        creation_time=NOW,
+        last_modified=NOW,
+        content_settings=types.SimpleNamespace(content_type="text/plain"),
+        metadata={},
+    )
+
+
+class FakePages:
+    """Mimics ItemPaged.by_page(): tokens are the offset of the next page."""
+
+    def __init__(self, container, names, page_size, token):
+        self.container = container
+        self.names = names
+        self.page_size = page_size
+        self.offset = int(token) if token else 0
+        self.continuation_token = token
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.offset >= len(self.names):
+            raise StopIteration
+        self.container.page_fetches += 1
+        chunk = self.names[self.offset:self.offset + self.page_size]
+        self.offset += self.page_size
+        self.continuation_token = str(self.offset) if self.offset < len(self.names) else None
+        return iter([_blob(n) for n in chunk])
+
+
+class FakeContainerClient:
+    def __init__(self, names):
+        self.names = names
+        self.page_fetches = 0
+
+    def exists(self):
+        return True
+
+    def list_blobs(self, name_starts_with=None, results_per_page=None, include=None):
+        names = [n for n in self.names if n.startswith(name_starts_with or "")]
+        container = self
+        return types.SimpleNamespace(
+            by_page=lambda continuation_token=None: FakePages(
+                container, names, results_per_page, continuation_token
+            )
+        )
+
+
+class FakeServiceClient:
+    url = "https://acct.blob.core.windows.net/"
+
+    def __init__(self, container_client):
+        self.container_client = container_client
+
+    def get_container_client(self, name):
+        return self.container_client
+
+
+@pytest.fixture
+def manager():
+    blob_cursors.cursor_store.clear()
+    container = FakeContainerClient([f"org/{n:03d}.txt" for n in range(100)])
+    manager = BlobStorageManager.__new__(BlobStorageManager)
+    manager.blob_service_client = FakeServiceClient(container)
+    manager.default_container_name = "documents"
+    yield manager, container
+    blob_cursors.cursor_store.clear()
+
+
+def test_cursor_round_trip_is_opaque():
+    cursor = blob_cursors.encode_cursor(3, {"token": "abc", "skip": 2})
+
+    assert "abc" not in cursor
+    assert blob_cursors.decode_cursor(cursor) == (3, {"token": "abc", "skip": 2})
+    assert blob_cursors.decode_cursor("raw-azure-token") is None
+    with pytest.raises(ValueError):
+        blob_cursors.decode_cursor("c1.!!!")
+
+
+def test_store_returns_nearest_known_page_and_is_bounded():
+    store = blob_cursors.BlobCursorStore(maxsize=1)
+    store.put("a", 3, {"token": "t3"})
+    store.put("a", 7, {"token": "t7"})
+
+    assert store.nearest("a", 5) == (3, {"token": "t3"})
+    assert store.nearest("a", 2) == (1, None)
+
+    store.put("b", 2, {"token": "b2"})
+    assert store.nearest("a", 9) == (1, None)
+
+
+def test_next_cursor_fetches_one_page(manager):
+    manager, container = manager
+    first = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10)
+    container.page_fetches = 0
+
+    second = manager.list_blobs_in_container_paginated(
+        "documents", "org/", page_size=10, continuation_token=first["next_continuation_token"]
+    )
+
+    assert container.page_fetches == 1
+    assert second["current_page"] == 2
+    assert second["blobs"][0]["name"] == "org/010.txt"
+
+
+def test_random_page_access_jumps_to_known_pages(manager):
+    manager, container = manager
+    deep = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=8)
+    assert deep["blobs"][0]["name"] == "org/070.txt"
+    container.page_fetches = 0
+
+    again = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=5)
+    later = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=9)
+
+    assert container.page_fetches == 2
+    assert again["blobs"][0]["name"] == "org/040.txt"
+    assert later["blobs"][0]["name"] == "org/080.txt"
+
+
+def test_last_page_has_no_cursor(manager):
+    manager, _ = manager
+
+    last = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=10)
+
+    assert last["has_more"] is False
+    assert last["next_continuation_token"] is None
+
+
+def test_filtered_pages_resume_from_stored_positions(manager, monkeypatch):
+    from gallery import blob_utils
+
+    manager, container = manager
+    monkeypatch.setattr(blob_utils, "BlobStorageManager", lambda: manager)
+    monkeypatch.setattr(blob_utils, "current_app", types.SimpleNamespace(
+        _get_current_object=lambda: types.SimpleNamespace(app_context=_NullContext)
+    ))
+    monkeypatch.setattr(blob_utils, "_generate_sas_url", lambda name, container_name: None)
+
+    def fetch(page, cursor=None):
+        return blob_utils.get_blobs_with_custom_filtering_paginated(
+            "documents", "org/", requested_page=page, requested_limit=4,
+            query="5", internal_page_size=10, cursor=cursor,
+        )
+
+    # Names containing "5": 005, 015, 025, 035, 045, 050..059, 065, ..., 095.
+    third = fetch(3)
+    assert [b["name"][4:7] for b in third["blobs"]] == ["053", "054", "055", "056"]
+    container.page_fetches = 0
+
+    following = fetch(4, third["next_continuation_token"])
+    assert [b["name"][4:7] for b in following["blobs"]] == ["057", "058", "059", "065"]
+    # Resumes at listing page 050-059 and spills into 060-069.
+    assert container.page_fetches == 2
+
+    container.page_fetches = 0
+    assert fetch(3)["blobs"] == third["blobs"]
+    assert container.page_fetches == 1
+
+    last = fetch(5, following["next_continuation_token"])
+    assert [b["name"][4:7] for b in last["blobs"]] == ["075", "085", "095"]
+    assert last["has_more"] is False
+
+
+class _NullContext:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_writes_drop_stored_positions_of_affected_listings(manager):
+    from shared.blob_storage import invalidate_directory_listing
+
+    manager, container = manager
+    manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=8)
+    container.names.insert(0, "org/000-new.txt")
+
+    invalidate_directory_listing("org/000-new.txt")
+    container.page_fetches = 0
+    page = manager.list_blobs_in_container_paginated("documents", "org/", page_size=10, page=5)
+
+    # Walked from the start instead of resuming from a stored, now shifted, token
+    assert container.page_fetches == 5
+    assert page["blobs"][0]["name"] == "org/039.txt"
+
+
+def test_store_invalidates_by_prefix_and_expires():
+    store = blob_cursors.BlobCursorStore(ttl=60)
+    store.put(("org/a/", "documents"), 2, {"token": "a2"})
+    store.put(("org/b/", "documents"), 2, {"token": "b2"})
+
+    store.invalidate("org/a/file.pdf")
+    assert store.nearest(("org/a/", "documents"), 2) == (1, None)
+    assert store.nearest(("org/b/", "documents"), 2) == (2, {"token": "b2"})
+
+    store.invalidate("org/")
+    assert store.nearest(("org/b/", "documents"), 2) == (1, None)
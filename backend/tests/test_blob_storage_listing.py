@@ -0,0 +1,163 @@
+import types
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from shared import blob_storage
+from shared.blob_storage import BlobStorageManager, ContainerNotFoundError
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _blob(name, metadata=None, created=NOW):
+    return types.SimpleNamespace(
+        name=name,
+        size=10,
+        creation_time=created,
+        last_modified=created,
+        content_settings=types.SimpleNamespace(content_type="text/plain"),
+        metadata=metadata,
+    )
+
+
+class FakeContainerClient:
+    def __init__(self, blobs, exists=True):
+        self.blobs = blobs
+        self._exists = exists
+        self.list_calls = []
+
+    def exists(self):
+        return self._exists
+
+    def list_blobs(self, **kwargs):
+        self.list_calls.append(kwargs)
+        prefix = kwargs.get("name_starts_with") or ""
+        include_metadata = "metadata" in (kwargs.get("include") or [])
+        for blob in self.blobs:
+            if blob.name.startswith(prefix):
+                yield _blob(blob.name, blob.metadata if include_metadata else None)
+
+    def walk_blobs(self, name_starts_with=None, include=None, delimiter="/"):
+        self.list_calls.append({"walk": name_starts_with})
+        prefix = name_starts_with or ""
+        seen = set()
+        for blob in self.blobs:
+            if not blob.name.startswith(prefix):
+                continue
+            rest = blob.name[len(prefix):]
+            if delimiter in rest:
+                folder = prefix + rest.split(delimiter)[0] + delimiter
+                if folder not in seen:
+                    seen.add(folder)
+                    yield types.SimpleNamespace(name=folder)
+            else:
+                yield blob
+
+    def get_blob_client(self, name):
+        raise AssertionError("listing must not fetch properties per blob")
+
+
+class FakeServiceClient:
+    url = "https://acct.blob.core.windows.net/"
+
+    def __init__(self, container_client):
+        self.container_client = container_client
+
+    def get_container_client(self, name):
+        return self.container_client
+
+
+def _manager(container_client):
+    manager = BlobStorageManager.__new__(BlobStorageManager)
+    manager.blob_service_client = FakeServiceClient(container_client)
+    manager.default_container_name = "documents"
+    return manager
+
+
+def test_metadata_comes_from_the_listing_call():
+    container = FakeContainerClient([_blob("a/1.txt", {"k": "v"}), _blob("a/2.txt", None)])
+    manager = _manager(container)
+
+    result = manager.list_blobs_in_container("documents", prefix="a/", include_metadata="yes")
+
+    assert isinstance(result, types.GeneratorType)
+    blobs = list(result)
+    assert [b["metadata"] for b in blobs] == [{"k": "v"}, {}]
+    assert container.list_calls == [{"name_starts_with": "a/", "include": ["metadata"]}]
+
+
+def test_listing_without_metadata_omits_include():
+    container = FakeContainerClient([_blob("a/1.txt", {"k": "v"})])
+    manager = _manager(container)
+
+    blobs = list(manager.list_blobs_in_container_for_upload_files("documents", prefix="a/"))
+
+    assert "metadata" not in blobs[0]
+    assert "include" not in container.list_calls[0]
+
+
+def test_missing_container_raises_before_iteration():
+    manager = _manager(FakeContainerClient([], exists=False))
+
+    with pytest.raises(ContainerNotFoundError):
+        manager.list_blobs_in_container("documents")
+
+
+def test_map_blobs_preserves_order():
+    manager = _manager(FakeContainerClient([]))
+
+    assert manager.map_blobs(lambda n: n * 2, range(20), max_workers=4) == [n * 2 for n in range(20)]
+
+
+@pytest.fixture
+def directory_manager():
+    blob_storage.invalidate_directory_listing()
+    blobs = [
+        _blob("org/a.pdf", created=NOW),
+        _blob("org/b.xlsx", created=NOW + timedelta(days=1)),
+        _blob("org/c.txt", created=NOW + timedelta(days=2)),
+        _blob("org/reports/q1/r.pdf"),
+        _blob("org/reports/r.pdf"),
+        _blob("org/generated_images/i.png"),
+    ]
+    container = FakeContainerClient(blobs)
+    yield _manager(container), container
+    blob_storage.invalidate_directory_listing()
+
+
+def test_list_directory_returns_direct_children_only(directory_manager):
+    manager, _ = directory_manager
+
+    listing = manager.list_directory(
+        "documents", "org/", exclude_prefixes=["org/generated_images/"]
+    )
+
+    assert listing["folders"] == ["org/reports/"]
+    assert [f["name"] for f in listing["files"]] == ["org/c.txt", "org/b.xlsx", "org/a.pdf"]
+
+
+def test_list_directory_filters_and_sorts_from_one_cached_walk(directory_manager):
+    manager, container = directory_manager
+
+    documents = manager.list_directory("documents", "org/", category="documents", order="oldest")
+    sheets = manager.list_directory("documents", "org/", category="spreadsheets")
+
+    assert [f["name"] for f in documents["files"]] == ["org/a.pdf", "org/c.txt"]
+    assert [f["name"] for f in sheets["files"]] == ["org/b.xlsx"]
+    assert len(container.list_calls) == 1
+
+
+def test_writes_invalidate_ancestor_and_descendant_listings(directory_manager):
+    manager, container = directory_manager
+    manager.list_directory("documents", "org/")
+    manager.list_directory("documents", "org/reports/")
+    manager.list_directory("documents", "org/reports/q1/")
+    manager.list_directory("documents", "other/")
+
+    container.blobs = [b for b in container.blobs if not b.name.startswith("org/reports/")]
+    blob_storage.invalidate_directory_listing("org/reports/")
+
+    assert manager.list_directory("documents", "org/")["folders"] == ["org/generated_images/"]
+    assert manager.list_directory("documents", "org/reports/q1/")["files"] == []
+    manager.list_directory("documents", "other/")
+    assert len(container.list_calls) == 6
@@ -0,0 +1,107 @@
+import io
+import os
+import threading
+import types
+
+import pytest
+
+from shared import blob_storage
+from shared.blob_storage import BlobStorageManager, FileSignatureError, FileTooLargeError
+
+
+class FakeBlockBlobClient:
+    def __init__(self, container, name):
+        self.container = container
+        self.name = name
+
+    def stage_block(self, block_id, data):
+        with self.container.lock:
+            self.container.staged[(self.name, block_id)] = data
+
+    def commit_block_list(self, block_ids, content_settings=None, metadata=None):
+        self.container.blobs[self.name] = b"".join(
+            self.container.staged[(self.name, b)] for b in block_ids
+        )
+        self.container.metadata[self.name] = metadata
+
+
+class FakeContainerClient:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.staged = {}
+        self.blobs = {}
+        self.metadata = {}
+
+    def get_blob_client(self, name):
+        return FakeBlockBlobClient(self, name)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(blob_storage, "get_secret", lambda *a, **kw: "sas")
+    container = FakeContainerClient()
+    manager = BlobStorageManager.__new__(BlobStorageManager)
+    manager.default_container_name = "documents"
+    manager.blob_service_client = types.SimpleNamespace(
+        url="https://acct/", get_container_client=lambda name: container
+    )
+    manager.container = container
+    return manager
+
+
+def test_stream_is_staged_in_blocks_and_committed_in_order(manager):
+    content = b"%PDF-1.7\n" + os.urandom(10_000)
+
+    result = manager.upload_stream_to_blob(
+        io.BytesIO(content), "../report.pdf", "org/o1", metadata={"k": "v"},
+        mimetype="application/pdf",
+    )
+
+    assert result["status"] == "success"
+    assert result["blob_path"] == "org/o1/report.pdf"
+    assert result["size"] == len(content)
+    assert manager.container.blobs["org/o1/report.pdf"] == content
+    assert manager.container.metadata["org/o1/report.pdf"] == {"k": "v"}
+
+
+def test_signature_is_checked_before_anything_is_staged(manager):
+    with pytest.raises(FileSignatureError):
+        manager.upload_stream_to_blob(
+            io.BytesIO(b"not a pdf"), "x.pdf", "org", mimetype="application/pdf"
+        )
+    assert manager.container.staged == {}
+
+
+def test_size_limit_and_spill_file(manager):
+    with pytest.raises(FileTooLargeError):
+        manager.stage_upload(io.BytesIO(b"a" * 100), "a.csv", "u", max_bytes=99, block_size=10)
+    assert manager.container.blobs == {}
+
+    staged = manager.stage_upload(io.BytesIO(b"a,b\n1,2\n"), "a.csv", "u", spill=True, block_size=3)
+    with open(staged.spill_path, "rb") as f:
+        assert f.read() == b"a,b\n1,2\n"
+    assert len(staged.block_ids) == 3
+    staged.discard_spill()
+    assert not os.path.exists(staged.spill_path)
+
+
+def test_chunk_iterators_upload_as_streams(manager):
+    chunks = (bytes([n]) * 7 for n in range(10))
+
+    result = manager.upload_stream_to_blob(
+        blob_storage.iter_stream(chunks), "out.json", "pulse",
+        content_type="application/json", content_encoding="gzip",
+    )
+
+    assert result["status"] == "success"
+    assert manager.container.blobs["pulse/out.json"] == b"".join(bytes([n]) * 7 for n in range(10))
+
+
+def test_concurrent_uploads_to_one_path_do_not_share_blocks(manager):
+    first = manager.stage_upload(io.BytesIO(b"a" * 30), "same.csv", "org", block_size=10)
+    second = manager.stage_upload(io.BytesIO(b"b" * 30), "same.csv", "org", block_size=10)
+
+    assert not set(first.block_ids) & set(second.block_ids)
+    assert len({len(b) for b in first.block_ids + second.block_ids}) == 1
+    manager.commit_upload(first)
+    assert manager.container.blobs["org/same.csv"] == b"a" * 30
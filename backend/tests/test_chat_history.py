@@ -0,0 +1,148 @@
+import pytest
+
+from shared import chat_history
+
+
+class FakeConversations:
+    def __init__(self, docs):
+        self.docs = docs
+        self.queries = 0
+
+    def query_items(self, query, parameters, partition_key):
+        self.queries += 1
+        params = {p["name"]: p["value"] for p in parameters}
+        rows = [
+            {"id": d["id"], "start_date": d["start_date"]} if "start_date" in d else {"id": d["id"]}
+            for d in self.docs
+        ]
+        if "NOT IS_DEFINED" in query:
+            rows = [r for r in rows if "start_date" not in r]
+            if "@id" in params:
+                rows = [r for r in rows if r["id"] < params["@id"]]
+            rows.sort(key=lambda r: r["id"], reverse=True)
+        else:
+            rows = [r for r in rows if "start_date" in r]
+            if "@start_date" in params:
+                key = (params["@start_date"], params["@id"])
+                rows = [r for r in rows if (r["start_date"], r["id"]) < key]
+            rows.sort(key=lambda r: (r["start_date"], r["id"]), reverse=True)
+        return iter(rows[: params["@limit"]])
+
+
+@pytest.fixture
+def container(monkeypatch):
+    docs = [
+        {"id": "a", "start_date": "2025-01-01 10:00:00"},
+        {"id": "b", "start_date": "2025-03-01 10:00:00"},
+        {"id": "c", "start_date": "2025-03-01 10:00:00"},
+        {"id": "d", "start_date": "2025-02-01 10:00:00"},
+        {"id": "legacy1"},
+        {"id": "legacy2"},
+    ]
+    fake = FakeConversations(docs)
+    monkeypatch.setattr(chat_history.clients, "get_cosmos_container", lambda name: fake)
+    chat_history._first_pages.clear()
+    return fake
+
+
+def test_pages_walk_newest_first_then_legacy(container):
+    seen, cursor = [], None
+    while True:
+        page = chat_history.get_history_page("u1", limit=2, cursor=cursor)
+        seen += [c["id"] for c in page["conversations"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == ["c", "b", "d", "a", "legacy2", "legacy1"]
+
+
+def test_first_page_is_cached_until_invalidated(container):
+    chat_history.get_history_page("u1", limit=3)
+    chat_history.get_history_page("u1", limit=3)
+    assert container.queries == 1
+
+    container.docs.append({"id": "e", "start_date": "2025-04-01 10:00:00"})
+    chat_history.invalidate_history("u1")
+
+    page = chat_history.get_history_page("u1", limit=3)
+    assert page["conversations"][0]["id"] == "e"
+    assert container.queries == 2
+
+
+def test_malformed_cursor_is_rejected(container):
+    with pytest.raises(ValueError):
+        chat_history.get_history_page("u1", cursor="h1.not-json")
+    with pytest.raises(ValueError):
+        chat_history.get_history_page("u1", cursor="garbage")
+
+
+class FakeConversationDocument:
+    def __init__(self, history):
+        self.history = history
+        self.etag = '"0x1"'
+
+    def query_items(self, query, parameters, partition_key):
+        params = {p["name"]: p["value"] for p in parameters}
+        if query.startswith("SELECT VALUE c._etag"):
+            return iter([self.etag])
+        if "@index" in params:
+            return iter([self.history[params["@index"]:params["@index"] + 1]])
+        if "@start" in params:
+            window = self.history[params["@start"]:params["@start"] + params["@count"]]
+        else:
+            window = self.history[-params["@limit"]:]
+        return iter([{
+            "_etag": self.etag,
+            "start_date": "2025-01-01",
+            "total": len(self.history),
+            "messages": window,
+        }])
+
+
+@pytest.fixture
+def conversation(monkeypatch):
+    history = [
+        {"role": "user" if n % 2 == 0 else "assistant", "content": f"m{n}", "data_points": "x" * n}
+        for n in range(7)
+    ]
+    fake = FakeConversationDocument(history)
+    monkeypatch.setattr(chat_history.clients, "get_cosmos_container", lambda name: fake)
+    return fake
+
+
+def test_window_returns_latest_messages_without_details(conversation):
+    window = chat_history.get_conversation_window("c1", "u1", limit=3)
+
+    assert [m["index"] for m in window["messages"]] == [4, 5, 6]
+    assert "data_points" not in window["messages"][0]
+    assert window["messages"][0]["has_details"] is True
+    assert window["older_cursor"] == 4
+
+    older = chat_history.get_conversation_window("c1", "u1", limit=3, before=4)
+    oldest = chat_history.get_conversation_window("c1", "u1", limit=3, before=older["older_cursor"])
+    assert [m["content"] for m in older["messages"]] == ["m1", "m2", "m3"]
+    assert [m["content"] for m in oldest["messages"]] == ["m0"]
+    assert oldest["older_cursor"] is None
+
+
+def test_window_etag_follows_the_document_version(conversation):
+    first = chat_history.get_conversation_window("c1", "u1", limit=3)
+    assert first["etag"] == chat_history.window_etag(
+        chat_history.get_conversation_etag("c1", "u1"), 3, None, False
+    )
+
+    conversation.etag = '"0x2"'
+    assert chat_history.get_conversation_window("c1", "u1", limit=3)["etag"] != first["etag"]
+    assert chat_history.get_message_details("c1", "u1", 2)["data_points"] == "xx"
+
+
+def test_out_of_range_limits_share_the_clamped_etag(conversation):
+    limit = chat_history.clamp_window_limit("500")
+    window = chat_history.get_conversation_window("c1", "u1", limit=500)
+
+    assert limit == chat_history.MAX_MESSAGE_WINDOW
+    assert chat_history.clamp_window_limit(0) == 1
+    assert window["etag"] == chat_history.window_etag(
+        chat_history.get_conversation_etag("c1", "u1"), limit, None, False
+    )
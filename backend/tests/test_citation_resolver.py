@@ -0,0 +1,142 @@
+import types
+
+import pytest
+
+from shared import citation_resolver
+
+
+class FakeBlobClient:
+    def __init__(self, service, name):
+        self.service = service
+        self.blob_name = name
+
+    def get_blob_properties(self):
+        self.service.head_calls.append(self.blob_name)
+        if self.blob_name not in self.service.blobs:
+            raise LookupError(self.blob_name)
+        return types.SimpleNamespace(etag=self.service.blobs[self.blob_name], size=3)
+
+
+class FakeServiceClient:
+    account_name = "acct"
+    credential = types.SimpleNamespace(account_key="key")
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.head_calls = []
+        self.list_calls = 0
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self, blob)
+
+    def get_container_client(self, name):
+        service = self
+
+        def list_blobs():
+            service.list_calls += 1
+            blobs = [types.SimpleNamespace(name=n) for n in sorted(service.blobs)]
+            return types.SimpleNamespace(by_page=lambda: iter([blobs]))
+
+        return types.SimpleNamespace(list_blobs=list_blobs)
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch):
+    citation_resolver._indexes.clear()
+    citation_resolver._resolved_names.clear()
+    citation_resolver._sas_urls.clear()
+    signed = []
+    monkeypatch.setattr(citation_resolver, "BlobSasPermissions", lambda **kw: kw)
+    monkeypatch.setattr(
+        citation_resolver,
+        "generate_blob_sas",
+        lambda **kw: signed.append(kw["blob_name"]) or f"sig={len(signed)}",
+    )
+    return signed
+
+
+@pytest.mark.parametrize(
+    "file_path, blob_name",
+    [
+        ("@https://q3%20sales.xlsx/", "q3 sales.xlsx"),
+        ("https://q3%20sales.csv", "q3 sales.csv"),
+        (
+            "https://acct.blob.core.windows.net/documents/organization_files/o1/a.xlsx",
+            "organization_files/o1/a.xlsx",
+        ),
+        ("documents/organization_files/o1/a%20b.csv", "organization_files/o1/a b.csv"),
+    ],
+)
+def test_citation_formats_parse_to_blob_names(file_path, blob_name):
+    assert citation_resolver.parse_citation_path(file_path) == blob_name
+
+
+def test_citation_by_file_name_resolves_through_the_index():
+    service = FakeServiceClient({"organization_files/o1/sales.csv": '"e1"', "other/x.csv": '"e2"'})
+
+    blob_client, props = citation_resolver.resolve_blob(service, "documents", "sales.csv")
+    citation_resolver.resolve_blob(service, "documents", "x.csv")
+
+    assert blob_client.blob_name == "organization_files/o1/sales.csv"
+    assert props.etag == '"e1"'
+    assert service.list_calls == 1
+
+
+def test_repeated_resolution_costs_one_head_request():
+    service = FakeServiceClient({"organization_files/o1/sales.csv": '"e1"'})
+    citation_resolver.resolve_blob(service, "documents", "sales.csv")
+    service.head_calls.clear()
+
+    citation_resolver.resolve_blob(service, "documents", "sales.csv")
+
+    assert service.head_calls == ["organization_files/o1/sales.csv"]
+
+
+def test_unknown_file_returns_none_without_rescanning():
+    service = FakeServiceClient({"a/b.csv": '"e1"'})
+
+    assert citation_resolver.resolve_blob(service, "documents", "missing.csv") is None
+    assert citation_resolver.resolve_blob(service, "documents", "missing2.csv") is None
+    assert service.list_calls == 1
+
+
+def test_writes_update_the_index_without_a_relisting():
+    service = FakeServiceClient({"a/old.csv": '"e1"'})
+    citation_resolver.resolve_blob(service, "documents", "old.csv")
+
+    service.blobs = {"b/new.csv": '"e2"'}
+    citation_resolver.note_blob_added("b/new.csv")
+    citation_resolver.note_blob_removed("a/old.csv")
+
+    assert citation_resolver.resolve_blob(service, "documents", "new.csv")[0].blob_name == "b/new.csv"
+    assert citation_resolver.resolve_blob(service, "documents", "old.csv") is None
+    assert service.list_calls == 1
+
+
+def test_sas_urls_are_reused(reset_state):
+    service = FakeServiceClient({})
+
+    first = citation_resolver.sign_blob_url(service, "documents", "a/b.csv")
+    second = citation_resolver.sign_blob_url(service, "documents", "a/b.csv")
+
+    assert first == second
+    assert reset_state == ["a/b.csv"]
+
+
+def test_batch_resolution_keeps_order_and_dedups(monkeypatch, reset_state):
+    service = FakeServiceClient({"organization_files/o1/a.xlsx": '"e1"'})
+    monkeypatch.setattr(citation_resolver, "get_service_client", lambda conn: service)
+
+    results = citation_resolver.resolve_citations(
+        ["a.xlsx", "notes.txt", "a.xlsx", "missing.csv"], "conn", "https://app/"
+    )
+
+    assert [r["file_path"] for r in results] == ["a.xlsx", "notes.txt", "a.xlsx", "missing.csv"]
+    assert results[0] is results[2]
+    assert results[0]["sas_url"].startswith(
+        "https://acct.blob.core.windows.net/documents/organization_files/o1/a.xlsx?"
+    )
+    assert results[1]["success"] is False
+    assert results[3]["sas_url"] is None
+    assert results[3]["download_url"] == results[3]["preview_url"]
+    assert reset_state == ["organization_files/o1/a.xlsx"]
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from shared import conversation_export
+
+
+@pytest.fixture
+def blobs(monkeypatch):
+    store = {"generated_images/a.png": b"A", "generated_images/copy.png": b"A"}
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(path):
+        with lock:
+            fetched.append(path)
+        return store.get(path)
+
+    monkeypatch.setattr(conversation_export, "fetch_image_from_blob", fetch)
+    monkeypatch.setattr(conversation_export, "image_cache", conversation_export.ImageCache())
+    return fetched
+
+
+def test_images_are_fetched_once_and_embedded_everywhere(blobs):
+    text = (
+        "![chart](generated_images/a.png) and again ![chart](generated_images/a.png) "
+        "![web](https://example.com/x.png) ![gone](generated_images/missing.png)"
+    )
+
+    first = conversation_export.embed_images_in_markdown(text)
+    second = conversation_export.embed_images_in_markdown(text)
+
+    assert first == second
+    assert first.count("![chart](data:image/png;base64,QQ==)") == 2
+    assert "![web](https://example.com/x.png)" in first
+    assert "![gone](generated_images/missing.png)" in first
+    assert blobs.count("generated_images/a.png") == 1
+
+
+def test_identical_images_share_one_cache_entry(blobs):
+    cache = conversation_export.image_cache
+    conversation_export.load_image_data_uri("generated_images/a.png")
+    conversation_export.load_image_data_uri("generated_images/copy.png")
+
+    assert len(cache._data_uris) == 1
+    assert cache.get("generated_images/copy.png") == "data:image/png;base64,QQ=="
+
+
+def test_html_is_streamed_one_chunk_per_message(blobs):
+    conversation = {
+        "id": "c1",
+        "start_date": "2025-01-01",
+        "messages": [
+            {"role": "user", "content": "show sales"},
+            {"role": "assistant", "content": "![chart](generated_images/a.png)"},
+        ],
+    }
+
+    chunks = list(conversation_export.iter_conversation_html(conversation))
+
+    assert len(chunks) == 4
+    assert "Total Messages:</strong> 2" in chunks[0]
+    assert "data:image/png;base64,QQ==" in chunks[2]
+    assert chunks[-1].strip().endswith("</html>")
+    assert "{messages_html}" not in "".join(chunks)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from data_summary import profiler
+from data_summary.summarize import FALLBACK_PROMPT, create_excel_file_summary
+
+
+class FakeLLM:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.profiles = []
+        self.prompts = []
+
+    def summarize_profile(self, profile, prompt):
+        self.profiles.append(profile)
+        self.prompts.append(prompt)
+        return self.answers.pop(0)
+
+
+def _write_csv(tmp_path, text, encoding="utf-8"):
+    path = tmp_path / "data.csv"
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_sniffs_encoding_and_delimiter_once(tmp_path):
+    path = _write_csv(tmp_path, "région;ventes\nNord;10\nSud;20\n", encoding="cp1252")
+
+    assert profiler.sniff_csv(path) == ("cp1252", ";")
+
+
+def test_profile_accumulates_across_chunks(tmp_path):
+    rows = ["region,sales,date"] + [
+        f"{'East' if n % 4 else 'West'},{n},2024-01-{n % 28 + 1:02d}" for n in range(1000)
+    ] + [",,"]
+    path = _write_csv(tmp_path, "\n".join(rows) + "\n")
+
+    profile = profiler.profile_file(path, chunk_rows=128)
+    columns = {c["name"]: c for c in profile["columns"]}
+
+    assert profile["rows"] == 1001
+    assert columns["region"]["kind"] == "text"
+    assert columns["region"]["top"][0] == ("East", 750)
+    assert columns["region"]["null_rate"] == 1 / 1001
+    assert columns["sales"]["kind"] == "numeric"
+    assert (columns["sales"]["min"], columns["sales"]["max"]) == (0, 999)
+    assert np.isclose(columns["sales"]["quantiles"][0.5], 499.5)
+    assert columns["date"]["kind"] == "datetime"
+    assert columns["date"]["max"] == pd.Timestamp("2024-01-28")
+
+
+def test_summary_sends_the_compact_profile(tmp_path):
+    path = _write_csv(tmp_path, "a,b\n1,x\n2,y\n")
+    llm = FakeLLM(["", "This vault file contains sales."])
+
+    result = create_excel_file_summary(path, llm)
+
+    assert result == {
+        "file_description": "This vault file contains sales.",
+        "source": "primary_llm",
+    }
+    assert llm.profiles[0].startswith("Rows: 2; Columns: 2")
+
+
+def test_last_attempt_switches_to_the_fallback_prompt(tmp_path):
+    path = _write_csv(tmp_path, "a,b\n3,x\n4,y\n")
+    llm = FakeLLM(["", "", "A small table."])
+
+    result = create_excel_file_summary(path, llm)
+
+    assert result["source"] == "secondary_llm_fallback"
+    assert llm.prompts[0] == llm.prompts[1] != llm.prompts[2]
+    assert llm.prompts[2] == FALLBACK_PROMPT
+
+
+def test_chunks_of_different_kinds_fall_back_to_text(tmp_path):
+    rows = ["when"] + [f"2024-01-{n % 28 + 1:02d}" for n in range(10)] + [str(n) for n in range(10)]
+    path = _write_csv(tmp_path, "\n".join(rows) + "\n")
+
+    [column] = profiler.profile_file(path, chunk_rows=10)["columns"]
+
+    assert column["kind"] == "text"
+    assert "min" not in column
+    assert column["distinct"] == 20
@@ -0,0 +1,67 @@
+from data_summary import description_cache
+from data_summary.description_cache import (
+    DescriptionCache,
+    LocalDescriptionStore,
+    cached_description,
+)
+
+
+def _describer(result):
+    calls = []
+
+    def describe():
+        calls.append(1)
+        return result
+
+    return describe, calls
+
+
+def test_same_content_is_described_once(tmp_path):
+    cache = DescriptionCache(LocalDescriptionStore(str(tmp_path / "cache")))
+    first, second = tmp_path / "q3.csv", tmp_path / "renamed.csv"
+    first.write_text("a,b\n1,2\n")
+    second.write_text("a,b\n1,2\n")
+    describe, calls = _describer({"file_description": "Sales.", "source": "primary_llm"})
+
+    cached_description(str(first), "prompt", "gpt", describe, cache=cache)
+    result = cached_description(str(second), "prompt", "gpt", describe, cache=cache)
+
+    assert result == {"file_description": "Sales.", "source": "primary_llm"}
+    assert calls == [1]
+
+    # Persisted: a fresh process (empty memory tier) still hits
+    fresh = DescriptionCache(LocalDescriptionStore(str(tmp_path / "cache")))
+    cached_description(str(second), "prompt", "gpt", describe, cache=fresh)
+    assert calls == [1]
+
+
+def test_prompt_or_model_change_misses(tmp_path):
+    cache = DescriptionCache(LocalDescriptionStore(str(tmp_path / "cache")))
+    path = tmp_path / "a.csv"
+    path.write_text("x\n1\n")
+    describe, calls = _describer({"file_description": "X.", "source": "openai_summary"})
+
+    cached_description(str(path), "prompt", "gpt", describe, cache=cache)
+    cached_description(str(path), "prompt v2", "gpt", describe, cache=cache)
+    cached_description(str(path), "prompt", "gpt-next", describe, cache=cache)
+
+    assert len(calls) == 3
+
+
+def test_manual_and_error_results_are_not_cached(tmp_path):
+    cache = DescriptionCache(LocalDescriptionStore(str(tmp_path / "cache")))
+    path = tmp_path / "a.csv"
+    path.write_text("x\n1\n")
+    describe, calls = _describer({"file_description": "table", "source": "manual_summary"})
+
+    cached_description(str(path), "prompt", "gpt", describe, cache=cache)
+    cached_description(str(path), "prompt", "gpt", describe, cache=cache)
+
+    assert len(calls) == 2
+
+
+def test_hashing_streams_in_chunks(tmp_path):
+    path = tmp_path / "big.bin"
+    path.write_bytes(b"abc" * 1000)
+
+    assert description_cache.file_sha256(str(path), chunk_bytes=7) == description_cache.file_sha256(str(path))
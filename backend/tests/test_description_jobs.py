@@ -0,0 +1,81 @@
+import pytest
+
+from shared import description_jobs
+
+
+@pytest.fixture
+def blobs(monkeypatch, tmp_path):
+    """Fake blob store: name -> metadata dict."""
+    store = {"org/a.csv": {"organization_id": "o1", "description_status": "pending"}}
+
+    def download(blob_name, container_name):
+        path = tmp_path / blob_name.replace("/", "_")
+        path.write_text("a,b\n1,2\n")
+        return str(path), store[blob_name]
+
+    monkeypatch.setattr(description_jobs, "download_blob_to_temp", download)
+    monkeypatch.setattr(
+        description_jobs,
+        "update_blob_metadata",
+        lambda blob_name, metadata, container_name: store[blob_name].update(metadata),
+    )
+    monkeypatch.setattr(description_jobs, "invalidate_directory_listing", lambda prefix: None)
+    monkeypatch.setattr(description_jobs, "_summarizers", {})
+    return store
+
+
+def test_memory_queue_applies_backpressure_but_keeps_retries():
+    q = description_jobs.InMemoryQueue(max_pending=2)
+    q.put({"blob_name": "a"})
+    q.put({"blob_name": "b"})
+
+    assert not q.has_capacity()
+    with pytest.raises(description_jobs.DescriptionQueueFull):
+        q.put({"blob_name": "c"})
+
+    message = q.receive(timeout=0)
+    q.retry(message)
+    q.retry(q.receive(timeout=0))
+    assert q.receive(timeout=0).body == {"blob_name": "a"}
+    assert q.receive(timeout=0).dequeue_count == 2
+
+
+def test_process_stores_description_in_metadata(blobs):
+    description_jobs._summarizers["excel"] = lambda path: {
+        "file_description": "Sales by region",
+        "source": "AI-generated",
+    }
+
+    done = description_jobs.process({"blob_name": "org/a.csv", "container": "documents", "kind": "excel"})
+
+    assert done
+    assert blobs["org/a.csv"] == {
+        "organization_id": "o1",
+        "description": "Sales by region",
+        "description_source": "AI-generated",
+        "description_status": "ready",
+    }
+
+
+def test_summarizer_errors_are_retried_then_marked_failed(blobs, monkeypatch):
+    description_jobs._summarizers["excel"] = lambda path: {"file_description": "", "source": "error"}
+    q = description_jobs.InMemoryQueue()
+    monkeypatch.setattr(description_jobs, "_queue", q)
+    monkeypatch.setattr(description_jobs, "DESCRIPTION_MAX_ATTEMPTS", 2)
+    q.put({"blob_name": "org/a.csv", "container": "documents", "kind": "excel"})
+
+    # Run the worker loop until the queue drains
+    receive = q.receive
+
+    def receive_until_empty(timeout):
+        message = receive(timeout=0)
+        if message is None:
+            raise SystemExit
+        return message
+
+    monkeypatch.setattr(q, "receive", receive_until_empty)
+    with pytest.raises(SystemExit):
+        description_jobs._work_loop()
+
+    assert blobs["org/a.csv"]["description_status"] == "failed"
+    assert "description" not in blobs["org/a.csv"]
@@ -0,0 +1,81 @@
+import pytest
+
+from gallery import blob_utils
+
+
+class FakeBlobStorageManager:
+    list_calls = 0
+    blobs = []
+
+    def list_blobs_in_container(self, container_name, prefix=None, include_metadata="no", max_results=None):
+        FakeBlobStorageManager.list_calls += 1
+        return iter([b for b in self.blobs if b["name"].startswith(prefix)])
+
+
+def _blob(org, n, user="u1"):
+    return {
+        "name": f"organization_files/{org}/generated_images/img{n}.png",
+        "size": 1,
+        "content_type": "image/png",
+        "last_modified": f"2025-01-{n:02d}T00:00:00+00:00",
+        "metadata": {"user_id": user},
+        "url": "raw",
+    }
+
+
+@pytest.fixture(autouse=True)
+def fake_storage(monkeypatch):
+    FakeBlobStorageManager.list_calls = 0
+    FakeBlobStorageManager.blobs = [_blob("org1", n, user="u1" if n % 2 else "u2") for n in range(1, 11)]
+    signed = []
+
+    def fake_sign(blob_name, container_name="documents", expiry_hours=24):
+        signed.append(blob_name)
+        return f"signed:{blob_name}"
+
+    monkeypatch.setattr(blob_utils, "BlobStorageManager", FakeBlobStorageManager)
+    monkeypatch.setattr(blob_utils, "_generate_sas_url", fake_sign)
+    blob_utils.invalidate_gallery_index()
+    yield signed
+    blob_utils.invalidate_gallery_index()
+
+
+def test_pages_are_sorted_and_only_page_is_signed(fake_storage):
+    result = blob_utils.get_gallery_items_by_org("org1", page=1, limit=3)
+
+    assert [i["name"][-9:] for i in result["items"]] == ["img10.png", "/img9.png", "/img8.png"]
+    assert result["total"] == 10
+    assert len(fake_storage) == 3
+    assert result["items"][0]["url"].startswith("signed:")
+
+
+def test_oldest_order_and_second_page():
+    result = blob_utils.get_gallery_items_by_org("org1", order="oldest", page=2, limit=4)
+
+    assert [i["name"].rsplit("img", 1)[1] for i in result["items"]] == ["5.png", "6.png", "7.png", "8.png"]
+
+
+def test_index_is_reused_across_pages_and_filters():
+    blob_utils.get_gallery_items_by_org("org1", page=1, limit=3)
+    filtered = blob_utils.get_gallery_items_by_org("org1", uploader_id="U1", page=1, limit=10)
+
+    assert FakeBlobStorageManager.list_calls == 1
+    assert filtered["total"] == 5
+
+
+def test_invalidation_by_blob_path_rebuilds_only_that_org():
+    blob_utils.get_gallery_items_by_org("org1")
+    FakeBlobStorageManager.blobs = FakeBlobStorageManager.blobs[:4]
+
+    blob_utils.invalidate_gallery_index("organization_files/org1/generated_images/img1.png")
+    result = blob_utils.get_gallery_items_by_org("org1")
+
+    assert FakeBlobStorageManager.list_calls == 2
+    assert result["total"] == 4
+
+
+def test_cached_entries_are_not_mutated_by_signing():
+    blob_utils.get_gallery_items_by_org("org1", limit=1)
+    index = blob_utils._get_gallery_index("org1")
+
+    assert index.items[0]["url"] == "raw"
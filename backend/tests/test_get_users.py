@@ -0,0 +1,74 @@
+import os
+
+os.environ["AZURE_DB_ID"] = "test_db_id"
+os.environ["AZURE_DB_NAME"] = "test_db_name"
+
+import utils
+
+
+class FakeQueryContainer:
+    def __init__(self, answer):
+        self.answer = answer
+        self.queries = 0
+
+    def query_items(self, query, parameters=None, **kwargs):
+        self.queries += 1
+        params = {p["name"]: p["value"] for p in parameters or []}
+        return iter(self.answer(query, params))
+
+
+def _install(monkeypatch, invitation_count=1000):
+    """Organization with `invitation_count` invitations across every state get_users handles."""
+    invitations = []
+    users = {"owner": {"id": "owner", "data": {"name": "Owner", "email": "owner@x.com"}, "_etag": "e"}}
+    for i in range(invitation_count):
+        kind = i % 4
+        uid = f"user{i}"
+        if kind == 0:  # active member
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": True})
+            users[uid] = {"id": uid, "data": {"name": uid, "email": f"{uid}@x.com"}}
+        elif kind == 1:  # inactive, not redeemed -> guest row
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": False,
+                                "invited_user_email": f"{uid}@x.com", "nickname": uid})
+            users[uid] = {"id": uid, "data": {"name": uid, "email": f"{uid}@x.com"}}
+        elif kind == 2:  # inactive, redeemed -> hidden
+            invitations.append({"id": f"inv{i}", "invited_user_id": uid, "role": "user", "active": False,
+                                "redeemed_at": "2024-01-01"})
+            users[uid] = {"id": uid, "data": {"name": uid, "email": f"{uid}@x.com"}}
+        else:  # invitation without a user yet
+            invitations.append({"id": f"inv{i}", "role": "user", "active": False,
+                                "invited_user_email": f"new{i}@x.com"})
+
+    containers = {
+        "invitations": FakeQueryContainer(lambda q, p: invitations),
+        "organizations": FakeQueryContainer(lambda q, p: ["owner"]),
+        "users": FakeQueryContainer(
+            lambda q, p: [{"id": users[u]["id"], "data": users[u]["data"]} for u in p["@user_ids"] if u in users]
+        ),
+    }
+    monkeypatch.setattr(utils, "get_cosmos_container", containers.__getitem__)
+    return containers
+
+
+def test_get_users_classifies_every_invitation_state(monkeypatch):
+    _install(monkeypatch, invitation_count=8)
+
+    result = utils.get_users("org1")
+    by_key = {(r["id"], r.get("invitation_id")): r for r in result}
+
+    assert by_key[("user0", None)]["user_account_created"] is True
+    assert by_key[("owner", None)]["role"] == "admin"
+    assert by_key[(None, "inv1")]["data"] == {"name": "user1", "email": "user1@x.com"}
+    assert by_key[(None, "inv3")]["data"]["email"] == "new3@x.com"
+    assert not any(r["id"] == "user2" or r.get("invitation_id") == "inv2" for r in result)
+    assert len(result) == 7
+
+
+def test_get_users_batches_user_lookups_for_1k_invitations(monkeypatch):
+    containers = _install(monkeypatch, invitation_count=1000)
+
+    result = utils.get_users("org1")
+
+    assert len(result) == 751
+    # 751 user ids in batches of USERS_BATCH_SIZE instead of batches of 10.
+    assert containers["users"].queries == -(-751 // utils.USERS_BATCH_SIZE)
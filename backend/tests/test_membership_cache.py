@@ -0,0 +1,90 @@
+import os
+import pytest
+from flask import Flask
+from unittest.mock import patch
+
+os.environ["AZURE_DB_ID"] = "test_db_id"
+os.environ["AZURE_DB_NAME"] = "test_db_name"
+
+from shared import membership_cache
+from shared.decorators import _get_user_org_ids
+
+
+def test_miss_then_hit_calls_loader_once():
+    calls = []
+
+    def loader(principal_id):
+        calls.append(principal_id)
+        return [{"id": "org1"}, {"id": "org2"}]
+
+    first = membership_cache.get_organization_ids("user1", loader)
+    second = membership_cache.get_organization_ids("user1", loader)
+
+    assert first == second == frozenset({"org1", "org2"})
+    assert calls == ["user1"]
+    assert membership_cache.get_stats()["hits"] == 1
+    assert membership_cache.get_stats()["misses"] == 1
+
+
+def test_invalidate_forces_reload():
+    orgs = [{"id": "org1"}]
+    membership_cache.get_organization_ids("user1", lambda _: orgs)
+
+    membership_cache.invalidate("user1")
+    reloaded = membership_cache.get_organization_ids("user1", lambda _: [{"id": "org2"}])
+
+    assert reloaded == frozenset({"org2"})
+
+
+def test_invalidate_all_clears_every_principal():
+    membership_cache.get_organization_ids("user1", lambda _: [{"id": "org1"}])
+    membership_cache.get_organization_ids("user2", lambda _: [{"id": "org1"}])
+
+    membership_cache.invalidate_all()
+
+    assert membership_cache.get_stats()["size"] == 0
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    def revoked_while_loading(principal_id):
+        # Membership changes after Cosmos was read but before the result is stored
+        membership_cache.invalidate(principal_id)
+        return [{"id": "org1"}]
+
+    stale = membership_cache.get_organization_ids("user1", revoked_while_loading)
+    fresh = membership_cache.get_organization_ids("user1", lambda _: [])
+
+    assert stale == frozenset({"org1"})
+    assert fresh == frozenset()
+
+
+def test_invalidate_all_during_a_load_is_not_overwritten():
+    def cleared_while_loading(_):
+        membership_cache.invalidate_all()
+        return [{"id": "org1"}]
+
+    membership_cache.get_organization_ids("user1", cleared_while_loading)
+
+    assert membership_cache.get_stats()["size"] == 0
+
+
+def test_loader_errors_are_not_cached():
+    def failing_loader(_):
+        raise RuntimeError("cosmos down")
+
+    with pytest.raises(RuntimeError):
+        membership_cache.get_organization_ids("user1", failing_loader)
+
+    assert membership_cache.get_stats()["size"] == 0
+
+
+def test_request_scope_reuses_result_without_touching_shared_cache():
+    app = Flask(__name__)
+    with patch("shared.decorators.get_user_organizations") as mock_get_user_orgs:
+        mock_get_user_orgs.return_value = [{"id": "org1"}]
+        with app.test_request_context():
+            _get_user_org_ids("user1")
+            _get_user_org_ids("user1")
+
+    assert mock_get_user_orgs.call_count == 1
+    assert membership_cache.get_stats()["hits"] == 0
@@ -0,0 +1,85 @@
+import pytest
+
+from shared import orchestrator_stream
+from shared.orchestrator_stream import OrchestratorStreamError, stream_orchestrator
+
+
+class FakeRaw:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.decode_content = None
+
+    def stream(self, amt, decode_content=None):
+        self.decode_content = decode_content
+        yield from self.chunks
+
+
+class FakeResponse:
+    def __init__(self, status_code, chunks=()):
+        self.status_code = status_code
+        self.raw = FakeRaw(list(chunks))
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+@pytest.fixture
+def fake_session(monkeypatch):
+    def install(response):
+        session = FakeSession(response)
+        monkeypatch.setattr(orchestrator_stream, "get_orchestrator_session", lambda: session)
+        return session
+
+    return install
+
+
+def test_stream_relays_raw_bytes(fake_session):
+    response = FakeResponse(200, [b"data: caf\xc3", b"\xa9\n\n", b""])
+    session = fake_session(response)
+
+    chunks = list(stream_orchestrator("https://orc/api", "{}", {"x-functions-key": "k"}))
+
+    assert chunks == [b"data: caf\xc3", b"\xa9\n\n"]
+    assert response.raw.decode_content is False
+    assert response.closed
+    _, kwargs = session.calls[0]
+    assert kwargs["stream"] is True
+    assert kwargs["timeout"] == (
+        orchestrator_stream.ORCHESTRATOR_CONNECT_TIMEOUT,
+        orchestrator_stream.ORCHESTRATOR_FIRST_BYTE_TIMEOUT,
+    )
+
+
+def test_stream_raises_on_error_status(fake_session):
+    fake_session(FakeResponse(502))
+
+    with pytest.raises(OrchestratorStreamError):
+        list(stream_orchestrator("https://orc/api", "{}", {}))
+
+
+def test_marker_watcher_sees_markers_split_across_chunks():
+    watcher = orchestrator_stream.MarkerWatcher(b"generated_images/")
+
+    assert watcher.scan(b'data: {"url": "org/generated') == b'data: {"url": "org/generated'
+    assert not watcher.seen
+    watcher.scan(b'_images/chart.png"}\n\n')
+    assert watcher.seen
+
+    other = orchestrator_stream.MarkerWatcher(b"generated_images/")
+    other.scan(b"data: generated_")
+    other.scan(b"text only\n\n")
+    assert not other.seen
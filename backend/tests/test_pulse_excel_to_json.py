@@ -0,0 +1,137 @@
+import gzip
+import json
+from io import BytesIO
+
+import openpyxl
+import pytest
+
+from shared import pulse_excel_to_json
+from shared.pulse_excel_to_json import NoValidSheetsError, SheetProcessor, serialize_excel
+
+
+def _databook(rows, title="Full Run %"):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = title
+    for row in rows:
+        sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+ROWS = [
+    [None, "Total", None, "Gender", None],
+    [None, "N", "%", "Male", "Female"],
+    ["Base", 1000, None, 500, 500],
+    [],
+    ["AWARENESS"],
+    ["Brand seen"],
+    [],
+    ["Yes", 600, 0.6, 0.55, 0.654],
+    ["No", 400, 0.4, 0.45, 0.346],
+]
+
+
+@pytest.mark.parametrize("read_only", [True, False])
+def test_databook_is_grouped_by_section_and_column(read_only):
+    result = serialize_excel(BytesIO(_databook(ROWS)), read_only=read_only)
+
+    assert result == [
+        {
+            "section": "AWARENESS",
+            "parent_category": "",
+            "column": "by_gender",
+            "data": {"Male": {"Yes": 0.55, "No": 0.45}, "Female": {"Yes": 0.65, "No": 0.35}},
+        },
+        {
+            "section": "AWARENESS",
+            "parent_category": "",
+            "column": "by_total",
+            "data": {"N": {"Yes": 600.0, "No": 400.0}, "%": {"Yes": 0.6, "No": 0.4}},
+        },
+    ]
+
+
+def test_rows_are_consumed_lazily():
+    consumed = []
+
+    def rows():
+        for row in ROWS:
+            consumed.append(row)
+            yield tuple(row)
+
+    records = SheetProcessor(rows()).iter_records()
+    first = next(records)
+
+    assert first["category"] == "Yes"
+    # One row of lookahead past the first record, nothing more
+    assert len(consumed) == ROWS.index(["No", 400, 0.4, 0.45, 0.346]) + 1
+
+
+def test_workbook_without_pulse_sheets_is_rejected():
+    with pytest.raises(NoValidSheetsError):
+        serialize_excel(BytesIO(_databook(ROWS, title="Summary")))
+
+
+def test_grouping_keeps_first_appearance_order_and_last_value():
+    rows = ROWS[:3] + [
+        [],
+        ["SECOND"],
+        ["Later"],
+        [],
+        [7],
+        [],
+        ["AWARENESS"],
+        ["Brand seen"],
+        [],
+        ["Yes", 600, 0.6, 0.333333, None],
+        ["Yes", 650, 0.65, 0.125, None],
+    ]
+
+    result = serialize_excel(BytesIO(_databook(rows)))
+
+    # The numeric-category row without values still places SECOND first
+    assert [(r["section"], r["column"]) for r in result] == [
+        ("AWARENESS", "by_gender"),
+        ("AWARENESS", "by_total"),
+    ]
+    assert result[0]["data"] == {"Male": {"Yes": 0.12}}
+    assert result[1]["data"] == {"N": {"Yes": 650.0}, "%": {"Yes": 0.65}}
+
+
+def test_sheets_parsed_in_a_process_pool_match_the_serial_result(monkeypatch):
+    workbook = openpyxl.load_workbook(BytesIO(_databook(ROWS)))
+    second = workbook.create_sheet("%")
+    for row in ROWS[:3] + [[], ["CONSIDERATION"], ["Would buy"], [], ["Yes", 300, 0.3, 0.25, 0.35]]:
+        second.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    monkeypatch.setattr(pulse_excel_to_json, "PARALLEL_MIN_BYTES", 0)
+
+    serial = serialize_excel(BytesIO(buffer.getvalue()), workers=1)
+    parallel = serialize_excel(BytesIO(buffer.getvalue()), workers=2)
+
+    assert parallel == serial
+    assert [r["section"] for r in serial] == ["AWARENESS", "AWARENESS", "CONSIDERATION", "CONSIDERATION"]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_records_are_encoded_incrementally(compress):
+    records = [{"section": "ÉTÉ", "data": {"Male": {"Yes": 0.5}}}, {"section": "B", "data": {}}]
+
+    chunks = list(pulse_excel_to_json.encode_records(records, compress=compress, chunk_bytes=8))
+    payload = b"".join(chunks)
+    if compress:
+        payload = gzip.decompress(payload)
+
+    assert len(chunks) > 1
+    assert payload.decode("utf-8") == json.dumps(records, ensure_ascii=False, separators=(",", ":"))
+
+
+def test_records_can_be_encoded_as_ndjson():
+    records = [{"a": 1}, {"b": [2]}]
+
+    payload = b"".join(pulse_excel_to_json.encode_records(records, "ndjson"))
+
+    assert [json.loads(line) for line in payload.decode().splitlines()] == records
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from shared.clients import SecretCache
+
+
+class FakeVault:
+    def __init__(self, value="v1"):
+        self.value = value
+        self.calls = 0
+        self.fail = False
+
+    def fetch(self, name):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("throttled")
+        return self.value
+
+
+def test_hit_after_first_read():
+    vault = FakeVault()
+    cache = SecretCache(vault.fetch, ttl=60, refresh_ahead=0)
+
+    assert cache.get("key") == "v1"
+    assert cache.get("key") == "v1"
+    assert vault.calls == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_concurrent_misses_share_one_call():
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(name):
+        calls.append(name)
+        release.wait(2)
+        return "v1"
+
+    cache = SecretCache(slow_fetch, ttl=60, refresh_ahead=0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("key"))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["v1"] * 5
+    assert calls == ["key"]
+
+
+def test_stale_value_served_when_vault_fails():
+    vault = FakeVault()
+    cache = SecretCache(vault.fetch, ttl=0, refresh_ahead=0, max_stale=60)
+    cache.get("key")
+
+    vault.fail = True
+
+    assert cache.get("key") == "v1"
+    assert cache.get_stats()["stale_served"] == 1
+
+
+def test_error_raised_without_cached_value():
+    vault = FakeVault()
+    vault.fail = True
+    cache = SecretCache(vault.fetch, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        cache.get("key")
+
+
+def test_refresh_ahead_updates_in_background():
+    vault = FakeVault()
+    cache = SecretCache(vault.fetch, ttl=1, refresh_ahead=60)
+    cache.get("key")
+    time.sleep(0.6)  # inside the last half of the TTL
+
+    vault.value = "v2"
+    assert cache.get("key") == "v1"
+
+    deadline = time.time() + 2
+    while cache.get("key") != "v2" and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.get("key") == "v2"
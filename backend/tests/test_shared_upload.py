@@ -4,6 +4,8 @@ import pytest
 from flask import Flask
 from unittest.mock import MagicMock
 
+from shared.blob_storage import FileSignatureError, matches_file_signature
+
 
 class DummyBlobStorageManager:
     """Mock blob storage manager for testing"""
@@ -11,13 +13,20 @@ class DummyBlobStorageManager:
         self.should_fail = should_fail
         self.blob_service_client = DummyBlobServiceClient()
 
-    def upload_to_blob(self, file_path, blob_folder, metadata, container):
+    def upload_stream_to_blob(self, stream, filename, blob_folder, metadata, container, mimetype):
+        # Same contract as BlobStorageManager: the signature is checked on the first block
+        content = stream.read()
+        if not matches_file_signature(content, mimetype):
+            raise FileSignatureError(f"Content of {filename} does not match {mimetype}")
         if self.should_fail:
-            return {"status": "error", "error": "upload failed"}
-        
+            return {"status": "failed", "error": "upload failed"}
+
+        blob_path = f"{blob_folder}/{os.path.basename(filename)}"
         return {
             "status": "success",
-            "blob_url": f"https://dummy.blob/{blob_folder}/{os.path.basename(file_path)}",
+            "blob_url": f"https://dummy.blob/{blob_path}",
+            "blob_path": blob_path,
+            "size": len(content),
         }
 
 
@@ -53,23 +62,20 @@ def app(monkeypatch):
     """Create Flask app for testing"""
     import routes.file_management as fm
 
+    # Spreadsheet descriptions are queued, not generated in the request
+    queued = []
     monkeypatch.setattr(
-        fm,
-        "create_description",
-        lambda path, llm=None: {
-            "file_description": "fake description",
-            "source": "test"
-        }
+        fm.description_jobs,
+        "enqueue",
+        lambda blob_name, container_name, kind: queued.append((blob_name, kind)),
     )
-
-    # Patch validate_file_signature to always return True
-    monkeypatch.setattr(fm, "validate_file_signature", lambda path, mime: True)
+    monkeypatch.setattr(fm, "note_blob_added", lambda blob_name: None)
 
     app = Flask(__name__)
     app.register_blueprint(fm.bp)
 
     # Dummy configs
-    app.config["llm"] = object()
+    app.config["queued_descriptions"] = queued
     app.config["blob_storage_manager"] = DummyBlobStorageManager()
 
     return app
@@ -114,18 +120,11 @@ def test_invalid_file_type(client):
     assert "Invalid file type" in json_data["error"]["message"]
 
 
-def test_file_signature_mismatch(client, monkeypatch, app):
-    """Test upload with mismatched file signature"""
-    # Mock validate_file_signature to return False
-    monkeypatch.setattr(
-        "routes.file_management.validate_file_signature", 
-        lambda path, mime: False
-    )
-    
-    # Create a CSV file (which is in ALLOWED_MIME_TYPES)
-    csv_content = b"col1,col2\n1,2"
+def test_file_signature_mismatch(client):
+    """Test upload whose content does not match its declared type"""
+    # Declared as a PDF, but without the %PDF signature
     data = {
-        "file": (io.BytesIO(csv_content), "test.csv")
+        "file": (io.BytesIO(b"col1,col2\n1,2"), "test.pdf")
     }
     
     res = client.post(
@@ -180,7 +179,7 @@ def test_upload_failure(client, app):
 
 def test_pdf_upload(client):
     """Test uploading a PDF file (no description generation)"""
-    # Create fake PDF content (just for testing, signature validation is mocked)
+    # Fake PDF content; only the signature is checked
     pdf_content = b"%PDF-1.4\nfake pdf content"
     data = {"file": (io.BytesIO(pdf_content), "test.pdf")}
     
@@ -196,8 +195,8 @@ def test_pdf_upload(client):
     assert "blob_url" in json_data
 
 
-def test_xlsx_upload_with_description(client):
-    """Test uploading an Excel file (should generate description)"""
+def test_xlsx_upload_with_description(client, app):
+    """Test uploading an Excel file (should queue a description)"""
     # Create fake Excel content
     xlsx_content = b"PK\x03\x04fake excel content"
     data = {"file": (io.BytesIO(xlsx_content), "test.xlsx")}
@@ -212,6 +211,10 @@ def test_xlsx_upload_with_description(client):
     json_data = json_response["data"]
     assert json_data["filename"] == "test.xlsx"
     assert "blob_url" in json_data
+    assert json_data["description_status"] == "pending"
+    assert app.config["queued_descriptions"] == [
+        ("organization_files/shared/test.xlsx", "excel")
+    ]
 
 
 def test_docx_upload(client):
@@ -271,13 +274,13 @@ def test_shared_file_metadata(client, monkeypatch):
     """Test that uploaded files have correct metadata including shared_file flag"""
     uploaded_metadata = []
     
-    # Capture metadata from upload_to_blob calls
-    original_upload = DummyBlobStorageManager.upload_to_blob
-    def capture_upload(self, file_path, blob_folder, metadata, container):
+    # Capture metadata from upload_stream_to_blob calls
+    original_upload = DummyBlobStorageManager.upload_stream_to_blob
+    def capture_upload(self, stream, filename, blob_folder, metadata, container, mimetype):
         uploaded_metadata.append(metadata)
-        return original_upload(self, file_path, blob_folder, metadata, container)
+        return original_upload(self, stream, filename, blob_folder, metadata, container, mimetype)
     
-    monkeypatch.setattr(DummyBlobStorageManager, "upload_to_blob", capture_upload)
+    monkeypatch.setattr(DummyBlobStorageManager, "upload_stream_to_blob", capture_upload)
     
     csv_content = b"col1,col2\n1,2"
     data = {"file": (io.BytesIO(csv_content), "test.csv")}
@@ -296,5 +299,5 @@ def test_shared_file_metadata(client, monkeypatch):
     assert metadata["shared_file"] == "true"
     assert "organization_id" in metadata
     assert metadata["organization_id"] == "shared"
-    assert "description" in metadata
-    assert "description_source" in metadata
+    # The description is added to the metadata by the background worker
+    assert metadata["description_status"] == "pending"
@@ -0,0 +1,62 @@
+import types
+
+import pytest
+
+from shared import spreadsheet_preview
+
+
+class FakeBlobClient:
+    def __init__(self, service, name):
+        self.service = service
+        self.blob_name = name
+
+    def get_blob_properties(self):
+        self.service.head_calls.append(self.blob_name)
+        if self.blob_name not in self.service.blobs:
+            raise LookupError(self.blob_name)
+        return types.SimpleNamespace(etag=self.service.blobs[self.blob_name], size=3)
+
+    def download_blob(self):
+        self.service.downloads += 1
+        return types.SimpleNamespace(readall=lambda: b"a,b\n1,2\n")
+
+
+class FakeServiceClient:
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.head_calls = []
+        self.downloads = 0
+
+    def get_blob_client(self, container, blob):
+        return FakeBlobClient(self, blob)
+
+
+@pytest.fixture(autouse=True)
+def reset_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        spreadsheet_preview, "preview_cache", spreadsheet_preview.PreviewCache(str(tmp_path))
+    )
+    monkeypatch.setattr(spreadsheet_preview, "csv_to_xlsx", lambda data: b"xlsx:" + data)
+
+
+def test_csv_preview_is_converted_once_per_etag(tmp_path):
+    service = FakeServiceClient({"a/b.csv": '"e1"'})
+    blob_client = service.get_blob_client("documents", "a/b.csv")
+
+    first = spreadsheet_preview.get_csv_preview(blob_client, "a/b.csv", '"e1"')
+    second = spreadsheet_preview.get_csv_preview(blob_client, "a/b.csv", '"e1"')
+    spreadsheet_preview.get_csv_preview(blob_client, "a/b.csv", '"e2"')
+
+    assert first == second == b"xlsx:a,b\n1,2\n"
+    assert service.downloads == 2
+    assert len(list(tmp_path.glob("*.xlsx"))) == 2
+
+
+def test_disk_cache_survives_memory_eviction(tmp_path):
+    cache = spreadsheet_preview.PreviewCache(str(tmp_path), memory_bytes=4, disk_bytes=10)
+    cache.put(("a", "1"), b"12345")
+    cache.put(("b", "1"), b"67890")
+
+    assert cache.get(("a", "1")) == b"12345"
+    cache.put(("c", "1"), b"abcde")
+    assert len(list(tmp_path.glob("*.xlsx"))) == 2
@@ -0,0 +1,78 @@
+from shared.tier_catalog import SubscriptionTierCatalog
+
+
+class FakeTierSource:
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.load_calls = 0
+
+    def load(self):
+        self.load_calls += 1
+        return list(self.tiers)
+
+    def version(self):
+        return frozenset((t["id"], t["_etag"]) for t in self.tiers)
+
+
+def _catalog(source):
+    return SubscriptionTierCatalog(
+        loader=source.load, version_probe=source.version, refresh_interval=0
+    )
+
+
+def test_lookups_load_catalog_once():
+    source = FakeTierSource([{"id": "tier_free", "_etag": "1"}, {"id": "tier_basic", "_etag": "1"}])
+    catalog = _catalog(source)
+
+    catalog.get("tier_free")
+    catalog.get("tier_basic")
+
+    assert source.load_calls == 1
+    assert catalog.get_stats()["hits"] == 2
+
+
+def test_unknown_tier_is_a_miss():
+    catalog = _catalog(FakeTierSource([{"id": "tier_free", "_etag": "1"}]))
+
+    assert catalog.get("tier_missing") is None
+    assert catalog.get_stats()["misses"] == 1
+
+
+def test_reload_skips_when_version_unchanged():
+    source = FakeTierSource([{"id": "tier_free", "_etag": "1"}])
+    catalog = _catalog(source)
+    catalog.get("tier_free")
+
+    assert catalog.reload() is False
+    assert source.load_calls == 1
+
+
+def test_reload_picks_up_edited_tier():
+    source = FakeTierSource([{"id": "tier_free", "_etag": "1", "quotas": {"totalCreditsAllocated": 10}}])
+    catalog = _catalog(source)
+    catalog.get("tier_free")
+
+    source.tiers = [{"id": "tier_free", "_etag": "2", "quotas": {"totalCreditsAllocated": 20}}]
+    catalog.reload()
+
+    assert catalog.get("tier_free")["quotas"]["totalCreditsAllocated"] == 20
+
+
+def test_empty_reload_keeps_previous_snapshot():
+    source = FakeTierSource([{"id": "tier_free", "_etag": "1"}])
+    catalog = _catalog(source)
+    catalog.get("tier_free")
+
+    source.tiers = []
+    catalog.reload(force=True)
+
+    assert catalog.get("tier_free") is not None
+
+
+def test_put_adds_tier_read_after_miss():
+    catalog = _catalog(FakeTierSource([{"id": "tier_free", "_etag": "1"}]))
+    catalog.get("tier_free")
+
+    catalog.put({"id": "tier_new", "_etag": "1"})
+
+    assert catalog.get("tier_new") == {"id": "tier_new", "_etag": "1"}
@@ -2,19 +2,28 @@ import io
 import os
 import pytest
 from flask import Flask
-from werkzeug.datastructures import FileStorage
+
+from shared.blob_storage import FileSignatureError, matches_file_signature
 
 
 class DummyBlobStorageManager:
     def __init__(self, should_fail=False):
         self.should_fail = should_fail
+        self.uploads = []
 
-    def upload_to_blob(self, file_path, blob_folder, metadata, container):
+    def upload_stream_to_blob(self, stream, filename, blob_folder, metadata, container, mimetype):
+        content = stream.read()
+        if not matches_file_signature(content, mimetype):
+            raise FileSignatureError(f"Content of {filename} does not match {mimetype}")
         if self.should_fail:
-            return {"status": "error", "error": "upload failed"}
+            return {"status": "failed", "error": "upload failed"}
+        blob_path = f"{blob_folder}/{os.path.basename(filename)}"
+        self.uploads.append((blob_path, content, metadata))
         return {
             "status": "success",
-            "blob_url": f"https://dummy.blob/{blob_folder}/{os.path.basename(file_path)}",
+            "blob_url": f"https://dummy.blob/{blob_path}",
+            "blob_path": blob_path,
+            "size": len(content),
         }
 
 
@@ -22,22 +31,47 @@ class DummyBlobStorageManager:
 def app(monkeypatch):
     # Import INSIDE fixture so conftest.py mock is applied first
     import routes.file_management as usd
+    import shared.decorators as decorators
 
     app = Flask(__name__)
     app.register_blueprint(usd.bp)
 
-    # Patch out create_description - must return dict with file_description and source
+    # Storage limits of an organization the caller belongs to
+    monkeypatch.setattr(decorators, "_get_user_org_ids", lambda user_id: {"org123"})
     monkeypatch.setattr(
-        usd,
-        "create_description",
-        lambda path, llm=None: {
-            "file_description": "fake description",
-            "source": "AI-generated"
-        }
+        decorators,
+        "get_organization_tier_and_subscription",
+        lambda organization_id: (
+            {
+                "policy": {"allowFileUploads": True},
+                "quotas": {
+                    "totalStorageAllocated": 10,
+                    "totalSpreadsheets": 10,
+                    "totalPagesAllocated": 100,
+                },
+            },
+            {
+                "balance": {
+                    "currentUsedStorage": 1,
+                    "currentPagesUsed": 0,
+                    "currentSpreadsheetsUsed": 0,
+                }
+            },
+        ),
     )
+    monkeypatch.setattr(usd, "update_storage_used", lambda organization_id, used: None)
+    monkeypatch.setattr(usd, "invalidate_gallery_index", lambda prefix: None)
+    monkeypatch.setattr(usd, "note_blob_added", lambda blob_name: None)
 
-    # Dummy configs
-    app.config["llm"] = object()
+    # Descriptions are queued, not generated in the request
+    queued = []
+    monkeypatch.setattr(usd.description_jobs, "has_capacity", lambda: True)
+    monkeypatch.setattr(
+        usd.description_jobs,
+        "enqueue",
+        lambda blob_name, container_name, kind: queued.append((blob_name, container_name, kind)),
+    )
+    app.config["queued_descriptions"] = queued
     app.config["blob_storage_manager"] = DummyBlobStorageManager()
 
     return app
@@ -45,7 +79,12 @@ def app(monkeypatch):
 
 @pytest.fixture
 def client(app):
-    return app.test_client()
+    client = app.test_client()
+    client.environ_base.update({
+        "HTTP_X_MS_CLIENT_PRINCIPAL_ID": "user1",
+        "HTTP_X_MS_CLIENT_PRINCIPAL_ORGANIZATION": "org123",
+    })
+    return client
 
 
 def test_no_file_in_request(client):
@@ -71,14 +110,57 @@ def test_no_organization_id(client):
     assert b"Organization ID is required" in res.data
 
 
-def test_successful_upload(client, monkeypatch):
+def test_successful_upload(client):
+    data = {
+        "file": (io.BytesIO(b"col1,col2\n1,2"), "test.csv"),
+        "organization_id": "org123",
+    }
+    res = client.post("/api/upload-source-document", data=data, content_type="multipart/form-data")
+    assert res.status_code == 200
+    json_data = res.get_json()["data"]
+    assert json_data["blob_name"] == "organization_files/org123/test.csv"
+    assert json_data["description_status"] == "pending"
+    assert client.application.config["queued_descriptions"] == [
+        ("organization_files/org123/test.csv", "documents", "excel")
+    ]
+
+
+def test_description_uses_the_upload_container(client, monkeypatch):
+    monkeypatch.setenv("BLOB_CONTAINER_NAME", "tenant-docs")
     data = {
         "file": (io.BytesIO(b"col1,col2\n1,2"), "test.csv"),
         "organization_id": "org123",
     }
     res = client.post("/api/upload-source-document", data=data, content_type="multipart/form-data")
     assert res.status_code == 200
-    assert b"blob_url" in res.data
+    assert client.application.config["queued_descriptions"] == [
+        ("organization_files/org123/test.csv", "tenant-docs", "excel")
+    ]
+
+
+def test_file_signature_mismatch(client, app):
+    data = {
+        "file": (io.BytesIO(b"not a pdf"), "test.pdf"),
+        "organization_id": "org123",
+    }
+    res = client.post("/api/upload-source-document", data=data, content_type="multipart/form-data")
+    assert res.status_code == 422
+    assert b"File content does not match declared type" in res.data
+    assert app.config["blob_storage_manager"].uploads == []
+
+
+def test_full_description_queue_is_retried_later(client, app, monkeypatch):
+    import routes.file_management as usd
+
+    monkeypatch.setattr(usd.description_jobs, "has_capacity", lambda: False)
+    data = {
+        "file": (io.BytesIO(b"col1,col2\n1,2"), "test.csv"),
+        "organization_id": "org123",
+    }
+    res = client.post("/api/upload-source-document", data=data, content_type="multipart/form-data")
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == str(usd.DESCRIPTION_RETRY_AFTER_SECONDS)
+    assert app.config["blob_storage_manager"].uploads == []
 
 
 def test_failed_upload(client, app):
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+os.environ["AZURE_DB_ID"] = "test_db_id"
+os.environ["AZURE_DB_NAME"] = "test_db_name"
+
+import shared.cosmo_db as cosmo_db
+
+
+class FakePagedResult(list):
+    def by_page(self):
+        return iter([list(self)])
+
+
+class FakeCountingContainer:
+    """Answers the queries get_user_organizations issues, counting round trips."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.round_trips = 0
+
+    def _trip(self):
+        self.round_trips += 1
+
+    def read_item(self, item, partition_key):
+        self._trip()
+        return self.docs[item]
+
+    def query_items(self, query, parameters=None, **kwargs):
+        self._trip()
+        params = {p["name"]: p["value"] for p in parameters or []}
+        if "@org_ids" in params:
+            return FakePagedResult(self.docs[i] for i in params["@org_ids"] if i in self.docs)
+        if "invited_user_id" in query:
+            return FakePagedResult(
+                {"organization_id": d["organization_id"]}
+                for d in self.docs.values()
+                if d["invited_user_id"] == params["@user_id"] and d["active"]
+            )
+        return FakePagedResult(d for d in self.docs.values() if d.get("owner") == params["@user_id"])
+
+
+def _install(monkeypatch, org_count, owned=()):
+    orgs = {
+        f"org{i}": {
+            "id": f"org{i}",
+            "name": f"Org {i}",
+            "owner": "someone-else",
+            "sessionId": "",
+            "subscriptionId": f"sub{i}",
+            "subscriptionStatus": "active",
+            "subscriptionExpirationDate": "",
+            "_etag": "ignored",
+        }
+        for i in range(org_count)
+    }
+    for org_id in owned:
+        orgs[org_id] = {"id": org_id, "name": org_id, "owner": "consultant"}
+    invitations = {
+        f"inv{i}": {"id": f"inv{i}", "organization_id": f"org{i}", "invited_user_id": "consultant", "active": True}
+        for i in range(org_count)
+    }
+    # One invitation points at an org that no longer exists.
+    invitations["dangling"] = {"id": "dangling", "organization_id": "gone", "invited_user_id": "consultant", "active": True}
+    containers = {
+        "organizations": FakeCountingContainer(orgs),
+        "invitations": FakeCountingContainer(invitations),
+    }
+    monkeypatch.setattr(cosmo_db, "get_cosmos_container", containers.__getitem__)
+    return containers
+
+
+def test_result_shape_and_dedup(monkeypatch):
+    _install(monkeypatch, 3, owned=["org1", "own1"])
+
+    orgs = cosmo_db.get_user_organizations("consultant")
+
+    assert sorted(o["id"] for o in orgs) == ["org0", "org1", "org2", "own1"]
+    assert set(orgs[0]) == {
+        "id",
+        "name",
+        "owner",
+        "sessionId",
+        "subscriptionExpirationDate",
+        "subscriptionId",
+        "subscriptionStatus",
+    }
+
+
+@pytest.mark.parametrize("org_count", [1, 10, 30, 50])
+def test_round_trips_do_not_grow_with_org_count(monkeypatch, org_count):
+    containers = _install(monkeypatch, org_count)
+
+    orgs = cosmo_db.get_user_organizations("consultant")
+
+    assert len(orgs) == org_count
+    # invitations query + owned query + one batched org query
+    assert containers["invitations"].round_trips + containers["organizations"].round_trips == 3
@@ -1,4 +1,5 @@
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import uuid
 import os
@@ -24,6 +25,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from shared import membership_cache
 from shared.cosmo_db import (
     get_organization_subscription,
     get_subscription_tier_by_id, 
@@ -390,11 +392,13 @@ def delete_conversation(conversation_id, user_id):
 
 
 def get_conversations(user_id):
+    """
+    Return every conversation of the user, unordered.
+
+    The sidebar pages through shared.chat_history.get_history_page instead.
+    """
     try:
-        credential = DefaultAzureCredential()
-        db_client = CosmosClient(AZURE_DB_URI, credential, consistency_level="Session")
-        db = db_client.get_database_client(database=AZURE_DB_NAME)
-        container = db.get_container_client("conversations")
+        container = get_cosmos_container("conversations")
 
         # Fetch all conversations for the user
         query = """
@@ -896,6 +900,41 @@ def get_user_by_id(user_id):
     return user
 
 
+USERS_BATCH_SIZE = int(os.getenv("USERS_BATCH_SIZE", "100"))
+USERS_READ_CONCURRENCY = int(os.getenv("USERS_READ_CONCURRENCY", "4"))
+
+
+def _read_users_by_ids(users_container, user_ids):
+    """
+    Read ``id`` and ``data`` for many users with concurrent batched queries.
+
+    Results are returned in batch order so callers see a stable ordering.
+    """
+    batches = [
+        user_ids[i : i + USERS_BATCH_SIZE]
+        for i in range(0, len(user_ids), USERS_BATCH_SIZE)
+    ]
+    if not batches:
+        return []
+
+    def read_batch(batch_ids):
+        return list(
+            users_container.query_items(
+                query="SELECT c.id, c.data FROM c WHERE ARRAY_CONTAINS(@user_ids, c.id)",
+                parameters=[{"name": "@user_ids", "value": batch_ids}],
+                enable_cross_partition_query=True,
+            )
+        )
+
+    if len(batches) == 1:
+        return read_batch(batches[0])
+
+    with ThreadPoolExecutor(
+        max_workers=min(USERS_READ_CONCURRENCY, len(batches))
+    ) as executor:
+        return [user for page in executor.map(read_batch, batches) for user in page]
+
+
 def get_users(organization_id):
     users_container = get_cosmos_container("users")
     invitations_container = get_cosmos_container("invitations")
@@ -930,78 +969,57 @@ def get_users(organization_id):
             owner_id = owner_list[0]
             user_roles[owner_id] = {"role": "admin", "active": True}
 
+        # Index inactive invitations by user once instead of scanning
+        # invitation_result for every user. The first match wins, as before.
+        pending_invitations = {}
+        redeemed_invitations = {}
+        for item in invitation_result:
+            uid = item.get("invited_user_id")
+            if not uid or item.get("active") != False:
+                continue
+            if item.get("redeemed_at"):
+                redeemed_invitations.setdefault(uid, item)
+            else:
+                pending_invitations.setdefault(uid, item)
+
         filtered_users = []
         existing_emails = set()
-        user_ids = list(user_roles.keys())
-        BATCH_SIZE = 10
 
         # 3. Bring active users
-        for i in range(0, len(user_ids), BATCH_SIZE):
-            found_user_ids = set()
-            batch_ids = user_ids[i : i + BATCH_SIZE]
-            in_clause = ", ".join([f'"{uid}"' for uid in batch_ids])
-            query = f"""
-                SELECT * FROM c WHERE c.id IN ({in_clause})
-            """
-            user_batch_result = users_container.query_items(
-                query=query,
-                enable_cross_partition_query=True,
-            )
-
-            for user in user_batch_result:
-                uid = user["id"]
-                found_user_ids.add(uid)
-                # Look for inactive and NOT redeemed invitation for this user
-                invitation = next(
-                    (
-                        item for item in invitation_result
-                        if item.get("invited_user_id") == uid
-                        and item.get("active") == False
-                        and not item.get("redeemed_at")
-                    ),
-                    None
-                )
-                # Search for inactive and YES redeemed invitation for this user
-                invitation_redeemed = next(
-                    (
-                        item for item in invitation_result
-                        if item.get("invited_user_id") == uid
-                        and item.get("active") == False
-                        and item.get("redeemed_at")
-                    ),
-                    None
-                )
-                # If there is an inactive invitation and NOT redeemed, display as a guest.
-                if invitation:
-                    email = invitation.get("invited_user_email", "")
-                    filtered_users.append({
-                        "id": None,
-                        "invitation_id": invitation.get("id"),
-                        "data": {
-                            "name": invitation.get("nickname", ""),
-                            "email": email
-                        },
-                        "role": invitation.get("role"),
-                        "active": invitation.get("active", False),
-                        "user_new": True,
-                        "token_expiry": invitation.get("token_expiry"),
-                        "nickname": invitation.get("nickname", "")
-                    })
-                    if email:
-                        existing_emails.add(email)
-                # If there is inactive invitation and YES redeemed, DO NOT add anything (skip this user)
-                elif invitation_redeemed:
-                    continue
-                # If active and no redeemed invitation, display as active user
-                elif user_roles.get(uid, {}).get("active"):
-                    user["role"] = user_roles.get(uid, {}).get("role")
-                    user["active"] = user_roles.get(uid, {}).get("active")
-                    user["user_new"] = False
-                    user["user_account_created"] = True
-                    filtered_users.append(user)
-                    email = user.get("data", {}).get("email")
-                    if email:
-                        existing_emails.add(email)
+        for user in _read_users_by_ids(users_container, list(user_roles.keys())):
+            uid = user["id"]
+            invitation = pending_invitations.get(uid)
+            # If there is an inactive invitation and NOT redeemed, display as a guest.
+            if invitation:
+                email = invitation.get("invited_user_email", "")
+                filtered_users.append({
+                    "id": None,
+                    "invitation_id": invitation.get("id"),
+                    "data": {
+                        "name": invitation.get("nickname", ""),
+                        "email": email
+                    },
+                    "role": invitation.get("role"),
+                    "active": invitation.get("active", False),
+                    "user_new": True,
+                    "token_expiry": invitation.get("token_expiry"),
+                    "nickname": invitation.get("nickname", "")
+                })
+                if email:
+                    existing_emails.add(email)
+            # If there is inactive invitation and YES redeemed, DO NOT add anything (skip this user)
+            elif uid in redeemed_invitations:
+                continue
+            # If active and no redeemed invitation, display as active user
+            elif user_roles.get(uid, {}).get("active"):
+                user["role"] = user_roles.get(uid, {}).get("role")
+                user["active"] = user_roles.get(uid, {}).get("active")
+                user["user_new"] = False
+                user["user_account_created"] = True
+                filtered_users.append(user)
+                email = user.get("data", {}).get("email")
+                if email:
+                    existing_emails.add(email)
 
         # 3.5. Add invitations with active+redeemed but no user (user_account_created=False), only once per invitation
         for item in invitation_result:
@@ -1090,6 +1108,7 @@ def delete_user(user_id, organization_id):
             inv_container.delete_item(item=invitation["id"], partition_key=invitation["id"])
             logging.info(f"[delete_user] Invitation {invitation['id']} deleted for user {user_id} for this organization {organization_id}")
 
+        membership_cache.invalidate(user_id)
         return jsonify("Success")
     except CosmosResourceNotFoundError:
         logging.warning(f"[delete_user] User not Found.")
@@ -1139,6 +1158,8 @@ def delete_invitation(invitation_id):
             container.delete_item(item=item["id"], partition_key=item["id"])
             logging.info(f"[delete_invitation] Deleted invitation {item['id']}")
 
+        membership_cache.invalidate(original_invitation.get("invited_user_id"))
+
         return {"status": "success", "deleted_count": len(items)}
 
     except CosmosResourceNotFoundError: